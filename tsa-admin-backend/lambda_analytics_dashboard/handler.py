@@ -5,7 +5,6 @@ Handles dashboard metrics, event tracking, sessions, and onboarding analytics
 import json
 import uuid
 import os
-import boto3
 from datetime import datetime, timedelta, timezone
 from typing import Dict, Any
 import logging
@@ -13,7 +12,8 @@ from decimal import Decimal
 
 # Import shared utilities from consolidated shared layer
 try:
-    from tsa_shared import create_cors_response, parse_event_body, log_admin_action
+    from tsa_shared import create_cors_response, parse_event_body, log_admin_action, get_table, get_client
+    from tsa_shared.admin_metrics import get_dashboard_metrics
     logger = logging.getLogger()
     logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 except ImportError as e:
@@ -21,17 +21,16 @@ except ImportError as e:
     raise
 
 # AWS clients
-dynamodb = boto3.resource('dynamodb')
-kinesis = boto3.client('kinesis')
+kinesis = get_client('kinesis')
 
 def get_analytics_tables():
     """Lazy initialization of analytics tables"""
     return {
-        'analytics_events': dynamodb.Table(os.environ.get('TSA_ANALYTICS_EVENTS_TABLE', 'coach-analytics-eventsdev')),
-        'sessions': dynamodb.Table(os.environ.get('TSA_ANALYTICS_SESSIONS_TABLE', 'coach-analytics-sessionsdev')),
-        'invitations': dynamodb.Table(os.environ.get('TSA_INVITATIONS_TABLE', 'coach-invitationsdev')),
-        'profiles': dynamodb.Table(os.environ.get('TSA_PROFILES_TABLE', 'profilesdev')),
-        'audit': dynamodb.Table(os.environ.get('TSA_AUDIT_LOGS_TABLE', 'admin-audit-logsdev'))
+        'analytics_events': get_table(os.environ.get('TSA_ANALYTICS_EVENTS_TABLE', 'coach-analytics-eventsdev')),
+        'sessions': get_table(os.environ.get('TSA_ANALYTICS_SESSIONS_TABLE', 'coach-analytics-sessionsdev')),
+        'invitations': get_table(os.environ.get('TSA_INVITATIONS_TABLE', 'coach-invitationsdev')),
+        'profiles': get_table(os.environ.get('TSA_PROFILES_TABLE', 'profilesdev')),
+        'audit': get_table(os.environ.get('TSA_AUDIT_LOGS_TABLE', 'admin-audit-logsdev'))
     }
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -68,30 +67,22 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 def handle_dashboard_analytics(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Handle dashboard analytics with enhanced metrics"""
     try:
-        # Get table references
-        tables = get_analytics_tables()
-        invitations_table = tables['invitations']
-        profiles_table = tables['profiles']
-        audit_table = tables['audit']
-        
-        # Fetch data
-        invitations_response = invitations_table.scan()
-        invitations = invitations_response.get('Items', [])
-        
-        coaches_response = profiles_table.scan()
-        coaches = coaches_response.get('Items', [])
+        # Pre-aggregated counters (maintained from table streams by lambda_metrics_aggregator)
+        metrics = get_dashboard_metrics()
         
+        audit_table = get_analytics_tables()['audit']
         audit_response = audit_table.scan(Limit=10)
         audit_logs = audit_response.get('Items', [])
         
         # Calculate metrics
-        total_invitations = len(invitations)
-        pending_invitations = len([inv for inv in invitations if inv.get('status') == 'pending'])
-        completed_invitations = len([inv for inv in invitations if inv.get('status') == 'accepted'])
-        cancelled_invitations = len([inv for inv in invitations if inv.get('status') == 'cancelled'])
+        invitations_by_status = metrics['invitations_by_status']
+        total_invitations = metrics['total_invitations']
+        pending_invitations = invitations_by_status.get('pending', 0)
+        completed_invitations = invitations_by_status.get('accepted', 0)
+        cancelled_invitations = invitations_by_status.get('cancelled', 0)
         
-        total_coaches = len(coaches)
-        active_coaches = len([coach for coach in coaches if coach.get('status') == 'active'])
+        total_coaches = metrics['total_coaches']
+        active_coaches = metrics['active_coaches']
         
         # Calculate completion rate
         onboarding_completion_rate = 0.0
@@ -126,10 +117,12 @@ def handle_dashboard_analytics(event: Dict[str, Any], context: Any) -> Dict[str,
                 'completed_onboarding': active_coaches
             },
             'growth_metrics': {
-                'invitations_this_week': len([inv for inv in invitations if is_this_week(inv.get('created_at', ''))]),
-                'coaches_this_week': len([coach for coach in coaches if is_this_week(coach.get('created_at', ''))]),
+                'invitations_this_week': metrics['invitations_this_week'],
+                'coaches_this_week': metrics['coaches_this_week'],
                 'completion_rate_trend': onboarding_completion_rate
-            }
+            },
+            # True until the first metrics rebuild finishes (counters read as zero meanwhile)
+            'metrics_initializing': metrics['initializing']
         }
         
         return create_cors_response(200, analytics_data)
@@ -354,21 +347,13 @@ def handle_sessions_analytics(event: Dict[str, Any], context: Any) -> Dict[str,
 def handle_onboarding_analytics(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Handle onboarding-specific analytics"""
     try:
-        tables = get_analytics_tables()
-        invitations_table = tables['invitations']
-        profiles_table = tables['profiles']
-        
-        # Get onboarding data
-        invitations_response = invitations_table.scan()
-        invitations = invitations_response.get('Items', [])
-        
-        profiles_response = profiles_table.scan()
-        profiles = profiles_response.get('Items', [])
+        metrics = get_dashboard_metrics()
+        invitations_by_status = metrics['invitations_by_status']
         
         # Calculate onboarding metrics
-        total_invitations = len(invitations)
-        started_onboarding = len([inv for inv in invitations if inv.get('status') in ['pending', 'accepted']])
-        completed_onboarding = len([prof for prof in profiles if prof.get('onboarding_complete')])
+        total_invitations = metrics['total_invitations']
+        started_onboarding = invitations_by_status.get('pending', 0) + invitations_by_status.get('accepted', 0)
+        completed_onboarding = metrics['onboarding_complete']
         
         onboarding_funnel = {
             'invited': total_invitations,
@@ -381,26 +366,11 @@ def handle_onboarding_analytics(event: Dict[str, Any], context: Any) -> Dict[str
             'onboarding_funnel': onboarding_funnel,
             'step_completion_rates': {},
             'average_completion_time': None,
-            'drop_off_points': []
+            'drop_off_points': [],
+            'metrics_initializing': metrics['initializing']
         })
         
     except Exception as e:
         logger.error(f"Error handling onboarding analytics: {str(e)}")
         return create_cors_response(500, {'error': str(e)})
 
-
-def is_this_week(date_str: str) -> bool:
-    """Check if date is within current week"""
-    try:
-        if not date_str:
-            return False
-        
-        date = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-        now = datetime.now(timezone.utc)
-        week_start = now - timedelta(days=now.weekday())
-        week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        return date >= week_start
-        
-    except Exception:
-        return False 
\ No newline at end of file
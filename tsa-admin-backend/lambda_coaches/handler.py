@@ -4,7 +4,6 @@ Handles listing, viewing, updating, and deleting coaches
 """
 import json
 import os
-import boto3
 from typing import Dict, Any
 from datetime import datetime
 import logging
@@ -17,7 +16,7 @@ logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
 # Import shared utilities from consolidated shared layer
 try:
-    from tsa_shared import create_cors_response, parse_event_body, log_admin_action
+    from tsa_shared import create_cors_response, parse_event_body, log_admin_action, get_table
 except ImportError as e:
     logger.error(f"Failed to import shared utilities: {e}")
     raise
@@ -63,9 +62,8 @@ def list_coaches(event: Dict[str, Any]) -> Dict[str, Any]:
         status_filter = query_params.get('status')
         limit = int(query_params.get('limit', 100))
         
-        dynamodb = boto3.resource('dynamodb')
         # Connect to the profiles table where coach data is stored
-        profiles_table = dynamodb.Table(config.get_table_name('profiles'))
+        profiles_table = get_table(config.get_table_name('profiles'))
         
         logger.info(f"Querying profiles table: {profiles_table.table_name}")
         
@@ -136,8 +134,7 @@ def list_coaches(event: Dict[str, Any]) -> Dict[str, Any]:
 def get_coach(coach_id: str) -> Dict[str, Any]:
     """Get specific coach details"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        profiles_table = dynamodb.Table(config.get_table_name('profiles'))
+        profiles_table = get_table(config.get_table_name('profiles'))
         
         # Try to find coach by profile_id first
         response = profiles_table.scan(
@@ -182,8 +179,7 @@ def update_coach(coach_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
         
         body = parse_event_body(event)
         
-        dynamodb = boto3.resource('dynamodb')
-        profiles_table = dynamodb.Table(config.get_table_name('profiles'))
+        profiles_table = get_table(config.get_table_name('profiles'))
         
         # Find the coach first
         response = profiles_table.scan(
@@ -279,8 +275,7 @@ def delete_coach(coach_id: str) -> Dict[str, Any]:
         if not coach_id:
             return create_cors_response(400, {'error': 'Coach ID is required'})
         
-        dynamodb = boto3.resource('dynamodb')
-        profiles_table = dynamodb.Table(config.get_table_name('profiles'))
+        profiles_table = get_table(config.get_table_name('profiles'))
         
         # Find the coach first
         response = profiles_table.scan(
@@ -4,7 +4,6 @@ Handles invitation creation, listing, updates, and email sending
 """
 import json
 import os
-import boto3
 import uuid
 from typing import Dict, Any
 from datetime import datetime, timedelta
@@ -18,7 +17,7 @@ logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 
 # Import shared utilities from consolidated shared layer
 try:
-    from tsa_shared import create_cors_response, parse_event_body, log_admin_action, SendGridService
+    from tsa_shared import create_cors_response, parse_event_body, log_admin_action, SendGridService, get_table
 except ImportError as e:
     logger.error(f"Failed to import shared utilities: {e}")
     raise
@@ -95,8 +94,7 @@ def create_invitation(event: Dict[str, Any]) -> Dict[str, Any]:
             return create_cors_response(400, {'error': 'Phone number must be at least 10 digits'}, event)
         
         # Check for duplicate pending invitations
-        dynamodb = boto3.resource('dynamodb')
-        invitations_table = dynamodb.Table(config.get_table_name('coach-invitations'))
+        invitations_table = get_table(config.get_table_name('coach-invitations'))
         
         # Check if active invitation already exists for this email
         response = invitations_table.scan(
@@ -200,8 +198,7 @@ def list_invitations(event: Dict[str, Any]) -> Dict[str, Any]:
         status_filter = query_params.get('status')
         limit = int(query_params.get('limit', 50))
         
-        dynamodb = boto3.resource('dynamodb')
-        invitations_table = dynamodb.Table(config.get_table_name('coach-invitations'))
+        invitations_table = get_table(config.get_table_name('coach-invitations'))
         
         if status_filter:
             # Query by status using GSI
@@ -235,8 +232,7 @@ def list_invitations(event: Dict[str, Any]) -> Dict[str, Any]:
 def get_invitation(invitation_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
     """Get specific invitation details"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        invitations_table = dynamodb.Table(config.get_table_name('coach-invitations'))
+        invitations_table = get_table(config.get_table_name('coach-invitations'))
         
         response = invitations_table.get_item(
             Key={'invitation_id': invitation_id}
@@ -274,8 +270,7 @@ def resend_invitation(invitation_id: str, event: Dict[str, Any]) -> Dict[str, An
         send_invitation_email(invitation['email'], invite_url, invitation)
         
         # Update last sent timestamp
-        dynamodb = boto3.resource('dynamodb')
-        invitations_table = dynamodb.Table(config.get_table_name('coach-invitations'))
+        invitations_table = get_table(config.get_table_name('coach-invitations'))
         invitations_table.update_item(
             Key={'invitation_id': invitation_id},
             UpdateExpression='SET last_sent_at = :timestamp',
@@ -292,8 +287,7 @@ def resend_invitation(invitation_id: str, event: Dict[str, Any]) -> Dict[str, An
 def cancel_invitation(invitation_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
     """Cancel an invitation"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        invitations_table = dynamodb.Table(config.get_table_name('coach-invitations'))
+        invitations_table = get_table(config.get_table_name('coach-invitations'))
         
         # Update status to cancelled
         invitations_table.update_item(
@@ -316,8 +310,7 @@ def cancel_invitation(invitation_id: str, event: Dict[str, Any]) -> Dict[str, An
 def delete_invitation(invitation_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
     """Permanently delete an invitation"""
     try:
-        dynamodb = boto3.resource('dynamodb')
-        invitations_table = dynamodb.Table(config.get_table_name('coach-invitations'))
+        invitations_table = get_table(config.get_table_name('coach-invitations'))
         
         # First check if invitation exists and get email for logging
         response = invitations_table.get_item(Key={'invitation_id': invitation_id})
@@ -369,8 +362,7 @@ def update_invitation(invitation_id: str, event: Dict[str, Any]) -> Dict[str, An
                     update_expression += f", {field} = :{field}"
                     expression_values[f':{field}'] = body[field]
         
-        dynamodb = boto3.resource('dynamodb')
-        invitations_table = dynamodb.Table(config.get_table_name('coach-invitations'))
+        invitations_table = get_table(config.get_table_name('coach-invitations'))
         
         invitations_table.update_item(
             Key={'invitation_id': invitation_id},
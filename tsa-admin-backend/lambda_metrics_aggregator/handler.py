@@ -0,0 +1,73 @@
+"""
+Lambda handler for admin dashboard metrics aggregation
+Consumes coach-invitations and profiles DynamoDB streams and maintains pre-aggregated counters
+
+Backfill / rebuild: invoke directly with {"action": "rebuild"} (optionally "total_segments")
+to recompute every counter from a parallel scan of the source tables.
+"""
+import os
+from datetime import datetime, timezone
+from typing import Dict, Any
+import logging
+
+# Import shared utilities from consolidated shared layer
+try:
+    from tsa_shared.admin_metrics import (
+        invitation_deltas, profile_deltas, deserialize_image,
+        apply_metric_deltas, rebuild_admin_metrics
+    )
+    logger = logging.getLogger()
+    logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+except ImportError as e:
+    logging.getLogger().error(f"Failed to import shared utilities: {e}")
+    raise
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Route stream batches and rebuild commands"""
+    if event.get('action') == 'rebuild':
+        result = rebuild_admin_metrics(int(event.get('total_segments', 4)))
+        logger.info(f"✅ Admin metrics rebuilt: {result}")
+        return {'success': True, **result}
+
+    return handle_stream_batch(event)
+
+
+def _table_name_from_arn(event_source_arn: str) -> str:
+    """arn:aws:dynamodb:region:account:table/<name>/stream/<label> -> <name>"""
+    try:
+        return event_source_arn.split(':table/', 1)[1].split('/', 1)[0]
+    except IndexError:
+        return ''
+
+
+def handle_stream_batch(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Fold a batch of stream records into counter deltas and apply them atomically"""
+    invitations_table = os.environ.get('TSA_INVITATIONS_TABLE')
+    profiles_table = os.environ.get('TSA_PROFILES_TABLE')
+
+    records = event.get('Records', [])
+    deltas = {}
+    skipped = 0
+
+    for record in records:
+        table_name = _table_name_from_arn(record.get('eventSourceARN', ''))
+        images = record.get('dynamodb', {})
+        old = deserialize_image(images.get('OldImage'))
+        new = deserialize_image(images.get('NewImage'))
+
+        if table_name == invitations_table:
+            invitation_deltas(old, new, deltas)
+        elif table_name == profiles_table:
+            profile_deltas(old, new, deltas)
+        else:
+            skipped += 1
+
+    # Retried batches carry the same event IDs, so the transaction token dedupes them
+    idempotency_key = ','.join(record.get('eventID', '') for record in records)
+    newest = max((record.get('dynamodb', {}).get('ApproximateCreationDateTime', 0) for record in records), default=0)
+    updated_at = datetime.fromtimestamp(newest, timezone.utc).isoformat() if newest else None
+    updated = apply_metric_deltas(deltas, idempotency_key=idempotency_key, updated_at=updated_at)
+
+    logger.info(f"Processed {len(records)} stream records -> {updated} metric items updated ({skipped} skipped)")
+    return {'success': True, 'records': len(records), 'metric_items_updated': updated}
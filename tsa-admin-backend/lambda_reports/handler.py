@@ -5,30 +5,30 @@ Handles report creation, execution, and management
 import json
 import uuid
 import os
-import boto3
 from datetime import datetime, timedelta
 from typing import Dict, Any
 import logging
 
 # Import shared utilities from consolidated shared layer
 try:
-    from tsa_shared import create_cors_response, parse_event_body, log_admin_action
+    from tsa_shared import create_cors_response, parse_event_body, log_admin_action, get_table
+    from report_engine import (
+        REPORT_SOURCES, EXPORT_FORMATS, DEFAULT_INLINE_LIMIT,
+        build_query_plan, run_inline, run_export
+    )
     logger = logging.getLogger()
     logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
 except ImportError as e:
     logger.error(f"Failed to import shared utilities: {e}")
     raise
 
-# AWS clients
-dynamodb = boto3.resource('dynamodb')
-
 def get_reports_tables():
     """Lazy initialization of reports tables"""
     return {
-        'custom_reports': dynamodb.Table(os.environ.get('TSA_CUSTOM_REPORTS_TABLE', 'coach-custom-reportsdev')),
-        'analytics_events': dynamodb.Table(os.environ.get('TSA_ANALYTICS_EVENTS_TABLE', 'coach-analytics-eventsdev')),
-        'invitations': dynamodb.Table(os.environ.get('TSA_INVITATIONS_TABLE', 'coach-invitationsdev')),
-        'profiles': dynamodb.Table(os.environ.get('TSA_PROFILES_TABLE', 'profilesdev'))
+        'custom_reports': get_table(os.environ.get('TSA_CUSTOM_REPORTS_TABLE', 'coach-custom-reportsdev')),
+        'analytics_events': get_table(os.environ.get('TSA_ANALYTICS_EVENTS_TABLE', 'coach-analytics-eventsdev')),
+        'invitations': get_table(os.environ.get('TSA_INVITATIONS_TABLE', 'coach-invitationsdev')),
+        'profiles': get_table(os.environ.get('TSA_PROFILES_TABLE', 'profilesdev'))
     }
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -122,7 +122,7 @@ def create_custom_report(event: Dict[str, Any]) -> Dict[str, Any]:
             'report_name': body['report_name'],
             'report_type': body['report_type'],  # 'dashboard', 'export', 'scheduled'
             'data_source': body['data_source'],  # 'invitations', 'coaches', 'analytics'
-            'filters': body.get('filters', {}),
+            'filters': body.get('filters', {}),  # Equality filters; indexed attributes (status, email) match exactly
             'columns': body.get('columns', []),
             'schedule': body.get('schedule', {}),  # For scheduled reports
             'format': body.get('format', 'json'),  # 'json', 'csv', 'pdf'
@@ -261,7 +261,14 @@ def delete_custom_report(report_id: str) -> Dict[str, Any]:
 
 
 def handle_report_execution(event: Dict[str, Any], context: Any, report_id: str) -> Dict[str, Any]:
-    """Execute a custom report and return results"""
+    """
+    Execute a custom report
+    
+    Query parameters:
+        format: 'json' (inline, default) or 'csv' / 'ndjson' (chunked S3 export)
+        limit: Max inline rows per response (default 1000)
+        continuation_token: Resume a previous execution
+    """
     try:
         # Get report configuration
         tables = get_reports_tables()
@@ -272,152 +279,53 @@ def handle_report_execution(event: Dict[str, Any], context: Any, report_id: str)
             return create_cors_response(404, {'error': 'Report not found'})
         
         report = response['Item']
+        query_params = event.get('queryStringParameters') or {}
         
-        # Execute report based on data source
+        # Plan the report based on data source
         data_source = report.get('data_source')
         filters = report.get('filters', {})
         columns = report.get('columns', [])
         
-        if data_source == 'invitations':
-            results = execute_invitations_report(filters, columns, tables)
-        elif data_source == 'coaches':
-            results = execute_coaches_report(filters, columns, tables)
-        elif data_source == 'analytics':
-            results = execute_analytics_report(filters, columns, tables)
-        else:
+        if data_source not in REPORT_SOURCES:
             return create_cors_response(400, {'error': f'Unsupported data source: {data_source}'})
         
-        # Update report run statistics
-        reports_table.update_item(
-            Key={'report_id': report_id},
-            UpdateExpression='SET last_run = :timestamp, run_count = run_count + :inc',
-            ExpressionAttributeValues={
-                ':timestamp': datetime.utcnow().isoformat(),
-                ':inc': 1
-            }
-        )
+        plan = build_query_plan(data_source, filters, columns)
+        source_table = tables[REPORT_SOURCES[data_source]['table_key']]
+        output_format = query_params.get('format', report.get('format', 'json'))
+        continuation_token = query_params.get('continuation_token')
+        
+        try:
+            if output_format in EXPORT_FORMATS:
+                results = run_export(
+                    source_table, plan, report_id, str(uuid.uuid4()), output_format,
+                    columns, context=context, continuation_token=continuation_token
+                )
+            else:
+                limit = min(int(query_params.get('limit', DEFAULT_INLINE_LIMIT)), DEFAULT_INLINE_LIMIT)
+                results = run_inline(source_table, plan, report_id, limit=limit, continuation_token=continuation_token)
+        except ValueError as e:
+            return create_cors_response(400, {'error': str(e)})
+        
+        # Update report run statistics once per execution (not per continuation)
+        if not continuation_token:
+            reports_table.update_item(
+                Key={'report_id': report_id},
+                UpdateExpression='SET last_run = :timestamp, run_count = run_count + :inc',
+                ExpressionAttributeValues={
+                    ':timestamp': datetime.utcnow().isoformat(),
+                    ':inc': 1
+                }
+            )
         
         return create_cors_response(200, {
             'report_id': report_id,
             'report_name': report.get('report_name'),
             'data_source': data_source,
             'executed_at': datetime.utcnow().isoformat(),
-            'row_count': len(results),
-            'data': results
+            'format': output_format if output_format in EXPORT_FORMATS else 'json',
+            **results
         })
         
     except Exception as e:
         logger.error(f"Error executing report {report_id}: {str(e)}")
         return create_cors_response(500, {'error': str(e)})
-
-
-def execute_invitations_report(filters: Dict[str, Any], columns: list, tables: Dict) -> list:
-    """Execute invitations-based report"""
-    try:
-        invitations_table = tables['invitations']
-        
-        # Get all invitations
-        response = invitations_table.scan()
-        invitations = response.get('Items', [])
-        
-        # Apply filters
-        if filters:
-            filtered_invitations = []
-            for inv in invitations:
-                include = True
-                for key, value in filters.items():
-                    if key in inv and inv[key] != value:
-                        include = False
-                        break
-                if include:
-                    filtered_invitations.append(inv)
-            invitations = filtered_invitations
-        
-        # Select specific columns if specified
-        if columns:
-            results = []
-            for inv in invitations:
-                filtered_inv = {col: inv.get(col) for col in columns if col in inv}
-                results.append(filtered_inv)
-            return results
-        
-        return invitations
-        
-    except Exception as e:
-        logger.error(f"Error executing invitations report: {str(e)}")
-        return []
-
-
-def execute_coaches_report(filters: Dict[str, Any], columns: list, tables: Dict) -> list:
-    """Execute coaches-based report"""
-    try:
-        profiles_table = tables['profiles']
-        
-        # Get all coaches
-        response = profiles_table.scan()
-        coaches = response.get('Items', [])
-        
-        # Apply filters
-        if filters:
-            filtered_coaches = []
-            for coach in coaches:
-                include = True
-                for key, value in filters.items():
-                    if key in coach and coach[key] != value:
-                        include = False
-                        break
-                if include:
-                    filtered_coaches.append(coach)
-            coaches = filtered_coaches
-        
-        # Select specific columns if specified
-        if columns:
-            results = []
-            for coach in coaches:
-                filtered_coach = {col: coach.get(col) for col in columns if col in coach}
-                results.append(filtered_coach)
-            return results
-        
-        return coaches
-        
-    except Exception as e:
-        logger.error(f"Error executing coaches report: {str(e)}")
-        return []
-
-
-def execute_analytics_report(filters: Dict[str, Any], columns: list, tables: Dict) -> list:
-    """Execute analytics-based report"""
-    try:
-        analytics_table = tables['analytics_events']
-        
-        # Get analytics events (limited for performance)
-        response = analytics_table.scan(Limit=100)
-        events = response.get('Items', [])
-        
-        # Apply filters
-        if filters:
-            filtered_events = []
-            for event in events:
-                include = True
-                for key, value in filters.items():
-                    if key in event and event[key] != value:
-                        include = False
-                        break
-                if include:
-                    filtered_events.append(event)
-            events = filtered_events
-        
-        # Select specific columns if specified
-        if columns:
-            results = []
-            for event in events:
-                filtered_event = {col: event.get(col) for col in columns if col in event}
-                results.append(filtered_event)
-            return results
-        
-        return events
-        
-    except Exception as e:
-        logger.error(f"Error executing analytics report: {str(e)}")
-        return []
-
@@ -0,0 +1,359 @@
+"""
+Report execution engine for custom reports
+Pushes filters/columns down to DynamoDB, streams pages through generators and
+writes large results to S3 as chunked CSV/NDJSON with continuation tokens
+"""
+import io
+import csv
+import json
+import base64
+import hashlib
+import hmac
+import os
+import re
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+import logging
+
+from boto3.dynamodb.conditions import Attr, Key
+from tsa_shared import get_client, get_jwt_secret
+from tsa_shared.database import iter_query_pages, iter_scan_pages
+
+logger = logging.getLogger()
+
+# Data source -> table env var and the GSIs whose partition key a filter can target.
+# Filters on these attributes match by strict equality (the GSIs are sparse, so
+# items without the attribute can only be found by a full scan)
+REPORT_SOURCES = {
+    'invitations': {
+        'table_key': 'invitations',
+        'indexes': {'status': 'status-index', 'email': 'email-index'}
+    },
+    'coaches': {
+        'table_key': 'profiles',
+        'indexes': {'email': 'email-index'}
+    },
+    'analytics': {
+        'table_key': 'analytics_events',
+        'indexes': {}
+    }
+}
+
+DEFAULT_PAGE_SIZE = 500
+DEFAULT_INLINE_LIMIT = 1000
+EXPORT_FORMATS = ('csv', 'ndjson')
+
+# S3 multipart parts must be >= 5 MB (except the last one)
+MIN_PART_BYTES = 5 * 1024 * 1024
+# Stop reading new pages once less than this much Lambda time remains
+TIME_BUDGET_MARGIN_MS = 10000
+# Continuation tokens carry Decimal key values as {DECIMAL_TAG: "<exact value>"}
+DECIMAL_TAG = '__decimal__'
+# execution_id becomes part of the S3 key
+EXECUTION_ID_PATTERN = re.compile(r'^[A-Za-z0-9-]+$')
+
+
+# =================================================================
+# QUERY PLANNING
+# =================================================================
+
+def build_query_plan(data_source: str, filters: Dict[str, Any], columns: List[str],
+                     page_size: int = DEFAULT_PAGE_SIZE) -> Dict[str, Any]:
+    """
+    Translate report filters/columns into Scan or Query parameters
+
+    A filter on a GSI partition key turns the scan into a Query on that index.
+    Filters on indexed attributes match by strict equality on both the Query
+    and the Scan path, so the two return the same rows. Other filters keep the
+    original report semantics: an item matches when the attribute is absent or
+    equal to the filter value.
+
+    Args:
+        data_source: Report data source ('invitations', 'coaches', 'analytics')
+        filters: Attribute equality filters
+        columns: Attributes to return (all when empty)
+        page_size: Items evaluated per DynamoDB request
+
+    Returns:
+        Dict with 'operation' ('scan' or 'query'), boto3 request kwargs and projection
+    """
+    source = REPORT_SOURCES[data_source]
+    filters = dict(filters or {})
+    filters_fingerprint = dict(filters)
+    request: Dict[str, Any] = {'Limit': page_size}
+    operation = 'scan'
+
+    for attribute, index_name in source['indexes'].items():
+        if attribute in filters and isinstance(filters[attribute], str):
+            request['IndexName'] = index_name
+            request['KeyConditionExpression'] = Key(attribute).eq(filters.pop(attribute))
+            operation = 'query'
+            break
+
+    condition = None
+    for attribute, value in filters.items():
+        if attribute in source['indexes']:
+            clause = Attr(attribute).eq(value)
+        else:
+            clause = Attr(attribute).not_exists() | Attr(attribute).eq(value)
+        condition = clause if condition is None else condition & clause
+    if condition is not None:
+        request['FilterExpression'] = condition
+
+    # Continuation tokens are signed against this, so a token only resumes the plan it came from
+    fingerprint = hashlib.sha256(json.dumps(
+        [data_source, filters_fingerprint, list(columns or []), page_size], sort_keys=True, default=str
+    ).encode('utf-8')).hexdigest()
+
+    return {'operation': operation, 'request': request, 'projection': list(columns or []),
+            'fingerprint': fingerprint}
+
+
+def iter_report_pages(table, plan: Dict[str, Any],
+                      start_key: Optional[Dict[str, Any]] = None) -> Iterator[Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """
+    Stream result pages for a query plan
+
+    Yields:
+        (items, last_evaluated_key) per DynamoDB page; last_evaluated_key is
+        None on the final page
+    """
+    iter_pages = iter_query_pages if plan['operation'] == 'query' else iter_scan_pages
+    for response in iter_pages(table, projection=plan['projection'], start_key=start_key, **plan['request']):
+        yield response.get('Items', []), response.get('LastEvaluatedKey')
+
+
+# =================================================================
+# CONTINUATION TOKENS
+# =================================================================
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return str(value)
+
+
+def _token_default(value):
+    # Keys go back into ExclusiveStartKey, where the resource layer rejects floats
+    if isinstance(value, Decimal):
+        return {DECIMAL_TAG: str(value)}
+    return str(value)
+
+
+def _token_object_hook(value: Dict[str, Any]):
+    if len(value) == 1 and DECIMAL_TAG in value:
+        return Decimal(value[DECIMAL_TAG])
+    return value
+
+
+def _token_signing_key() -> bytes:
+    return (os.environ.get('REPORT_TOKEN_SECRET') or get_jwt_secret()).encode('utf-8')
+
+
+def _token_signature(report_id: str, plan: Dict[str, Any], payload: str) -> str:
+    message = '\n'.join([report_id, plan['fingerprint'], payload]).encode('utf-8')
+    return hmac.new(_token_signing_key(), message, hashlib.sha256).hexdigest()
+
+
+def encode_continuation_token(state: Dict[str, Any], report_id: str, plan: Dict[str, Any]) -> str:
+    """
+    Serialize pagination state into an opaque URL-safe token (Decimals kept exact)
+
+    The token is signed with an HMAC over (report_id, plan, state), so it
+    cannot be edited or replayed against another report or plan.
+    """
+    raw = json.dumps(state, default=_token_default, separators=(',', ':'))
+    payload = base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+    return f"{payload}.{_token_signature(report_id, plan, payload)}"
+
+
+def decode_continuation_token(token: Optional[str], report_id: str, plan: Dict[str, Any]) -> Dict[str, Any]:
+    """Verify and parse a continuation token (empty dict when absent)"""
+    if not token:
+        return {}
+    payload, _, signature = token.rpartition('.')
+    if not payload or not hmac.compare_digest(signature, _token_signature(report_id, plan, payload)):
+        raise ValueError('Invalid continuation token')
+    try:
+        return json.loads(base64.urlsafe_b64decode(payload.encode('ascii')).decode('utf-8'),
+                          object_hook=_token_object_hook)
+    except Exception:
+        raise ValueError('Invalid continuation token')
+
+
+# =================================================================
+# INLINE EXECUTION
+# =================================================================
+
+def run_inline(table, plan: Dict[str, Any], report_id: str, limit: int = DEFAULT_INLINE_LIMIT,
+               continuation_token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Collect up to `limit` rows for a JSON response
+
+    Stops at a DynamoDB page boundary, so a page may overshoot the limit
+    slightly; the continuation token resumes exactly after the last page read.
+
+    Returns:
+        Dict with 'data', 'row_count' and 'continuation_token' (None when done)
+    """
+    state = decode_continuation_token(continuation_token, report_id, plan)
+    rows: List[Dict[str, Any]] = []
+    last_key = None
+
+    for items, last_key in iter_report_pages(table, plan, state.get('last_key')):
+        rows.extend(items)
+        if len(rows) >= limit:
+            break
+
+    return {
+        'data': rows,
+        'row_count': len(rows),
+        'continuation_token': encode_continuation_token({'last_key': last_key}, report_id, plan) if last_key else None
+    }
+
+
+# =================================================================
+# S3 EXPORT
+# =================================================================
+
+class _ChunkWriter:
+    """Buffers serialized rows and flushes >= 5 MB parts to an S3 multipart upload"""
+
+    def __init__(self, bucket: str, key: str, content_type: str):
+        self.s3 = get_client('s3')
+        self.bucket = bucket
+        self.key = key
+        self.upload_id = self.s3.create_multipart_upload(
+            Bucket=bucket, Key=key, ContentType=content_type
+        )['UploadId']
+        self.parts: List[Dict[str, Any]] = []
+        self.buffer = io.BytesIO()
+        self.bytes_written = 0
+
+    def write(self, data: str) -> None:
+        self.buffer.write(data.encode('utf-8'))
+        if self.buffer.tell() >= MIN_PART_BYTES:
+            self._flush()
+
+    def _flush(self) -> None:
+        body = self.buffer.getvalue()
+        if not body:
+            return
+        part_number = len(self.parts) + 1
+        response = self.s3.upload_part(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+            PartNumber=part_number, Body=body
+        )
+        self.parts.append({'ETag': response['ETag'], 'PartNumber': part_number})
+        self.bytes_written += len(body)
+        self.buffer = io.BytesIO()
+
+    def complete(self) -> int:
+        self._flush()
+        if not self.parts:
+            # S3 requires at least one part - upload an empty object instead
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+            self.s3.put_object(Bucket=self.bucket, Key=self.key, Body=b'')
+            return 0
+        self.s3.complete_multipart_upload(
+            Bucket=self.bucket, Key=self.key, UploadId=self.upload_id,
+            MultipartUpload={'Parts': self.parts}
+        )
+        return self.bytes_written
+
+    def abort(self) -> None:
+        self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.key, UploadId=self.upload_id)
+
+
+def _serialize_rows(rows: List[Dict[str, Any]], output_format: str, columns: List[str],
+                    include_header: bool) -> str:
+    if output_format == 'ndjson':
+        return ''.join(json.dumps(row, default=_json_default) + '\n' for row in rows)
+
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=columns, extrasaction='ignore')
+    if include_header:
+        writer.writeheader()
+    for row in rows:
+        writer.writerow({
+            column: json.dumps(value, default=_json_default) if isinstance(value, (dict, list)) else value
+            for column, value in row.items()
+        })
+    return out.getvalue()
+
+
+def run_export(table, plan: Dict[str, Any], report_id: str, execution_id: str,
+               output_format: str, columns: List[str], context: Any = None,
+               continuation_token: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Stream report pages into one S3 chunk object until done or out of time
+
+    Each call writes reports/{report_id}/{execution_id}/part-NNNNN.{ext}. When
+    the Lambda time budget runs low the chunk is closed and a continuation
+    token is returned; calling again with it writes the next chunk. Memory use
+    is bounded by one DynamoDB page plus one 5 MB upload part.
+
+    Returns:
+        Dict with chunk key, presigned download URL, row count and continuation token
+    """
+    bucket = os.environ.get('TSA_REPORTS_BUCKET')
+    if not bucket:
+        raise ValueError('TSA_REPORTS_BUCKET is not configured for report exports')
+
+    state = decode_continuation_token(continuation_token, report_id, plan)
+    execution_id = str(state.get('execution_id', execution_id))
+    if not EXECUTION_ID_PATTERN.match(execution_id):
+        raise ValueError('Invalid continuation token')
+    chunk = int(state.get('chunk', 0)) + 1
+    csv_columns = state.get('columns') or list(columns or [])
+
+    key = f"reports/{report_id}/{execution_id}/part-{chunk:05d}.{output_format}"
+    content_type = 'text/csv' if output_format == 'csv' else 'application/x-ndjson'
+    writer = _ChunkWriter(bucket, key, content_type)
+
+    row_count = 0
+    header_written = False
+    last_key = None
+    try:
+        for items, last_key in iter_report_pages(table, plan, state.get('last_key')):
+            if items:
+                if output_format == 'csv' and not csv_columns:
+                    # No explicit columns - derive a stable header from the first page
+                    csv_columns = sorted({column for item in items for column in item})
+                # Filtered pages can come back empty - the header goes before the first row
+                writer.write(_serialize_rows(items, output_format, csv_columns, include_header=not header_written))
+                header_written = True
+                row_count += len(items)
+
+            if last_key and context is not None and \
+                    context.get_remaining_time_in_millis() < TIME_BUDGET_MARGIN_MS:
+                break
+        bytes_written = writer.complete()
+    except Exception:
+        writer.abort()
+        raise
+
+    download_url = get_client('s3').generate_presigned_url(
+        'get_object',
+        Params={'Bucket': bucket, 'Key': key},
+        ExpiresIn=int(os.environ.get('REPORT_URL_EXPIRY_SECONDS', '3600'))
+    )
+
+    next_token = None
+    if last_key:
+        next_token = encode_continuation_token({
+            'last_key': last_key,
+            'execution_id': execution_id,
+            'chunk': chunk,
+            'columns': csv_columns
+        }, report_id, plan)
+
+    return {
+        'execution_id': execution_id,
+        'chunk': chunk,
+        's3_key': key,
+        'download_url': download_url,
+        'row_count': row_count,
+        'bytes_written': bytes_written,
+        'continuation_token': next_token
+    }
@@ -0,0 +1,24 @@
+"""
+Principal Authorizer - API Gateway TOKEN authorizer
+Verifies the Cognito bearer token and resolves the caller (email, profile_id,
+role, user_type) once; API Gateway caches the result per token and passes the
+principal to handlers in requestContext.authorizer.
+"""
+from typing import Dict, Any
+
+# Import shared utilities from centralized layer
+from tsa_shared.principal import resolve_principal, build_authorizer_response
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Authorize a request from its Authorization header"""
+    auth_header = event.get('authorizationToken') or ''
+    token = auth_header[7:] if auth_header.startswith('Bearer ') else auth_header
+
+    principal = resolve_principal(token) if token else None
+    if not principal:
+        # API Gateway maps this exact message to a 401 response
+        raise Exception('Unauthorized')
+
+    print(f"✅ Authorized {principal['email']} ({principal['user_type'] or 'no profile'})")
+    return build_authorizer_response(principal, event['methodArn'])
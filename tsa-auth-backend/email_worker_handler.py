@@ -0,0 +1,52 @@
+"""
+Email Outbox Worker - Drains the SQS email outbox
+Delivers queued email jobs in batches, grouping identical content into
+multi-personalization SendGrid sends. Transiently failed jobs are reported as
+partial batch failures so SQS retries them and eventually moves them to the
+DLQ; recipients SendGrid rejects permanently are logged and dropped.
+"""
+import json
+from typing import Dict, Any, List
+
+# Import shared utilities from centralized layer
+from tsa_shared.sendgrid_service import SendGridService
+
+# Created on first batch with use_outbox=False - enqueueing again would loop back onto the queue
+sendgrid = None
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Deliver a batch of queued email jobs"""
+    global sendgrid
+
+    records = event.get('Records', [])
+    jobs: List[Dict[str, Any]] = []
+    message_ids: Dict[str, str] = {}
+    failures: List[Dict[str, str]] = []
+
+    for record in records:
+        try:
+            job = json.loads(record['body'])
+            jobs.append(job)
+            message_ids[job['job_id']] = record['messageId']
+        except (KeyError, ValueError) as e:
+            print(f"❌ Malformed email job {record.get('messageId')}: {str(e)}")
+            failures.append({'itemIdentifier': record.get('messageId', '')})
+
+    if jobs:
+        try:
+            if sendgrid is None:
+                sendgrid = SendGridService(use_outbox=False)
+            result = sendgrid.deliver_email_jobs(jobs)
+            failed_job_ids = result['failed']
+            for job_id in result['rejected']:
+                # Retrying cannot fix a rejected recipient - acknowledge it instead of feeding the DLQ
+                print(f"⚠️ Dropping email job {job_id}: recipient rejected by SendGrid")
+        except Exception as e:
+            print(f"❌ Email delivery failed for batch of {len(jobs)}: {str(e)}")
+            failed_job_ids = list(message_ids)
+
+        failures.extend({'itemIdentifier': message_ids[job_id]} for job_id in failed_job_ids)
+
+    print(f"📧 Email outbox: {len(records)} jobs received, {len(failures)} returned for retry")
+    return {'batchItemFailures': failures}
@@ -6,9 +6,13 @@ from tsa_shared import (
     generate_magic_link_jwt,
     create_response,
     create_cognito_user,
-    SendGridService
+    get_sendgrid_service,
+    prefetch_stage_parameters
 )
 
+# Batch-load /tsa/{stage}/ parameters once per cold start
+prefetch_stage_parameters()
+
 # These will need to be implemented or imported from service-specific modules
 def create_error_response(message, status_code, details=None, event=None):
     return create_response(status_code, {'error': message, 'details': details} if details else {'error': message}, event)
@@ -17,41 +21,9 @@ def create_health_response(service, status, details, event=None):
     return create_response(200, {'service': service, 'status': status, 'details': details}, event)
 
 def send_magic_link_email(email, magic_link, user_exists, user_role, invitation_token):
-    # Ensure SendGrid API key is available as environment variable
-    if not os.environ.get('SENDGRID_API_KEY'):
-        try:
-            # Try to get from Parameter Store first
-            import boto3
-            ssm = boto3.client('secretsmanager')
-            stage = os.environ.get('STAGE', 'dev')
-            
-            # First try Parameter Store
-            try:
-                ssm_client = boto3.client('ssm')
-                param_response = ssm_client.get_parameter(
-                    Name=f'/tsa/{stage}/sendgrid/api_key',
-                    WithDecryption=True
-                )
-                api_key = param_response['Parameter']['Value']
-                os.environ['SENDGRID_API_KEY'] = api_key
-                print("✅ Retrieved SendGrid API key from Parameter Store")
-            except Exception as e:
-                print(f"⚠️ Parameter Store failed: {str(e)}")
-                # Fallback to Secrets Manager
-                secret_arn = os.environ.get('SENDGRID_SECRET_ARN')
-                if secret_arn:
-                    secret_response = ssm.get_secret_value(SecretId=secret_arn)
-                    secret_data = json.loads(secret_response['SecretString'])
-                    api_key = secret_data.get('api_key')
-                    if api_key:
-                        os.environ['SENDGRID_API_KEY'] = api_key
-                        print("✅ Retrieved SendGrid API key from Secrets Manager")
-        except Exception as e:
-            print(f"❌ Failed to retrieve SendGrid API key: {str(e)}")
-    
-    # Use centralized SendGrid service
-    sendgrid = SendGridService()
-    return sendgrid.send_magic_link_email(email, magic_link, user_exists, user_role, invitation_token)
+    # Enqueued on the email outbox when TSA_EMAIL_QUEUE_URL is configured
+    result = get_sendgrid_service().send_magic_link_email(email, magic_link, user_role)
+    return result.get('success', False)
 
 def validate_user_role(email, user_role, invitation_token):
     # TODO: Implement role validation logic
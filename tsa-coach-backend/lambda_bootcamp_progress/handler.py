@@ -8,8 +8,9 @@ from typing import Dict, Any, List, Optional
 # Import from centralized shared layer
 from tsa_shared import (
     create_response as create_api_response, parse_event_body, get_current_timestamp as get_current_time, 
-    format_error_response as standardize_error_response, get_config,
-    UserIdentifier, CoachProfile, BootcampModule, BootcampProgress
+    format_error_response as standardize_error_response, get_config, get_dynamodb_table,
+    UserIdentifier, CoachProfile, BootcampModule, BootcampProgress, verify_token_email,
+    get_request_email, get_request_profile_id
 )
 
 config = get_config()
@@ -18,11 +19,6 @@ def get_table_name(table_type):
     stage = os.environ.get('STAGE', 'dev')
     return config.get_table_name(table_type, stage)
 
-def get_dynamodb_table(table_name):
-    import boto3
-    dynamodb = boto3.resource('dynamodb')
-    return dynamodb.Table(table_name)
-
 # remove
 # Bootcamp module definitions - centralized configuration
 BOOTCAMP_MODULES = [
@@ -118,6 +114,11 @@ def extract_user_from_auth_token(event: Dict[str, Any]) -> Optional[str]:
     Returns the authenticated user's email, or None if not authenticated
     """
     try:
+        # Principal resolved by the API Gateway authorizer (cached per token)
+        email = get_request_email(event)
+        if email:
+            return email
+        
         headers = event.get('headers', {})
         
         # Get authorization header (case-insensitive)
@@ -138,32 +139,13 @@ def extract_user_from_auth_token(event: Dict[str, Any]) -> Optional[str]:
         # Extract JWT token
         token = auth_header[7:]  # Remove 'Bearer ' prefix
         
-        # Decode JWT payload (basic validation - assumes token is already validated by API Gateway)
-        import base64
-        import json
-        
-        # Split token into parts
-        token_parts = token.split('.')
-        if len(token_parts) != 3:
-            print("⚠️ Invalid JWT token format")
-            return None
-        
-        # Decode payload (second part)
-        payload_b64 = token_parts[1]
-        # Add padding if necessary
-        padding = 4 - len(payload_b64) % 4
-        if padding != 4:
-            payload_b64 += '=' * padding
-        
-        payload = json.loads(base64.b64decode(payload_b64))
-        
-        # Extract email from token payload
-        email = payload.get('email') or payload.get('username')
+        # Verify signature, issuer and expiry locally (JWKS and claims cached per container)
+        email = verify_token_email(token)
         if email:
             print(f"✅ Authenticated user extracted from token: {email}")
-            return email.lower().strip()
+            return email
         
-        print("⚠️ No email found in token payload")
+        print("⚠️ JWT token invalid, expired or missing an email")
         return None
         
     except Exception as e:
@@ -185,7 +167,7 @@ def get_progress(event: Dict[str, Any]) -> Dict[str, Any]:
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         
         try:
-            normalized_profile_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_profile_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_api_response(404, {'error': str(e)})
         
@@ -268,7 +250,7 @@ def start_module(event: Dict[str, Any]) -> Dict[str, Any]:
         # Normalize coach ID from authenticated user
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         try:
-            normalized_profile_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_profile_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_api_response(404, {'error': str(e)})
         
@@ -319,7 +301,7 @@ def complete_video(event: Dict[str, Any]) -> Dict[str, Any]:
         # Normalize coach ID from authenticated user
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         try:
-            normalized_profile_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_profile_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_api_response(404, {'error': str(e)})
         
@@ -361,7 +343,7 @@ def complete_quiz_module(event: Dict[str, Any]) -> Dict[str, Any]:
         # Normalize coach ID from authenticated user
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         try:
-            normalized_profile_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_profile_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_api_response(404, {'error': str(e)})
         
@@ -407,7 +389,7 @@ def save_video_progress(event: Dict[str, Any]) -> Dict[str, Any]:
         # Normalize coach ID from authenticated user
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         try:
-            normalized_profile_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_profile_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_api_response(404, {'error': str(e)})
         
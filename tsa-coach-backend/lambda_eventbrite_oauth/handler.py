@@ -16,6 +16,8 @@ import sys
 sys.path.append('/opt/python')
 from tsa_shared.database import get_dynamodb_table, get_table_name, get_current_timestamp
 from tsa_shared.table_models import EventbriteConfig, EventbriteOAuthStatus
+from tsa_shared.jwt_verifier import verify_token_email
+from tsa_shared.principal import get_request_email, get_request_profile_id
 from lambda_events.eventbrite_client import EventbriteClient, EventbriteAPIError, EventbriteCredentials
 from lambda_events.secrets_utils import get_eventbrite_client_credentials
 
@@ -104,6 +106,11 @@ def extract_user_from_auth_token(event: Dict[str, Any]) -> Optional[str]:
     Returns the authenticated user's email, or None if not authenticated
     """
     try:
+        # Principal resolved by the API Gateway authorizer (cached per token)
+        email = get_request_email(event)
+        if email:
+            return email
+        
         headers = event.get('headers', {})
         
         # Get authorization header (case-insensitive)
@@ -124,32 +131,13 @@ def extract_user_from_auth_token(event: Dict[str, Any]) -> Optional[str]:
         # Extract JWT token
         token = auth_header[7:]  # Remove 'Bearer ' prefix
         
-        # Decode JWT payload (basic validation - assumes token is already validated by API Gateway)
-        import base64
-        import json
-        
-        # Split token into parts
-        token_parts = token.split('.')
-        if len(token_parts) != 3:
-            print("⚠️ Invalid JWT token format")
-            return None
-        
-        # Decode payload (second part)
-        payload_b64 = token_parts[1]
-        # Add padding if necessary
-        padding = 4 - len(payload_b64) % 4
-        if padding != 4:
-            payload_b64 += '=' * padding
-        
-        payload = json.loads(base64.b64decode(payload_b64))
-        
-        # Extract email from token payload
-        email = payload.get('email') or payload.get('username')
+        # Verify signature, issuer and expiry locally (JWKS and claims cached per container)
+        email = verify_token_email(token)
         if email:
             print(f"✅ Authenticated user extracted from token: {email}")
-            return email.lower().strip()
+            return email
         
-        print("⚠️ No email found in token payload")
+        print("⚠️ JWT token invalid, expired or missing an email")
         return None
         
     except Exception as e:
@@ -171,7 +159,7 @@ def get_oauth_status(event: Dict[str, Any]) -> Dict[str, Any]:
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         
         try:
-            normalized_coach_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_coach_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_cors_response(404, {'error': str(e)})
         
@@ -221,7 +209,7 @@ def initiate_oauth(event: Dict[str, Any]) -> Dict[str, Any]:
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         
         try:
-            normalized_coach_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_coach_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_cors_response(404, {'error': str(e)})
         
@@ -280,7 +268,7 @@ def disconnect_oauth(event: Dict[str, Any]) -> Dict[str, Any]:
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         
         try:
-            normalized_coach_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_coach_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_cors_response(404, {'error': str(e)})
         
@@ -4,14 +4,21 @@ Handles synchronization between TSA and Eventbrite events
 """
 import json
 import os
-from typing import Dict, Any, Optional, List
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from decimal import Decimal
+from typing import Dict, Any, Optional, List, Tuple
 import logging
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 
 # Import shared utilities
 import sys
 sys.path.append('/opt/python')
-from tsa_shared.database import get_dynamodb_table, get_table_name, get_current_timestamp
+from tsa_shared.database import (
+    get_dynamodb_table, get_table_name, get_current_timestamp, batch_get_items, batch_write_items
+)
 from tsa_shared.table_models import (
     Event, EventbriteConfig, EventbriteOAuthStatus, EventAttendee,
     EventStatus, AttendeeStatus, TicketType
@@ -20,6 +27,115 @@ from lambda_events.eventbrite_client import EventbriteClient, EventbriteAPIError
 
 logger = logging.getLogger(__name__)
 
+# Incremental attendee syncs re-read this much before the watermark; content
+# hashes make the overlap free, and it covers Eventbrite clock skew
+WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Statuses that hold a registration (drive current_registrations)
+ACTIVE_ATTENDEE_STATUSES = {AttendeeStatus.ATTENDING.value, AttendeeStatus.CHECKED_IN.value}
+
+# Attendee attributes that are sync bookkeeping, not content
+ATTENDEE_SYNC_FIELDS = ('content_hash', 'last_synced', 'created_at')
+
+
+def token_fingerprint(access_token: str) -> str:
+    """Short, non-reversible identifier for an access token"""
+    return hashlib.sha256(access_token.encode()).hexdigest()[:16]
+
+
+class _CoachClientCache:
+    """
+    Thread-safe LRU cache of per-coach Eventbrite clients for a warm container
+    
+    Entries hold the coach's EventbriteConfig and a client built for its
+    token (fingerprint). The config is re-read after ttl_seconds; the client
+    - and its keep-alive session - is kept as long as the token is unchanged.
+    Entries are evicted when the token expires or Eventbrite returns 401.
+    """
+    
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # coach_id -> (refresh_at, fingerprint, config, client, token_expires_at)
+        self._entries: 'OrderedDict[str, Tuple[float, str, EventbriteConfig, EventbriteClient, Optional[datetime]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'config_reads': 0, 'clients_built': 0, 'evictions': 0}
+    
+    def get(self, coach_id: str) -> Optional[Tuple[EventbriteConfig, EventbriteClient]]:
+        """Cached (config, client) for a coach, or None if missing, stale or expired"""
+        with self._lock:
+            entry = self._entries.get(coach_id)
+            if entry is None or entry[0] < time.monotonic():
+                self.counters['misses'] += 1
+                return None
+            if entry[4] and datetime.now(timezone.utc) >= entry[4]:
+                del self._entries[coach_id]
+                self.counters['evictions'] += 1
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(coach_id)
+            self.counters['hits'] += 1
+            return entry[2], entry[3]
+    
+    def reusable_client(self, coach_id: str, fingerprint: str) -> Optional[EventbriteClient]:
+        """Client from a stale entry that can still be reused (same token)"""
+        with self._lock:
+            entry = self._entries.get(coach_id)
+            return entry[3] if entry and entry[1] == fingerprint else None
+    
+    def store(self, coach_id: str, fingerprint: str, config: EventbriteConfig,
+              client: EventbriteClient, expires_at: Optional[datetime]) -> None:
+        with self._lock:
+            self._entries[coach_id] = (time.monotonic() + self.ttl_seconds, fingerprint, config, client, expires_at)
+            self._entries.move_to_end(coach_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.counters['evictions'] += 1
+    
+    def invalidate(self, coach_id: str, fingerprint: Optional[str] = None) -> None:
+        """Drop a coach's entry (only if it still holds `fingerprint`, when given)"""
+        with self._lock:
+            entry = self._entries.get(coach_id)
+            if entry and (fingerprint is None or entry[1] == fingerprint):
+                del self._entries[coach_id]
+                self.counters['evictions'] += 1
+    
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for counter in self.counters:
+                self.counters[counter] = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+# Module-level cache survives across warm Lambda invocations
+_client_cache = _CoachClientCache(
+    max_entries=int(os.environ.get('EVENTBRITE_CLIENT_CACHE_MAX_ENTRIES', '64')),
+    ttl_seconds=int(os.environ.get('EVENTBRITE_CONFIG_TTL_SECONDS', '300'))
+)
+
+
+def get_client_cache_stats() -> Dict[str, Any]:
+    """Per-coach Eventbrite client cache counters for this container"""
+    return _client_cache.stats()
+
+
+def invalidate_coach_client(coach_id: str) -> None:
+    """Drop a coach's cached config and client (e.g. after reconnecting Eventbrite)"""
+    _client_cache.invalidate(coach_id)
+
 
 class EventSyncService:
     """Service for syncing events between TSA and Eventbrite"""
@@ -30,31 +146,62 @@ class EventSyncService:
         self.attendees_table = get_dynamodb_table(get_table_name('event-attendees'))
     
     def get_coach_eventbrite_client(self, coach_id: str) -> Optional[EventbriteClient]:
-        """Get authenticated Eventbrite client for a coach"""
+        """Get authenticated Eventbrite client for a coach (cached per container)"""
+        cached = self._get_coach_connection(coach_id)
+        return cached[1] if cached else None
+    
+    def get_coach_eventbrite_config(self, coach_id: str) -> Optional[EventbriteConfig]:
+        """Get a coach's connected Eventbrite config (cached alongside the client)"""
+        cached = self._get_coach_connection(coach_id)
+        return cached[0] if cached else None
+    
+    def _get_coach_connection(self, coach_id: str) -> Optional[Tuple[EventbriteConfig, EventbriteClient]]:
+        """Cached (config, client) for a coach, re-reading eventbrite-config on a miss"""
+        cached = _client_cache.get(coach_id)
+        if cached:
+            return cached
+        
         try:
+            _client_cache.increment('config_reads')
             response = self.config_table.get_item(Key={'coach_id': coach_id})
             if 'Item' not in response:
                 logger.warning(f"No Eventbrite config found for coach {coach_id}")
+                _client_cache.invalidate(coach_id)
                 return None
             
             config = EventbriteConfig(**response['Item'])
             
             if config.oauth_status != EventbriteOAuthStatus.CONNECTED:
                 logger.warning(f"Eventbrite not connected for coach {coach_id}")
+                _client_cache.invalidate(coach_id)
                 return None
             
             # Check if token is expired
+            expires_at = None
             if config.token_expires_at:
                 expires_at = datetime.fromisoformat(config.token_expires_at)
+                if expires_at.tzinfo is None:
+                    expires_at = expires_at.replace(tzinfo=timezone.utc)
                 if datetime.now(timezone.utc) >= expires_at:
                     logger.warning(f"Eventbrite token expired for coach {coach_id}")
+                    _client_cache.invalidate(coach_id)
                     return None
             
             # Decrypt token (placeholder - implement proper decryption)
             access_token = config.access_token
-            
-            credentials = EventbriteCredentials(access_token=access_token)
-            return EventbriteClient(credentials)
+            fingerprint = token_fingerprint(access_token)
+            
+            # Same token as the stale entry - keep its client and warm connections
+            client = _client_cache.reusable_client(coach_id, fingerprint)
+            if client is None:
+                _client_cache.increment('clients_built')
+                client = EventbriteClient(
+                    EventbriteCredentials(access_token=access_token, expires_at=expires_at),
+                    on_unauthorized=lambda: _client_cache.invalidate(coach_id, fingerprint)
+                )
+            
+            _client_cache.store(coach_id, fingerprint, config, client, expires_at)
+            return config, client
         
         except Exception as e:
             logger.error(f"Error getting Eventbrite client for coach {coach_id}: {str(e)}")
@@ -80,12 +227,10 @@ class EventSyncService:
             if event_data.get('ticket_types'):
                 eventbrite_client.create_ticket_classes(eventbrite_event_id, event_data['ticket_types'])
             
-            # Auto-publish if enabled in coach settings
-            config_response = self.config_table.get_item(Key={'coach_id': coach_id})
-            if 'Item' in config_response:
-                config = EventbriteConfig(**config_response['Item'])
-                if config.auto_publish_events:
-                    eventbrite_client.publish_event(eventbrite_event_id)
+            # Auto-publish if enabled in coach settings (config cached with the client)
+            config = self.get_coach_eventbrite_config(coach_id)
+            if config and config.auto_publish_events:
+                eventbrite_client.publish_event(eventbrite_event_id)
             
             # Update TSA event with Eventbrite details
             self.events_table.update_item(
@@ -232,8 +377,22 @@ class EventSyncService:
             self._update_sync_error(event_id, str(e))
             raise
     
-    def sync_event_attendees(self, event_id: str) -> Dict[str, Any]:
-        """Sync attendees from Eventbrite to TSA"""
+    def sync_event_attendees(self, event_id: str, full: bool = False) -> Dict[str, Any]:
+        """
+        Sync attendees from Eventbrite to TSA (incremental, diff-based)
+        
+        Only attendees changed since the event's last successful sync are
+        fetched (changed_since watermark), and only those whose content hash
+        differs from the stored one are written, in batches.
+        current_registrations moves by the change in active attendees.
+        
+        Args:
+            event_id: TSA event ID
+            full: Ignore the watermark and re-read every attendee (count is reset)
+            
+        Returns:
+            Sync report with added / changed / cancelled / unchanged counts
+        """
         try:
             # Get TSA event
             response = self.events_table.get_item(Key={'event_id': event_id})
@@ -242,7 +401,8 @@ class EventSyncService:
             
             event_data = response['Item']
             coach_id = event_data['coach_id']
-            eventbrite_event_id = event_data.get('eventbrite', {}).get('eventbrite_event_id')
+            eventbrite_data = event_data.get('eventbrite') or {}
+            eventbrite_event_id = eventbrite_data.get('eventbrite_event_id')
             
             if not eventbrite_event_id:
                 raise Exception("No Eventbrite event ID found")
@@ -252,53 +412,134 @@ class EventSyncService:
             if not eventbrite_client:
                 raise Exception("Eventbrite not connected or token expired")
             
-            # Get attendees from Eventbrite
-            eventbrite_attendees = eventbrite_client.get_all_event_attendees(eventbrite_event_id)
-            
-            synced_count = 0
-            errors = []
-            
-            for eb_attendee in eventbrite_attendees:
-                try:
-                    # Transform Eventbrite attendee to TSA format
-                    tsa_attendee = self._transform_eventbrite_attendee(eb_attendee, event_id)
-                    
-                    # Upsert attendee in TSA
-                    self.attendees_table.put_item(Item=tsa_attendee.dict())
-                    synced_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error syncing attendee {eb_attendee.get('id', 'unknown')}: {str(e)}")
-                    errors.append(str(e))
-            
-            # Update event with registration count
+            watermark = None if full else eventbrite_data.get('attendees_watermark')
+            changed_since = None
+            if watermark:
+                changed_since = datetime.fromisoformat(watermark.replace('Z', '+00:00')) - WATERMARK_OVERLAP
+            
+            # Taken before fetching so changes made during the sync are re-read next time
+            sync_started = datetime.now(timezone.utc)
+            eventbrite_attendees = eventbrite_client.get_all_event_attendees(
+                eventbrite_event_id, changed_since=changed_since
+            )
+            
+            report = self._apply_attendee_changes(event_id, eventbrite_attendees)
+            report.update({
+                'mode': 'incremental' if changed_since else 'full',
+                'changed_since': changed_since.isoformat() if changed_since else None
+            })
+            
+            # Update registration count and advance the watermark only if every write landed
+            now = get_current_timestamp()
+            if changed_since:
+                count_expression = 'current_registrations = if_not_exists(current_registrations, :zero) + :count'
+                count_value = report['registration_delta']
+            else:
+                count_expression = 'current_registrations = :count'
+                count_value = report['active_attendees']
+            
+            set_clauses = [count_expression, 'eventbrite.last_synced = :now', 'updated_at = :now']
+            values = {':count': count_value, ':now': now}
+            if changed_since:
+                values[':zero'] = 0
+            if not report['errors']:
+                set_clauses.append('eventbrite.attendees_watermark = :watermark')
+                values[':watermark'] = sync_started.isoformat()
+            
             self.events_table.update_item(
                 Key={'event_id': event_id},
-                UpdateExpression='''
-                    SET current_registrations = :count,
-                        eventbrite.last_synced = :now,
-                        updated_at = :now
-                ''',
-                ExpressionAttributeValues={
-                    ':count': synced_count,
-                    ':now': get_current_timestamp()
-                }
+                UpdateExpression='SET ' + ', '.join(set_clauses),
+                ExpressionAttributeValues=values
             )
             
-            logger.info(f"Successfully synced {synced_count} attendees for event {event_id}")
+            logger.info(
+                f"Synced attendees for event {event_id} ({report['mode']}): {report['added']} added, "
+                f"{report['changed']} changed, {report['cancelled']} cancelled, {report['unchanged']} unchanged"
+            )
             
-            return {
-                'success': True,
-                'synced_count': synced_count,
-                'total_attendees': len(eventbrite_attendees),
-                'errors': errors
-            }
+            return {'success': not report['errors'], **report}
         
         except Exception as e:
             logger.error(f"Error syncing attendees for event {event_id}: {str(e)}")
             self._update_sync_error(event_id, str(e))
             raise
     
+    def _apply_attendee_changes(self, event_id: str, eventbrite_attendees: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Diff fetched attendees against stored content hashes and batch-write the changed ones"""
+        errors = []
+        records = {}
+        for eb_attendee in eventbrite_attendees:
+            try:
+                record = self._attendee_record(eb_attendee, event_id)
+                records[record['attendee_id']] = record
+            except Exception as e:
+                logger.error(f"Error syncing attendee {eb_attendee.get('id', 'unknown')}: {str(e)}")
+                errors.append(str(e))
+        
+        stored = {
+            item['attendee_id']: item
+            for item in batch_get_items(
+                self.attendees_table,
+                [{'attendee_id': attendee_id} for attendee_id in records],
+                projection=['attendee_id', 'content_hash', 'status', 'created_at']
+            )
+        } if records else {}
+        
+        now = get_current_timestamp()
+        writes = []
+        transitions = []  # (kind, registration delta) per write
+        unchanged = 0
+        for attendee_id, record in records.items():
+            existing = stored.get(attendee_id)
+            if existing and existing.get('content_hash') == record['content_hash']:
+                unchanged += 1
+                continue
+            
+            was_active = bool(existing) and existing.get('status') in ACTIVE_ATTENDEE_STATUSES
+            is_active = record['status'] in ACTIVE_ATTENDEE_STATUSES
+            if not existing:
+                kind = 'added'
+            elif was_active and not is_active:
+                kind = 'cancelled'
+            else:
+                kind = 'changed'
+            
+            writes.append({**record, 'last_synced': now, 'created_at': (existing or {}).get('created_at', now)})
+            transitions.append((kind, int(is_active) - int(was_active)))
+        
+        report = {
+            'total_attendees': len(eventbrite_attendees),
+            'added': 0, 'changed': 0, 'cancelled': 0,
+            'unchanged': unchanged,
+            'registration_delta': 0,
+            'active_attendees': sum(1 for record in records.values() if record['status'] in ACTIVE_ATTENDEE_STATUSES),
+            'errors': errors
+        }
+        
+        if writes:
+            result = batch_write_items(self.attendees_table, writes)
+            for status, (kind, delta) in zip(result['results'], transitions):
+                if status['status'] == 'written':
+                    report[kind] += 1
+                    report['registration_delta'] += delta
+                else:
+                    errors.append(f"Attendee {writes[status['index']]['attendee_id']}: {status.get('error')}")
+        
+        report['synced_count'] = report['added'] + report['changed'] + report['cancelled']
+        return report
+    
+    def _attendee_record(self, eb_attendee: Dict[str, Any], event_id: str) -> Dict[str, Any]:
+        """Attendee item with a content hash over everything except sync bookkeeping"""
+        attendee = self._transform_eventbrite_attendee(eb_attendee, event_id)
+        # DynamoDB rejects floats - round-trip through JSON into Decimals
+        record = json.loads(attendee.json(), parse_float=Decimal)
+        for field in ATTENDEE_SYNC_FIELDS:
+            record.pop(field, None)
+        record['content_hash'] = hashlib.sha256(
+            json.dumps(record, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return record
+    
     def _transform_eventbrite_attendee(self, eb_attendee: Dict[str, Any], event_id: str) -> EventAttendee:
         """Transform Eventbrite attendee data to TSA format"""
         
@@ -318,6 +559,10 @@ class EventSyncService:
         
         eb_status = eb_attendee.get('status', 'Attending')
         tsa_status = status_mapping.get(eb_status, AttendeeStatus.ATTENDING)
+        if eb_attendee.get('refunded'):
+            tsa_status = AttendeeStatus.REFUNDED
+        elif eb_attendee.get('cancelled'):
+            tsa_status = AttendeeStatus.CANCELLED
         
         # Extract registration answers
         answers = {}
@@ -1,14 +1,25 @@
 """
 Eventbrite API Client
 Handles OAuth authentication, event management, and attendee synchronization
+
+Requests are budgeted per access token, time out strictly and retry a bounded
+number of times with jittered backoff. A throttle that would need a long wait
+raises EventbriteRateLimitError (with retry_after) instead of sleeping through
+billed Lambda time, so callers can defer the work.
 """
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import time
-from typing import Dict, Any, Optional, List
+import random
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Iterator, Union, Callable
 from datetime import datetime, timezone
 from dataclasses import dataclass
 import logging
+import os
 import urllib.parse
 
 # Import shared utilities for DynamoDB integration
@@ -50,33 +61,139 @@ class EventbriteAPIError(Exception):
         super().__init__(self.message)
 
 
+class EventbriteRateLimitError(EventbriteAPIError):
+    """Rate limit that cannot be waited out within the request policy"""
+    def __init__(self, message: str, retry_after: float, response_data: Dict = None):
+        self.retry_after = retry_after
+        super().__init__(message, status_code=429, response_data=response_data)
+
+
+@dataclass
+class EventbriteRequestPolicy:
+    """Timeouts, retries and concurrency for Eventbrite requests"""
+    connect_timeout: float = 3.05
+    read_timeout: float = 10.0
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 4.0
+    max_rate_wait: float = 5.0  # Longest throttle wait before raising EventbriteRateLimitError
+    max_concurrency: int = 4    # Parallel page / ticket class requests
+
+    @classmethod
+    def from_env(cls) -> 'EventbriteRequestPolicy':
+        """Policy with overrides from EVENTBRITE_* environment variables"""
+        return cls(
+            connect_timeout=float(os.environ.get('EVENTBRITE_CONNECT_TIMEOUT', cls.connect_timeout)),
+            read_timeout=float(os.environ.get('EVENTBRITE_READ_TIMEOUT', cls.read_timeout)),
+            max_retries=int(os.environ.get('EVENTBRITE_MAX_RETRIES', cls.max_retries)),
+            max_rate_wait=float(os.environ.get('EVENTBRITE_MAX_RATE_WAIT', cls.max_rate_wait)),
+            max_concurrency=int(os.environ.get('EVENTBRITE_MAX_CONCURRENCY', cls.max_concurrency))
+        )
+
+
+# Eventbrite allows 2,000 calls per hour per OAuth token
+HOURLY_CALL_LIMIT = int(os.environ.get('EVENTBRITE_HOURLY_CALL_LIMIT', '2000'))
+CALL_BURST = int(os.environ.get('EVENTBRITE_CALL_BURST', '100'))
+
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
+
+class TokenRateBudget:
+    """Token bucket for one access token (container-scoped, shared across clients)"""
+
+    def __init__(self, calls_per_hour: int = HOURLY_CALL_LIMIT, burst: int = CALL_BURST):
+        self.rate = calls_per_hour / 3600.0
+        self.capacity = float(burst)
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self, max_wait: float) -> None:
+        """
+        Take one call from the budget, waiting at most max_wait seconds
+
+        Raises:
+            EventbriteRateLimitError: If the budget cannot cover the call in time
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+            wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate if self.tokens < 1 else 0.0)
+            if wait > max_wait:
+                raise EventbriteRateLimitError(f"Eventbrite call budget exhausted, retry in {wait:.0f}s", retry_after=wait)
+            # Reserve the call now so concurrent callers queue behind it
+            self.tokens -= 1
+
+        if wait > 0:
+            time.sleep(wait)
+
+    def block_for(self, seconds: float) -> None:
+        """Stop spending the budget after a server-side 429"""
+        with self.lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = min(self.tokens, 0.0)
+
+
+_rate_budgets: Dict[str, TokenRateBudget] = {}
+_rate_budgets_lock = threading.Lock()
+
+
+def get_rate_budget(access_token: str) -> TokenRateBudget:
+    """Container-scoped budget for an access token (keyed by hash, never the raw token)"""
+    key = hashlib.sha256(access_token.encode()).hexdigest()
+    with _rate_budgets_lock:
+        if key not in _rate_budgets:
+            _rate_budgets[key] = TokenRateBudget()
+        return _rate_budgets[key]
+
+
 class EventbriteClient:
     """Eventbrite API client with OAuth and rate limiting support"""
     
     BASE_URL = "https://www.eventbriteapi.com/v3"
     OAUTH_URL = "https://www.eventbrite.com/oauth"
     
-    def __init__(self, credentials: EventbriteCredentials):
+    def __init__(self, credentials: EventbriteCredentials, policy: Optional[EventbriteRequestPolicy] = None,
+                 on_unauthorized: Optional[Callable[[], None]] = None):
         self.credentials = credentials
+        self.policy = policy or EventbriteRequestPolicy.from_env()
+        # Called on a 401 (e.g. to evict this client from a cache)
+        self.on_unauthorized = on_unauthorized
+        self.rate_budget = get_rate_budget(credentials.access_token)
         self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_maxsize=max(self.policy.max_concurrency, 1)))
         self.session.headers.update({
             'Authorization': f'Bearer {credentials.access_token}',
             'Content-Type': 'application/json'
         })
         
+    def _backoff_delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        return random.uniform(0, min(self.policy.backoff_max, self.policy.backoff_base * (2 ** attempt)))
+    
     def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any]:
-        """Make authenticated request with error handling and rate limiting"""
+        """Make authenticated request with timeouts, rate budgeting and bounded retries"""
         url = f"{self.BASE_URL}/{endpoint.lstrip('/')}"
+        kwargs.setdefault('timeout', (self.policy.connect_timeout, self.policy.read_timeout))
+        # POSTs (create event / ticket class) only retry when Eventbrite cannot have processed them
+        is_idempotent = method.upper() == 'GET'
         
-        try:
-            response = self.session.request(method, url, **kwargs)
+        for attempt in range(self.policy.max_retries + 1):
+            self.rate_budget.acquire(self.policy.max_rate_wait)
+            is_last_attempt = attempt == self.policy.max_retries
             
-            # Handle rate limiting
-            if response.status_code == 429:
-                retry_after = int(response.headers.get('Retry-After', 60))
-                logger.warning(f"Rate limited. Waiting {retry_after} seconds...")
-                time.sleep(retry_after)
+            try:
                 response = self.session.request(method, url, **kwargs)
+            except requests.RequestException as e:
+                if is_last_attempt or not (is_idempotent or isinstance(e, requests.ConnectTimeout)):
+                    logger.error(f"Request failed: {str(e)}")
+                    raise EventbriteAPIError(f"Request failed: {str(e)}")
+                logger.warning(f"Request to {endpoint} failed ({str(e)}), retrying")
+                time.sleep(self._backoff_delay(attempt))
+                continue
             
             # Parse response
             try:
@@ -84,7 +201,25 @@ class EventbriteClient:
             except ValueError:
                 data = {}
             
+            if response.status_code == 429:
+                retry_after = self._retry_after_seconds(response)
+                self.rate_budget.block_for(retry_after)
+                if is_last_attempt or retry_after > self.policy.max_rate_wait:
+                    logger.warning(f"Rate limited by Eventbrite, retry after {retry_after:.0f}s")
+                    raise EventbriteRateLimitError(
+                        f"Rate limited, retry after {retry_after:.0f}s", retry_after=retry_after, response_data=data
+                    )
+                # The budget holds the next acquire until Retry-After has passed
+                continue
+            
+            if response.status_code in RETRYABLE_STATUS_CODES and is_idempotent and not is_last_attempt:
+                logger.warning(f"Eventbrite returned {response.status_code} for {endpoint}, retrying")
+                time.sleep(self._backoff_delay(attempt))
+                continue
+            
             if not response.ok:
+                if response.status_code == 401 and self.on_unauthorized:
+                    self.on_unauthorized()
                 error_msg = data.get('error_description', data.get('error', f'HTTP {response.status_code}'))
                 raise EventbriteAPIError(
                     message=error_msg,
@@ -93,10 +228,21 @@ class EventbriteClient:
                 )
             
             return data
-            
-        except requests.RequestException as e:
-            logger.error(f"Request failed: {str(e)}")
-            raise EventbriteAPIError(f"Request failed: {str(e)}")
+    
+    @staticmethod
+    def _retry_after_seconds(response: requests.Response) -> float:
+        """Retry-After in seconds (defaults to 60 when missing or not numeric)"""
+        try:
+            return max(float(response.headers.get('Retry-After', 60)), 0.0)
+        except ValueError:
+            return 60.0
+    
+    def _run_concurrently(self, calls: List) -> List[Any]:
+        """Run zero-argument calls with bounded concurrency, preserving order"""
+        if len(calls) <= 1 or self.policy.max_concurrency <= 1:
+            return [call() for call in calls]
+        with ThreadPoolExecutor(max_workers=min(self.policy.max_concurrency, len(calls))) as executor:
+            return list(executor.map(lambda call: call(), calls))
     
     def get_user_info(self) -> Dict[str, Any]:
         """Get current user information"""
@@ -135,53 +281,92 @@ class EventbriteClient:
         return self._make_request('GET', f'/events/{event_id}/')
     
     def create_ticket_classes(self, event_id: str, ticket_types: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Create ticket classes for an event"""
-        created_tickets = []
-        
-        for ticket_type in ticket_types:
-            ticket_data = self._transform_ticket_to_eventbrite_format(ticket_type)
-            
-            response = self._make_request(
-                'POST', 
-                f'/events/{event_id}/ticket_classes/',
-                json={'ticket_class': ticket_data}
-            )
-            created_tickets.append(response)
+        """Create ticket classes for an event (concurrently, in input order)"""
+        requests_data = [
+            {'ticket_class': self._transform_ticket_to_eventbrite_format(ticket_type)}
+            for ticket_type in ticket_types
+        ]
         
-        return created_tickets
+        return self._run_concurrently([
+            lambda body=body: self._make_request('POST', f'/events/{event_id}/ticket_classes/', json=body)
+            for body in requests_data
+        ])
     
-    def get_event_attendees(self, event_id: str, page: int = 1) -> Dict[str, Any]:
-        """Get event attendees with pagination"""
-        params = {
-            'page': page,
-            'expand': 'answers,promotional_code,ticket_class,order'
-        }
+    def get_event_attendees(self, event_id: str, page: int = 1, continuation: Optional[str] = None,
+                            changed_since: Optional[Union[str, datetime]] = None) -> Dict[str, Any]:
+        """
+        Get one page of event attendees
+        
+        Args:
+            event_id: Eventbrite event ID
+            page: Page number (ignored when continuation is given)
+            continuation: Continuation token from a previous page's pagination
+            changed_since: Only attendees changed after this time (ISO string or datetime)
+        """
+        params = {'expand': 'answers,promotional_code,ticket_class,order'}
+        if continuation:
+            params['continuation'] = continuation
+        else:
+            params['page'] = page
+        if changed_since:
+            params['changed_since'] = self._format_changed_since(changed_since)
         
         return self._make_request('GET', f'/events/{event_id}/attendees/', params=params)
     
-    def get_all_event_attendees(self, event_id: str) -> List[Dict[str, Any]]:
-        """Get all event attendees (handles pagination)"""
-        attendees = []
-        page = 1
+    def iter_event_attendee_pages(self, event_id: str, continuation: Optional[str] = None,
+                                  changed_since: Optional[Union[str, datetime]] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Walk attendee pages with continuation tokens (resumable)
         
+        Yields:
+            Raw page responses; pagination.continuation resumes after that page
+        """
         while True:
-            response = self.get_event_attendees(event_id, page)
-            page_attendees = response.get('attendees', [])
-            
-            if not page_attendees:
-                break
-            
-            attendees.extend(page_attendees)
+            response = self.get_event_attendees(event_id, continuation=continuation, changed_since=changed_since)
+            yield response
             
-            # Check if there are more pages
             pagination = response.get('pagination', {})
-            if not pagination.get('has_more_items', False):
+            continuation = pagination.get('continuation')
+            if not pagination.get('has_more_items', False) or not continuation:
                 break
-            
-            page += 1
+    
+    def get_all_event_attendees(self, event_id: str,
+                                changed_since: Optional[Union[str, datetime]] = None) -> List[Dict[str, Any]]:
+        """
+        Get all event attendees (optionally only those changed since a time)
+        
+        The first page reports page_count; the remaining pages are fetched
+        concurrently. Falls back to continuation tokens when page_count is absent.
+        """
+        first = self.get_event_attendees(event_id, page=1, changed_since=changed_since)
+        attendees = list(first.get('attendees', []))
+        pagination = first.get('pagination', {})
+        if not pagination.get('has_more_items', False):
+            return attendees
         
+        page_count = pagination.get('page_count')
+        if not page_count:
+            for response in self.iter_event_attendee_pages(event_id, pagination.get('continuation'), changed_since):
+                attendees.extend(response.get('attendees', []))
+            return attendees
+        
+        pages = self._run_concurrently([
+            lambda page=page: self.get_event_attendees(event_id, page=page, changed_since=changed_since)
+            for page in range(2, int(page_count) + 1)
+        ])
+        for response in pages:
+            attendees.extend(response.get('attendees', []))
         return attendees
     
+    @staticmethod
+    def _format_changed_since(changed_since: Union[str, datetime]) -> str:
+        """Eventbrite expects UTC 'YYYY-MM-DDThh:mm:ssZ'"""
+        if isinstance(changed_since, str):
+            changed_since = datetime.fromisoformat(changed_since.replace('Z', '+00:00'))
+        if changed_since.tzinfo is None:
+            changed_since = changed_since.replace(tzinfo=timezone.utc)
+        return changed_since.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+    
     def _transform_to_eventbrite_format(self, tsa_event: Dict[str, Any]) -> Dict[str, Any]:
         """Transform TSA event data to Eventbrite API format"""
         
@@ -327,7 +512,9 @@ class EventbriteClient:
             'redirect_uri': redirect_uri
         }
         
-        response = requests.post(f"{EventbriteClient.OAUTH_URL}/token", data=data)
+        policy = EventbriteRequestPolicy()
+        response = requests.post(f"{EventbriteClient.OAUTH_URL}/token", data=data,
+                                 timeout=(policy.connect_timeout, policy.read_timeout))
         
         if not response.ok:
             try:
@@ -15,9 +15,12 @@ import sys
 sys.path.append('/opt/python')
 from tsa_shared.database import get_dynamodb_table, get_table_name, get_current_timestamp
 from tsa_shared.table_models import Event, EventStatus, EventCategory, EventVisibility, TicketType
-from user_identifier import UserIdentifier
+from tsa_shared.users import UserIdentifier
+from tsa_shared.coach_progress import get_materialized_progress
+from tsa_shared.jwt_verifier import verify_token_email
+from tsa_shared.principal import get_request_email, get_request_profile_id
 from lambda_events.event_sync_service import EventSyncService
-from lambda_events.eventbrite_client import EventbriteAPIError
+from lambda_events.eventbrite_client import EventbriteAPIError, EventbriteRateLimitError
 
 logger = logging.getLogger()
 logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
@@ -80,6 +83,11 @@ def extract_user_from_auth_token(event: Dict[str, Any]) -> Optional[str]:
     Returns the authenticated user's email, or None if not authenticated
     """
     try:
+        # Principal resolved by the API Gateway authorizer (cached per token)
+        email = get_request_email(event)
+        if email:
+            return email
+        
         headers = event.get('headers', {})
         
         # Get authorization header (case-insensitive)
@@ -100,32 +108,13 @@ def extract_user_from_auth_token(event: Dict[str, Any]) -> Optional[str]:
         # Extract JWT token
         token = auth_header[7:]  # Remove 'Bearer ' prefix
         
-        # Decode JWT payload (basic validation - assumes token is already validated by API Gateway)
-        import base64
-        import json
-        
-        # Split token into parts
-        token_parts = token.split('.')
-        if len(token_parts) != 3:
-            print("⚠️ Invalid JWT token format")
-            return None
-        
-        # Decode payload (second part)
-        payload_b64 = token_parts[1]
-        # Add padding if necessary
-        padding = 4 - len(payload_b64) % 4
-        if padding != 4:
-            payload_b64 += '=' * padding
-        
-        payload = json.loads(base64.b64decode(payload_b64))
-        
-        # Extract email from token payload
-        email = payload.get('email') or payload.get('username')
+        # Verify signature, issuer and expiry locally (JWKS and claims cached per container)
+        email = verify_token_email(token)
         if email:
             print(f"✅ Authenticated user extracted from token: {email}")
-            return email.lower().strip()
+            return email
         
-        print("⚠️ No email found in token payload")
+        print("⚠️ JWT token invalid, expired or missing an email")
         return None
         
     except Exception as e:
@@ -153,7 +142,7 @@ def get_events(event: Dict[str, Any]) -> Dict[str, Any]:
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         
         try:
-            normalized_coach_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_coach_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_cors_response(404, {'error': str(e)})
         
@@ -210,56 +199,29 @@ def get_timeline_status(event: Dict[str, Any]) -> Dict[str, Any]:
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         
         try:
-            normalized_coach_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_coach_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_cors_response(404, {'error': str(e)})
         
-        # Get coach profile for timeline status
-        response = profiles_table.get_item(Key={'profile_id': normalized_coach_id})
-        if 'Item' not in response:
+        # Coach progress projection - one get_item, maintained from table streams
+        progress = get_materialized_progress(normalized_coach_id)
+        if progress is None:
             return create_cors_response(404, {'error': 'Coach profile not found'})
         
-        profile = response['Item']
-        
         # Verify the profile belongs to the authenticated user (security check)
-        if profile.get('email', '').lower() != authenticated_email:
-            print(f"🚨 Security violation: Authenticated user {authenticated_email} tried to access profile {profile.get('email')}")
+        if progress.get('email', '').lower() != authenticated_email:
+            print(f"🚨 Security violation: Authenticated user {authenticated_email} tried to access profile {progress.get('email')}")
             return create_cors_response(403, {'error': 'Access denied'})
         
-        # Calculate timeline status based on profile completeness and activities
+        onboarding = progress.get('onboarding', {})
         timeline_status = {
-            'profile_complete': bool(profile.get('first_name') and profile.get('last_name') and profile.get('school_name')),
-            'onboarding_complete': profile.get('onboarding_completed', False),
-            'events_created': 0,  # Will be calculated below
-            'invitations_sent': 0,  # Will be calculated below
+            'profile_complete': onboarding.get('details', {}).get('profile_complete', False),
+            'onboarding_complete': onboarding.get('status') == 'completed',
+            'events_created': int(progress.get('events_created', 0)),
+            'invitations_sent': int(progress.get('invitations_sent', 0)),
             'next_steps': []
         }
         
-        # Count events created by this coach
-        events_table = get_dynamodb_table(get_table_name('events'))
-        try:
-            events_response = events_table.query(
-                IndexName='coach-events-index',
-                KeyConditionExpression='coach_id = :coach_id',
-                ExpressionAttributeValues={':coach_id': normalized_coach_id},
-                Select='COUNT'
-            )
-            timeline_status['events_created'] = events_response.get('Count', 0)
-        except Exception as e:
-            logger.warning(f"Error counting events: {str(e)}")
-        
-        # Count invitations sent by this coach
-        try:
-                    invitations_table = get_dynamodb_table(get_table_name('parent-invitations'))
-        invitations_response = invitations_table.scan(
-                FilterExpression='coach_id = :coach_id',
-                ExpressionAttributeValues={':coach_id': normalized_coach_id},
-                Select='COUNT'
-            )
-            timeline_status['invitations_sent'] = invitations_response.get('Count', 0)
-        except Exception as e:
-            logger.warning(f"Error counting invitations: {str(e)}")
-        
         # Generate next steps based on current status
         if not timeline_status['profile_complete']:
             timeline_status['next_steps'].append('Complete your profile information')
@@ -675,16 +637,25 @@ def sync_event_attendees(event: Dict[str, Any]) -> Dict[str, Any]:
         if not event_id:
             return create_cors_response(400, {'error': 'event_id is required'})
         
+        query_params = event.get('queryStringParameters') or {}
+        full_sync = str(query_params.get('full', '')).lower() in ('1', 'true', 'yes')
+        
         sync_service = EventSyncService()
         
         try:
-            result = sync_service.sync_event_attendees(event_id)
+            result = sync_service.sync_event_attendees(event_id, full=full_sync)
             logger.info(f"Successfully synced attendees for event {event_id}: {result}")
             
             return create_cors_response(200, {
                 'message': 'Attendees synced successfully',
                 'result': result
             })
+        except EventbriteRateLimitError as e:
+            logger.warning(f"Eventbrite rate limit hit syncing event {event_id}, retry after {e.retry_after:.0f}s")
+            return create_cors_response(429, {
+                'error': 'Eventbrite rate limit reached, please retry later',
+                'retry_after': int(e.retry_after)
+            })
         except EventbriteAPIError as e:
             logger.error(f"Eventbrite attendee sync failed for event {event_id}: {str(e)}")
             return create_cors_response(400, {'error': f'Failed to sync from Eventbrite: {str(e)}'})
@@ -2,11 +2,11 @@
 Profile Sync Utility
 Hardening mechanism to ensure completed onboarding invitations have corresponding profiles
 """
-import boto3
 import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from botocore.exceptions import ClientError
+from tsa_shared.aws_clients import get_table
 
 logger = logging.getLogger(__name__)
 
@@ -14,10 +14,9 @@ class ProfileSyncManager:
     """Manages synchronization between completed onboarding and profiles table"""
     
     def __init__(self, users_table_name: str, profiles_table_name: str, invitations_table_name: str):
-        self.dynamodb = boto3.resource('dynamodb')
-        self.users_table = self.dynamodb.Table(users_table_name)
-        self.profiles_table = self.dynamodb.Table(profiles_table_name)
-        self.invitations_table = self.dynamodb.Table(invitations_table_name)
+        self.users_table = get_table(users_table_name)
+        self.profiles_table = get_table(profiles_table_name)
+        self.invitations_table = get_table(invitations_table_name)
     
     def ensure_profile_exists_for_email(self, email: str) -> bool:
         """
@@ -0,0 +1,301 @@
+"""
+Eventbrite Sync Orchestrator
+Keeps attendee counts fresh for every coach without user-triggered sync load
+
+Scheduled invocation (EventBridge): finds published, upcoming events that are
+due for an attendee sync and enqueues one job per event on a FIFO queue with
+MessageGroupId = coach_id, so at most one sync per coach (and per Eventbrite
+token) runs at a time.
+
+SQS invocation: runs the queued syncs - coaches in parallel, each coach's
+jobs in order - and records per-event sync lag.
+"""
+import json
+import os
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+from boto3.dynamodb.conditions import Key
+
+# Import shared utilities
+import sys
+sys.path.append('/opt/python')
+from tsa_shared.aws_clients import get_client
+from tsa_shared.database import get_dynamodb_table, get_table_name, iter_query_pages
+from tsa_shared.table_models import EventStatus
+from lambda_events.event_sync_service import EventSyncService
+from lambda_events.eventbrite_client import EventbriteRateLimitError
+
+logger = logging.getLogger()
+logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+
+SYNC_QUEUE_URL = os.environ.get('EVENTBRITE_SYNC_QUEUE_URL', '')
+EVENTS_STATUS_INDEX = 'status-start-date-index'
+
+# Events that ended more than this long ago are no longer synced
+SYNC_LOOKBACK = timedelta(days=1)
+# Only events starting within this horizon are synced on a schedule
+SYNC_HORIZON = timedelta(days=int(os.environ.get('EVENTBRITE_SYNC_HORIZON_DAYS', '90')))
+
+# Sync interval by time until the event starts (closer events sync more often)
+SYNC_INTERVALS = [
+    (timedelta(days=2), timedelta(minutes=15)),
+    (timedelta(days=14), timedelta(hours=1)),
+    (None, timedelta(hours=6))
+]
+
+SQS_BATCH_ENTRIES = 10
+# Worker threads across coaches in one SQS batch (one coach's jobs always run in order)
+MAX_PARALLEL_COACHES = int(os.environ.get('EVENTBRITE_SYNC_MAX_PARALLEL_COACHES', '4'))
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Route SQS sync jobs to the worker and scheduled invocations to the planner"""
+    if 'Records' in event:
+        return process_sync_jobs(event.get('Records', []))
+    return enqueue_due_syncs()
+
+
+# =================================================================
+# PLANNER
+# =================================================================
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def sync_interval(start: datetime, now: datetime) -> timedelta:
+    """How often an event starting at `start` should be synced"""
+    for until_start, interval in SYNC_INTERVALS:
+        if until_start is None or start - now <= until_start:
+            return interval
+    return SYNC_INTERVALS[-1][1]
+
+
+def due_since(event_item: Dict[str, Any], now: datetime) -> Optional[datetime]:
+    """
+    When an event became due for a sync (None if it is not due)
+
+    Due when it was never synced, changed since its last sync, or its last
+    sync is older than the interval for how soon it starts.
+    """
+    eventbrite = event_item.get('eventbrite') or {}
+    start = _parse_time(event_item.get('start_date'))
+    last_synced = _parse_time(eventbrite.get('last_synced'))
+    updated_at = _parse_time(event_item.get('updated_at'))
+
+    if last_synced is None:
+        return _parse_time(event_item.get('published_at')) or updated_at or now
+    # Our own sync bumps updated_at to last_synced, so only later edits count
+    if updated_at and updated_at > last_synced:
+        return updated_at
+
+    next_due = last_synced + sync_interval(start or now, now)
+    return next_due if next_due <= now else None
+
+
+def iter_due_events(now: Optional[datetime] = None) -> Iterator[Tuple[Dict[str, Any], datetime]]:
+    """
+    Yield (event, due_since) for published Eventbrite events due for a sync
+
+    Uses the events status-start-date-index: status = published and
+    start_date between now - SYNC_LOOKBACK and now + SYNC_HORIZON.
+    """
+    now = now or datetime.now(timezone.utc)
+    events_table = get_dynamodb_table(get_table_name('events'))
+
+    # Bare timestamps compare correctly against start dates stored with 'Z' or '+00:00'
+    window_start = (now - SYNC_LOOKBACK).strftime('%Y-%m-%dT%H:%M:%S')
+    window_end = (now + SYNC_HORIZON).strftime('%Y-%m-%dT%H:%M:%S')
+    for page in iter_query_pages(
+        events_table,
+        projection=['event_id', 'coach_id', 'start_date', 'updated_at', 'published_at', 'eventbrite'],
+        IndexName=EVENTS_STATUS_INDEX,
+        KeyConditionExpression=Key('status').eq(EventStatus.PUBLISHED.value) &
+                               Key('start_date').between(window_start, window_end)
+    ):
+        for item in page.get('Items', []):
+            if not (item.get('eventbrite') or {}).get('eventbrite_event_id') or not item.get('coach_id'):
+                continue
+            became_due = due_since(item, now)
+            if became_due:
+                yield item, became_due
+
+
+def enqueue_due_syncs() -> Dict[str, Any]:
+    """Enqueue one FIFO sync job per due event (grouped by coach)"""
+    if not SYNC_QUEUE_URL:
+        logger.error("EVENTBRITE_SYNC_QUEUE_URL is not configured")
+        return {'success': False, 'error': 'Sync queue not configured'}
+
+    now = datetime.now(timezone.utc)
+    sqs = get_client('sqs')
+    # Jobs enqueued by the same run dedupe; SQS drops repeats within its 5-minute window
+    run_marker = now.strftime('%Y%m%d%H%M')
+
+    batch: List[Dict[str, Any]] = []
+    enqueued = 0
+    failed = 0
+    coaches = set()
+    max_lag = 0.0
+
+    def flush():
+        nonlocal enqueued, failed
+        if not batch:
+            return
+        try:
+            response = sqs.send_message_batch(QueueUrl=SYNC_QUEUE_URL, Entries=list(batch))
+            failed += len(response.get('Failed', []))
+            enqueued += len(response.get('Successful', []))
+        except Exception as e:
+            logger.error(f"Failed to enqueue {len(batch)} sync jobs: {str(e)}")
+            failed += len(batch)
+        batch.clear()
+
+    for event_item, became_due in iter_due_events(now):
+        event_id = event_item['event_id']
+        coaches.add(event_item['coach_id'])
+        max_lag = max(max_lag, (now - became_due).total_seconds())
+        batch.append({
+            # SQS batch entry ids only allow alphanumerics, hyphens and underscores
+            'Id': f"job{len(batch)}",
+            'MessageBody': json.dumps({
+                'event_id': event_id,
+                'coach_id': event_item['coach_id'],
+                'due_since': became_due.isoformat(),
+                'enqueued_at': now.isoformat()
+            }),
+            'MessageGroupId': event_item['coach_id'],
+            'MessageDeduplicationId': f"{event_id}-{run_marker}"
+        })
+        if len(batch) == SQS_BATCH_ENTRIES:
+            flush()
+    flush()
+
+    logger.info(json.dumps({
+        'metric': 'eventbrite_sync_planned',
+        'enqueued': enqueued,
+        'failed': failed,
+        'coaches': len(coaches),
+        'max_due_lag_seconds': round(max_lag, 1)
+    }))
+    return {'success': failed == 0, 'enqueued': enqueued, 'failed': failed, 'coaches': len(coaches)}
+
+
+# =================================================================
+# WORKER
+# =================================================================
+
+def _record_sync_lag(events_table, event_id: str, lag_seconds: float) -> None:
+    try:
+        events_table.update_item(
+            Key={'event_id': event_id},
+            UpdateExpression='SET eventbrite.sync_lag_seconds = :lag',
+            ConditionExpression='attribute_exists(eventbrite)',
+            ExpressionAttributeValues={':lag': int(lag_seconds)}
+        )
+    except Exception as e:
+        logger.warning(f"Could not record sync lag for event {event_id}: {str(e)}")
+
+
+def _defer(record: Dict[str, Any], seconds: float) -> None:
+    """Hold a throttled job until its coach's Eventbrite budget recovers"""
+    try:
+        get_client('sqs').change_message_visibility(
+            QueueUrl=SYNC_QUEUE_URL,
+            ReceiptHandle=record['receiptHandle'],
+            VisibilityTimeout=int(min(max(seconds, 0), 43200))
+        )
+    except Exception as e:
+        logger.warning(f"Could not defer sync job {record.get('messageId')}: {str(e)}")
+
+
+def _already_synced(events_table, event_id: str, enqueued_at: Optional[datetime]) -> bool:
+    """A backed-up queue can hold repeat jobs - skip events synced since this job was enqueued"""
+    if not enqueued_at:
+        return False
+    item = events_table.get_item(
+        Key={'event_id': event_id}, ProjectionExpression='eventbrite.last_synced'
+    ).get('Item') or {}
+    last_synced = _parse_time((item.get('eventbrite') or {}).get('last_synced'))
+    return bool(last_synced and last_synced >= enqueued_at)
+
+
+def _run_coach_jobs(records: List[Dict[str, Any]], sync_service: EventSyncService, events_table) -> List[str]:
+    """Run one coach's jobs in order; returns message IDs to retry"""
+    for position, record in enumerate(records):
+        job = json.loads(record.get('body') or '{}')
+        event_id = job.get('event_id')
+        started = time.monotonic()
+        try:
+            if _already_synced(events_table, event_id, _parse_time(job.get('enqueued_at'))):
+                logger.info(f"Event {event_id} already synced since job was enqueued, skipping")
+                continue
+            report = sync_service.sync_event_attendees(event_id)
+        except EventbriteRateLimitError as e:
+            # The rest of this coach's jobs share the throttled token - retry them all later
+            for deferred in records[position:]:
+                _defer(deferred, e.retry_after)
+            logger.warning(f"Eventbrite throttled coach {job.get('coach_id')}, deferring {len(records) - position} jobs")
+            return [deferred['messageId'] for deferred in records[position:]]
+        except Exception as e:
+            logger.error(f"Sync failed for event {event_id}: {str(e)}")
+            return [failed['messageId'] for failed in records[position:]]
+
+        now = datetime.now(timezone.utc)
+        became_due = _parse_time(job.get('due_since')) or now
+        enqueued_at = _parse_time(job.get('enqueued_at')) or now
+        lag_seconds = (now - became_due).total_seconds()
+        _record_sync_lag(events_table, event_id, lag_seconds)
+
+        logger.info(json.dumps({
+            'metric': 'eventbrite_sync_completed',
+            'event_id': event_id,
+            'coach_id': job.get('coach_id'),
+            'sync_lag_seconds': round(lag_seconds, 1),
+            'queue_delay_seconds': round((now - enqueued_at).total_seconds(), 1),
+            'duration_ms': int((time.monotonic() - started) * 1000),
+            'added': report.get('added', 0),
+            'changed': report.get('changed', 0),
+            'cancelled': report.get('cancelled', 0),
+            'unchanged': report.get('unchanged', 0)
+        }))
+    return []
+
+
+def process_sync_jobs(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Run a batch of queued sync jobs
+
+    Jobs are grouped by coach; coaches run in parallel (bounded) and each
+    coach's jobs run in order. A failed job is retried together with the
+    coach's later jobs in the batch, as FIFO ordering requires.
+
+    Returns:
+        Partial batch response ({"batchItemFailures": [...]})
+    """
+    by_coach: Dict[str, List[Dict[str, Any]]] = {}
+    for record in records:
+        group = record.get('attributes', {}).get('MessageGroupId') or 'default'
+        by_coach.setdefault(group, []).append(record)
+
+    sync_service = EventSyncService()
+    events_table = get_dynamodb_table(get_table_name('events'))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_PARALLEL_COACHES, len(by_coach)))) as executor:
+        retry_ids = [
+            message_id
+            for failed in executor.map(lambda jobs: _run_coach_jobs(jobs, sync_service, events_table), by_coach.values())
+            for message_id in failed
+        ]
+
+    logger.info(f"Processed {len(records)} sync jobs for {len(by_coach)} coaches ({len(retry_ids)} to retry)")
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in retry_ids]}
@@ -5,7 +5,6 @@ Handles invitations to events (not parent invitations to join platform).
 """
 import json
 import os
-import boto3
 from typing import Dict, Any, List, Optional
 from datetime import datetime, timedelta
 
@@ -13,8 +12,10 @@ from datetime import datetime, timedelta
 from tsa_shared import (
     parse_event_body, get_current_timestamp as get_current_time, 
     format_error_response as standardize_error_response, get_config,
-    generate_id, validate_email_format as validate_email, CoachProfile
+    generate_id, validate_email_format as validate_email, CoachProfile, get_dynamodb_table,
+    iter_query_pages, batch_write_items
 )
+from boto3.dynamodb.conditions import Key
 
 config = get_config()
 
@@ -22,11 +23,7 @@ def get_table_name(table_type):
     stage = os.environ.get('STAGE', 'dev')
     return config.get_table_name(table_type, stage)
 
-def get_dynamodb_table(table_name):
-    import boto3
-    dynamodb = boto3.resource('dynamodb')
-    return dynamodb.Table(table_name)
-from user_identifier import UserIdentifier
+from tsa_shared.users import UserIdentifier
 
 
 def create_cors_response(status_code: int, body: dict) -> dict:
@@ -191,15 +188,7 @@ def create_invitation(event: Dict[str, Any]) -> Dict[str, Any]:
         event_data = event_response['Item']
         
         # Check if invitation already exists
-        existing_invitation = invitations_table.scan(
-            FilterExpression='event_id = :event_id AND invitee_email = :email',
-            ExpressionAttributeValues={
-                ':event_id': body['event_id'],
-                ':email': body['invitee_email'].lower().strip()
-            }
-        )
-        
-        if existing_invitation['Items']:
+        if body['invitee_email'].lower().strip() in load_existing_invitee_emails(invitations_table, body['event_id']):
             return create_cors_response(400, {'error': 'Invitation already exists for this email'})
         
         # Create invitation with centralized ID generation
@@ -213,9 +202,9 @@ def create_invitation(event: Dict[str, Any]) -> Dict[str, Any]:
             'event_id': body['event_id'],
             'event_title': event_data['title'],
             'invitee_email': body['invitee_email'].lower().strip(),
-            'invitee_name': body.get('invitee_name', ''),
+            'invitee_name': body.get('invitee_name') or '',
             'inviter_id': normalized_inviter_id,  # Use normalized profile_id
-            'message': body.get('message', ''),
+            'message': body.get('message') or '',
             'status': 'pending',
             'sent_at': None,
             'expires_at': expires_at,
@@ -328,8 +317,27 @@ def send_invitations(event: Dict[str, Any]) -> Dict[str, Any]:
         return create_cors_response(500, standardize_error_response(e, "send_invitations"))
 
 
+def load_existing_invitee_emails(invitations_table, event_id: str) -> set:
+    """Load every invitee email already invited to an event with one GSI query"""
+    emails = set()
+    for page in iter_query_pages(
+        invitations_table,
+        projection=['invitee_email'],
+        IndexName='event-id-index',
+        KeyConditionExpression=Key('event_id').eq(event_id)
+    ):
+        emails.update(item['invitee_email'] for item in page.get('Items', []) if item.get('invitee_email'))
+    return emails
+
+
 def send_bulk_invitations(event: Dict[str, Any]) -> Dict[str, Any]:
-    """Create and send invitations to multiple recipients"""
+    """
+    Create and send invitations to multiple recipients
+    
+    Existing invitees are loaded with one event-id-index query and duplicates
+    are removed in memory, new invitations are written with batched writes,
+    and emails go out as SendGrid personalizations rendered once per event.
+    """
     try:
         body = parse_event_body(event)
         
@@ -360,91 +368,96 @@ def send_bulk_invitations(event: Dict[str, Any]) -> Dict[str, Any]:
         
         event_data = event_response['Item']
         
-        created_invitations = []
-        sent_count = 0
-        failed_count = 0
+        # Dedupe against existing invitations and within the request
+        seen_emails = load_existing_invitee_emails(invitations_table, body['event_id'])
+        results = []
+        new_invitations = []
         
         expires_at = (datetime.utcnow() + timedelta(days=7)).isoformat()
+        created_at = get_current_time()
         
         for invitee in body['invitees']:
-            try:
-                if 'email' not in invitee:
-                    failed_count += 1
-                    continue
-                
-                email = invitee['email'].lower().strip()
-                
-                # Validate email format
-                if not validate_email(email):
-                    failed_count += 1
-                    continue
-                
-                # Check if invitation already exists
-                existing = invitations_table.scan(
-                    FilterExpression='event_id = :event_id AND invitee_email = :email',
-                    ExpressionAttributeValues={
-                        ':event_id': body['event_id'],
-                        ':email': email
-                    }
-                )
-                
-                if existing['Items']:
-                    failed_count += 1
-                    continue
-                
-                # Create invitation with centralized ID generation
-                invitation_id = generate_id('invitation')
-                
-                invitation_data = {
-                    'invitation_id': invitation_id,
-                    'event_id': body['event_id'],
-                    'event_title': event_data['title'],
-                    'invitee_email': email,
-                    'invitee_name': invitee.get('name', ''),
-                    'inviter_id': normalized_inviter_id,  # Use normalized profile_id
-                    'message': body.get('message', ''),
-                    'status': 'pending',
-                    'sent_at': None,
-                    'expires_at': expires_at,
-                    'responded_at': None,
-                    'response': None,
-                    'created_at': get_current_time(),
-                    'updated_at': get_current_time()
-                }
-                
-                invitations_table.put_item(Item=invitation_data)
-                
-                # Send email immediately if requested
-                if body.get('send_immediately', False):
-                    email_sent = send_invitation_email(invitation_data)
-                    
-                    if email_sent:
-                        invitations_table.update_item(
-                            Key={'invitation_id': invitation_id},
-                            UpdateExpression='SET #status = :status, sent_at = :sent_at, updated_at = :updated_at',
-                            ExpressionAttributeNames={'#status': 'status'},
-                            ExpressionAttributeValues={
-                                ':status': 'sent',
-                                ':sent_at': get_current_time(),
-                                ':updated_at': get_current_time()
-                            }
-                        )
-                        sent_count += 1
-                        invitation_data['status'] = 'sent'
-                        invitation_data['sent_at'] = get_current_time()
-                
-                created_invitations.append(invitation_data)
-                
-            except Exception as e:
-                print(f"Error processing invitee {invitee.get('email', 'unknown')}: {str(e)}")
-                failed_count += 1
+            email = str(invitee.get('email') or '').lower().strip() if isinstance(invitee, dict) else ''
+            
+            if not email or not validate_email(email):
+                results.append({'email': email, 'status': 'failed', 'error': 'Invalid email format'})
+                continue
+            
+            if email in seen_emails:
+                results.append({'email': email, 'status': 'failed', 'error': 'Invitation already exists for this email'})
+                continue
+            seen_emails.add(email)
+            
+            new_invitations.append({
+                'invitation_id': generate_id('invitation'),
+                'event_id': body['event_id'],
+                'event_title': event_data['title'],
+                'invitee_email': email,
+                'invitee_name': invitee.get('name') or '',
+                'inviter_id': normalized_inviter_id,  # Use normalized profile_id
+                'message': body.get('message') or '',
+                'status': 'pending',
+                'sent_at': None,
+                'expires_at': expires_at,
+                'responded_at': None,
+                'response': None,
+                'created_at': created_at,
+                'updated_at': created_at
+            })
+        
+        write_result = batch_write_items(invitations_table, new_invitations)
+        created_invitations = []
+        for invitation, item_result in zip(new_invitations, write_result['results']):
+            if item_result['status'] == 'written':
+                created_invitations.append(invitation)
+            else:
+                results.append({
+                    'email': invitation['invitee_email'],
+                    'status': 'failed',
+                    'error': item_result.get('error', 'Failed to save invitation')
+                })
         
+        sent_count = 0
+        queued_count = 0
+        if body.get('send_immediately', False) and created_invitations:
+            delivery = send_invitation_emails(created_invitations, event_data)
+            delivered = set(delivery['sent'])
+            queued = set(delivery['queued'])
+            now = get_current_time()
+            
+            updated_invitations = []
+            for invitation in created_invitations:
+                if invitation['invitee_email'] in delivered:
+                    invitation.update({'status': 'sent', 'sent_at': now, 'updated_at': now})
+                    updated_invitations.append(invitation)
+                elif invitation['invitee_email'] in queued:
+                    # Handed to the email outbox - not delivered yet
+                    invitation.update({'status': 'queued', 'queued_at': now, 'updated_at': now})
+                    updated_invitations.append(invitation)
+            
+            status_result = batch_write_items(invitations_table, updated_invitations)
+            if not status_result['success']:
+                print(f"⚠️ Emails sent but {status_result['failed']} invitation statuses not updated")
+            sent_count = sum(1 for invitation in updated_invitations if invitation['status'] == 'sent')
+            queued_count = len(updated_invitations) - sent_count
+        
+        for invitation in created_invitations:
+            results.append({
+                'email': invitation['invitee_email'],
+                'invitation_id': invitation['invitation_id'],
+                'status': invitation['status']
+            })
+        
+        print(f"✅ Bulk invitations for {body['event_id']}: {len(created_invitations)} created, "
+              f"{sent_count} sent, {queued_count} queued")
         return create_cors_response(201, {
             'message': f'Created {len(created_invitations)} invitations',
             'created_count': len(created_invitations),
             'sent_count': sent_count,
-            'failed_count': failed_count,
-            'invitations': created_invitations
+            'queued_count': queued_count,
+            'failed_count': len(body['invitees']) - len(created_invitations),
+            'invitations': created_invitations,
+            'results': results
         })
         
     except Exception as e:
@@ -452,84 +465,158 @@ def send_bulk_invitations(event: Dict[str, Any]) -> Dict[str, Any]:
         return create_cors_response(500, standardize_error_response(e, "send_bulk_invitations"))
 
 
-def send_invitation_email(invitation: Dict[str, Any]) -> bool:
+# Per-recipient SendGrid substitution tags used by the invitation template
+INVITEE_NAME_TAG = '-invitee_name-'
+INVITATION_LINK_TAG = '-invitation_link-'
+EXPIRES_ON_TAG = '-expires_on-'
+
+
+def render_invitation_email(event_data: Dict[str, Any], message: str = '') -> Dict[str, str]:
+    """
+    Render the invitation email for an event once
+    
+    Per-recipient values are left as substitution tags so the same content can
+    be sent to every invitee of the event.
+    
+    Returns:
+        Dict with subject, html and text
+    """
+    subject = f"You're Invited: {event_data['title']}"
+    
+    # Format dates for display
+    start_date = datetime.fromisoformat(event_data['start_date'].replace('Z', '+00:00'))
+    formatted_date = start_date.strftime("%B %d, %Y at %I:%M %p")
+    
+    body_html = f"""
+    <html>
+    <body>
+        <h2>You're Invited to {event_data['title']}!</h2>
+        <p>Hello {INVITEE_NAME_TAG}!</p>
+        
+        <div style="background-color: #f5f5f5; padding: 20px; margin: 20px 0; border-radius: 8px;">
+            <h3>{event_data['title']}</h3>
+            <p><strong>Date:</strong> {formatted_date}</p>
+            <p><strong>Location:</strong> {event_data.get('location', 'TBD')}</p>
+            <p><strong>Description:</strong> {event_data['description']}</p>
+            {f"<p><strong>Cost:</strong> ${event_data['cost']}</p>" if event_data.get('cost', 0) > 0 else ""}
+        </div>
+        
+        {f"<p><em>Personal message:</em><br>{message}</p>" if message else ""}
+        
+        <p>
+            <a href="{INVITATION_LINK_TAG}" style="background-color: #007bff; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block;">
+                View Invitation & Respond
+            </a>
+        </p>
+        
+        <p>This invitation expires on {EXPIRES_ON_TAG}.</p>
+        
+        <p>Best regards,<br>The Texas Sports Academy Team</p>
+    </body>
+    </html>
+    """
+    
+    body_text = f"""
+    You're Invited to {event_data['title']}!
+    
+    Hello {INVITEE_NAME_TAG}!
+    
+    Event Details:
+    - Title: {event_data['title']}
+    - Date: {formatted_date}
+    - Location: {event_data.get('location', 'TBD')}
+    - Description: {event_data['description']}
+    {f"- Cost: ${event_data['cost']}" if event_data.get('cost', 0) > 0 else ""}
+    
+    {f"Personal message: {message}" if message else ""}
+    
+    To respond to this invitation, visit: {INVITATION_LINK_TAG}
+    
+    This invitation expires on {EXPIRES_ON_TAG}.
+    
+    Best regards,
+    The Texas Sports Academy Team
+    """
+    
+    return {'subject': subject, 'html': body_html, 'text': body_text}
+
+
+def invitation_substitutions(invitation: Dict[str, Any]) -> Dict[str, str]:
+    """Per-recipient values for the invitation template tags"""
+    return {
+        INVITEE_NAME_TAG: invitation.get('invitee_name') or '',
+        INVITATION_LINK_TAG: f"{os.environ.get('FRONTEND_URL', 'https://localhost:3000')}/invitations/{invitation['invitation_id']}",
+        EXPIRES_ON_TAG: datetime.fromisoformat(invitation['expires_at']).strftime("%B %d, %Y")
+    }
+
+
+def send_invitation_emails(invitations: List[Dict[str, Any]], event_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Send invitation emails for one event in SendGrid personalization batches
+    
+    Invitations are grouped by personal message, since the message is part of
+    the rendered content.
+    
+    Returns:
+        Dict with sent, queued (enqueued on the email outbox) and failed invitee email lists
+    """
+    from tsa_shared.sendgrid_service import get_sendgrid_service
+    
+    sendgrid_service = get_sendgrid_service()
+    by_message: Dict[str, List[Dict[str, Any]]] = {}
+    for invitation in invitations:
+        by_message.setdefault(invitation.get('message') or '', []).append(invitation)
+    
+    sent, queued, failed = [], [], []
+    for message, group in by_message.items():
+        content = render_invitation_email(event_data, message)
+        result = sendgrid_service.send_personalized_batch(
+            recipients=[
+                {
+                    'email': invitation['invitee_email'],
+                    'name': invitation.get('invitee_name'),
+                    'substitutions': invitation_substitutions(invitation)
+                }
+                for invitation in group
+            ],
+            subject=content['subject'],
+            plain_content=content['text'],
+            html_content=content['html']
+        )
+        sent.extend(result['sent'])
+        queued.extend(result.get('queued', []))
+        failed.extend(result['failed'])
+    
+    print(f"Invitation emails via SendGrid: {len(sent)} sent, {len(queued)} queued, {len(failed)} failed")
+    return {'sent': sent, 'queued': queued, 'failed': failed}
+
+
+def send_invitation_email(invitation: Dict[str, Any], event_data: Optional[Dict[str, Any]] = None) -> bool:
     """Send invitation email using SendGrid"""
     try:
-        from tsa_shared.sendgrid_service import SendGridService
+        from tsa_shared.sendgrid_service import get_sendgrid_service
         
-        sendgrid_service = SendGridService()
+        sendgrid_service = get_sendgrid_service()
         
         # Get event details for email content
-        events_table = get_dynamodb_table(get_table_name('events'))
-        event_response = events_table.get_item(Key={'event_id': invitation['event_id']})
-        
-        if 'Item' not in event_response:
-            return False
-        
-        event_data = event_response['Item']
-        
-        subject = f"You're Invited: {event_data['title']}"
-        
-        # Format dates for display
-        start_date = datetime.fromisoformat(event_data['start_date'].replace('Z', '+00:00'))
-        formatted_date = start_date.strftime("%B %d, %Y at %I:%M %p")
-        
-        invitation_link = f"{os.environ.get('FRONTEND_URL', 'https://localhost:3000')}/invitations/{invitation['invitation_id']}"
-        
-        body_html = f"""
-        <html>
-        <body>
-            <h2>You're Invited to {event_data['title']}!</h2>
-            <p>Hello {invitation.get('invitee_name', '')}!</p>
-            
-            <div style="background-color: #f5f5f5; padding: 20px; margin: 20px 0; border-radius: 8px;">
-                <h3>{event_data['title']}</h3>
-                <p><strong>Date:</strong> {formatted_date}</p>
-                <p><strong>Location:</strong> {event_data.get('location', 'TBD')}</p>
-                <p><strong>Description:</strong> {event_data['description']}</p>
-                {f"<p><strong>Cost:</strong> ${event_data['cost']}</p>" if event_data.get('cost', 0) > 0 else ""}
-            </div>
-            
-            {f"<p><em>Personal message:</em><br>{invitation['message']}</p>" if invitation.get('message') else ""}
-            
-            <p>
-                <a href="{invitation_link}" style="background-color: #007bff; color: white; padding: 12px 24px; text-decoration: none; border-radius: 4px; display: inline-block;">
-                    View Invitation & Respond
-                </a>
-            </p>
+        if event_data is None:
+            events_table = get_dynamodb_table(get_table_name('events'))
+            event_response = events_table.get_item(Key={'event_id': invitation['event_id']})
             
-            <p>This invitation expires on {datetime.fromisoformat(invitation['expires_at']).strftime("%B %d, %Y")}.</p>
+            if 'Item' not in event_response:
+                return False
             
-            <p>Best regards,<br>The Texas Sports Academy Team</p>
-        </body>
-        </html>
-        """
-        
-        body_text = f"""
-        You're Invited to {event_data['title']}!
-        
-        Hello {invitation.get('invitee_name', '')}!
+            event_data = event_response['Item']
         
-        Event Details:
-        - Title: {event_data['title']}
-        - Date: {formatted_date}
-        - Location: {event_data.get('location', 'TBD')}
-        - Description: {event_data['description']}
-        {f"- Cost: ${event_data['cost']}" if event_data.get('cost', 0) > 0 else ""}
-        
-        {f"Personal message: {invitation['message']}" if invitation.get('message') else ""}
-        
-        To respond to this invitation, visit: {invitation_link}
-        
-        This invitation expires on {datetime.fromisoformat(invitation['expires_at']).strftime("%B %d, %Y")}.
-        
-        Best regards,
-        The Texas Sports Academy Team
-        """
+        content = render_invitation_email(event_data, invitation.get('message') or '')
+        body_html, body_text = content['html'], content['text']
+        for tag, value in invitation_substitutions(invitation).items():
+            body_html = body_html.replace(tag, value)
+            body_text = body_text.replace(tag, value)
         
         result = sendgrid_service._send_email(
             to_email=invitation['invitee_email'],
-            subject=subject,
+            subject=content['subject'],
             plain_content=body_text,
             html_content=body_html
         )
@@ -1142,9 +1229,9 @@ def send_bulk_parent_invitations(event: Dict[str, Any]) -> Dict[str, Any]:
 def send_parent_invitation_email(invitation: Dict[str, Any]) -> bool:
     """Send parent invitation email using SendGrid"""
     try:
-        from tsa_shared.sendgrid_service import SendGridService
+        from tsa_shared.sendgrid_service import get_sendgrid_service
         
-        sendgrid_service = SendGridService()
+        sendgrid_service = get_sendgrid_service()
         
         student_name = f"{invitation.get('student_first_name', '')} {invitation.get('student_last_name', '')}".strip()
         if not student_name:
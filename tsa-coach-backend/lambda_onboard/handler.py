@@ -4,20 +4,17 @@ Handles invitation validation, progress tracking, and onboarding completion
 """
 
 import json
-import boto3
 import os
 import logging
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
 from decimal import Decimal
+from tsa_shared.aws_clients import get_client, get_table
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-# Initialize AWS clients
-dynamodb = boto3.resource('dynamodb')
-
 # Environment variables
 ONBOARDING_SESSIONS_TABLE = os.environ.get('ONBOARDING_SESSIONS_TABLE')
 INVITATIONS_TABLE = os.environ.get('INVITATIONS_TABLE')
@@ -71,7 +68,7 @@ def validate_invitation(data: Dict[str, Any]) -> Dict[str, Any]:
             return create_response(400, {'error': 'invitation_id is required'})
         
         # Get invitation from admin backend table using direct lookup
-        invitations_table = dynamodb.Table(INVITATIONS_TABLE)
+        invitations_table = get_table(INVITATIONS_TABLE)
         
         # Direct lookup by invitation_id (primary key) - much faster than scan
         try:
@@ -144,7 +141,7 @@ def get_onboarding_progress(data: Dict[str, Any]) -> Dict[str, Any]:
             return create_response(400, {'error': 'email is required'})
         
         # Get existing progress
-        sessions_table = dynamodb.Table(ONBOARDING_SESSIONS_TABLE)
+        sessions_table = get_table(ONBOARDING_SESSIONS_TABLE)
         
         try:
             response = sessions_table.get_item(Key={'session_id': email})
@@ -209,7 +206,7 @@ def update_onboarding_progress(data: Dict[str, Any]) -> Dict[str, Any]:
         if not email or not current_step:
             return create_response(400, {'error': 'email and current_step are required'})
         
-        sessions_table = dynamodb.Table(ONBOARDING_SESSIONS_TABLE)
+        sessions_table = get_table(ONBOARDING_SESSIONS_TABLE)
         
         # Update the progress record
         update_expression = """
@@ -257,7 +254,7 @@ def complete_onboarding(data: Dict[str, Any]) -> Dict[str, Any]:
             return create_response(400, {'error': 'email is required'})
         
         # Get the onboarding progress
-        sessions_table = dynamodb.Table(ONBOARDING_SESSIONS_TABLE)
+        sessions_table = get_table(ONBOARDING_SESSIONS_TABLE)
         progress_response = sessions_table.get_item(Key={'session_id': email})
         
         if 'Item' not in progress_response:
@@ -267,7 +264,7 @@ def complete_onboarding(data: Dict[str, Any]) -> Dict[str, Any]:
         step_data = progress.get('step_data', {})
         
         # Create user profile in users table
-        users_table = dynamodb.Table(USERS_TABLE)
+        users_table = get_table(USERS_TABLE)
         
         user_profile = {
             'user_id': f"coach_{email.replace('@', '_').replace('.', '_')}",
@@ -358,7 +355,7 @@ def complete_onboarding(data: Dict[str, Any]) -> Dict[str, Any]:
         users_table.put_item(Item=user_profile)
         
         # ✅ ALSO create coach profile in profiles table (for coach portal functionality)
-        profiles_table = dynamodb.Table(PROFILES_TABLE)
+        profiles_table = get_table(PROFILES_TABLE)
         
         # Generate coach_id based on email normalization used by coach services
         coach_id = f"coach_{email.replace('@', '_').replace('.', '_')}"
@@ -482,7 +479,7 @@ def update_invitation_status_by_id(invitation_id: str, status: str) -> bool:
         if not invitation_id:
             return False
             
-        invitations_table = dynamodb.Table(INVITATIONS_TABLE)
+        invitations_table = get_table(INVITATIONS_TABLE)
         
         # Direct lookup by invitation_id (primary key) - much faster than scan
         try:
@@ -529,7 +526,7 @@ def register_user_with_auth_service(user_profile: Dict[str, Any]) -> bool:
             return False
         
         # Initialize Cognito client
-        cognito_client = boto3.client('cognito-idp')
+        cognito_client = get_client('cognito-idp')
         
         # Check if user already exists
         try:
@@ -4,7 +4,6 @@ Handles coach self-service profile updates including preferences and tour comple
 """
 import json
 import os
-import boto3
 import sys
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
@@ -26,7 +25,9 @@ from tsa_shared import (
     format_error_response,
     get_current_timestamp,
     extract_user_from_auth_token,
-    get_config
+    get_request_profile_id,
+    get_config,
+    get_table
 )
 
 # Get table name from config
@@ -39,7 +40,7 @@ def get_table_name(table_type):
 def standardize_error_response(error, context):
     return {'error': str(error), 'context': context}
 # CoachProfile import removed - not used in this handler
-from user_identifier import UserIdentifier
+from tsa_shared.users import UserIdentifier
 
 # Environment variables
 PROFILES_TABLE = os.environ.get('PROFILES_TABLE')
@@ -82,8 +83,7 @@ def get_coach_profile(event: Dict[str, Any]) -> Dict[str, Any]:
         logger.info(f"🔐 Fetching profile for authenticated user: {email}")
         
         # Get profile from profiles table  
-        dynamodb = boto3.resource('dynamodb')
-        profiles_table = dynamodb.Table(PROFILES_TABLE)
+        profiles_table = get_table(PROFILES_TABLE)
         
         # Generate consistent coach_id
         coach_id = f"coach_{email.replace('@', '_').replace('.', '_')}"
@@ -140,7 +140,7 @@ def update_coach_profile(event: Dict[str, Any]) -> Dict[str, Any]:
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         
         try:
-            normalized_profile_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_profile_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_response(404, {'error': str(e)})
         
@@ -217,7 +217,7 @@ def update_coach_preferences(event: Dict[str, Any]) -> Dict[str, Any]:
         profiles_table = get_dynamodb_table(get_table_name('profiles'))
         
         try:
-            normalized_profile_id = UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
+            normalized_profile_id = get_request_profile_id(event) or UserIdentifier.normalize_coach_id(authenticated_email, profiles_table)
         except ValueError as e:
             return create_response(404, {'error': str(e)})
         
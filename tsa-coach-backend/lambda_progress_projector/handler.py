@@ -0,0 +1,144 @@
+"""
+Lambda handler for the coach progress projection
+Consumes background-checks, events, parent-invitations and enrollments
+DynamoDB streams, plus profile changes from the profiles table's Kinesis
+data stream, and keeps one coach-progress item per coach up to date
+
+Backfill / rebuild: invoke directly with {"action": "rebuild"} (optionally
+"profile_ids" and "total_segments") to recompute progress from the source tables.
+"""
+import base64
+import json
+import os
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional
+import logging
+
+# Import shared utilities from consolidated shared layer
+try:
+    from tsa_shared.admin_metrics import deserialize_image
+    from tsa_shared.coach_progress import (
+        source_table_names, progress_changes, apply_progress_changes, rebuild_coach_progress
+    )
+    logger = logging.getLogger()
+    logger.setLevel(os.environ.get('LOG_LEVEL', 'INFO'))
+except ImportError as e:
+    logging.getLogger().error(f"Failed to import shared utilities: {e}")
+    raise
+
+
+def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
+    """Route stream batches and rebuild commands"""
+    if event.get('action') == 'rebuild':
+        result = rebuild_coach_progress(event.get('profile_ids'), int(event.get('total_segments', 4)))
+        result.pop('items', None)
+        if result['success']:
+            logger.info(f"✅ Coach progress rebuilt: {result}")
+        else:
+            logger.error(f"❌ Coach progress rebuild incomplete: {result}")
+        return result
+
+    return handle_stream_batch(event)
+
+
+def _table_name_from_arn(event_source_arn: str) -> str:
+    """arn:aws:dynamodb:region:account:table/<name>/stream/<label> -> <name>"""
+    try:
+        return event_source_arn.split(':table/', 1)[1].split('/', 1)[0]
+    except IndexError:
+        return ''
+
+
+def _change_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Normalize a DynamoDB stream record or a Kinesis data stream record
+
+    Kinesis records wrap the DynamoDB change as base64 JSON and report
+    ApproximateCreationDateTime in milliseconds instead of seconds.
+    """
+    if 'kinesis' in record:
+        payload = json.loads(base64.b64decode(record['kinesis']['data']))
+        images = payload.get('dynamodb', {})
+        return {
+            'table_name': payload.get('tableName', ''),
+            'event_id': payload.get('eventID', ''),
+            'sequence_number': record['kinesis']['sequenceNumber'],
+            'created_at': images.get('ApproximateCreationDateTime', 0) / 1000,
+            'images': images
+        }
+
+    images = record.get('dynamodb', {})
+    return {
+        'table_name': _table_name_from_arn(record.get('eventSourceARN', '')),
+        'event_id': record.get('eventID', ''),
+        'sequence_number': images.get('SequenceNumber'),
+        'created_at': images.get('ApproximateCreationDateTime', 0),
+        'images': images
+    }
+
+
+def _sequence_number(record: Dict[str, Any]) -> Optional[str]:
+    if 'kinesis' in record:
+        return record['kinesis'].get('sequenceNumber')
+    return record.get('dynamodb', {}).get('SequenceNumber')
+
+
+def handle_stream_batch(event: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fold a batch of stream records into per-coach progress changes and apply them
+
+    Records are folded in order up to the first one that cannot be processed;
+    only that record (and the ones after it) is reported in batchItemFailures,
+    so ADD deltas from the records before it are not applied twice.
+    """
+    sources = source_table_names()
+    records = event.get('Records', [])
+    folded: List[Dict[str, Any]] = []
+    failures: List[Optional[str]] = []
+    skipped = 0
+
+    for record in records:
+        try:
+            change_record = _change_record(record)
+            source = sources.get(change_record['table_name'])
+            if not source:
+                skipped += 1
+                folded.append({**change_record, 'changes': {}})
+                continue
+            images = change_record['images']
+            folded.append({**change_record, 'changes': progress_changes(
+                source, deserialize_image(images.get('OldImage')), deserialize_image(images.get('NewImage'))
+            )})
+        except Exception as e:
+            logger.error(f"❌ Cannot process stream record {_sequence_number(record)}: {e}", exc_info=True)
+            failures.append(_sequence_number(record))
+            break
+
+    # Kinesis may deliver an item's changes out of order within a batch; the newest step wins
+    changes = {}
+    for change_record in sorted(folded, key=lambda folded_record: folded_record['created_at']):
+        for profile_id, change in change_record['changes'].items():
+            merged = changes.setdefault(profile_id, {'set': {}, 'add': {}})
+            merged['set'].update(change['set'])
+            for counter, value in change['add'].items():
+                merged['add'][counter] = merged['add'].get(counter, 0) + value
+
+    # Retried batches carry the same event IDs, so the transaction token dedupes them
+    idempotency_key = ','.join(change_record['event_id'] for change_record in folded)
+    newest = max((change_record['created_at'] for change_record in folded), default=0)
+    updated_at = datetime.fromtimestamp(newest, timezone.utc).isoformat() if newest else None
+    try:
+        updated = apply_progress_changes(changes, idempotency_key=idempotency_key, updated_at=updated_at)
+    except Exception as e:
+        logger.error(f"❌ Error applying coach progress changes: {e}", exc_info=True)
+        updated = 0
+        failures = [_sequence_number(record) for record in records[:1]]
+
+    logger.info(f"Processed {len(folded)} of {len(records)} stream records -> "
+                f"{updated} coach progress items updated ({skipped} skipped)")
+    return {
+        'success': not failures,
+        'records': len(folded),
+        'progress_items_updated': updated,
+        'batchItemFailures': [{'itemIdentifier': sequence_number} for sequence_number in failures]
+    }
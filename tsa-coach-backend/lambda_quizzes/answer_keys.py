@@ -0,0 +1,230 @@
+"""
+Compiled quiz answer keys and grading
+Shared by attempt submission and batch regrading
+"""
+import os
+import time
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Any, List, Optional, Tuple
+from tsa_shared import get_dynamodb_table, get_current_timestamp, iter_query_pages
+
+GRADED_QUESTION_TYPES = ('multiple_choice', 'true_false', 'short_answer')
+ANSWER_KEY_PROJECTION = [
+    'question_id', 'question_text', 'question_type', 'correct_answer',
+    'points', 'explanation', 'order_index'
+]
+
+
+def _questions_table():
+    return get_dynamodb_table(os.environ.get('QUESTIONS_TABLE', 'quiz-questions'))
+
+
+def _quizzes_table():
+    return get_dynamodb_table(os.environ.get('QUIZZES_TABLE', 'quizzes'))
+
+
+def normalize_answer(value: Any) -> str:
+    """Case- and whitespace-insensitive form used for every graded question type"""
+    return str(value).strip().lower()
+
+
+@dataclass(frozen=True)
+class CompiledAnswerKey:
+    """Column-oriented answer key for one version of a quiz's question set"""
+    quiz_id: str
+    version: int
+    question_ids: Tuple[str, ...]
+    # Normalized correct answers; None for question types that are never auto-graded
+    expected: Tuple[Optional[str], ...]
+    points: Tuple[Any, ...]
+    questions: Tuple[Dict[str, Any], ...]
+    total_points: Any
+
+    @classmethod
+    def compile(cls, quiz_id: str, version: int, questions: List[Dict[str, Any]]) -> 'CompiledAnswerKey':
+        questions = sorted(questions, key=lambda q: q.get('order_index', 0))
+        points = tuple(q.get('points', 1) for q in questions)
+        return cls(
+            quiz_id=quiz_id,
+            version=version,
+            question_ids=tuple(q['question_id'] for q in questions),
+            expected=tuple(
+                normalize_answer(q['correct_answer']) if q.get('question_type') in GRADED_QUESTION_TYPES else None
+                for q in questions
+            ),
+            points=points,
+            questions=tuple(
+                {
+                    'question_text': q.get('question_text', ''),
+                    'correct_answer': q.get('correct_answer'),
+                    'explanation': q.get('explanation', '')
+                }
+                for q in questions
+            ),
+            total_points=sum(points)
+        )
+
+    def grade(self, answers: Dict[str, Any], passing_score: Any = 70) -> Dict[str, Any]:
+        """
+        Grade one set of answers
+
+        Args:
+            answers: Dict of question_id -> student answer
+            passing_score: Percentage needed to pass
+
+        Returns:
+            Dict with score, total_points, percentage, passed, correct_count,
+            total_questions and detailed_results
+        """
+        submitted = [answers.get(question_id, '') for question_id in self.question_ids]
+        correct = [
+            expected is not None and normalize_answer(answer) == expected
+            for answer, expected in zip(submitted, self.expected)
+        ]
+        earned_points = sum(points for points, is_correct in zip(self.points, correct) if is_correct)
+
+        percentage = (earned_points / self.total_points * 100) if self.total_points > 0 else 0
+        return {
+            'score': earned_points,
+            'total_points': self.total_points,
+            # DynamoDB stores numbers as Decimal (floats are rejected)
+            'percentage': Decimal(str(round(percentage, 2))),
+            'passed': percentage >= passing_score,
+            'correct_count': sum(correct),
+            'total_questions': len(self.question_ids),
+            'question_set_version': self.version,
+            'detailed_results': [
+                {
+                    'question_id': question_id,
+                    'question_text': question['question_text'],
+                    'student_answer': answer,
+                    'correct_answer': question['correct_answer'],
+                    'is_correct': is_correct,
+                    'points_earned': points if is_correct else 0,
+                    'points_possible': points,
+                    'explanation': question['explanation']
+                }
+                for question_id, question, answer, is_correct, points
+                in zip(self.question_ids, self.questions, submitted, correct, self.points)
+            ]
+        }
+
+    def grade_many(self, answer_sets: List[Dict[str, Any]], passing_score: Any = 70) -> List[Dict[str, Any]]:
+        """Grade many answer sets against this key (e.g. every attempt for a quiz)"""
+        return [self.grade(answers, passing_score) for answers in answer_sets]
+
+
+# =================================================================
+# ANSWER KEY CACHE
+# =================================================================
+
+class _AnswerKeyCache:
+    """Thread-safe LRU + TTL cache of compiled keys by (quiz_id, question set version)"""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: 'OrderedDict[Tuple[str, int], Tuple[float, CompiledAnswerKey]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'compiled': 0}
+
+    def get(self, quiz_id: str, version: int) -> Optional[CompiledAnswerKey]:
+        with self._lock:
+            entry = self._entries.get((quiz_id, version))
+            if entry is None or entry[0] < time.monotonic():
+                self._entries.pop((quiz_id, version), None)
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end((quiz_id, version))
+            self.counters['hits'] += 1
+            return entry[1]
+
+    def put(self, key: CompiledAnswerKey) -> None:
+        with self._lock:
+            self.counters['compiled'] += 1
+            self._entries[(key.quiz_id, key.version)] = (time.monotonic() + self.ttl_seconds, key)
+            self._entries.move_to_end((key.quiz_id, key.version))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, quiz_id: str) -> None:
+        with self._lock:
+            for cache_key in [k for k in self._entries if k[0] == quiz_id]:
+                del self._entries[cache_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for counter in self.counters:
+                self.counters[counter] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'entries': len(self._entries), 'max_entries': self.max_entries}
+
+
+# Module-level cache survives across warm Lambda invocations
+_answer_key_cache = _AnswerKeyCache(
+    max_entries=int(os.environ.get('ANSWER_KEY_CACHE_MAX_ENTRIES', '128')),
+    # Bounds staleness if a quiz-id-index read lagged behind a question write
+    ttl_seconds=int(os.environ.get('ANSWER_KEY_CACHE_TTL_SECONDS', '300'))
+)
+
+
+def get_question_set_version(quiz: Dict[str, Any]) -> int:
+    return int(quiz.get('question_set_version', 0))
+
+
+def load_quiz_questions(quiz_id: str, projection: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """All questions for a quiz (follows quiz-id-index pagination)"""
+    questions = []
+    for page in iter_query_pages(
+        _questions_table(),
+        projection=projection,
+        IndexName='quiz-id-index',
+        KeyConditionExpression='quiz_id = :quiz_id',
+        ExpressionAttributeValues={':quiz_id': quiz_id}
+    ):
+        questions.extend(page.get('Items', []))
+    return questions
+
+
+def get_answer_key(quiz_id: str, quiz: Dict[str, Any]) -> CompiledAnswerKey:
+    """
+    Compiled answer key for the quiz's current question set
+
+    Args:
+        quiz_id: Quiz ID
+        quiz: Current quiz item (its question_set_version selects the cache entry)
+
+    Returns:
+        CompiledAnswerKey
+    """
+    version = get_question_set_version(quiz)
+    key = _answer_key_cache.get(quiz_id, version)
+    if key is None:
+        key = CompiledAnswerKey.compile(quiz_id, version, load_quiz_questions(quiz_id, ANSWER_KEY_PROJECTION))
+        _answer_key_cache.put(key)
+    return key
+
+
+def bump_question_set_version(quiz_id: str) -> None:
+    """Mark a quiz's questions as changed so every container recompiles its answer key"""
+    _answer_key_cache.invalidate(quiz_id)
+    try:
+        _quizzes_table().update_item(
+            Key={'quiz_id': quiz_id},
+            UpdateExpression='SET updated_at = :updated_at ADD question_set_version :one',
+            ConditionExpression='attribute_exists(quiz_id)',
+            ExpressionAttributeValues={':one': 1, ':updated_at': get_current_timestamp()}
+        )
+    except Exception as e:
+        print(f"Error bumping question set version: {str(e)}")
+
+
+def get_answer_key_cache_stats() -> Dict[str, Any]:
+    """Answer key cache counters for this container"""
+    return _answer_key_cache.stats()
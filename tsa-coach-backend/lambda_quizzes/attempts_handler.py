@@ -6,8 +6,10 @@ import os
 from typing import Dict, Any, List
 from tsa_shared import (
     create_response, get_dynamodb_table, parse_event_body,
-    get_current_timestamp, validate_required_fields, get_path_parameters
+    get_current_timestamp, validate_required_fields, get_path_parameters,
+    iter_scan_pages, batch_write_items
 )
+from answer_keys import get_answer_key
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -27,6 +29,8 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
                 return start_attempt(event)
             elif '/submit' in path:
                 return submit_attempt(event)
+            elif '/regrade' in path:
+                return regrade_attempts(event)
             else:
                 return create_response(400, {'error': 'Invalid endpoint'})
         elif http_method == 'PUT':
@@ -156,6 +160,7 @@ def submit_attempt(event: Dict[str, Any]) -> Dict[str, Any]:
                 score = :score,
                 percentage = :percentage,
                 passed = :passed,
+                question_set_version = :question_set_version,
                 completed_at = :completed_at,
                 updated_at = :updated_at
             ''',
@@ -166,6 +171,7 @@ def submit_attempt(event: Dict[str, Any]) -> Dict[str, Any]:
                 ':score': score_result['score'],
                 ':percentage': score_result['percentage'],
                 ':passed': score_result['passed'],
+                ':question_set_version': score_result['question_set_version'],
                 ':completed_at': completion_time,
                 ':updated_at': get_current_timestamp()
             }
@@ -191,81 +197,91 @@ def submit_attempt(event: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def score_attempt(quiz_id: str, answers: Dict[str, Any]) -> Dict[str, Any]:
-    """Score a quiz attempt"""
+    """Score a quiz attempt against the quiz's cached answer key"""
     try:
-        questions_table = get_dynamodb_table(os.environ.get('QUESTIONS_TABLE', 'quiz-questions'))
         quizzes_table = get_dynamodb_table(os.environ.get('QUIZZES_TABLE', 'quizzes'))
         
-        # Get quiz passing score
-        quiz_response = quizzes_table.get_item(Key={'quiz_id': quiz_id})
-        passing_score = quiz_response['Item'].get('passing_score', 70) if 'Item' in quiz_response else 70
+        # The quiz item carries the passing score and the question set version
+        quiz = quizzes_table.get_item(Key={'quiz_id': quiz_id}).get('Item', {})
+        passing_score = quiz.get('passing_score', 70)
         
-        # Get all questions for the quiz
-        questions_response = questions_table.query(
-            IndexName='quiz-id-index',
-            KeyConditionExpression='quiz_id = :quiz_id',
-            ExpressionAttributeValues={':quiz_id': quiz_id}
-        )
+        return get_answer_key(quiz_id, quiz).grade(answers, passing_score)
         
-        questions = questions_response.get('Items', [])
+    except Exception as e:
+        print(f"Error scoring attempt: {str(e)}")
+        raise
+
+
+def regrade_attempts(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Re-score every completed attempt for a quiz (e.g. after a question change)"""
+    try:
+        body = parse_event_body(event)
         
-        total_points = 0
-        earned_points = 0
-        correct_count = 0
-        total_questions = len(questions)
-        detailed_results = []
+        error = validate_required_fields(body, ['quiz_id'])
+        if error:
+            return create_response(400, {'error': error})
         
-        for question in questions:
-            question_id = question['question_id']
-            correct_answer = question['correct_answer']
-            points = question.get('points', 1)
-            total_points += points
-            
-            # Get student's answer
-            student_answer = answers.get(question_id, '')
-            
-            # Check if answer is correct
-            is_correct = False
-            if question['question_type'] == 'multiple_choice':
-                is_correct = str(student_answer).strip().lower() == str(correct_answer).strip().lower()
-            elif question['question_type'] == 'true_false':
-                is_correct = str(student_answer).strip().lower() == str(correct_answer).strip().lower()
-            elif question['question_type'] == 'short_answer':
-                # For short answer, do case-insensitive comparison
-                is_correct = str(student_answer).strip().lower() == str(correct_answer).strip().lower()
-            
-            if is_correct:
-                earned_points += points
-                correct_count += 1
-            
-            detailed_results.append({
-                'question_id': question_id,
-                'question_text': question['question_text'],
-                'student_answer': student_answer,
-                'correct_answer': correct_answer,
-                'is_correct': is_correct,
-                'points_earned': points if is_correct else 0,
-                'points_possible': points,
-                'explanation': question.get('explanation', '')
-            })
-        
-        # Calculate percentage
-        percentage = (earned_points / total_points * 100) if total_points > 0 else 0
-        passed = percentage >= passing_score
-        
-        return {
-            'score': earned_points,
-            'total_points': total_points,
-            'percentage': round(percentage, 2),
-            'passed': passed,
-            'correct_count': correct_count,
-            'total_questions': total_questions,
-            'detailed_results': detailed_results
-        }
+        quiz_id = body['quiz_id']
+        attempts_table = get_dynamodb_table(os.environ.get('ATTEMPTS_TABLE', 'quiz-attempts'))
+        quizzes_table = get_dynamodb_table(os.environ.get('QUIZZES_TABLE', 'quizzes'))
+        
+        quiz_response = quizzes_table.get_item(Key={'quiz_id': quiz_id})
+        if 'Item' not in quiz_response:
+            return create_response(404, {'error': 'Quiz not found'})
+        
+        quiz = quiz_response['Item']
+        answer_key = get_answer_key(quiz_id, quiz)
+        passing_score = quiz.get('passing_score', 70)
+        
+        attempts = []
+        for page in iter_scan_pages(
+            attempts_table,
+            FilterExpression='quiz_id = :quiz_id AND #status = :completed',
+            ExpressionAttributeNames={'#status': 'status'},
+            ExpressionAttributeValues={':quiz_id': quiz_id, ':completed': 'completed'}
+        ):
+            attempts.extend(page.get('Items', []))
+        
+        results = answer_key.grade_many([attempt.get('answers') or {} for attempt in attempts], passing_score)
+        
+        # Only rewrite attempts whose outcome changed
+        regraded_at = get_current_timestamp()
+        changed = [
+            {
+                **attempt,
+                'score': result['score'],
+                'percentage': result['percentage'],
+                'passed': result['passed'],
+                'question_set_version': result['question_set_version'],
+                'regraded_at': regraded_at,
+                'updated_at': regraded_at
+            }
+            for attempt, result in zip(attempts, results)
+            if (attempt.get('score'), attempt.get('percentage'), attempt.get('passed'))
+            != (result['score'], result['percentage'], result['passed'])
+        ]
+        write_result = batch_write_items(attempts_table, changed) if changed else {'results': []}
+        
+        # Report only rewrites DynamoDB confirmed; the rest keep their stale scores
+        failed_attempt_ids = [
+            changed[result['index']]['attempt_id']
+            for result in write_result['results'] if result['status'] != 'written'
+        ]
+        
+        return create_response(200 if not failed_attempt_ids else 207, {
+            'message': 'Quiz attempts regraded successfully' if not failed_attempt_ids else 'Some quiz attempts failed to regrade',
+            'quiz_id': quiz_id,
+            'question_set_version': answer_key.version,
+            'total_attempts': len(attempts),
+            'changed': len(changed) - len(failed_attempt_ids),
+            'unchanged': len(attempts) - len(changed),
+            'failed': len(failed_attempt_ids),
+            'failed_attempt_ids': failed_attempt_ids
+        })
         
     except Exception as e:
-        print(f"Error scoring attempt: {str(e)}")
-        raise
+        print(f"Error regrading attempts: {str(e)}")
+        return create_response(500, {'error': 'Failed to regrade quiz attempts'})
 
 
 def get_attempt(attempt_id: str) -> Dict[str, Any]:
@@ -3,11 +3,19 @@ Lambda handler for quiz questions CRUD operations
 """
 import json
 import os
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from botocore.exceptions import ClientError
 from tsa_shared import (
     create_response, get_dynamodb_table, parse_event_body,
-    get_current_timestamp, validate_required_fields, get_path_parameters
+    get_current_timestamp, validate_required_fields, get_path_parameters,
+    batch_get_items, batch_write_items
 )
+from answer_keys import bump_question_set_version, load_quiz_questions
+
+VALID_QUESTION_TYPES = ['multiple_choice', 'true_false', 'short_answer']
+# TransactWriteItems limit - one slot per chunk goes to the quiz version bump
+TRANSACT_BATCH_SIZE = 100
+MAX_IMPORT_QUESTIONS = 500
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -15,6 +23,7 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     try:
         http_method = event.get('httpMethod', '')
         path_params = get_path_parameters(event)
+        path = event.get('path', '')
         
         if http_method == 'GET':
             if 'question_id' in path_params:
@@ -22,6 +31,10 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
             else:
                 return list_questions(event)
         elif http_method == 'POST':
+            if '/reorder' in path:
+                return reorder_questions(event)
+            elif '/import' in path:
+                return import_questions(event)
             return create_question(event)
         elif http_method == 'PUT':
             if 'question_id' in path_params:
@@ -41,68 +54,174 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         return create_response(500, {'error': 'Internal server error'})
 
 
+def validate_question(body: Dict[str, Any]) -> Optional[str]:
+    """Validate question fields, returning an error message or None"""
+    required_fields = ['quiz_id', 'question_text', 'question_type', 'options', 'correct_answer']
+    error = validate_required_fields(body, required_fields)
+    if error:
+        return error
+    
+    # Validate question type
+    if body['question_type'] not in VALID_QUESTION_TYPES:
+        return f"Invalid question type. Must be one of: {', '.join(VALID_QUESTION_TYPES)}"
+    
+    # Validate options for multiple choice
+    if body['question_type'] == 'multiple_choice':
+        if not isinstance(body['options'], list) or len(body['options']) < 2:
+            return 'Multiple choice questions must have at least 2 options'
+    
+    return None
+
+
+def build_question(body: Dict[str, Any], question_id: str, order_index: Any = 0) -> Dict[str, Any]:
+    """Build a question item from request fields"""
+    timestamp = get_current_timestamp()
+    return {
+        'question_id': question_id,
+        'quiz_id': body['quiz_id'],
+        'question_text': body['question_text'],
+        'question_type': body['question_type'],
+        'options': body['options'],
+        'correct_answer': body['correct_answer'],
+        'explanation': body.get('explanation', ''),
+        'points': body.get('points', 1),
+        'order_index': body.get('order_index', order_index),
+        'created_at': timestamp,
+        'updated_at': timestamp
+    }
+
+
+def quiz_question_set_update(quizzes_table, quiz_id: str, delta: int) -> Dict[str, Any]:
+    """Transaction action bumping a quiz's question set version and adjusting its question count by delta"""
+    return {
+        'Update': {
+            'TableName': quizzes_table.name,
+            'Key': {'quiz_id': quiz_id},
+            'UpdateExpression': 'SET updated_at = :updated_at ADD question_count :delta, question_set_version :one',
+            'ConditionExpression': 'attribute_exists(quiz_id)',
+            'ExpressionAttributeValues': {
+                ':delta': delta,
+                ':one': 1,
+                ':updated_at': get_current_timestamp()
+            }
+        }
+    }
+
+
+def cancellation_codes(error: ClientError) -> List[str]:
+    """Per-action codes of a cancelled transaction ('None' for actions that did not fail)"""
+    return [reason.get('Code', 'None') for reason in error.response.get('CancellationReasons', [])]
+
+
 def create_question(event: Dict[str, Any]) -> Dict[str, Any]:
     """Create a new question for a quiz"""
     try:
         body = parse_event_body(event)
         
-        # Validate required fields
-        required_fields = ['quiz_id', 'question_text', 'question_type', 'options', 'correct_answer']
-        error = validate_required_fields(body, required_fields)
+        error = validate_question(body)
         if error:
             return create_response(400, {'error': error})
         
-        # Validate question type
-        valid_types = ['multiple_choice', 'true_false', 'short_answer']
-        if body['question_type'] not in valid_types:
-            return create_response(400, {
-                'error': f"Invalid question type. Must be one of: {', '.join(valid_types)}"
-            })
+        questions_table = get_dynamodb_table(os.environ.get('QUESTIONS_TABLE', 'quiz-questions'))
+        quizzes_table = get_dynamodb_table(os.environ.get('QUIZZES_TABLE', 'quizzes'))
         
-        # Validate options for multiple choice
-        if body['question_type'] == 'multiple_choice':
-            if not isinstance(body['options'], list) or len(body['options']) < 2:
-                return create_response(400, {
-                    'error': 'Multiple choice questions must have at least 2 options'
-                })
+        question_id = f"q_{get_current_timestamp().replace(':', '').replace('-', '')}"
+        question_data = build_question(body, question_id)
+        
+        # Insert the question and count it in one round trip (fails if the quiz does not exist)
+        try:
+            questions_table.meta.client.transact_write_items(TransactItems=[
+                {'Put': {'TableName': questions_table.name, 'Item': question_data}},
+                quiz_question_set_update(quizzes_table, body['quiz_id'], 1)
+            ])
+        except ClientError as e:
+            if cancellation_codes(e)[1:2] == ['ConditionalCheckFailed']:
+                return create_response(404, {'error': 'Quiz not found'})
+            raise
+        
+        return create_response(201, {
+            'message': 'Question created successfully',
+            'question': question_data
+        })
+        
+    except Exception as e:
+        print(f"Error creating question: {str(e)}")
+        return create_response(500, {'error': 'Failed to create question'})
+
+
+def import_questions(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Import many questions into a quiz in one request"""
+    try:
+        body = parse_event_body(event)
+        
+        error = validate_required_fields(body, ['quiz_id', 'questions'])
+        if error:
+            return create_response(400, {'error': error})
+        
+        quiz_id = body['quiz_id']
+        questions = body['questions']
+        if not isinstance(questions, list) or not questions:
+            return create_response(400, {'error': 'questions must be a non-empty list'})
+        if len(questions) > MAX_IMPORT_QUESTIONS:
+            return create_response(400, {'error': f'Cannot import more than {MAX_IMPORT_QUESTIONS} questions at once'})
+        
+        # Validate everything before writing anything
+        errors = []
+        for index, question in enumerate(questions):
+            error = validate_question({**question, 'quiz_id': quiz_id}) if isinstance(question, dict) else 'Invalid question'
+            if error:
+                errors.append({'index': index, 'error': error})
+        if errors:
+            return create_response(400, {'error': 'Invalid questions', 'details': errors})
         
         questions_table = get_dynamodb_table(os.environ.get('QUESTIONS_TABLE', 'quiz-questions'))
         quizzes_table = get_dynamodb_table(os.environ.get('QUIZZES_TABLE', 'quizzes'))
         
-        # Check if quiz exists
-        quiz_response = quizzes_table.get_item(Key={'quiz_id': body['quiz_id']})
+        quiz_response = quizzes_table.get_item(Key={'quiz_id': quiz_id}, ProjectionExpression='question_count')
         if 'Item' not in quiz_response:
             return create_response(404, {'error': 'Quiz not found'})
         
-        question_id = f"q_{get_current_timestamp().replace(':', '').replace('-', '')}"
+        # Imported questions go after the existing ones unless they carry an order_index
+        first_index = int(quiz_response['Item'].get('question_count', 0))
+        id_prefix = f"q_{get_current_timestamp().replace(':', '').replace('-', '')}"
+        items = [
+            build_question({**question, 'quiz_id': quiz_id}, f"{id_prefix}_{index:04d}", first_index + index)
+            for index, question in enumerate(questions)
+        ]
         
-        question_data = {
-            'question_id': question_id,
-            'quiz_id': body['quiz_id'],
-            'question_text': body['question_text'],
-            'question_type': body['question_type'],
-            'options': body['options'],
-            'correct_answer': body['correct_answer'],
-            'explanation': body.get('explanation', ''),
-            'points': body.get('points', 1),
-            'order_index': body.get('order_index', 0),
-            'created_at': get_current_timestamp(),
-            'updated_at': get_current_timestamp()
-        }
+        write_result = batch_write_items(questions_table, items)
         
-        questions_table.put_item(Item=question_data)
+        # Count and report only the questions confirmed written
+        written_ids = [
+            items[result['index']]['question_id']
+            for result in write_result['results'] if result['status'] == 'written'
+        ]
+        failed = [
+            {'index': result['index'], 'error': result.get('error')}
+            for result in write_result['results'] if result['status'] != 'written'
+        ]
         
-        # Update quiz question count
-        update_quiz_question_count(body['quiz_id'])
+        if written_ids:
+            quizzes_table.update_item(
+                Key={'quiz_id': quiz_id},
+                UpdateExpression='SET updated_at = :updated_at ADD question_count :delta, question_set_version :one',
+                ExpressionAttributeValues={
+                    ':delta': len(written_ids),
+                    ':one': 1,
+                    ':updated_at': get_current_timestamp()
+                }
+            )
         
-        return create_response(201, {
-            'message': 'Question created successfully',
-            'question': question_data
+        return create_response(201 if not failed else 207, {
+            'message': 'Questions imported successfully' if not failed else 'Some questions failed to import',
+            'imported': len(written_ids),
+            'failed': failed,
+            'question_ids': written_ids
         })
         
     except Exception as e:
-        print(f"Error creating question: {str(e)}")
-        return create_response(500, {'error': 'Failed to create question'})
+        print(f"Error importing questions: {str(e)}")
+        return create_response(500, {'error': 'Failed to import questions'})
 
 
 def get_question(question_id: str) -> Dict[str, Any]:
@@ -131,15 +250,7 @@ def list_questions(event: Dict[str, Any]) -> Dict[str, Any]:
         if not quiz_id:
             return create_response(400, {'error': 'quiz_id parameter is required'})
         
-        questions_table = get_dynamodb_table(os.environ.get('QUESTIONS_TABLE', 'quiz-questions'))
-        
-        response = questions_table.query(
-            IndexName='quiz-id-index',
-            KeyConditionExpression='quiz_id = :quiz_id',
-            ExpressionAttributeValues={':quiz_id': quiz_id}
-        )
-        
-        questions = response.get('Items', [])
+        questions = load_quiz_questions(quiz_id)
         
         # Sort by order_index
         questions.sort(key=lambda x: x.get('order_index', 0))
@@ -197,6 +308,9 @@ def update_question(question_id: str, event: Dict[str, Any]) -> Dict[str, Any]:
             ExpressionAttributeValues=expression_values
         )
         
+        # Recompile answer keys for this quiz
+        bump_question_set_version(response['Item']['quiz_id'])
+        
         # Get updated question
         updated_response = questions_table.get_item(Key={'question_id': question_id})
         
@@ -214,6 +328,7 @@ def delete_question(question_id: str) -> Dict[str, Any]:
     """Delete a question"""
     try:
         questions_table = get_dynamodb_table(os.environ.get('QUESTIONS_TABLE', 'quiz-questions'))
+        quizzes_table = get_dynamodb_table(os.environ.get('QUIZZES_TABLE', 'quizzes'))
         
         # Check if question exists and get quiz_id
         response = questions_table.get_item(Key={'question_id': question_id})
@@ -222,11 +337,22 @@ def delete_question(question_id: str) -> Dict[str, Any]:
         
         quiz_id = response['Item']['quiz_id']
         
-        # Delete the question
-        questions_table.delete_item(Key={'question_id': question_id})
-        
-        # Update quiz question count
-        update_quiz_question_count(quiz_id)
+        # Delete the question and uncount it atomically (a concurrent delete cancels this one)
+        try:
+            questions_table.meta.client.transact_write_items(TransactItems=[
+                {
+                    'Delete': {
+                        'TableName': questions_table.name,
+                        'Key': {'question_id': question_id},
+                        'ConditionExpression': 'attribute_exists(question_id)'
+                    }
+                },
+                quiz_question_set_update(quizzes_table, quiz_id, -1)
+            ])
+        except ClientError as e:
+            if cancellation_codes(e)[:1] == ['ConditionalCheckFailed']:
+                return create_response(404, {'error': 'Question not found'})
+            raise
         
         return create_response(200, {
             'message': 'Question deleted successfully'
@@ -237,38 +363,14 @@ def delete_question(question_id: str) -> Dict[str, Any]:
         return create_response(500, {'error': 'Failed to delete question'})
 
 
-def update_quiz_question_count(quiz_id: str) -> None:
-    """Update the question count for a quiz"""
-    try:
-        questions_table = get_dynamodb_table(os.environ.get('QUESTIONS_TABLE', 'quiz-questions'))
-        quizzes_table = get_dynamodb_table(os.environ.get('QUIZZES_TABLE', 'quizzes'))
-        
-        # Count questions for this quiz
-        response = questions_table.query(
-            IndexName='quiz-id-index',
-            KeyConditionExpression='quiz_id = :quiz_id',
-            ExpressionAttributeValues={':quiz_id': quiz_id},
-            Select='COUNT'
-        )
-        
-        question_count = response['Count']
-        
-        # Update quiz with new count
-        quizzes_table.update_item(
-            Key={'quiz_id': quiz_id},
-            UpdateExpression='SET question_count = :count, updated_at = :updated_at',
-            ExpressionAttributeValues={
-                ':count': question_count,
-                ':updated_at': get_current_timestamp()
-            }
-        )
-        
-    except Exception as e:
-        print(f"Error updating quiz question count: {str(e)}")
-
-
 def reorder_questions(event: Dict[str, Any]) -> Dict[str, Any]:
-    """Reorder questions in a quiz"""
+    """
+    Reorder questions in a quiz
+    
+    Every question is checked against the quiz before anything is written.
+    Orders are then written in TransactWriteItems chunks; each chunk applies
+    atomically (all or none) together with a question set version bump.
+    """
     try:
         body = parse_event_body(event)
         
@@ -278,23 +380,99 @@ def reorder_questions(event: Dict[str, Any]) -> Dict[str, Any]:
         if error:
             return create_response(400, {'error': error})
         
+        quiz_id = body['quiz_id']
+        question_orders = body['question_orders']
+        if not isinstance(question_orders, list) or not all(
+            isinstance(order, dict) and 'question_id' in order and 'order_index' in order
+            for order in question_orders
+        ):
+            return create_response(400, {'error': 'question_orders must be a list of {question_id, order_index}'})
+        
         questions_table = get_dynamodb_table(os.environ.get('QUESTIONS_TABLE', 'quiz-questions'))
+        quizzes_table = get_dynamodb_table(os.environ.get('QUIZZES_TABLE', 'quizzes'))
+        client = questions_table.meta.client
+        timestamp = get_current_timestamp()
         
-        # Update each question's order
-        for question_order in body['question_orders']:
-            questions_table.update_item(
-                Key={'question_id': question_order['question_id']},
-                UpdateExpression='SET order_index = :order_index, updated_at = :updated_at',
-                ExpressionAttributeValues={
-                    ':order_index': question_order['order_index'],
-                    ':updated_at': get_current_timestamp()
+        # A transaction cannot touch the same item twice - last order wins
+        orders = {order['question_id']: order['order_index'] for order in question_orders}
+        
+        # Validate the whole request up front so a bad ID never leaves the quiz half-reordered
+        if 'Item' not in quizzes_table.get_item(Key={'quiz_id': quiz_id}, ProjectionExpression='quiz_id'):
+            return create_response(404, {'error': 'Quiz not found'})
+        existing = batch_get_items(
+            questions_table, [{'question_id': question_id} for question_id in orders],
+            consistent_read=True, projection=['question_id', 'quiz_id']
+        )
+        in_quiz = {item['question_id'] for item in existing if item.get('quiz_id') == quiz_id}
+        missing = [question_id for question_id in orders if question_id not in in_quiz]
+        if missing:
+            return create_response(400, {
+                'error': 'Some questions could not be reordered',
+                'reordered': 0,
+                'not_reordered': len(orders),
+                'failed': [{'question_id': question_id, 'error': 'Question not found in quiz'} for question_id in missing]
+            })
+        
+        actions = [
+            {
+                'Update': {
+                    'TableName': questions_table.name,
+                    'Key': {'question_id': question_id},
+                    'UpdateExpression': 'SET order_index = :order_index, updated_at = :updated_at',
+                    # Only reorder questions that exist and belong to this quiz
+                    'ConditionExpression': 'quiz_id = :quiz_id',
+                    'ExpressionAttributeValues': {
+                        ':order_index': order_index,
+                        ':updated_at': timestamp,
+                        ':quiz_id': quiz_id
+                    }
                 }
-            )
+            }
+            for question_id, order_index in orders.items()
+        ]
+        
+        # Concurrent deletes can still fail a chunk after the check above
+        chunk_size = TRANSACT_BATCH_SIZE - 1
+        applied = 0
+        failed: List[Dict[str, Any]] = []
+        for i in range(0, len(actions), chunk_size):
+            chunk = actions[i:i + chunk_size]
+            try:
+                client.transact_write_items(TransactItems=chunk + [quiz_question_set_update(quizzes_table, quiz_id, 0)])
+                applied += len(chunk)
+            except ClientError as e:
+                codes = cancellation_codes(e)
+                if 'ConditionalCheckFailed' not in codes:
+                    raise
+                if codes[len(chunk):] == ['ConditionalCheckFailed']:
+                    if not applied:
+                        return create_response(404, {'error': 'Quiz not found'})
+                    # Quiz deleted mid-request - the remaining chunks cannot apply either
+                    failed.extend(
+                        {'question_id': action['Update']['Key']['question_id'], 'error': 'Quiz not found'}
+                        for action in actions[i:]
+                    )
+                    break
+                # The whole chunk was rolled back; report the questions that failed their check
+                failed.extend(
+                    {'question_id': action['Update']['Key']['question_id'], 'error': 'Question not found in quiz'}
+                    for action, code in zip(chunk, codes) if code == 'ConditionalCheckFailed'
+                )
+        
+        if failed:
+            # Earlier chunks stay committed - report a partial result like import_questions
+            return create_response(207 if applied else 400, {
+                'error': 'Some questions could not be reordered',
+                'reordered': applied,
+                'not_reordered': len(actions) - applied,
+                'failed': failed
+            })
         
         return create_response(200, {
-            'message': 'Questions reordered successfully'
+            'message': 'Questions reordered successfully',
+            'reordered': applied
         })
         
     except Exception as e:
         print(f"Error reordering questions: {str(e)}")
-        return create_response(500, {'error': 'Failed to reorder questions'}) 
\ No newline at end of file
+        return create_response(500, {'error': 'Failed to reorder questions'})
@@ -3,15 +3,36 @@ Coach Timeline Handler - Clean Architecture with Centralized Models
 Tracks coach progress events and provides timeline status for wizard flow UI.
 Moved from events handler where it was incorrectly placed.
 """
+import os
 import json
-from typing import Dict, Any, List, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, Any, List, Optional, Callable
+from boto3.dynamodb.conditions import Key
 
 # Import centralized models and utilities - NO fallback pattern
 from tsa_shared import (
     create_api_response, parse_event_body, get_current_time, 
     standardize_error_response, get_table_name, get_dynamodb_table,
-    generate_id, UserIdentifier, CoachProfile, TimelineEvent
+    generate_id, UserIdentifier, TimelineEvent,
+    create_response, format_error_response, get_current_timestamp
 )
+from tsa_shared.database import iter_query_pages
+from tsa_shared.coach_progress import (
+    get_timeline_progress, onboarding_step, bootcamp_step, background_check_step,
+    TIMELINE_STEPS
+)
+
+# GSIs backing the per-coach existence checks
+BACKGROUND_CHECKS_COACH_INDEX = 'coach-id-index'
+EVENTS_COACH_INDEX = 'coach-events-index'
+PARENT_INVITATIONS_COACH_INDEX = 'coach-id-index'
+ENROLLMENTS_COACH_INDEX = 'coach-id-index'
+
+# Status checks fan out on a container-scoped pool; a slow check degrades to
+# an error entry instead of holding up the whole timeline
+TIMELINE_CHECK_TIMEOUT_SECONDS = float(os.environ.get('TIMELINE_CHECK_TIMEOUT_SECONDS', '3'))
+_check_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='timeline-check')
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -52,7 +73,12 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
 
 
 def get_timeline_status(query_params: Dict[str, Any]) -> Dict[str, Any]:
-    """Get timeline status with auto-detection of completed steps"""
+    """
+    Get timeline status from the stream-maintained coach progress projection
+    
+    The live checks (run_timeline_checks) are only used when the projection
+    cannot be read.
+    """
     try:
         coach_id = query_params.get('coach_id')
         
@@ -67,26 +93,22 @@ def get_timeline_status(query_params: Dict[str, Any]) -> Dict[str, Any]:
         except ValueError as e:
             return create_response(404, {'error': str(e)})
         
-        # Initialize status tracking
-        timeline_status = {}
-        
-        # 1. Check onboarding completion
-        timeline_status['onboarding'] = check_onboarding_status(normalized_profile_id, profiles_table)
-        
-        # 2. Check background check completion
-        timeline_status['background_check'] = check_background_check_status(normalized_profile_id)
-        
-        # 3. Check bootcamp progress
-        timeline_status['bootcamp_completion'] = check_bootcamp_status(normalized_profile_id, profiles_table)
-        
-        # 4. Check events created (Host Events step)
-        timeline_status['host_events'] = check_events_status(normalized_profile_id)
-        
-        # 5. Check parent invitations sent (Invite Students step)
-        timeline_status['invite_students'] = check_invitations_status(normalized_profile_id)
-        
-        # 6. Check student enrollment
-        timeline_status['student_enrollment'] = check_enrollment_status(normalized_profile_id)
+        # One get_item against the projection (materialized on first read)
+        try:
+            progress = get_timeline_progress(normalized_profile_id)
+            if progress:
+                return create_response(200, {
+                    'timeline_status': progress['timeline_status'],
+                    'progress_summary': progress['progress_summary'],
+                    'coach_id': normalized_profile_id,
+                    'updated_at': progress['progress'].get('updated_at')
+                })
+        except Exception as e:
+            print(f"⚠️ Coach progress projection unavailable, running live checks: {str(e)}")
+        
+        # Run independent checks concurrently; the profile is fetched once
+        # and shared by the onboarding and bootcamp checks
+        timeline_status = run_timeline_checks(normalized_profile_id, profiles_table)
         
         # Calculate overall progress
         completed_steps = sum(1 for step in timeline_status.values() if step['status'] == 'completed')
@@ -110,29 +132,62 @@ def get_timeline_status(query_params: Dict[str, Any]) -> Dict[str, Any]:
         return create_response(500, format_error_response(e, "get_timeline_status"))
 
 
-def check_onboarding_status(profile_id: str, profiles_table) -> Dict[str, Any]:
+def fetch_coach_profile(profile_id: str, profiles_table) -> Optional[Dict[str, Any]]:
+    """Fetch the coach profile item once for all profile-based checks"""
+    response = profiles_table.get_item(Key={'profile_id': profile_id})
+    return response.get('Item')
+
+
+def run_timeline_checks(profile_id: str, profiles_table) -> Dict[str, Dict[str, Any]]:
+    """
+    Run all timeline checks concurrently with a shared deadline
+    
+    Args:
+        profile_id: Normalized coach profile_id
+        profiles_table: Profiles table resource
+        
+    Returns:
+        Dict of step name -> check result, in timeline step order
+    """
+    deadline = time.monotonic() + TIMELINE_CHECK_TIMEOUT_SECONDS
+    
+    profile_future = _check_executor.submit(fetch_coach_profile, profile_id, profiles_table)
+    futures = {
+        'background_check': _check_executor.submit(check_background_check_status, profile_id),
+        'host_events': _check_executor.submit(check_events_status, profile_id),
+        'invite_students': _check_executor.submit(check_invitations_status, profile_id),
+        'student_enrollment': _check_executor.submit(check_enrollment_status, profile_id)
+    }
+    
+    def await_result(future, on_result: Callable[[Any], Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            return on_result(future.result(timeout=max(0.0, deadline - time.monotonic())))
+        except FutureTimeoutError:
+            return {'status': 'not_started', 'auto_detected': False, 'error': 'Check timed out'}
+        except Exception as e:
+            return {'status': 'not_started', 'auto_detected': False, 'error': str(e)}
+    
+    profile_checks = await_result(profile_future, lambda profile: {
+        'onboarding': check_onboarding_status(profile),
+        'bootcamp_completion': check_bootcamp_status(profile)
+    })
+    if 'status' in profile_checks:
+        # Profile fetch failed or timed out - both profile-based steps report it
+        profile_checks = {'onboarding': profile_checks, 'bootcamp_completion': profile_checks}
+    
+    timeline_status = {}
+    for step in get_step_order():
+        if step in profile_checks:
+            timeline_status[step] = profile_checks[step]
+        else:
+            timeline_status[step] = await_result(futures[step], lambda result: result)
+    return timeline_status
+
+
+def check_onboarding_status(profile_item: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """Check onboarding completion status"""
     try:
-        response = profiles_table.get_item(Key={'profile_id': profile_id})
-        
-        if 'Item' not in response:
-            return {
-                'status': 'not_started',
-                'auto_detected': False,
-                'error': 'Profile not found'
-            }
-        
-        profile = CoachProfile(response['Item'])
-        is_complete = profile.is_onboarding_complete()
-        
-        return {
-            'status': 'completed' if is_complete else 'in_progress',
-            'auto_detected': True,
-            'details': {
-                'profile_complete': bool(profile.first_name and profile.last_name and profile.school_name),
-                'onboarding_progress': profile.onboarding_progress
-            }
-        }
+        return onboarding_step(profile_item)
         
     except Exception as e:
         return {
@@ -147,34 +202,18 @@ def check_background_check_status(profile_id: str) -> Dict[str, Any]:
     try:
         background_checks_table = get_dynamodb_table(get_table_name('background_checks'))
         
-        response = background_checks_table.get_item(Key={'profile_id': profile_id})
+        # Checks are keyed by check_id - take the coach's most recent one
+        latest_check = None
+        for page in iter_query_pages(
+            background_checks_table,
+            IndexName=BACKGROUND_CHECKS_COACH_INDEX,
+            KeyConditionExpression=Key('coach_id').eq(profile_id)
+        ):
+            for item in page.get('Items', []):
+                if latest_check is None or item.get('created_at', '') > latest_check.get('created_at', ''):
+                    latest_check = item
         
-        if 'Item' not in response:
-            return {
-                'status': 'not_started',
-                'auto_detected': True,
-                'details': {'checkr_status': 'not_initiated'}
-            }
-        
-        check_data = response['Item']
-        checkr_status = check_data.get('checkr_status', 'pending')
-        
-        status_mapping = {
-            'clear': 'completed',
-            'consider': 'completed',  # May need review but completed
-            'suspended': 'blocked',
-            'dispute': 'in_review'
-        }
-        
-        return {
-            'status': status_mapping.get(checkr_status, 'in_progress'),
-            'auto_detected': True,
-            'details': {
-                'checkr_status': checkr_status,
-                'initiated_at': check_data.get('created_at'),
-                'completed_at': check_data.get('completed_at')
-            }
-        }
+        return background_check_step(latest_check)
         
     except Exception as e:
         return {
@@ -184,37 +223,10 @@ def check_background_check_status(profile_id: str) -> Dict[str, Any]:
         }
 
 
-def check_bootcamp_status(profile_id: str, profiles_table) -> Dict[str, Any]:
+def check_bootcamp_status(profile_item: Optional[Dict[str, Any]]) -> Dict[str, Any]:
     """Check bootcamp completion status"""
     try:
-        response = profiles_table.get_item(Key={'profile_id': profile_id})
-        
-        if 'Item' not in response:
-            return {
-                'status': 'not_started',
-                'auto_detected': False,
-                'error': 'Profile not found'
-            }
-        
-        profile = CoachProfile(response['Item'])
-        completion_percentage = profile.get_bootcamp_completion_percentage()
-        
-        if completion_percentage >= 80:
-            status = 'completed'
-        elif completion_percentage > 0:
-            status = 'in_progress'
-        else:
-            status = 'not_started'
-        
-        return {
-            'status': status,
-            'auto_detected': True,
-            'details': {
-                'completion_percentage': completion_percentage,
-                'modules_completed': len(profile.bootcamp_progress.get('modules_completed', [])),
-                'certifications_earned': len(profile.bootcamp_progress.get('certifications_earned', []))
-            }
-        }
+        return bootcamp_step(profile_item)
         
     except Exception as e:
         return {
@@ -229,14 +241,12 @@ def check_events_status(profile_id: str) -> Dict[str, Any]:
     try:
         events_table = get_dynamodb_table(get_table_name('events'))
         
-        response = events_table.scan(
-            FilterExpression='created_by = :profile_id',
-            ExpressionAttributeValues={':profile_id': profile_id},
-            Select='COUNT'
+        events_count = count_query(
+            events_table,
+            IndexName=EVENTS_COACH_INDEX,
+            KeyConditionExpression=Key('coach_id').eq(profile_id)
         )
         
-        events_count = response['Count']
-        
         return {
             'status': 'completed' if events_count > 0 else 'not_started',
             'auto_detected': True,
@@ -258,14 +268,12 @@ def check_invitations_status(profile_id: str) -> Dict[str, Any]:
     try:
         invitations_table = get_dynamodb_table(get_table_name('parent_invitations'))
         
-        response = invitations_table.scan(
-            FilterExpression='coach_id = :profile_id',
-            ExpressionAttributeValues={':profile_id': profile_id},
-            Select='COUNT'
+        invitations_count = count_query(
+            invitations_table,
+            IndexName=PARENT_INVITATIONS_COACH_INDEX,
+            KeyConditionExpression=Key('coach_id').eq(profile_id)
         )
         
-        invitations_count = response['Count']
-        
         return {
             'status': 'completed' if invitations_count > 0 else 'not_started',
             'auto_detected': True,
@@ -287,17 +295,12 @@ def check_enrollment_status(profile_id: str) -> Dict[str, Any]:
     try:
         enrollments_table = get_dynamodb_table(get_table_name('enrollments'))
         
-        response = enrollments_table.scan(
-            FilterExpression='coach_id = :profile_id AND enrollment_status = :status',
-            ExpressionAttributeValues={
-                ':profile_id': profile_id,
-                ':status': 'enrolled'
-            },
-            Select='COUNT'
+        enrollments_count = count_query(
+            enrollments_table,
+            IndexName=ENROLLMENTS_COACH_INDEX,
+            KeyConditionExpression=Key('coach_id').eq(profile_id) & Key('enrollment_status').eq('enrolled')
         )
         
-        enrollments_count = response['Count']
-        
         return {
             'status': 'completed' if enrollments_count > 0 else 'not_started',
             'auto_detected': True,
@@ -314,14 +317,19 @@ def check_enrollment_status(profile_id: str) -> Dict[str, Any]:
         }
 
 
+def count_query(table, **query_kwargs) -> int:
+    """Count matching GSI items with Select='COUNT' (no items are returned)"""
+    return sum(page.get('Count', 0) for page in iter_query_pages(table, Select='COUNT', **query_kwargs))
+
+
+def get_step_order() -> List[str]:
+    """Timeline steps in wizard order"""
+    return list(TIMELINE_STEPS)
+
+
 def get_current_step(timeline_status: Dict[str, Any]) -> str:
     """Determine the current step based on status"""
-    step_order = [
-        'onboarding', 'background_check', 'bootcamp_completion',
-        'host_events', 'invite_students', 'student_enrollment'
-    ]
-    
-    for step in step_order:
+    for step in get_step_order():
         if step in timeline_status:
             status = timeline_status[step]['status']
             if status in ['not_started', 'in_progress']:
@@ -0,0 +1,81 @@
+"""
+Tests for quiz attempt regrading
+"""
+import json
+import os
+import sys
+from decimal import Decimal
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'lambda_quizzes'))
+sys.path.insert(0, os.path.join(ROOT, '..', 'tsa-infrastructure', 'layers', 'tsa-shared-utilities', 'python'))
+
+import tsa_shared  # noqa: E402
+
+# The quiz handlers import get_path_parameters, which the shared layer does not define yet
+if not hasattr(tsa_shared, 'get_path_parameters'):
+    tsa_shared.get_path_parameters = lambda event: event.get('pathParameters') or {}
+
+import attempts_handler  # noqa: E402
+from answer_keys import CompiledAnswerKey  # noqa: E402
+
+
+class FakeAttemptsClient:
+    """Leaves the given attempts unprocessed, returning them with Decimal numbers like DynamoDB"""
+
+    def __init__(self, unprocessed_ids):
+        self.unprocessed_ids = set(unprocessed_ids)
+
+    def batch_write_item(self, RequestItems, ReturnConsumedCapacity=None):
+        leftover = {}
+        for table_name, requests in RequestItems.items():
+            stuck = [
+                {'PutRequest': {'Item': {
+                    key: Decimal(str(value)) if isinstance(value, int) and not isinstance(value, bool) else value
+                    for key, value in request['PutRequest']['Item'].items()
+                }}}
+                for request in requests
+                if request['PutRequest']['Item']['attempt_id'] in self.unprocessed_ids
+            ]
+            if stuck:
+                leftover[table_name] = stuck
+        return {'UnprocessedItems': leftover}
+
+
+class FakeQuizzesTable:
+    def get_item(self, Key):
+        return {'Item': {'quiz_id': Key['quiz_id'], 'passing_score': 70}}
+
+
+def test_partially_unprocessed_regrade_reports_failed_attempts(monkeypatch):
+    answer_key = CompiledAnswerKey.compile('quiz-1', 2, [
+        {'question_id': 'q1', 'question_type': 'true_false', 'correct_answer': 'true', 'points': 5, 'order_index': 0}
+    ])
+    attempts = [
+        {'attempt_id': f'a{i}', 'quiz_id': 'quiz-1', 'status': 'completed',
+         'answers': {'q1': 'true'}, 'score': 0, 'percentage': Decimal('0'), 'passed': False}
+        for i in range(3)
+    ]
+    attempts_table = SimpleNamespace(table_name='quiz-attempts', meta=SimpleNamespace(client=FakeAttemptsClient({'a1'})))
+    tables = {'quiz-attempts': attempts_table, 'quizzes': FakeQuizzesTable()}
+
+    # The handler expects the error-string form of validate_required_fields
+    monkeypatch.setattr(attempts_handler, 'validate_required_fields', lambda data, fields: None)
+    monkeypatch.setattr(attempts_handler, 'get_dynamodb_table', lambda name: tables[name])
+    monkeypatch.setattr(attempts_handler, 'iter_scan_pages', lambda table, **kwargs: iter([{'Items': attempts}]))
+    monkeypatch.setattr(attempts_handler, 'get_answer_key', lambda quiz_id, quiz: answer_key)
+    monkeypatch.setattr(attempts_handler, 'batch_write_items', _fast_batch_write_items)
+
+    response = attempts_handler.regrade_attempts({'body': json.dumps({'quiz_id': 'quiz-1'})})
+    body = json.loads(response['body'])
+
+    assert response['statusCode'] == 207
+    assert body['changed'] == 2
+    assert body['failed'] == 1
+    assert body['failed_attempt_ids'] == ['a1']
+
+
+def _fast_batch_write_items(table, items):
+    from tsa_shared import batch_write_items
+    return batch_write_items(table, items, max_retries=1, base_delay=0)
@@ -172,7 +172,15 @@ def main():
         "database_name": "unified_platform",
         "database_secret_arn": data_stack.database.secret.secret_arn,
         "events_photos_bucket_name": data_stack.events_photos_bucket.bucket_name,
+        "profiles_table": data_stack.profiles_table,  # Stream source for admin metrics
+        "profiles_change_stream": data_stack.profiles_change_stream,  # Profile changes for coach progress
+        "coach_invitations_table": data_stack.coach_invitations_table,  # Stream source for admin metrics
+        "events_table": data_stack.events_table,  # Stream source for coach progress
+        "parent_invitations_table": data_stack.parent_invitations_table,  # Stream source for coach progress
+        "enrollments_table": data_stack.enrollments_table,  # Stream source for coach progress
         "sendgrid_secret_arn": auth_stack.sendgrid_secret.secret_arn,  # SendGrid secret for email sending
+        "email_queue_url": auth_stack.email_queue.queue_url,  # Email outbox drained by the auth email worker
+        "email_queue_arn": auth_stack.email_queue.queue_arn,
         "environment_config": env_config,
     }
 
@@ -1,12 +1,11 @@
-from shared_db_utils.db_utils import DatabaseManager
+from shared_db_utils.database import get_async_db_manager
 import logging
 
 logger = logging.getLogger(__name__)
 
 async def get_db_manager():
     """
-    Returns an initialized database manager.
+    Returns the container's initialized database manager.
+    The engine and its connection pool are reused across warm invocations.
     """
-    db_manager = DatabaseManager()
-    await db_manager.initialize()
-    return db_manager 
\ No newline at end of file
+    return await get_async_db_manager()
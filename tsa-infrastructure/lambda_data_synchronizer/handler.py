@@ -1,26 +1,19 @@
-import asyncio
-import json
 import logging
 import os
 from typing import Any, Dict
 
 from mappers import handle_event
 from db import get_db_manager
+from shared_db_utils.database import run_async, get_pool_stats
 
 # Configure logging
 logger = logging.getLogger()
 logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
 
-# Initialize database manager outside of the handler to reuse connections
-db_manager = None
-
-async def initialize_db():
-    """Initializes the database manager if it's not already initialized."""
-    global db_manager
-    if db_manager is None:
-        logger.info("Initializing database manager...")
-        db_manager = await get_db_manager()
-        logger.info("Database manager initialized successfully.")
+async def process_records(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Processes stream records with the container's pooled database manager."""
+    db_manager = await get_db_manager()
+    return await handle_event(event, db_manager)
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
@@ -28,14 +21,16 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """
     logger.info(f"Received {len(event.get('Records', []))} records to process.")
     
-    # Ensure the database is initialized
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(initialize_db())
-
-    # Process records
+    # Process records on the persistent event loop so pooled connections are reused
     try:
-        loop.run_until_complete(handle_event(event, db_manager))
-        return {"statusCode": 200, "body": "Successfully processed records."}
+        result = run_async(process_records(event))
+        logger.debug(f"Database pool stats: {get_pool_stats()}")
+        failures = result["failures"]
     except Exception as e:
         logger.error(f"Error processing records: {e}", exc_info=True)
-        return {"statusCode": 500, "body": "Error processing records."} 
\ No newline at end of file
+        failures = [
+            record["dynamodb"]["SequenceNumber"] for record in event.get("Records", [])
+        ]
+
+    # Partial batch response - only the failed records (and later ones in their shard) are retried
+    return {"batchItemFailures": [{"itemIdentifier": sequence_number} for sequence_number in failures]}
@@ -1,70 +1,241 @@
+import os
+import time
+import json
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple
 
-from shared_db_utils.db_utils import (
-    upsert_user,
-    upsert_organization,
-    delete_user,
-    delete_organization,
-)
+from boto3.dynamodb.types import TypeDeserializer
+
+from shared_db_utils.models import User, Organization
+from shared_db_utils.db_utils import bulk_upsert, bulk_delete
 
 logger = logging.getLogger(__name__)
 
-async def map_profile_to_user(record: Dict[str, Any], db_manager: Any) -> None:
-    """Maps a profile record to the users table."""
+_deserializer = TypeDeserializer()
+
+
+def profile_to_user_row(image: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps a profile image to a users row."""
     # This is a simplified example. In a real scenario, you would
     # have more complex logic to map the fields.
-    user_data = {
-        "user_id": record["dynamodb"]["Keys"]["profile_id"]["S"],
-        "email": record["dynamodb"]["NewImage"]["email"]["S"],
-        "name": record["dynamodb"]["NewImage"]["name"]["S"],
+    return {
+        "user_id": image["profile_id"],
+        "email": image["email"],
+        "given_name": image.get("first_name"),
+        "family_name": image.get("last_name"),
+        "role": image.get("role") or "teacher",
         # Add other fields as needed
     }
-    await upsert_user(user_data, db_manager)
-    logger.info(f"Upserted user {user_data['user_id']} from profile.")
-
-async def map_organization(record: Dict[str, Any], db_manager: Any) -> None:
-    """Maps an organization record to the organizations table."""
-    org_data = {
-        "org_id": record["dynamodb"]["Keys"]["org_id"]["S"],
-        "name": record["dynamodb"]["NewImage"]["name"]["S"],
+
+def organization_to_row(image: Dict[str, Any]) -> Dict[str, Any]:
+    """Maps an organization image to an organizations row."""
+    return {
+        "org_id": image["org_id"],
+        "name": image["name"],
+        "type": image.get("type") or "school",
         # Add other fields as needed
     }
-    await upsert_organization(org_data, db_manager)
-    logger.info(f"Upserted organization {org_data['org_id']}.")
 
 # Add other mappers for enrollments, events, etc.
 
-EVENT_MAPPERS = {
-    "profiles": map_profile_to_user,
-    "organizations": map_organization,
+# Source table (without stage suffix) -> target model, keys and row mapper
+TABLE_MAPPINGS = {
+    "profiles": {
+        "model": User,
+        "source_key": "profile_id",
+        "target_key": "user_id",
+        "to_row": profile_to_user_row,
+    },
+    "organizations": {
+        "model": Organization,
+        "source_key": "org_id",
+        "target_key": "org_id",
+        "to_row": organization_to_row,
+    },
     # Add other tables here
 }
 
-async def handle_event(event: Dict[str, Any], db_manager: Any) -> None:
+
+def source_table_name(record: Dict[str, Any]) -> str:
+    """Logical table name from a stream record ARN (e.g. 'profiles-dev' -> 'profiles')."""
+    table_name = record["eventSourceARN"].split("/")[1]
+    suffix = f"-{os.environ.get('STAGE', 'dev')}"
+    return table_name[:-len(suffix)] if table_name.endswith(suffix) else table_name
+
+def deserialize_image(image: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Converts a DynamoDB stream image to a plain dict."""
+    return {key: _deserializer.deserialize(value) for key, value in (image or {}).items()}
+
+
+# =================================================================
+# COALESCING
+# =================================================================
+
+def coalesce_records(records: List[Dict[str, Any]]) -> Tuple[Dict[Tuple[str, Any], Dict[str, Any]], List[str], int]:
+    """
+    Collapses stream records to the last change per (table, key).
+
+    Records for one item share a shard and arrive in order, so the last
+    record seen for a key is its final state in this batch.
+
+    Returns:
+        (changes, failed_sequence_numbers, skipped) where changes maps
+        (table, key) -> {'mapping', 'record', 'sequence_numbers'}
+    """
+    changes: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+    failures: List[str] = []
+    skipped = 0
+
+    for record in records:
+        sequence_number = record.get("dynamodb", {}).get("SequenceNumber", "")
+        try:
+            table_name = source_table_name(record)
+            mapping = TABLE_MAPPINGS.get(table_name)
+            if not mapping:
+                skipped += 1
+                continue
+            key = _deserializer.deserialize(record["dynamodb"]["Keys"][mapping["source_key"]])
+        except (KeyError, IndexError, TypeError) as e:
+            logger.error(f"Malformed stream record {sequence_number}: {e}")
+            failures.append(sequence_number)
+            continue
+
+        change = changes.setdefault((table_name, key), {"mapping": mapping, "sequence_numbers": []})
+        change["record"] = record
+        change["sequence_numbers"].append(sequence_number)
+
+    return changes, failures, skipped
+
+def build_write_plan(changes: Dict[Tuple[str, Any], Dict[str, Any]]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
     """
-    Handles a DynamoDB stream event and routes it to the correct mapper.
+    Groups coalesced changes into per-table upsert rows and delete keys.
+
+    Returns:
+        (plan, failed_sequence_numbers) where plan maps table ->
+        {'mapping', 'upserts': [(row, change)], 'deletes': [(key, change)]}
     """
-    for record in event["Records"]:
-        event_name = record["eventName"]  # INSERT, MODIFY, REMOVE
-        table_name = record["eventSourceARN"].split("/")[1]
+    plan: Dict[str, Dict[str, Any]] = {}
+    failures: List[str] = []
+
+    for (table_name, key), change in changes.items():
+        mapping = change["mapping"]
+        writes = plan.setdefault(table_name, {"mapping": mapping, "upserts": [], "deletes": []})
+        record = change["record"]
 
-        mapper = EVENT_MAPPERS.get(table_name)
-        if not mapper:
-            logger.warning(f"No mapper found for table {table_name}")
+        if record["eventName"] == "REMOVE":
+            writes["deletes"].append((key, change))
             continue
 
-        if event_name in ["INSERT", "MODIFY"]:
-            await mapper(record, db_manager)
-        elif event_name == "REMOVE":
-            # Handle deletions
-            if table_name == "profiles":
-                user_id = record["dynamodb"]["Keys"]["profile_id"]["S"]
-                await delete_user(user_id, db_manager)
-                logger.info(f"Deleted user {user_id} from profile.")
-            elif table_name == "organizations":
-                org_id = record["dynamodb"]["Keys"]["org_id"]["S"]
-                await delete_organization(org_id, db_manager)
-                logger.info(f"Deleted organization {org_id}.")
-        else:
-            logger.warning(f"Unknown event type {event_name}") 
\ No newline at end of file
+        try:
+            row = mapping["to_row"](deserialize_image(record["dynamodb"].get("NewImage")))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"Cannot map {table_name} record {key}: {e}")
+            failures.extend(change["sequence_numbers"])
+            continue
+        writes["upserts"].append((row, change))
+
+    return plan, failures
+
+
+# =================================================================
+# WRITES
+# =================================================================
+
+async def apply_write_plan(session: Any, plan: Dict[str, Dict[str, Any]]) -> Tuple[int, int]:
+    """Executes one multi-row upsert and one delete per target table."""
+    upserted = deleted = 0
+    for writes in plan.values():
+        mapping = writes["mapping"]
+        if writes["upserts"]:
+            upserted += await bulk_upsert(
+                session, mapping["model"], [row for row, _ in writes["upserts"]], [mapping["target_key"]]
+            )
+        if writes["deletes"]:
+            deleted += await bulk_delete(
+                session, mapping["model"], mapping["target_key"], [key for key, _ in writes["deletes"]]
+            )
+    return upserted, deleted
+
+async def apply_individually(session: Any, plan: Dict[str, Dict[str, Any]]) -> Tuple[int, int, List[str]]:
+    """
+    Fallback after a failed batch: applies each change in its own savepoint so
+    only poison records are reported for retry.
+    """
+    upserted = deleted = 0
+    failures: List[str] = []
+    for table_name, writes in plan.items():
+        mapping = writes["mapping"]
+        for operation, entries in (("upsert", writes["upserts"]), ("delete", writes["deletes"])):
+            for value, change in entries:
+                try:
+                    async with session.begin_nested():
+                        if operation == "upsert":
+                            await bulk_upsert(session, mapping["model"], [value], [mapping["target_key"]])
+                            upserted += 1
+                        else:
+                            await bulk_delete(session, mapping["model"], mapping["target_key"], [value])
+                            deleted += 1
+                except Exception as e:
+                    logger.error(f"Failed to {operation} {table_name} record: {e}")
+                    failures.extend(change["sequence_numbers"])
+    return upserted, deleted, failures
+
+
+# =================================================================
+# BATCH PROCESSING
+# =================================================================
+
+def _lag_seconds(records: List[Dict[str, Any]], now: float) -> List[float]:
+    return [
+        max(0.0, now - float(record["dynamodb"]["ApproximateCreationDateTime"]))
+        for record in records
+        if record.get("dynamodb", {}).get("ApproximateCreationDateTime") is not None
+    ]
+
+async def handle_event(event: Dict[str, Any], db_manager: Any) -> Dict[str, Any]:
+    """
+    Handles a DynamoDB stream batch: coalesces records per key, writes each
+    target table with multi-row statements in one transaction and, if that
+    transaction fails, retries change by change to isolate poison records.
+
+    Returns:
+        Dict with 'failures' (sequence numbers to retry) and batch 'metrics'
+    """
+    started = time.time()
+    records = event.get("Records", [])
+
+    changes, failures, skipped = coalesce_records(records)
+    plan, mapping_failures = build_write_plan(changes)
+    failures.extend(mapping_failures)
+
+    db_started = time.time()
+    fallback = False
+    try:
+        async with db_manager.get_async_session() as session:
+            upserted, deleted = await apply_write_plan(session, plan)
+    except Exception as e:
+        logger.warning(f"Batch write failed, retrying changes individually: {e}")
+        fallback = True
+        async with db_manager.get_async_session() as session:
+            upserted, deleted, write_failures = await apply_individually(session, plan)
+        failures.extend(write_failures)
+    db_ms = (time.time() - db_started) * 1000
+
+    lags = _lag_seconds(records, started)
+    metrics = {
+        "metric": "data_sync_batch",
+        "records": len(records),
+        "coalesced": len(changes),
+        "skipped": skipped,
+        "upserted": upserted,
+        "deleted": deleted,
+        "failed": len(failures),
+        "fallback": fallback,
+        "db_ms": round(db_ms, 1),
+        "duration_ms": round((time.time() - started) * 1000, 1),
+        "max_lag_seconds": round(max(lags), 1) if lags else None,
+        "avg_lag_seconds": round(sum(lags) / len(lags), 1) if lags else None,
+    }
+    logger.info(json.dumps(metrics))
+
+    return {"failures": failures, "metrics": metrics}
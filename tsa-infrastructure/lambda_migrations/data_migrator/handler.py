@@ -4,12 +4,15 @@ Migrates DynamoDB profiles to PostgreSQL users/organizations using SQLAlchemy
 """
 import json
 import os
-import asyncio
 import logging
 from typing import Dict, Any
 
 # Import shared database utilities from layer
-from shared_db_utils import migrate_profiles
+from shared_db_utils import migrate_profiles, migrate_profiles_bulk, run_async
+from shared_db_utils.migrations import BULK_CHUNK_SIZE, PROFILE_SCAN_SEGMENTS
+
+# Seconds of Lambda time kept in reserve when a bulk run pauses for resumption
+BULK_TIME_MARGIN_SECONDS = 60
 
 # Configure logging
 logger = logging.getLogger()
@@ -23,15 +26,22 @@ def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
         # Check if this is a dry run
         dry_run = event.get('dry_run', False)
         
-        # Run async function
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        
-        try:
-            result = loop.run_until_complete(migrate_profiles(dry_run))
+        if event.get('mode') == 'bulk':
+            # COPY-based loader; pauses before the Lambda timeout and resumes on the next invocation
+            time_budget = None
+            if context is not None:
+                time_budget = context.get_remaining_time_in_millis() / 1000 - BULK_TIME_MARGIN_SECONDS
+            result = run_async(migrate_profiles_bulk(
+                dry_run=dry_run,
+                chunk_size=int(event.get('chunk_size', BULK_CHUNK_SIZE)),
+                total_segments=int(event.get('total_segments', PROFILE_SCAN_SEGMENTS)),
+                resume=event.get('resume', True),
+                time_budget_seconds=time_budget
+            ))
             return create_response(200, result)
-        finally:
-            loop.close()
+        
+        result = run_async(migrate_profiles(dry_run))
+        return create_response(200, result)
             
     except Exception as e:
         logger.error(f"❌ Unexpected error: {str(e)}")
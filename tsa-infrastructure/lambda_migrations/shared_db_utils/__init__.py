@@ -4,21 +4,27 @@ Provides SQLAlchemy models and database management for EdFi/OneRoster compliance
 """
 
 from .models import *
-from .database import DatabaseManager
-from .migrations import MigrationManager, create_schema, migrate_profiles
+from .database import (
+    DatabaseManager, get_async_db_manager, get_sync_db_manager,
+    run_async, dispose_db_managers, get_pool_stats
+)
+from .migrations import MigrationManager, create_schema, migrate_profiles, migrate_profiles_bulk
 from .db_utils import *
 
 __all__ = [
     # Models
     'School', 'Student', 'StudentSchoolAssociation', 
-    'Organization', 'User', 'ProfileSyncLog',
+    'Organization', 'User', 'ProfileSyncLog', 'MigrationCheckpoint',
     
     # Database Management
     'DatabaseManager', 'MigrationManager',
+    'get_async_db_manager', 'get_sync_db_manager', 'run_async',
+    'dispose_db_managers', 'get_pool_stats',
     
     # Convenience Functions
-    'create_schema', 'migrate_profiles',
+    'create_schema', 'migrate_profiles', 'migrate_profiles_bulk',
 
     # DB Utils
-    'upsert_user', 'delete_user', 'upsert_organization', 'delete_organization'
+    'upsert_user', 'delete_user', 'upsert_organization', 'delete_organization',
+    'bulk_upsert', 'bulk_delete'
 ] 
\ No newline at end of file
@@ -1,24 +1,106 @@
 """
 Database Manager for TSA Coach Portal
 Handles SQLAlchemy connections and sessions for PostgreSQL
+
+Engines are container-scoped: get_async_db_manager() / get_sync_db_manager()
+return the same initialized manager on every warm invocation, backed by a
+small bounded pool (sized for RDS Proxy) and, for async work, one persistent
+event loop per container (see run_async).
 """
 
 import os
 import json
+import time
+import asyncio
 import boto3
 import logging
-from typing import Dict, Any, Optional, AsyncContextManager, ContextManager, Union
+from typing import Dict, Any, Optional, AsyncContextManager, ContextManager, Union, Awaitable, TypeVar
 from contextlib import asynccontextmanager, contextmanager
 
-from sqlalchemy import create_engine, Engine
+from sqlalchemy import create_engine, event, Engine
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.pool import QueuePool, NullPool
+from sqlalchemy.pool import QueuePool
 
 from .models import Base
 
 logger = logging.getLogger(__name__)
 
+# Container-scoped credential cache. This layer ships without tsa_shared, so it
+# keeps its own small TTL cache instead of the shared secrets provider.
+CREDENTIALS_TTL_SECONDS = int(os.environ.get('SECRETS_CACHE_TTL_SECONDS', '900'))
+_credentials_cache: Dict[str, tuple] = {}
+_secrets_client = None
+
+
+# Pool settings - keep pools small: each warm container holds its own connections
+POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', '2'))
+MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', '1'))
+POOL_TIMEOUT_SECONDS = int(os.environ.get('DB_POOL_TIMEOUT_SECONDS', '10'))
+# Recycle before RDS Proxy's idle client timeout closes the connection underneath us
+POOL_RECYCLE_SECONDS = int(os.environ.get('DB_POOL_RECYCLE_SECONDS', '300'))
+# RDS Proxy pins sessions that use named prepared statements, so the asyncpg
+# statement cache is disabled behind a proxy unless explicitly configured
+USE_RDS_PROXY = os.environ.get('DB_USE_RDS_PROXY', 'false').lower() == 'true'
+STATEMENT_CACHE_SIZE = int(os.environ.get('DB_STATEMENT_CACHE_SIZE', '0' if USE_RDS_PROXY else '100'))
+
+T = TypeVar('T')
+
+# Container-scoped managers (one per mode) and the persistent event loop
+_managers: Dict[str, 'DatabaseManager'] = {}
+_event_loop: Optional[asyncio.AbstractEventLoop] = None
+
+_pool_stats = {
+    'engines_created': 0,
+    'connections_opened': 0,
+    'checkouts': 0,
+    'credential_refreshes': 0,
+    'manager_reuses': 0
+}
+
+
+def _get_secrets_client():
+    """Get the container-scoped Secrets Manager client"""
+    global _secrets_client
+    if _secrets_client is None:
+        _secrets_client = boto3.client('secretsmanager')
+    return _secrets_client
+
+
+def load_database_credentials(force_refresh: bool = False) -> Dict[str, Any]:
+    """Get database credentials from AWS Secrets Manager (cached per container)"""
+    secret_arn = os.environ.get('DB_SECRET_ARN')
+    
+    if not secret_arn:
+        raise ValueError("DB_SECRET_ARN environment variable not set")
+    
+    cached = _credentials_cache.get(secret_arn)
+    if cached and not force_refresh and cached[1] > time.time():
+        return cached[0]
+    
+    response = _get_secrets_client().get_secret_value(SecretId=secret_arn)
+    secret_data = json.loads(response['SecretString'])
+    
+    credentials = {
+        'host': os.environ.get('DB_PROXY_ENDPOINT') or secret_data.get('host', os.environ.get('DB_HOST')),
+        'database': secret_data.get('dbname', os.environ.get('DB_NAME', 'coach_portal')),
+        'username': secret_data.get('username'),
+        'password': secret_data.get('password'),
+        'port': secret_data.get('port', os.environ.get('DB_PORT', 5432))
+    }
+    _credentials_cache[secret_arn] = (credentials, time.time() + CREDENTIALS_TTL_SECONDS)
+    
+    return credentials
+
+
+def _is_auth_error(error: Exception) -> bool:
+    """True when a connect failure means the cached password is stale (rotation)"""
+    for err in (error, error.__cause__):
+        if type(err).__name__ in ('InvalidPasswordError', 'InvalidAuthorizationSpecificationError'):
+            return True
+    return 'password authentication failed' in str(error).lower()
+
+
 class DatabaseManager:
     """
     Manages PostgreSQL database connections using SQLAlchemy
@@ -30,27 +112,12 @@ class DatabaseManager:
         self._engine: Optional[Union[Engine, AsyncEngine]] = None
         self._session_factory: Optional[Union[sessionmaker, async_sessionmaker]] = None
         self._database_url: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
         
-    async def get_database_credentials(self) -> Dict[str, Any]:
-        """Get database credentials from AWS Secrets Manager"""
+    async def get_database_credentials(self, force_refresh: bool = False) -> Dict[str, Any]:
+        """Get database credentials from AWS Secrets Manager (cached per container)"""
         try:
-            secrets_client = boto3.client('secretsmanager')
-            secret_arn = os.environ.get('DB_SECRET_ARN')
-            
-            if not secret_arn:
-                raise ValueError("DB_SECRET_ARN environment variable not set")
-            
-            response = secrets_client.get_secret_value(SecretId=secret_arn)
-            secret_data = json.loads(response['SecretString'])
-            
-            return {
-                'host': secret_data.get('host', os.environ.get('DB_HOST')),
-                'database': secret_data.get('dbname', os.environ.get('DB_NAME', 'coach_portal')),
-                'username': secret_data.get('username'),
-                'password': secret_data.get('password'),
-                'port': secret_data.get('port', os.environ.get('DB_PORT', 5432))
-            }
-            
+            return load_database_credentials(force_refresh)
         except Exception as e:
             logger.error(f"Failed to get database credentials: {e}")
             raise
@@ -64,50 +131,91 @@ class DatabaseManager:
             # Use psycopg2 for sync operations  
             driver = "postgresql+psycopg2"
             
-        return (
+        # Credentials are injected per connection (see _attach_pool_events) so a
+        # rotated password is picked up without rebuilding the engine
+        url = (
             f"{driver}://"
-            f"{credentials['username']}:{credentials['password']}@"
             f"{credentials['host']}:{credentials['port']}/{credentials['database']}"
         )
+        if self.use_async:
+            # SQLAlchemy's own prepared-statement cache on top of asyncpg's
+            url += f"?prepared_statement_cache_size={STATEMENT_CACHE_SIZE}"
+        return url
     
     async def initialize(self) -> None:
         """Initialize database connection and create engine"""
         try:
             credentials = await self.get_database_credentials()
             self._database_url = self._build_database_url(credentials)
+            echo = os.environ.get('SQL_ECHO', 'false').lower() == 'true'
+            pool_options = {
+                'pool_size': POOL_SIZE,
+                'max_overflow': MAX_OVERFLOW,
+                'pool_timeout': POOL_TIMEOUT_SECONDS,
+                'pool_recycle': POOL_RECYCLE_SECONDS,
+                'pool_pre_ping': True,
+                'echo': echo
+            }
             
             if self.use_async:
                 self._engine = create_async_engine(
                     self._database_url,
-                    poolclass=NullPool,
-                    pool_pre_ping=True,
-                    echo=os.environ.get('SQL_ECHO', 'false').lower() == 'true'
+                    connect_args={'statement_cache_size': STATEMENT_CACHE_SIZE},
+                    **pool_options
                 )
+                self._attach_pool_events(self._engine.sync_engine)
                 self._session_factory = async_sessionmaker(
                     bind=self._engine,
                     class_=AsyncSession,
                     expire_on_commit=False
                 )
+                self._loop = asyncio.get_running_loop()
             else:
                 self._engine = create_engine(
                     self._database_url,
                     poolclass=QueuePool,
-                    pool_size=5,
-                    max_overflow=0,
-                    pool_pre_ping=True,
-                    echo=os.environ.get('SQL_ECHO', 'false').lower() == 'true'
+                    **pool_options
                 )
+                self._attach_pool_events(self._engine)
                 self._session_factory = sessionmaker(
                     bind=self._engine,
                     expire_on_commit=False
                 )
-                
-            logger.info(f"✅ Database engine initialized ({'async' if self.use_async else 'sync'})")
+            
+            _pool_stats['engines_created'] += 1
+            logger.info(f"✅ Database engine initialized ({'async' if self.use_async else 'sync'}, pool {POOL_SIZE}+{MAX_OVERFLOW})")
             
         except Exception as e:
             logger.error(f"❌ Failed to initialize database: {e}")
             raise
     
+    @staticmethod
+    def _attach_pool_events(engine: Engine) -> None:
+        """Inject cached credentials per connection and retry once after rotation"""
+        
+        @event.listens_for(engine, "do_connect")
+        def connect_with_current_credentials(dialect, conn_rec, cargs, cparams):
+            credentials = load_database_credentials()
+            cparams.update(user=credentials['username'], password=credentials['password'])
+            try:
+                return dialect.connect(*cargs, **cparams)
+            except Exception as e:
+                if not _is_auth_error(e):
+                    raise
+                logger.warning("Database authentication failed - refreshing rotated credentials")
+                _pool_stats['credential_refreshes'] += 1
+                credentials = load_database_credentials(force_refresh=True)
+                cparams.update(user=credentials['username'], password=credentials['password'])
+                return dialect.connect(*cargs, **cparams)
+        
+        @event.listens_for(engine, "connect")
+        def count_connect(dbapi_connection, connection_record):
+            _pool_stats['connections_opened'] += 1
+        
+        @event.listens_for(engine, "checkout")
+        def count_checkout(dbapi_connection, connection_record, connection_proxy):
+            _pool_stats['checkouts'] += 1
+    
     @property
     def engine(self) -> Union[Engine, AsyncEngine]:
         """Get the SQLAlchemy engine"""
@@ -215,32 +323,107 @@ class DatabaseManager:
             logger.error(f"❌ Failed to create default data: {e}")
             raise
     
+    @property
+    def is_initialized(self) -> bool:
+        """Whether the engine has been created (and not closed)"""
+        return self._engine is not None
+    
+    def pool_status(self) -> Dict[str, Any]:
+        """Current pool occupancy for this manager's engine"""
+        if not self._engine:
+            return {'initialized': False}
+        pool = self._engine.pool
+        return {
+            'initialized': True,
+            'mode': 'async' if self.use_async else 'sync',
+            'size': pool.size(),
+            'checked_in': pool.checkedin(),
+            'checked_out': pool.checkedout(),
+            'overflow': pool.overflow()
+        }
+    
     async def close(self) -> None:
-        """Close database connections"""
+        """Close database connections (the next get_*_db_manager call re-initializes)"""
         if self._engine:
             if self.use_async:
                 await self._engine.dispose()
             else:
                 self._engine.dispose()
+            self._engine = None
+            self._session_factory = None
+            self._loop = None
             logger.info("Database connections closed")
 
-# Convenience functions for common usage patterns
+# =================================================================
+# CONTAINER-SCOPED ENGINE REGISTRY
+# =================================================================
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """
+    Get the persistent per-container event loop
+    
+    asyncpg connections belong to the loop that opened them, so pooled async
+    engines are only reusable when every invocation runs on the same loop.
+    """
+    global _event_loop
+    if _event_loop is None or _event_loop.is_closed():
+        _event_loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_event_loop)
+    return _event_loop
+
+
+def run_async(coro: Awaitable[T]) -> T:
+    """Run a coroutine to completion on the persistent event loop"""
+    return get_event_loop().run_until_complete(coro)
+
+
 async def get_async_db_manager() -> DatabaseManager:
-    """Get an initialized async database manager"""
-    db = DatabaseManager(use_async=True)
+    """Get the container's initialized async database manager"""
+    db = _managers.get('async')
+    loop = asyncio.get_running_loop()
+    
+    if db and db.is_initialized and db._loop is loop:
+        _pool_stats['manager_reuses'] += 1
+        return db
+    
+    if db and db.is_initialized:
+        # Called from a different loop (e.g. asyncio.run) - the old pool's
+        # connections cannot be used here, so drop them without closing
+        logger.warning("Async database manager used from a new event loop - rebuilding engine (use run_async to reuse connections)")
+        await db._engine.dispose(close=False)
+        db._engine = None
+    
+    db = db or DatabaseManager(use_async=True)
     await db.initialize()
+    _managers['async'] = db
     return db
 
+
 def get_sync_db_manager() -> DatabaseManager:
-    """Get an initialized sync database manager"""
-    import asyncio
-    
-    db = DatabaseManager(use_async=False)
-    # Run the async initialization in a sync context
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        loop.run_until_complete(db.initialize())
+    """Get the container's initialized sync database manager"""
+    db = _managers.get('sync')
+    if db and db.is_initialized:
+        _pool_stats['manager_reuses'] += 1
         return db
-    finally:
-        loop.close() 
\ No newline at end of file
+    
+    db = db or DatabaseManager(use_async=False)
+    run_async(db.initialize())
+    _managers['sync'] = db
+    return db
+
+
+async def dispose_db_managers() -> None:
+    """Close every container-scoped engine (e.g. before a bulk credential change)"""
+    for db in list(_managers.values()):
+        await db.close()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Container-wide engine and connection counters plus current pool occupancy"""
+    return {
+        **_pool_stats,
+        'pool_size': POOL_SIZE,
+        'max_overflow': MAX_OVERFLOW,
+        'statement_cache_size': STATEMENT_CACHE_SIZE,
+        'pools': {mode: db.pool_status() for mode, db in _managers.items()}
+    }
@@ -1,43 +1,66 @@
 import logging
-from typing import Any, Dict
+from typing import Any, Dict, List, Sequence
+from sqlalchemy import delete
 from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from .models import User, Organization
 from .database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# PostgreSQL allows at most 32767 bind parameters per statement
+MAX_BIND_PARAMS = 32000
+
 async def upsert_user(user_data: Dict[str, Any], db_manager: DatabaseManager) -> None:
     """Inserts or updates a user in the PostgreSQL database."""
-    async with db_manager.get_session() as session:
-        stmt = insert(User).values(user_data)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=['user_id'],
-            set_=user_data
-        )
-        await session.execute(stmt)
+    async with db_manager.get_async_session() as session:
+        await bulk_upsert(session, User, [user_data], ['user_id'])
 
 async def delete_user(user_id: str, db_manager: DatabaseManager) -> None:
     """Deletes a user from the PostgreSQL database."""
-    async with db_manager.get_session() as session:
-        user = await session.get(User, user_id)
-        if user:
-            await session.delete(user)
+    async with db_manager.get_async_session() as session:
+        await bulk_delete(session, User, 'user_id', [user_id])
 
 async def upsert_organization(org_data: Dict[str, Any], db_manager: DatabaseManager) -> None:
     """Inserts or updates an organization in the PostgreSQL database."""
-    async with db_manager.get_session() as session:
-        stmt = insert(Organization).values(org_data)
-        stmt = stmt.on_conflict_do_update(
-            index_elements=['org_id'],
-            set_=org_data
-        )
-        await session.execute(stmt)
+    async with db_manager.get_async_session() as session:
+        await bulk_upsert(session, Organization, [org_data], ['org_id'])
 
 async def delete_organization(org_id: str, db_manager: DatabaseManager) -> None:
     """Deletes an organization from the PostgreSQL database."""
-    async with db_manager.get_session() as session:
-        org = await session.get(Organization, org_id)
-        if org:
-            await session.delete(org)
+    async with db_manager.get_async_session() as session:
+        await bulk_delete(session, Organization, 'org_id', [org_id])
+
+async def bulk_upsert(session: AsyncSession, model: Any, rows: List[Dict[str, Any]],
+                      key_columns: Sequence[str]) -> int:
+    """
+    Inserts or updates many rows with multi-row INSERT ... ON CONFLICT statements.
+    Rows are grouped by column set so a row never overwrites columns it does not
+    carry; keys must be unique within `rows` (PostgreSQL rejects a statement
+    that updates the same row twice).
+    """
+    by_columns: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        by_columns.setdefault(tuple(sorted(row)), []).append(row)
+
+    for columns, group in by_columns.items():
+        chunk_size = max(1, MAX_BIND_PARAMS // len(columns))
+        for i in range(0, len(group), chunk_size):
+            stmt = insert(model).values(group[i:i + chunk_size])
+            update_columns = {
+                column: stmt.excluded[column] for column in columns if column not in key_columns
+            }
+            if update_columns:
+                stmt = stmt.on_conflict_do_update(index_elements=list(key_columns), set_=update_columns)
+            else:
+                stmt = stmt.on_conflict_do_nothing(index_elements=list(key_columns))
+            await session.execute(stmt)
+
+    return len(rows)
 
-# Add other upsert/delete functions for other tables as needed. 
\ No newline at end of file
+async def bulk_delete(session: AsyncSession, model: Any, key_column: str, keys: List[Any]) -> int:
+    """Deletes many rows by primary key with chunked DELETE ... WHERE key IN (...) statements."""
+    column = getattr(model, key_column)
+    for i in range(0, len(keys), MAX_BIND_PARAMS):
+        await session.execute(delete(model).where(column.in_(keys[i:i + MAX_BIND_PARAMS])))
+    return len(keys)
@@ -3,21 +3,59 @@ Migration Manager for TSA Coach Portal
 Handles schema creation and data migration using SQLAlchemy
 """
 
+import os
+import time
+import asyncio
 import boto3
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from decimal import Decimal
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timezone
 import uuid
 
-from sqlalchemy import select, and_
+from sqlalchemy import select, and_, text
 from sqlalchemy.dialects.postgresql import insert
 
 from .database import DatabaseManager
-from .models import Organization, User, ProfileSyncLog
+from .models import Organization, User, ProfileSyncLog, MigrationCheckpoint
+from .db_utils import bulk_upsert
 
 logger = logging.getLogger(__name__)
 
+# Optional shared layer (tsa_shared) - not part of the migration layer itself
+try:
+    from tsa_shared.database import parallel_scan_items
+except ImportError:
+    parallel_scan_items = None
+
+PROFILE_SCAN_SEGMENTS = 4
+
+# Bulk loader settings
+PROFILES_TABLE_NAME = os.environ.get('TSA_PROFILES_TABLE', 'profiles')
+PROFILE_MIGRATION_JOB = 'profiles'
+BULK_CHUNK_SIZE = int(os.environ.get('MIGRATION_CHUNK_SIZE', '5000'))
+BULK_SCAN_PAGE_SIZE = 1000
+
+# Columns refreshed when a bulk-loaded row already exists (matches migrate_profiles)
+USER_MERGE_COLUMNS = ['email', 'given_name', 'family_name', 'role', 'date_last_modified', 'updated_at']
+ORGANIZATION_MERGE_COLUMNS = ['name', 'date_last_modified', 'model_metadata']
+
+
+def _table_row(model: Any, data: Dict[str, Any]) -> Dict[str, Any]:
+    """Keep only the keys that are columns of the model's table"""
+    columns = model.__table__.columns
+    return {key: value for key, value in data.items() if key in columns}
+
+
+def _json_safe(value: Any) -> Any:
+    """Convert DynamoDB Decimals in a LastEvaluatedKey for JSON storage"""
+    if isinstance(value, dict):
+        return {key: _json_safe(item) for key, item in value.items()}
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else float(value)
+    return value
+
 class MigrationManager:
     """
     Manages database schema creation and data migration
@@ -61,17 +99,21 @@ class MigrationManager:
         """Fetch all profiles from DynamoDB"""
         try:
             dynamodb = boto3.resource('dynamodb')
-            profiles_table = dynamodb.Table('profiles')
-            
-            response = profiles_table.scan()
-            profiles = response.get('Items', [])
+            profiles_table = dynamodb.Table(PROFILES_TABLE_NAME)
             
-            # Handle pagination
-            while 'LastEvaluatedKey' in response:
-                response = profiles_table.scan(
-                    ExclusiveStartKey=response['LastEvaluatedKey']
-                )
-                profiles.extend(response.get('Items', []))
+            if parallel_scan_items:
+                # Segmented parallel scan from the shared layer when it is attached
+                profiles = list(parallel_scan_items(profiles_table, total_segments=PROFILE_SCAN_SEGMENTS))
+            else:
+                response = profiles_table.scan()
+                profiles = response.get('Items', [])
+                
+                # Handle pagination
+                while 'LastEvaluatedKey' in response:
+                    response = profiles_table.scan(
+                        ExclusiveStartKey=response['LastEvaluatedKey']
+                    )
+                    profiles.extend(response.get('Items', []))
             
             logger.info(f"📦 Found {len(profiles)} profiles in DynamoDB")
             return profiles
@@ -300,6 +342,266 @@ class MigrationManager:
             logger.error(f"❌ Migration failed: {e}")
             raise
 
+    # =================================================================
+    # BULK LOADER
+    # =================================================================
+    
+    async def load_checkpoints(self, session, job_name: str, total_segments: int) -> Dict[int, MigrationCheckpoint]:
+        """Load (or start) per-segment checkpoints; a segment-count change restarts the job"""
+        result = await session.execute(
+            select(MigrationCheckpoint).where(MigrationCheckpoint.job_name == job_name)
+        )
+        checkpoints = {checkpoint.segment: checkpoint for checkpoint in result.scalars()}
+        
+        if any(checkpoint.total_segments != total_segments for checkpoint in checkpoints.values()):
+            logger.warning(f"⚠️ Segment count changed for {job_name} - restarting from the beginning")
+            for checkpoint in checkpoints.values():
+                await session.delete(checkpoint)
+            await session.flush()
+            checkpoints = {}
+        
+        for segment in range(total_segments):
+            if segment not in checkpoints:
+                checkpoints[segment] = MigrationCheckpoint(
+                    job_name=job_name, segment=segment, total_segments=total_segments,
+                    last_key=None, completed=False, rows_loaded=0
+                )
+                session.add(checkpoints[segment])
+        return checkpoints
+    
+    async def _scan_segment(self, client, table_name: str, segment: int, total_segments: int,
+                            start_key: Optional[Dict[str, Any]], queue: asyncio.Queue) -> None:
+        """Producer: page through one scan segment, putting (segment, items, last_key) on the queue
+        (items is the exception if a scan request fails)"""
+        loop = asyncio.get_running_loop()
+        request = {'TableName': table_name, 'Segment': segment, 'TotalSegments': total_segments,
+                   'Limit': BULK_SCAN_PAGE_SIZE}
+        if start_key:
+            request['ExclusiveStartKey'] = start_key
+        
+        while True:
+            try:
+                # boto3 is blocking - run each page request on the default thread pool
+                response = await loop.run_in_executor(None, lambda: client.scan(**request))
+            except Exception as e:
+                # Hand the error to the consumer, which would otherwise wait for this segment forever
+                await queue.put((segment, e, None))
+                return
+            last_key = response.get('LastEvaluatedKey')
+            await queue.put((segment, response.get('Items', []), last_key))
+            if not last_key:
+                return
+            request['ExclusiveStartKey'] = last_key
+    
+    def _map_profile_rows(self, profiles: List[Dict[str, Any]], seen_orgs: set) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Map a batch of profiles to users/organizations table rows"""
+        users: List[Dict[str, Any]] = []
+        organizations: List[Dict[str, Any]] = []
+        
+        for profile in profiles:
+            self.migration_stats['profiles_processed'] += 1
+            if not profile.get('email') or not profile.get('profile_id'):
+                self.migration_stats['skipped'] += 1
+                continue
+            
+            organization_data = self.create_organization_for_school(profile)
+            if organization_data and organization_data['sourced_id'] not in seen_orgs:
+                seen_orgs.add(organization_data['sourced_id'])
+                organizations.append(_table_row(Organization, {'org_id': organization_data['sourced_id'], **organization_data}))
+            
+            user_data = self.map_profile_to_user(profile)
+            users.append(_table_row(User, {'user_id': user_data['profile_id'], **user_data}))
+        
+        return users, organizations
+    
+    async def _copy_merge(self, session, model: Any, rows: List[Dict[str, Any]],
+                          merge_columns: List[str]) -> int:
+        """
+        COPY rows into an ON COMMIT DROP staging table, then merge them into
+        the target with one INSERT ... SELECT ... ON CONFLICT (sourced_id)
+        """
+        if not rows:
+            return 0
+        
+        table = model.__table__.name
+        staging = f"staging_{table}"
+        columns = sorted({column for row in rows for column in row})
+        updates = [column for column in merge_columns if column in columns]
+        column_list = ', '.join(columns)
+        
+        connection = await session.connection()
+        raw = await connection.get_raw_connection()
+        driver = raw.driver_connection
+        
+        if not hasattr(driver, 'copy_records_to_table'):
+            # Not asyncpg (e.g. psycopg2 engine) - multi-row upsert instead of COPY
+            return await bulk_upsert(session, model, rows, ['sourced_id'])
+        
+        await session.execute(text(
+            f"CREATE TEMP TABLE IF NOT EXISTS {staging} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"
+        ))
+        await driver.copy_records_to_table(
+            staging,
+            records=[tuple(row.get(column) for column in columns) for row in rows],
+            columns=columns
+        )
+        
+        conflict_action = (
+            "DO UPDATE SET " + ', '.join(f"{column} = EXCLUDED.{column}" for column in updates)
+            if updates else "DO NOTHING"
+        )
+        await session.execute(text(
+            f"INSERT INTO {table} ({column_list}) "
+            f"SELECT DISTINCT ON (sourced_id) {column_list} FROM {staging} ORDER BY sourced_id "
+            f"ON CONFLICT (sourced_id) {conflict_action}"
+        ))
+        return len(rows)
+    
+    async def _write_chunk(self, session, users: List[Dict[str, Any]], organizations: List[Dict[str, Any]]) -> None:
+        """Merge one chunk; on failure retry row by row in savepoints to isolate bad rows"""
+        try:
+            async with session.begin_nested():
+                self.migration_stats['organizations_created'] += await self._copy_merge(
+                    session, Organization, organizations, ORGANIZATION_MERGE_COLUMNS)
+                self.migration_stats['users_created'] += await self._copy_merge(
+                    session, User, users, USER_MERGE_COLUMNS)
+                if users:
+                    await session.execute(insert(ProfileSyncLog).values(
+                        [{'profile_id': row['user_id'], 'status': 'completed'} for row in users]
+                    ))
+            return
+        except Exception as e:
+            logger.warning(f"⚠️ Bulk chunk merge failed, retrying row by row: {e}")
+        
+        for model, rows, counter in ((Organization, organizations, 'organizations_created'),
+                                     (User, users, 'users_created')):
+            for row in rows:
+                try:
+                    async with session.begin_nested():
+                        await bulk_upsert(session, model, [row], ['sourced_id'])
+                    self.migration_stats[counter] += 1
+                except Exception as e:
+                    logger.error(f"❌ Failed to merge {model.__tablename__} row {row.get('sourced_id')}: {e}")
+                    self.migration_stats['errors'] += 1
+    
+    async def migrate_profiles_bulk(self, dry_run: bool = False, chunk_size: int = BULK_CHUNK_SIZE,
+                                    total_segments: int = PROFILE_SCAN_SEGMENTS, resume: bool = True,
+                                    time_budget_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Bulk profile migration: parallel segmented scan -> COPY -> set-based merge
+        
+        Pages from every scan segment are streamed through a bounded queue and
+        mapped as they arrive. Each chunk of about chunk_size rows is committed
+        together with the scan position of every segment it covers, so an
+        interrupted run resumes exactly after the last committed chunk.
+        
+        Args:
+            dry_run: Scan and map only, without writing
+            chunk_size: Profiles per committed chunk
+            total_segments: Parallel scan segments
+            resume: Continue from stored checkpoints (False restarts the job)
+            time_budget_seconds: Stop after the chunk that crosses this budget
+                                 (e.g. Lambda remaining time minus a margin)
+        
+        Returns:
+            Dict with stats, whether the job completed, and chunks committed
+        """
+        started = time.time()
+        # Segments page concurrently on executor threads: share the resource's thread-safe
+        # client (which still returns native Python values), never a Table resource
+        scan_client = boto3.resource('dynamodb').meta.client
+        
+        async with self.db_manager.get_async_session() as session:
+            if not dry_run:
+                connection = await session.connection()
+                await connection.run_sync(lambda sync_conn: MigrationCheckpoint.__table__.create(sync_conn, checkfirst=True))
+                if not resume:
+                    await session.execute(MigrationCheckpoint.__table__.delete().where(
+                        MigrationCheckpoint.job_name == PROFILE_MIGRATION_JOB))
+            checkpoints = await self.load_checkpoints(session, PROFILE_MIGRATION_JOB, total_segments) if not dry_run else {}
+            pending_segments = [segment for segment in range(total_segments)
+                                if not (checkpoints.get(segment) and checkpoints[segment].completed)]
+            start_keys = {segment: checkpoints[segment].last_key if segment in checkpoints else None
+                          for segment in pending_segments}
+            
+            if not pending_segments:
+                logger.info("✅ Bulk profile migration already complete (use resume=False to re-run)")
+                return {"message": "Migration already complete", "stats": self.migration_stats,
+                        "completed": True, "chunks": 0, "dry_run": dry_run}
+            
+            logger.info(f"🚀 Bulk profile migration: {len(pending_segments)}/{total_segments} segments, chunk size {chunk_size} (dry_run={dry_run})")
+            
+            queue: asyncio.Queue = asyncio.Queue(maxsize=total_segments * 2)
+            producers = [
+                asyncio.create_task(self._scan_segment(scan_client, PROFILES_TABLE_NAME, segment, total_segments,
+                                                       start_keys[segment], queue))
+                for segment in pending_segments
+            ]
+            
+            seen_orgs: set = set()
+            chunk_users: List[Dict[str, Any]] = []
+            chunk_orgs: List[Dict[str, Any]] = []
+            chunk_positions: Dict[int, Tuple[Optional[Dict[str, Any]], int]] = {}
+            active = set(pending_segments)
+            chunks = 0
+            out_of_time = False
+            
+            async def flush() -> None:
+                nonlocal chunk_users, chunk_orgs, chunk_positions, chunks
+                if not dry_run:
+                    await self._write_chunk(session, chunk_users, chunk_orgs)
+                    for segment, (last_key, rows) in chunk_positions.items():
+                        checkpoint = checkpoints[segment]
+                        checkpoint.last_key = _json_safe(last_key) if last_key else checkpoint.last_key
+                        checkpoint.completed = last_key is None
+                        checkpoint.rows_loaded = (checkpoint.rows_loaded or 0) + rows
+                        checkpoint.updated_at = datetime.now(timezone.utc)
+                    await session.commit()
+                chunks += 1
+                logger.info(f"📦 Chunk {chunks}: {len(chunk_users)} users, {len(chunk_orgs)} organizations "
+                            f"({self.migration_stats['profiles_processed']} profiles, {time.time() - started:.1f}s)")
+                chunk_users, chunk_orgs, chunk_positions = [], [], {}
+            
+            try:
+                while active:
+                    segment, items, last_key = await queue.get()
+                    if isinstance(items, Exception):
+                        logger.error(f"❌ Scan of segment {segment} failed: {items}")
+                        raise items
+                    users, organizations = self._map_profile_rows(items, seen_orgs)
+                    chunk_users.extend(users)
+                    chunk_orgs.extend(organizations)
+                    _, rows = chunk_positions.get(segment, (None, 0))
+                    chunk_positions[segment] = (last_key, rows + len(users))
+                    if last_key is None:
+                        active.discard(segment)
+                    
+                    if len(chunk_users) >= chunk_size:
+                        await flush()
+                        if time_budget_seconds and time.time() - started >= time_budget_seconds:
+                            out_of_time = True
+                            break
+                
+                if chunk_positions and not out_of_time:
+                    await flush()
+            finally:
+                for producer in producers:
+                    producer.cancel()
+                await asyncio.gather(*producers, return_exceptions=True)
+        
+        completed = not out_of_time
+        logger.info(f"{'✅' if completed else '⏸️'} Bulk profile migration {'completed' if completed else 'paused'}: "
+                    f"{self.migration_stats} in {time.time() - started:.1f}s")
+        return {
+            "message": "Bulk migration completed" if completed else "Bulk migration paused - invoke again to resume",
+            "stats": self.migration_stats,
+            "completed": completed,
+            "chunks": chunks,
+            "duration_seconds": round(time.time() - started, 1),
+            "dry_run": dry_run,
+            "method": "COPY + merge"
+        }
+
 # Convenience functions for direct usage
 async def create_schema() -> Dict[str, Any]:
     """Create schema using async SQLAlchemy"""
@@ -321,4 +623,16 @@ async def migrate_profiles(dry_run: bool = False) -> Dict[str, Any]:
         migration_manager = MigrationManager(db_manager)
         return await migration_manager.migrate_profiles(dry_run)
     finally:
-        await db_manager.close() 
\ No newline at end of file
+        await db_manager.close()
+
+async def migrate_profiles_bulk(dry_run: bool = False, chunk_size: int = BULK_CHUNK_SIZE,
+                                total_segments: int = PROFILE_SCAN_SEGMENTS, resume: bool = True,
+                                time_budget_seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Bulk-migrate profiles with COPY, chunked commits and resumable checkpoints"""
+    from .database import get_async_db_manager
+    
+    db_manager = await get_async_db_manager()
+    migration_manager = MigrationManager(db_manager)
+    return await migration_manager.migrate_profiles_bulk(
+        dry_run, chunk_size, total_segments, resume, time_budget_seconds
+    )
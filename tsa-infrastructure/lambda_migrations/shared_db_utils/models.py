@@ -53,4 +53,15 @@ class ProfileSyncLog(Base):
     __tablename__ = 'profile_sync_logs'
     log_id = Column(Integer, primary_key=True)
     profile_id = Column(String)
-    status = Column(String) 
\ No newline at end of file
+    status = Column(String)
+
+class MigrationCheckpoint(Base):
+    """Resume position of one segment of a bulk migration job"""
+    __tablename__ = 'migration_checkpoints'
+    job_name = Column(String, primary_key=True)
+    segment = Column(Integer, primary_key=True)
+    total_segments = Column(Integer, nullable=False)
+    last_key = Column(JSON)
+    completed = Column(Boolean, default=False)
+    rows_loaded = Column(Integer, default=0)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)) 
\ No newline at end of file
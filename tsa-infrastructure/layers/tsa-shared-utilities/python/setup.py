@@ -11,6 +11,7 @@ setup(
         "pydantic>=2.0.0",
         "sendgrid>=6.10.0",
         "python-jose[cryptography]>=3.3.0",
+        "PyJWT[crypto]>=2.8.0",
         "email-validator>=2.0.0",
         "requests>=2.31.0",
     ],
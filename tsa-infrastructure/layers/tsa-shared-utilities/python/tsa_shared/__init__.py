@@ -6,6 +6,28 @@ Centralized utilities for all TSA Lambda functions
 # Configuration
 from .config import get_config
 
+# AWS Client Pool
+from .aws_clients import (
+    get_aws_pool, get_client, get_resource, get_table, get_aws_pool_stats
+)
+
+# Paginated DynamoDB Iterators
+from .database import (
+    iter_query_pages, iter_scan_pages, parallel_scan, parallel_scan_items, ScanCheckpoint
+)
+
+# Batch I/O
+from .database import batch_get_items, batch_write_items, BatchOperationError
+
+# Security Patterns
+from .security_patterns import SecurityMatcher, match_security_pattern
+
+# Secrets Provider
+from .secrets import (
+    get_secrets_provider, get_secret, get_parameter, get_stage_parameter,
+    prefetch_stage_parameters, invalidate_secrets, get_secrets_stats
+)
+
 # Table Models
 from .table_models import (
     # Coach Models
@@ -36,7 +58,7 @@ from .table_models import (
 )
 
 # SendGrid Service
-from .sendgrid_service import SendGridService
+from .sendgrid_service import SendGridService, get_sendgrid_service, get_email_outbox, drain_email_outbox
 
 # Authentication Utils
 from .auth_utils import (
@@ -50,7 +72,8 @@ from .auth_utils import (
     extract_user_from_auth_token, extract_email_from_jwt,
     # Session management
     extract_session_id_from_event, restore_from_server_session,
-    create_auth_session, invalidate_auth_sessions,
+    create_auth_session, invalidate_auth_session, invalidate_auth_sessions,
+    get_session_cache_stats, clear_session_cache,
     # Utility functions
     generate_secure_password, create_lambda_response,
     validate_required_fields
@@ -75,6 +98,32 @@ from .response_utils import (
     generate_unique_id
 )
 
+# User Identity
+from .users import (
+    UserIdentifier, find_profile_by_email, get_coach_profile, get_user_by_email,
+    get_identity_cache_stats, clear_identity_cache, invalidate_identity
+)
+
+# JWT Verification
+from .jwt_verifier import (
+    verify_cognito_token, verify_token_email, get_email_from_claims,
+    get_jwt_verifier_stats, clear_jwt_verifier_cache
+)
+
+# Request Principal
+from .principal import (
+    resolve_principal, build_authorizer_response,
+    get_request_principal, get_request_email, get_request_profile_id
+)
+
+# Admin Metrics
+from .admin_metrics import get_dashboard_metrics, rebuild_admin_metrics
+
+# Coach Progress
+from .coach_progress import (
+    get_coach_progress, get_materialized_progress, get_timeline_progress, rebuild_coach_progress
+)
+
 # Enrollment Utils
 from .enrollment_utils import (
     # Response utilities
@@ -103,6 +152,22 @@ __all__ = [
     # Configuration
     'get_config',
     
+    # AWS Client Pool
+    'get_aws_pool', 'get_client', 'get_resource', 'get_table', 'get_aws_pool_stats',
+    
+    # Paginated DynamoDB Iterators
+    'iter_query_pages', 'iter_scan_pages', 'parallel_scan', 'parallel_scan_items', 'ScanCheckpoint',
+    
+    # Batch I/O
+    'batch_get_items', 'batch_write_items', 'BatchOperationError',
+    
+    # Security Patterns
+    'SecurityMatcher', 'match_security_pattern',
+    
+    # Secrets Provider
+    'get_secrets_provider', 'get_secret', 'get_parameter', 'get_stage_parameter',
+    'prefetch_stage_parameters', 'invalidate_secrets', 'get_secrets_stats',
+    
     # Table Models - Coach
     'CoachProfile', 'ProgressTracking', 'WizardFlow',
     
@@ -137,7 +202,7 @@ __all__ = [
     'SystemMetric', 'MetricType',
     
     # SendGrid Service
-    'SendGridService',
+    'SendGridService', 'get_sendgrid_service', 'get_email_outbox', 'drain_email_outbox',
     
     # Authentication
     'create_cognito_user', 'generate_cognito_tokens', 
@@ -146,7 +211,8 @@ __all__ = [
     'verify_magic_link_jwt', 'extract_jwt_payload',
     'extract_user_from_auth_token', 'extract_email_from_jwt',
     'extract_session_id_from_event', 'restore_from_server_session',
-    'create_auth_session', 'invalidate_auth_sessions',
+    'create_auth_session', 'invalidate_auth_session', 'invalidate_auth_sessions',
+    'get_session_cache_stats', 'clear_session_cache',
     'generate_secure_password', 'create_lambda_response',
     
     # Response & API
@@ -159,6 +225,24 @@ __all__ = [
     'get_current_timestamp', 'get_client_ip', 'is_this_week',
     'generate_unique_id',
     
+    # User Identity
+    'UserIdentifier', 'find_profile_by_email', 'get_coach_profile', 'get_user_by_email',
+    'get_identity_cache_stats', 'clear_identity_cache', 'invalidate_identity',
+    
+    # JWT Verification
+    'verify_cognito_token', 'verify_token_email', 'get_email_from_claims',
+    'get_jwt_verifier_stats', 'clear_jwt_verifier_cache',
+    
+    # Request Principal
+    'resolve_principal', 'build_authorizer_response',
+    'get_request_principal', 'get_request_email', 'get_request_profile_id',
+    
+    # Admin Metrics
+    'get_dashboard_metrics', 'rebuild_admin_metrics',
+    
+    # Coach Progress
+    'get_coach_progress', 'get_materialized_progress', 'get_timeline_progress', 'rebuild_coach_progress',
+    
     # Enrollment
     'create_enrollment_response', 'validate_enrollment_step',
     'validate_phone_format', 'validate_date_format',
@@ -0,0 +1,367 @@
+"""
+Admin Metrics - Pre-aggregated counters for the admin dashboard
+
+The coach-invitations and profiles table streams feed a small metrics table
+(one item per metric_key) so dashboard endpoints read a handful of items
+instead of scanning both tables on every load.
+
+Metric items:
+    invitations                  total, status#<status>
+    coaches                      total, active, onboarding_complete
+    invitations#week#<YYYY-Www>  count (weekly invitation cohort by created_at)
+    coaches#week#<YYYY-Www>      count (weekly profile cohort by created_at)
+"""
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Tuple
+from boto3.dynamodb.types import TypeDeserializer
+
+from .aws_clients import get_client, get_resource, get_table
+from .config import get_config
+from .database import iter_scan_pages, parallel_scan_items
+
+logger = logging.getLogger(__name__)
+
+INVITATIONS_METRIC = 'invitations'
+COACHES_METRIC = 'coaches'
+
+# TransactWriteItems accepts at most 100 actions per call
+TRANSACT_BATCH_SIZE = 100
+
+# Minimum time between async rebuild requests from one container while metrics are missing
+REBUILD_REQUEST_INTERVAL_SECONDS = int(os.environ.get('ADMIN_METRICS_REBUILD_REQUEST_INTERVAL_SECONDS', '300'))
+
+_deserializer = TypeDeserializer()
+_rebuild_lock = threading.Lock()
+_rebuild_requested_at: Optional[float] = None
+
+MetricDeltas = Dict[Tuple[str, str], int]
+
+
+def get_metrics_table_name() -> str:
+    """Get the admin metrics table name for this stage"""
+    return os.environ.get('TSA_ADMIN_METRICS_TABLE', f"admin-metrics-{os.environ.get('STAGE', 'dev')}")
+
+
+def week_key(date_str: Optional[str]) -> Optional[str]:
+    """ISO week (Monday start) of an ISO timestamp, e.g. '2025-W07'"""
+    try:
+        if not date_str:
+            return None
+        year, week, _ = datetime.fromisoformat(str(date_str).replace('Z', '+00:00')).isocalendar()
+        return f"{year}-W{week:02d}"
+    except Exception:
+        return None
+
+
+def current_week_key() -> str:
+    """ISO week key for now (UTC)"""
+    year, week, _ = datetime.now(timezone.utc).isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+# =================================================================
+# COUNTER DERIVATION
+# =================================================================
+
+def _add(deltas: MetricDeltas, metric_key: str, attribute: str, value: int) -> None:
+    key = (metric_key, attribute)
+    deltas[key] = deltas.get(key, 0) + value
+
+
+def invitation_deltas(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+                      deltas: Optional[MetricDeltas] = None) -> MetricDeltas:
+    """
+    Counter changes for one coach-invitations item transition
+
+    Args:
+        old: Item before the change (None for INSERT)
+        new: Item after the change (None for REMOVE)
+        deltas: Optional accumulator to add into
+
+    Returns:
+        Dict of (metric_key, attribute) -> delta
+    """
+    deltas = {} if deltas is None else deltas
+    for item, sign in ((old, -1), (new, 1)):
+        if not item:
+            continue
+        _add(deltas, INVITATIONS_METRIC, 'total', sign)
+        _add(deltas, INVITATIONS_METRIC, f"status#{item.get('status') or 'unknown'}", sign)
+        week = week_key(item.get('created_at'))
+        if week:
+            _add(deltas, f"{INVITATIONS_METRIC}#week#{week}", 'count', sign)
+    return deltas
+
+
+def profile_deltas(old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+                   deltas: Optional[MetricDeltas] = None) -> MetricDeltas:
+    """
+    Counter changes for one profiles item transition
+
+    Args:
+        old: Item before the change (None for INSERT)
+        new: Item after the change (None for REMOVE)
+        deltas: Optional accumulator to add into
+
+    Returns:
+        Dict of (metric_key, attribute) -> delta
+    """
+    deltas = {} if deltas is None else deltas
+    for item, sign in ((old, -1), (new, 1)):
+        if not item:
+            continue
+        _add(deltas, COACHES_METRIC, 'total', sign)
+        if item.get('status') == 'active':
+            _add(deltas, COACHES_METRIC, 'active', sign)
+        if item.get('onboarding_complete'):
+            _add(deltas, COACHES_METRIC, 'onboarding_complete', sign)
+        week = week_key(item.get('created_at'))
+        if week:
+            _add(deltas, f"{COACHES_METRIC}#week#{week}", 'count', sign)
+    return deltas
+
+
+def deserialize_image(image: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Convert a DynamoDB stream image to a plain dict"""
+    if not image:
+        return None
+    return {key: _deserializer.deserialize(value) for key, value in image.items()}
+
+
+# =================================================================
+# WRITES
+# =================================================================
+
+def apply_metric_deltas(deltas: MetricDeltas, idempotency_key: Optional[str] = None,
+                        updated_at: Optional[str] = None) -> int:
+    """
+    Apply counter deltas with one atomic ADD update per metric item
+
+    Updates are sent as TransactWriteItems with a ClientRequestToken derived
+    from idempotency_key, so a retried stream batch is not counted twice.
+    Retries must send identical parameters, so pass a deterministic
+    updated_at (e.g. the newest record timestamp) along with the key.
+
+    Args:
+        deltas: Dict of (metric_key, attribute) -> delta
+        idempotency_key: Stable identifier for the batch (e.g. stream event IDs)
+        updated_at: Timestamp stored on updated items (defaults to now)
+
+    Returns:
+        Number of metric items updated
+    """
+    by_metric: Dict[str, Dict[str, int]] = {}
+    for (metric_key, attribute), value in deltas.items():
+        if value:
+            by_metric.setdefault(metric_key, {})[attribute] = value
+
+    if not by_metric:
+        return 0
+
+    table_name = get_metrics_table_name()
+    now = updated_at or datetime.now(timezone.utc).isoformat()
+    actions = []
+    for metric_key, counters in sorted(by_metric.items()):
+        names = {'#updated_at': 'updated_at'}
+        values = {':updated_at': {'S': now}}
+        clauses = []
+        for i, (attribute, value) in enumerate(sorted(counters.items())):
+            names[f'#c{i}'] = attribute
+            values[f':c{i}'] = {'N': str(value)}
+            clauses.append(f'#c{i} :c{i}')
+        actions.append({
+            'Update': {
+                'TableName': table_name,
+                'Key': {'metric_key': {'S': metric_key}},
+                'UpdateExpression': f"ADD {', '.join(clauses)} SET #updated_at = :updated_at",
+                'ExpressionAttributeNames': names,
+                'ExpressionAttributeValues': values
+            }
+        })
+
+    client = get_client('dynamodb')
+    for i in range(0, len(actions), TRANSACT_BATCH_SIZE):
+        request = {'TransactItems': actions[i:i + TRANSACT_BATCH_SIZE]}
+        if idempotency_key:
+            request['ClientRequestToken'] = hashlib.md5(f"{idempotency_key}:{i}".encode()).hexdigest()
+        client.transact_write_items(**request)
+
+    return len(actions)
+
+
+# =================================================================
+# READS
+# =================================================================
+
+def get_metric_items(metric_keys: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Fetch metric items by key with a single BatchGetItem
+
+    Returns:
+        Dict of metric_key -> item (missing keys are omitted)
+    """
+    table_name = get_metrics_table_name()
+    request = {table_name: {'Keys': [{'metric_key': key} for key in metric_keys]}}
+    items: Dict[str, Dict[str, Any]] = {}
+
+    while request:
+        response = get_resource('dynamodb').batch_get_item(RequestItems=request)
+        for item in response.get('Responses', {}).get(table_name, []):
+            items[item['metric_key']] = item
+        request = response.get('UnprocessedKeys') or None
+
+    return items
+
+
+def _count(item: Optional[Dict[str, Any]], attribute: str) -> int:
+    return int((item or {}).get(attribute, 0))
+
+
+def get_aggregator_function_name() -> str:
+    """Name of the metrics aggregator Lambda (stream consumer and rebuild entry point)"""
+    return (os.environ.get('TSA_ADMIN_METRICS_AGGREGATOR_FUNCTION')
+            or get_config().get_lambda_names()['admin_metrics_aggregator'])
+
+
+def request_metrics_rebuild() -> bool:
+    """
+    Ask the metrics aggregator to rebuild every counter (async invoke)
+
+    Requests from one container are spaced REBUILD_REQUEST_INTERVAL_SECONDS
+    apart so a dashboard polled during a long rebuild does not queue more.
+
+    Returns:
+        True if a rebuild was requested
+    """
+    global _rebuild_requested_at
+    with _rebuild_lock:
+        now = time.monotonic()
+        if _rebuild_requested_at is not None and now - _rebuild_requested_at < REBUILD_REQUEST_INTERVAL_SECONDS:
+            return False
+        _rebuild_requested_at = now
+
+    try:
+        get_client('lambda').invoke(
+            FunctionName=get_aggregator_function_name(),
+            InvocationType='Event',
+            Payload=json.dumps({'action': 'rebuild'}).encode()
+        )
+        logger.info("Requested admin metrics rebuild")
+        return True
+    except Exception as e:
+        # Allow the next dashboard load to try again
+        with _rebuild_lock:
+            _rebuild_requested_at = None
+        logger.error(f"❌ Error requesting admin metrics rebuild: {str(e)}")
+        return False
+
+
+def get_dashboard_metrics() -> Dict[str, Any]:
+    """
+    Read pre-aggregated dashboard counters
+
+    If the metrics table has not been populated yet (fresh deploy before a
+    backfill), an async rebuild is requested and zero counters are returned
+    with 'initializing' set - the source tables are never scanned here.
+
+    Returns:
+        Dict with invitation status counts, coach counts, weekly cohorts and
+        the 'initializing' flag
+    """
+    week = current_week_key()
+    keys = [INVITATIONS_METRIC, COACHES_METRIC,
+            f"{INVITATIONS_METRIC}#week#{week}", f"{COACHES_METRIC}#week#{week}"]
+    items = get_metric_items(keys)
+
+    initializing = INVITATIONS_METRIC not in items and COACHES_METRIC not in items
+    if initializing:
+        logger.warning("Admin metrics not initialized - requesting a rebuild from source tables")
+        request_metrics_rebuild()
+
+    invitations = items.get(INVITATIONS_METRIC, {})
+    coaches = items.get(COACHES_METRIC, {})
+
+    return {
+        'invitations_by_status': {
+            attribute.split('#', 1)[1]: int(value)
+            for attribute, value in invitations.items()
+            if attribute.startswith('status#')
+        },
+        'total_invitations': _count(invitations, 'total'),
+        'total_coaches': _count(coaches, 'total'),
+        'active_coaches': _count(coaches, 'active'),
+        'onboarding_complete': _count(coaches, 'onboarding_complete'),
+        'invitations_this_week': _count(items.get(f"{INVITATIONS_METRIC}#week#{week}"), 'count'),
+        'coaches_this_week': _count(items.get(f"{COACHES_METRIC}#week#{week}"), 'count'),
+        'updated_at': max(invitations.get('updated_at', ''), coaches.get('updated_at', '')),
+        'initializing': initializing
+    }
+
+
+# =================================================================
+# BACKFILL / REBUILD
+# =================================================================
+
+def compute_admin_metrics(total_segments: int = 4) -> MetricDeltas:
+    """Recompute all counters from a parallel scan of the source tables"""
+    counters: MetricDeltas = {}
+
+    invitations_table = os.environ.get('TSA_INVITATIONS_TABLE', f"coach-invitations-{os.environ.get('STAGE', 'dev')}")
+    for item in parallel_scan_items(get_table(invitations_table), total_segments, ['invitation_id', 'status', 'created_at']):
+        invitation_deltas(None, item, counters)
+
+    profiles_table = os.environ.get('TSA_PROFILES_TABLE', f"profiles-{os.environ.get('STAGE', 'dev')}")
+    for item in parallel_scan_items(get_table(profiles_table), total_segments, ['profile_id', 'status', 'onboarding_complete', 'created_at']):
+        profile_deltas(None, item, counters)
+
+    return counters
+
+
+def rebuild_admin_metrics(total_segments: int = 4) -> Dict[str, Any]:
+    """
+    Recompute and overwrite every metric item, deleting stale ones
+
+    Stream updates that land while the scan runs may be overwritten; run
+    again (or let the next changes reconcile) if exact counts matter.
+
+    Args:
+        total_segments: Parallel scan segments per source table
+
+    Returns:
+        Dict with rebuild summary
+    """
+    counters = compute_admin_metrics(total_segments)
+    now = datetime.now(timezone.utc).isoformat()
+
+    items: Dict[str, Dict[str, Any]] = {}
+    for (metric_key, attribute), value in counters.items():
+        items.setdefault(metric_key, {'metric_key': metric_key, 'updated_at': now})[attribute] = value
+    for metric_key in (INVITATIONS_METRIC, COACHES_METRIC):
+        items.setdefault(metric_key, {'metric_key': metric_key, 'updated_at': now, 'total': 0})
+
+    metrics_table = get_table(get_metrics_table_name())
+
+    existing_keys = set()
+    for response in iter_scan_pages(metrics_table, projection=['metric_key']):
+        existing_keys.update(item['metric_key'] for item in response.get('Items', []))
+
+    stale_keys = existing_keys - set(items)
+    with metrics_table.batch_writer() as batch:
+        for item in items.values():
+            batch.put_item(Item=item)
+        for metric_key in stale_keys:
+            batch.delete_item(Key={'metric_key': metric_key})
+
+    logger.info(f"Rebuilt {len(items)} admin metric items ({len(stale_keys)} stale removed)")
+    return {
+        'metric_items': len(items),
+        'stale_removed': len(stale_keys),
+        'total_invitations': items[INVITATIONS_METRIC].get('total', 0),
+        'total_coaches': items[COACHES_METRIC].get('total', 0)
+    }
@@ -2,7 +2,6 @@
 Authentication Utilities for TSA Platform
 Centralized authentication, JWT handling, session management, and profile sync
 """
-import boto3
 import string
 import random
 import secrets
@@ -10,9 +9,17 @@ import json
 import os
 import logging
 import time
-import base64
-from typing import Dict, Any, Optional, List
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+from botocore.exceptions import ClientError
 from .config import get_config
+from .aws_clients import get_client, get_table
+from .database import iter_query_pages, iter_scan_pages, batch_write_items
+from .users import _is_missing_index_error
+from .secrets import get_secret, get_stage_parameter
+from .jwt_verifier import verify_token_email
+from .principal import get_request_email
 
 logger = logging.getLogger(__name__)
 
@@ -31,7 +38,7 @@ def create_cognito_user(email: str, user_role: str, invitation_token: str = None
         env_vars = config.get_env_vars('auth')
         user_pool_id = env_vars.get('USER_POOL_ID')
         
-        cognito_client = boto3.client('cognito-idp')
+        cognito_client = get_client('cognito-idp')
         
         # Check if user already exists
         try:
@@ -95,7 +102,7 @@ def generate_cognito_tokens(email: str, request_id: str = None) -> Dict[str, Any
         user_pool_id = env_vars.get('USER_POOL_ID')
         client_id = env_vars.get('CLIENT_ID')
         
-        cognito_client = boto3.client('cognito-idp')
+        cognito_client = get_client('cognito-idp')
         
         # Set a temporary password for the user
         temp_password = generate_secure_password()
@@ -153,7 +160,7 @@ def get_cognito_user_attributes(email: str) -> Dict[str, Any]:
         env_vars = config.get_env_vars('auth')
         user_pool_id = env_vars.get('USER_POOL_ID')
         
-        cognito_client = boto3.client('cognito-idp')
+        cognito_client = get_client('cognito-idp')
         
         response = cognito_client.admin_get_user(
             UserPoolId=user_pool_id,
@@ -186,7 +193,7 @@ def validate_user_exists(email: str) -> bool:
         env_vars = config.get_env_vars('auth')
         user_pool_id = env_vars.get('USER_POOL_ID')
         
-        cognito_client = boto3.client('cognito-idp')
+        cognito_client = get_client('cognito-idp')
         
         cognito_client.admin_get_user(
             UserPoolId=user_pool_id,
@@ -209,6 +216,7 @@ def extract_user_from_auth_token(event: Dict[str, Any]) -> Optional[str]:
     Extract user email from JWT Authorization header with session restoration fallback
     
     Flow:
+    0. Use the principal from the API Gateway authorizer when the route has one
     1. Try to extract from JWT token in Authorization header
     2. If no token, try to restore from server-side session
     3. Include profile sync hardening as final fallback
@@ -220,6 +228,11 @@ def extract_user_from_auth_token(event: Dict[str, Any]) -> Optional[str]:
         User email if authentication successful, None otherwise
     """
     try:
+        # Step 0: Principal already resolved (and cached per token) by the authorizer
+        email = get_request_email(event)
+        if email:
+            return email
+        
         # Step 1: Try JWT token extraction first
         headers = event.get('headers', {})
         auth_header = None
@@ -258,46 +271,16 @@ def extract_user_from_auth_token(event: Dict[str, Any]) -> Optional[str]:
 
 
 def extract_email_from_jwt(token: str) -> Optional[str]:
-    """Extract email from JWT token payload"""
-    try:
-        # Split token into parts
-        token_parts = token.split('.')
-        if len(token_parts) != 3:
-            return None
-        
-        # Decode payload (second part)
-        payload_b64 = token_parts[1]
-        # Add padding if necessary
-        padding = 4 - len(payload_b64) % 4
-        if padding != 4:
-            payload_b64 += '=' * padding
-        
-        payload = json.loads(base64.b64decode(payload_b64))
-        
-        # Check token expiration
-        current_time = int(time.time())
-        if payload.get('exp', 0) <= current_time:
-            logger.info("JWT token is expired")
-            return None
-        
-        # Extract email from token payload
-        email = payload.get('email') or payload.get('username')
-        if email:
-            return email.lower().strip()
-        
-        return None
-        
-    except Exception as e:
-        logger.warning(f"Error extracting email from JWT: {str(e)}")
-        return None
+    """Extract email from a Cognito JWT after verifying its signature, issuer and expiry"""
+    return verify_token_email(token)
 
 
 # =================================================================
 # JWT UTILITIES
 # =================================================================
 
-def get_jwt_secret() -> str:
-    """Get JWT signing secret from AWS Secrets Manager"""
+def get_jwt_secret(force_refresh: bool = False) -> str:
+    """Get JWT signing secret from AWS Secrets Manager (cached per container)"""
     try:
         # Get environment variables
         env_vars = config.get_env_vars('auth')
@@ -310,10 +293,7 @@ def get_jwt_secret() -> str:
         if not secret_arn:
             raise Exception("No secret ARN available for JWT signing")
         
-        # Retrieve secret from AWS Secrets Manager
-        secrets_client = boto3.client('secretsmanager')
-        secret_response = secrets_client.get_secret_value(SecretId=secret_arn)
-        secret_data = json.loads(secret_response['SecretString'])
+        secret_data = get_secret(secret_arn, force_refresh=force_refresh)
         
         # Try to get JWT secret, fallback to SendGrid key for now
         jwt_secret = secret_data.get('jwt_secret') or secret_data.get('api_key')
@@ -328,20 +308,31 @@ def get_jwt_secret() -> str:
         raise
 
 
-def get_sendgrid_api_key() -> str:
-    """Get SendGrid API key from AWS Secrets Manager"""
+def get_sendgrid_api_key(force_refresh: bool = False) -> str:
+    """
+    Get SendGrid API key (cached per container)
+    
+    Checks Parameter Store (/tsa/{stage}/sendgrid/api_key) first, then the
+    SENDGRID_SECRET_ARN secret in AWS Secrets Manager.
+    """
     try:
-        # Get environment variables
+        try:
+            api_key = get_stage_parameter('sendgrid/api_key', force_refresh=force_refresh)
+        except Exception as e:
+            logger.warning(f"Failed to get SendGrid API key from Parameter Store: {str(e)}")
+            api_key = None
+        
+        if api_key:
+            return api_key
+        
+        # Fallback to Secrets Manager
         env_vars = config.get_env_vars('auth')
         secret_arn = env_vars.get('SENDGRID_SECRET_ARN')
         
         if not secret_arn:
             raise Exception("SENDGRID_SECRET_ARN environment variable not found")
         
-        # Retrieve secret from AWS Secrets Manager
-        secrets_client = boto3.client('secretsmanager')
-        secret_response = secrets_client.get_secret_value(SecretId=secret_arn)
-        secret_data = json.loads(secret_response['SecretString'])
+        secret_data = get_secret(secret_arn, force_refresh=force_refresh)
         
         # Get SendGrid API key
         api_key = secret_data.get('api_key')
@@ -364,7 +355,7 @@ def generate_magic_link_jwt(email: str, user_role: str, invitation_token: str =
         import uuid
         from datetime import datetime, timedelta
         
-        # Get JWT secret from AWS Secrets Manager
+        # Get JWT secret (cached per container)
         jwt_secret = get_jwt_secret()
         
         # Create JWT payload
@@ -394,6 +385,23 @@ def generate_magic_link_jwt(email: str, user_role: str, invitation_token: str =
         raise
 
 
+# Forced JWT secret refreshes after a signature failure (forged tokens must not drive Secrets Manager calls)
+JWT_SECRET_REFRESH_INTERVAL_SECONDS = int(os.environ.get('JWT_SECRET_REFRESH_INTERVAL_SECONDS', '60'))
+# Earliest time (monotonic) the next forced refresh may run
+_jwt_secret_next_refresh_at = 0.0
+_jwt_secret_refresh_lock = threading.Lock()
+
+
+def _refresh_jwt_secret() -> Optional[str]:
+    """Force-refresh the JWT secret at most once per interval per container (None when rate-limited)"""
+    global _jwt_secret_next_refresh_at
+    with _jwt_secret_refresh_lock:
+        if time.monotonic() < _jwt_secret_next_refresh_at:
+            return None
+        _jwt_secret_next_refresh_at = time.monotonic() + JWT_SECRET_REFRESH_INTERVAL_SECONDS
+    return get_jwt_secret(force_refresh=True)
+
+
 def verify_magic_link_jwt(token: str) -> Dict[str, Any]:
     """Verify JWT magic link token"""
     try:
@@ -403,12 +411,24 @@ def verify_magic_link_jwt(token: str) -> Dict[str, Any]:
         jwt_secret = get_jwt_secret()
         
         # Decode and validate JWT
-        payload = jwt.decode(
-            token, 
-            jwt_secret, 
-            algorithms=['HS256'],
-            audience='tsa-auth'
-        )
+        try:
+            payload = jwt.decode(
+                token, 
+                jwt_secret, 
+                algorithms=['HS256'],
+                audience='tsa-auth'
+            )
+        except jwt.InvalidSignatureError:
+            # The cached secret may predate a rotation - refresh (rate-limited) and retry
+            refreshed_secret = _refresh_jwt_secret()
+            if refreshed_secret is None or refreshed_secret == jwt_secret:
+                raise
+            payload = jwt.decode(
+                token, 
+                refreshed_secret, 
+                algorithms=['HS256'],
+                audience='tsa-auth'
+            )
         
         # Additional validation
         if payload.get('purpose') != 'magic_link':
@@ -507,6 +527,86 @@ def extract_session_from_cookies(cookie_header: str) -> Optional[str]:
         return None
 
 
+SESSIONS_USER_EMAIL_INDEX = 'user-email-index'
+
+
+class _SessionCache:
+    """Thread-safe LRU + TTL cache of validated sessions, never kept past the session's own expires_at"""
+    
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # session_id -> (cache_expires_at (monotonic), user_email, session expires_at (epoch))
+        self._entries: 'OrderedDict[str, Tuple[float, str, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'invalidations': 0}
+    
+    def get(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None or entry[0] < time.monotonic() or (entry[2] and entry[2] < time.time()):
+                self._entries.pop(session_id, None)
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(session_id)
+            self.counters['hits'] += 1
+            return entry[1]
+    
+    def store(self, session_id: str, user_email: str, expires_at: int) -> None:
+        with self._lock:
+            self._entries[session_id] = (time.monotonic() + self.ttl_seconds, user_email, expires_at)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def invalidate(self, session_ids: Optional[List[str]] = None, user_email: Optional[str] = None) -> None:
+        with self._lock:
+            doomed = set(session_ids or [])
+            if user_email:
+                doomed.update(session_id for session_id, entry in self._entries.items() if entry[1] == user_email)
+            for session_id in doomed:
+                if self._entries.pop(session_id, None):
+                    self.counters['invalidations'] += 1
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for counter in self.counters:
+                self.counters[counter] = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+# Module-level cache survives across warm Lambda invocations
+_session_cache = _SessionCache(
+    max_entries=int(os.environ.get('SESSION_CACHE_MAX_ENTRIES', '1024')),
+    # Bounds how long a session invalidated from another container is still honoured here
+    ttl_seconds=int(os.environ.get('SESSION_CACHE_TTL_SECONDS', '60'))
+)
+
+
+def get_session_cache_stats() -> Dict[str, Any]:
+    """Validated-session cache counters for this container"""
+    return _session_cache.stats()
+
+
+def clear_session_cache() -> None:
+    """Drop all cached sessions for this container"""
+    _session_cache.clear()
+
+
+def _get_sessions_table():
+    """Pooled sessions table (expired items are removed by DynamoDB TTL on expires_at)"""
+    return get_table(os.environ.get('SESSIONS_TABLE') or config.get_table_name('sessions'))
+
+
 def restore_from_server_session(session_id: str) -> Optional[str]:
     """
     Restore user authentication from server-side session
@@ -518,15 +618,14 @@ def restore_from_server_session(session_id: str) -> Optional[str]:
         User email if session is valid, None otherwise
     """
     try:
-        # Get stage from environment
-        stage = os.environ.get('STAGE', 'dev')
-        table_name = config.get_table_name('user-sessions', stage)
+        user_email = _session_cache.get(session_id)
+        if user_email:
+            return user_email
         
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(table_name)
-        
-        # Retrieve session from DynamoDB
-        response = table.get_item(Key={'session_id': session_id})
+        response = _get_sessions_table().get_item(
+            Key={'session_id': session_id},
+            ProjectionExpression='user_email, expires_at'
+        )
         
         if 'Item' not in response:
             logger.info(f"No valid session found for ID: {session_id}")
@@ -539,12 +638,13 @@ def restore_from_server_session(session_id: str) -> Optional[str]:
             logger.warning(f"Session {session_id} missing user_email")
             return None
         
-        # Check if session is expired
-        expires_at = session.get('expires_at')
-        if expires_at and int(time.time()) > int(expires_at):
+        # TTL deletes expired sessions, but can lag - an expired item is never honoured
+        expires_at = int(session.get('expires_at') or 0)
+        if expires_at and int(time.time()) > expires_at:
             logger.info(f"Session {session_id} has expired")
             return None
         
+        _session_cache.store(session_id, user_email, expires_at)
         return user_email
         
     except Exception as e:
@@ -567,12 +667,6 @@ def create_auth_session(user_email: str, user_role: str, auth_tokens: Dict[str,
         Session ID if successful, None otherwise
     """
     try:
-        stage = os.environ.get('STAGE', 'dev')
-        table_name = config.get_table_name('user-sessions', stage)
-        
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(table_name)
-        
         # Generate secure session ID
         session_id = secrets.token_urlsafe(32)
         
@@ -590,7 +684,8 @@ def create_auth_session(user_email: str, user_role: str, auth_tokens: Dict[str,
             'metadata': metadata or {}
         }
         
-        table.put_item(Item=session_data)
+        _get_sessions_table().put_item(Item=session_data)
+        _session_cache.store(session_id, user_email, expires_at)
         
         logger.info(f"Created session {session_id} for {user_email}")
         return session_id
@@ -600,9 +695,59 @@ def create_auth_session(user_email: str, user_role: str, auth_tokens: Dict[str,
         return None
 
 
+def _find_user_session_ids(table, user_email: str) -> List[str]:
+    """Session IDs for a user via the user-email-index (paginated scan if the index is missing)"""
+    try:
+        return [
+            item['session_id']
+            for page in iter_query_pages(
+                table,
+                projection=['session_id'],
+                IndexName=SESSIONS_USER_EMAIL_INDEX,
+                KeyConditionExpression='user_email = :email',
+                ExpressionAttributeValues={':email': user_email}
+            )
+            for item in page.get('Items', [])
+        ]
+    except ClientError as e:
+        if not _is_missing_index_error(e):
+            raise
+        logger.warning(f"⚠️ Sessions table has no {SESSIONS_USER_EMAIL_INDEX}, falling back to scan")
+    
+    return [
+        item['session_id']
+        for page in iter_scan_pages(
+            table,
+            projection=['session_id'],
+            FilterExpression='user_email = :email',
+            ExpressionAttributeValues={':email': user_email}
+        )
+        for item in page.get('Items', [])
+    ]
+
+
+def invalidate_auth_session(session_id: str) -> bool:
+    """
+    Invalidate a single session (logout)
+    
+    Args:
+        session_id: The session identifier
+        
+    Returns:
+        True if the session was deleted
+    """
+    _session_cache.invalidate(session_ids=[session_id])
+    try:
+        _get_sessions_table().delete_item(Key={'session_id': session_id})
+        return True
+    except Exception as e:
+        logger.error(f"Error invalidating session: {str(e)}")
+        return False
+
+
 def invalidate_auth_sessions(user_email: str) -> int:
     """
-    Invalidate all sessions for a user
+    Invalidate all sessions for a user (logout everywhere)
     
     Args:
         user_email: User's email address
@@ -610,26 +755,20 @@ def invalidate_auth_sessions(user_email: str) -> int:
     Returns:
         Number of sessions invalidated
     """
+    _session_cache.invalidate(user_email=user_email)
     try:
-        stage = os.environ.get('STAGE', 'dev')
-        table_name = config.get_table_name('user-sessions', stage)
-        
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(table_name)
-        
-        # Scan for user sessions (in production, consider GSI)
-        response = table.scan(
-            FilterExpression='user_email = :email',
-            ExpressionAttributeValues={':email': user_email}
-        )
-        
-        invalidated_count = 0
-        for item in response.get('Items', []):
-            table.delete_item(Key={'session_id': item['session_id']})
-            invalidated_count += 1
-        
-        logger.info(f"Invalidated {invalidated_count} sessions for {user_email}")
-        return invalidated_count
+        table = _get_sessions_table()
+        session_ids = _find_user_session_ids(table, user_email)
+        if not session_ids:
+            return 0
+        
+        _session_cache.invalidate(session_ids=session_ids)
+        result = batch_write_items(table, [{'session_id': session_id} for session_id in session_ids], operation='delete')
+        
+        if result['failed']:
+            logger.warning(f"⚠️ {result['failed']} sessions for {user_email} could not be deleted")
+        logger.info(f"Invalidated {result['written']} sessions for {user_email}")
+        return result['written']
         
     except Exception as e:
         logger.error(f"Error invalidating sessions: {str(e)}")
@@ -0,0 +1,200 @@
+"""
+AWS Client Pool - Container-scoped boto3 sessions, clients and tables for TSA services
+
+Lambda containers are reused across invocations, so boto3 sessions, clients
+and DynamoDB Table objects are built lazily once per warm container and shared
+by every handler and tsa_shared utility instead of per request.
+"""
+import os
+import threading
+from typing import Dict, Any, Optional
+import boto3
+from botocore.config import Config
+
+
+# Shared client configuration - bounded retries and connection reuse
+DEFAULT_CLIENT_CONFIG = Config(
+    retries={'max_attempts': int(os.environ.get('AWS_MAX_ATTEMPTS', '3')), 'mode': 'standard'},
+    max_pool_connections=int(os.environ.get('AWS_MAX_POOL_CONNECTIONS', '25')),
+    connect_timeout=5,
+    read_timeout=10
+)
+
+
+class AWSResourcePool:
+    """Lazily built, thread-safe pool of boto3 sessions, clients, resources and tables"""
+
+    def __init__(self, client_config: Config = DEFAULT_CLIENT_CONFIG):
+        self.client_config = client_config
+        self._lock = threading.RLock()
+        self._sessions: Dict[Optional[str], boto3.session.Session] = {}
+        self._clients: Dict[tuple, Any] = {}
+        self._resources: Dict[tuple, Any] = {}
+        self._tables: Dict[tuple, Any] = {}
+        self._validated_tables: Dict[tuple, Dict[str, Any]] = {}
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {
+            'sessions_created': 0,
+            'clients_created': 0,
+            'clients_reused': 0,
+            'resources_created': 0,
+            'resources_reused': 0,
+            'tables_created': 0,
+            'tables_reused': 0,
+            'table_validations': 0,
+            'table_validations_cached': 0
+        }
+
+    @staticmethod
+    def _region(region: Optional[str]) -> Optional[str]:
+        return region or os.environ.get('AWS_REGION') or os.environ.get('AWS_DEFAULT_REGION')
+
+    def get_session(self, region: Optional[str] = None) -> boto3.session.Session:
+        """
+        Get the boto3 session for a region
+
+        Sessions are not thread-safe to build clients from concurrently,
+        so all client/resource creation happens under the pool lock.
+        """
+        region = self._region(region)
+        with self._lock:
+            session = self._sessions.get(region)
+            if session is None:
+                session = boto3.session.Session(region_name=region)
+                self._sessions[region] = session
+                self._stats['sessions_created'] += 1
+            return session
+
+    def get_client(self, service_name: str, region: Optional[str] = None):
+        """
+        Get a pooled low-level client
+
+        Args:
+            service_name: AWS service name (e.g. 'secretsmanager', 'cognito-idp')
+            region: Optional region override
+
+        Returns:
+            boto3 client (thread-safe, safe to share)
+        """
+        key = (service_name, self._region(region))
+        with self._lock:
+            client = self._clients.get(key)
+            if client is not None:
+                self._stats['clients_reused'] += 1
+                return client
+
+            client = self.get_session(region).client(service_name, config=self.client_config)
+            self._clients[key] = client
+            self._stats['clients_created'] += 1
+            return client
+
+    def get_resource(self, service_name: str, region: Optional[str] = None):
+        """
+        Get a pooled service resource (e.g. dynamodb, s3)
+
+        Args:
+            service_name: AWS service name
+            region: Optional region override
+
+        Returns:
+            boto3 ServiceResource
+        """
+        key = (service_name, self._region(region))
+        with self._lock:
+            resource = self._resources.get(key)
+            if resource is not None:
+                self._stats['resources_reused'] += 1
+                return resource
+
+            resource = self.get_session(region).resource(service_name, config=self.client_config)
+            self._resources[key] = resource
+            self._stats['resources_created'] += 1
+            return resource
+
+    def get_table(self, table_name: str, region: Optional[str] = None, validate: bool = False):
+        """
+        Get a pooled DynamoDB Table object
+
+        Args:
+            table_name: Full DynamoDB table name
+            region: Optional region override
+            validate: Run DescribeTable once per container to verify the table exists
+
+        Returns:
+            DynamoDB Table resource
+        """
+        key = (table_name, self._region(region))
+        with self._lock:
+            table = self._tables.get(key)
+            if table is None:
+                table = self.get_resource('dynamodb', region).Table(table_name)
+                self._tables[key] = table
+                self._stats['tables_created'] += 1
+            else:
+                self._stats['tables_reused'] += 1
+
+            if validate:
+                if key in self._validated_tables:
+                    self._stats['table_validations_cached'] += 1
+                else:
+                    table.load()
+                    self._validated_tables[key] = {
+                        'table_status': table.table_status,
+                        'item_count': table.item_count
+                    }
+                    self._stats['table_validations'] += 1
+
+            return table
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get creation/reuse counters for this container"""
+        with self._lock:
+            return {
+                **self._stats,
+                'sessions': len(self._sessions),
+                'clients': sorted(f"{service}:{region or 'default'}" for service, region in self._clients),
+                'tables': sorted(name for name, _ in self._tables),
+                'validated_tables': sorted(name for name, _ in self._validated_tables)
+            }
+
+    def reset(self) -> None:
+        """Drop all pooled objects (e.g. after credential changes in tests)"""
+        with self._lock:
+            self._sessions.clear()
+            self._clients.clear()
+            self._resources.clear()
+            self._tables.clear()
+            self._validated_tables.clear()
+            self._stats = self._empty_stats()
+
+
+# Module-level pool survives across warm Lambda invocations
+_pool = AWSResourcePool()
+
+
+def get_aws_pool() -> AWSResourcePool:
+    """Get the container-scoped AWS resource pool"""
+    return _pool
+
+
+def get_client(service_name: str, region: Optional[str] = None):
+    """Get a pooled boto3 client - convenience function"""
+    return _pool.get_client(service_name, region)
+
+
+def get_resource(service_name: str, region: Optional[str] = None):
+    """Get a pooled boto3 resource - convenience function"""
+    return _pool.get_resource(service_name, region)
+
+
+def get_table(table_name: str, region: Optional[str] = None, validate: bool = False):
+    """Get a pooled DynamoDB table - convenience function"""
+    return _pool.get_table(table_name, region, validate)
+
+
+def get_aws_pool_stats() -> Dict[str, Any]:
+    """Get pool creation/reuse counters - convenience function"""
+    return _pool.get_stats()
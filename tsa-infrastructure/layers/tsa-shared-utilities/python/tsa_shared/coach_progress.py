@@ -0,0 +1,577 @@
+"""
+Coach Progress - Materialized per-coach timeline progress
+
+The profiles, background-checks, events, parent-invitations and enrollments
+table streams keep one coach-progress item per profile_id up to date, so the
+timeline endpoints serve a coach's progress with a single get_item instead of
+re-running every check on each page load.
+
+Progress item:
+    profile_id                 partition key
+    email                      coach email (for ownership checks)
+    onboarding                 step map (status, auto_detected, details)
+    bootcamp_completion        step map
+    background_check           step map
+    events_created             counter (events by coach_id)
+    invitations_sent           counter (parent invitations by coach_id)
+    students_enrolled          counter (enrollments by coach_id with status 'enrolled')
+    revision                   incremented by every stream update
+    step_statuses, current_step, completed_steps, completion_percentage
+                               derived from the fields above
+"""
+import os
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError
+
+from .aws_clients import get_table
+from .database import (
+    get_table_name, iter_query_pages, iter_scan_pages, parallel_scan_items,
+    batch_get_items, batch_write_items, BatchOperationError
+)
+
+logger = logging.getLogger(__name__)
+
+# Timeline steps in wizard order
+TIMELINE_STEPS = [
+    'onboarding', 'background_check', 'bootcamp_completion',
+    'host_events', 'invite_students', 'student_enrollment'
+]
+
+# Count-based steps: step -> (counter attribute, details key)
+COUNTER_STEPS = {
+    'host_events': ('events_created', 'events_created'),
+    'invite_students': ('invitations_sent', 'invitations_sent'),
+    'student_enrollment': ('students_enrolled', 'students_enrolled')
+}
+
+BOOTCAMP_COMPLETE_PERCENTAGE = 80
+# Modules defined in lambda_bootcamp_progress (BOOTCAMP_MODULES)
+BOOTCAMP_MODULE_COUNT = 5
+
+BACKGROUND_STATUS_MAPPING = {
+    'clear': 'completed',
+    'consider': 'completed',  # May need review but completed
+    'suspended': 'blocked',
+    'dispute': 'in_review'
+}
+
+# Source table keys (tsa_shared.database.get_table_name) feeding the projection
+SOURCE_TABLES = ('profiles', 'background_checks', 'events', 'parent_invitations', 'enrollments')
+
+# TransactWriteItems accepts at most 100 actions per call
+TRANSACT_BATCH_SIZE = 100
+
+# Written by a rebuild or a profiles stream record; counter deltas alone never set them
+MATERIALIZED_FIELDS = ('email', 'onboarding')
+
+# Per-profile pending changes: {'set': {attribute: value}, 'add': {counter: delta}}
+ProgressChanges = Dict[str, Dict[str, Dict[str, Any]]]
+
+_source_table_names: Dict[str, str] = {}
+
+
+def get_progress_table_name() -> str:
+    """Get the coach progress table name for this stage"""
+    return os.environ.get('TSA_COACH_PROGRESS_TABLE', f"coach-progress-{os.environ.get('STAGE', 'dev')}")
+
+
+def source_table_names() -> Dict[str, str]:
+    """Physical table name -> source key for the projection's stream sources (cached per container)"""
+    if not _source_table_names:
+        for source in SOURCE_TABLES:
+            _source_table_names[get_table_name(source)] = source
+    return _source_table_names
+
+
+# =================================================================
+# STEP DERIVATION
+# =================================================================
+
+def onboarding_step(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Onboarding step from a profile item"""
+    if not profile:
+        return {'status': 'not_started', 'auto_detected': False, 'error': 'Profile not found'}
+
+    is_complete = bool(profile.get('onboarding_completed') or profile.get('onboarding_complete'))
+    return {
+        'status': 'completed' if is_complete else 'in_progress',
+        'auto_detected': True,
+        'details': {
+            'profile_complete': bool(profile.get('first_name') and profile.get('last_name') and profile.get('school_name')),
+            'onboarding_progress': profile.get('onboarding_progress')
+        }
+    }
+
+
+def bootcamp_step(profile: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Bootcamp step from a profile item's bootcamp_progress"""
+    if not profile:
+        return {'status': 'not_started', 'auto_detected': False, 'error': 'Profile not found'}
+
+    progress = profile.get('bootcamp_progress') or {}
+    modules_completed = progress.get('modules_completed', [])
+    completion_percentage = progress.get('completion_percentage')
+    if not completion_percentage:
+        completion_percentage = len(modules_completed) / BOOTCAMP_MODULE_COUNT * 100
+    # Whole percent - DynamoDB rejects Python floats
+    completion_percentage = int(round(float(completion_percentage)))
+
+    if completion_percentage >= BOOTCAMP_COMPLETE_PERCENTAGE:
+        status = 'completed'
+    elif completion_percentage > 0:
+        status = 'in_progress'
+    else:
+        status = 'not_started'
+
+    return {
+        'status': status,
+        'auto_detected': True,
+        'details': {
+            'completion_percentage': completion_percentage,
+            'modules_completed': len(modules_completed),
+            'certifications_earned': len(progress.get('certifications_earned', []))
+        }
+    }
+
+
+def background_check_step(check: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Background check step from a background-checks item"""
+    if not check:
+        return {
+            'status': 'not_started',
+            'auto_detected': True,
+            'details': {'checkr_status': 'not_initiated'}
+        }
+
+    checkr_status = check.get('checkr_status', 'pending')
+    return {
+        'status': BACKGROUND_STATUS_MAPPING.get(checkr_status, 'in_progress'),
+        'auto_detected': True,
+        'details': {
+            'checkr_status': checkr_status,
+            'initiated_at': check.get('created_at'),
+            'completed_at': check.get('completed_at')
+        }
+    }
+
+
+def counter_step(count: int, details_key: str) -> Dict[str, Any]:
+    """Count-based step (completed once anything exists)"""
+    count = int(count or 0)
+    return {
+        'status': 'completed' if count > 0 else 'not_started',
+        'auto_detected': True,
+        'details': {details_key: count}
+    }
+
+
+def get_current_step(timeline_status: Dict[str, Any]) -> str:
+    """First step that is not started or in progress ('completed' when all are done)"""
+    for step in TIMELINE_STEPS:
+        if step in timeline_status and timeline_status[step]['status'] in ('not_started', 'in_progress'):
+            return step
+    return 'completed'
+
+
+def build_timeline(progress: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Timeline status and progress summary from a progress item
+
+    Returns:
+        (timeline_status, progress_summary) in the timeline endpoint's shape
+    """
+    timeline_status = {
+        'onboarding': progress.get('onboarding') or onboarding_step(None),
+        'background_check': progress.get('background_check') or background_check_step(None),
+        'bootcamp_completion': progress.get('bootcamp_completion') or bootcamp_step(None)
+    }
+    for step, (counter, details_key) in COUNTER_STEPS.items():
+        timeline_status[step] = counter_step(progress.get(counter, 0), details_key)
+    timeline_status = {step: timeline_status[step] for step in TIMELINE_STEPS}
+
+    completed_steps = sum(1 for step in timeline_status.values() if step['status'] == 'completed')
+    total_steps = len(timeline_status)
+    progress_summary = {
+        'completed_steps': completed_steps,
+        'total_steps': total_steps,
+        'completion_percentage': (completed_steps / total_steps * 100) if total_steps > 0 else 0,
+        'current_step': get_current_step(timeline_status)
+    }
+    return timeline_status, progress_summary
+
+
+def _derived_fields(progress: Dict[str, Any]) -> Dict[str, Any]:
+    timeline_status, summary = build_timeline(progress)
+    return {
+        'step_statuses': {step: value['status'] for step, value in timeline_status.items()},
+        'current_step': summary['current_step'],
+        'completed_steps': summary['completed_steps'],
+        'completion_percentage': int(summary['completion_percentage'])
+    }
+
+
+# =================================================================
+# STREAM FOLDING
+# =================================================================
+
+def _change(changes: ProgressChanges, profile_id: Optional[str]) -> Optional[Dict[str, Dict[str, Any]]]:
+    if not profile_id:
+        return None
+    return changes.setdefault(profile_id, {'set': {}, 'add': {}})
+
+
+def _add_count(changes: ProgressChanges, profile_id: Optional[str], counter: str, value: int) -> None:
+    change = _change(changes, profile_id)
+    if change is not None:
+        change['add'][counter] = change['add'].get(counter, 0) + value
+
+
+def progress_changes(source: str, old: Optional[Dict[str, Any]], new: Optional[Dict[str, Any]],
+                     changes: Optional[ProgressChanges] = None) -> ProgressChanges:
+    """
+    Progress changes for one source item transition
+
+    Args:
+        source: Source table key ('profiles', 'background_checks', 'events',
+                'parent_invitations', 'enrollments')
+        old: Item before the change (None for INSERT)
+        new: Item after the change (None for REMOVE)
+        changes: Optional accumulator to add into
+
+    Returns:
+        Dict of profile_id -> {'set': {...}, 'add': {...}}
+    """
+    changes = {} if changes is None else changes
+
+    if source == 'profiles':
+        item = new or old
+        change = _change(changes, item.get('profile_id') if item else None)
+        if change is not None:
+            change['set'].update({
+                'email': (item.get('email') or '').lower(),
+                'onboarding': onboarding_step(new),
+                'bootcamp_completion': bootcamp_step(new)
+            })
+
+    elif source == 'background_checks':
+        item = new or old
+        change = _change(changes, item.get('coach_id') if item else None)
+        if change is not None:
+            change['set']['background_check'] = background_check_step(new)
+
+    elif source in ('events', 'parent_invitations'):
+        counter = 'events_created' if source == 'events' else 'invitations_sent'
+        for item, sign in ((old, -1), (new, 1)):
+            if item:
+                _add_count(changes, item.get('coach_id'), counter, sign)
+
+    elif source == 'enrollments':
+        for item, sign in ((old, -1), (new, 1)):
+            if item and item.get('enrollment_status') == 'enrolled':
+                _add_count(changes, item.get('coach_id'), 'students_enrolled', sign)
+
+    return changes
+
+
+# =================================================================
+# WRITES
+# =================================================================
+
+def apply_progress_changes(changes: ProgressChanges, idempotency_key: Optional[str] = None,
+                           updated_at: Optional[str] = None) -> int:
+    """
+    Apply progress changes, then refresh the derived fields of touched items
+
+    Counter and step updates are sent as TransactWriteItems with a
+    ClientRequestToken derived from idempotency_key, so a retried stream
+    batch is not counted twice. Every update bumps `revision`; derived fields
+    are written conditionally on the revision they were computed from, so a
+    concurrent batch on the same coach never leaves a stale current_step.
+
+    Args:
+        changes: Dict of profile_id -> {'set': {...}, 'add': {...}}
+        idempotency_key: Stable identifier for the batch (e.g. stream event IDs)
+        updated_at: Timestamp stored on updated items (defaults to now)
+
+    Returns:
+        Number of progress items updated
+    """
+    table_name = get_progress_table_name()
+    now = updated_at or datetime.now(timezone.utc).isoformat()
+    actions = []
+
+    for profile_id, change in sorted(changes.items()):
+        counters = {counter: value for counter, value in change['add'].items() if value}
+        if not counters and not change['set']:
+            continue
+
+        names = {'#updated_at': 'updated_at', '#revision': 'revision'}
+        values: Dict[str, Any] = {':updated_at': now, ':one': 1}
+        set_clauses = ['#updated_at = :updated_at']
+        add_clauses = ['#revision :one']
+        for i, (attribute, value) in enumerate(sorted(change['set'].items())):
+            names[f'#s{i}'] = attribute
+            values[f':s{i}'] = value
+            set_clauses.append(f'#s{i} = :s{i}')
+        for i, (attribute, value) in enumerate(sorted(counters.items())):
+            names[f'#c{i}'] = attribute
+            values[f':c{i}'] = value
+            add_clauses.append(f'#c{i} :c{i}')
+
+        actions.append({
+            'Update': {
+                'TableName': table_name,
+                'Key': {'profile_id': profile_id},
+                'UpdateExpression': f"SET {', '.join(set_clauses)} ADD {', '.join(add_clauses)}",
+                'ExpressionAttributeNames': names,
+                'ExpressionAttributeValues': values
+            }
+        })
+
+    if not actions:
+        return 0
+
+    # The resource-level client serializes native Python values
+    client = get_table(table_name).meta.client
+    for i in range(0, len(actions), TRANSACT_BATCH_SIZE):
+        request = {'TransactItems': actions[i:i + TRANSACT_BATCH_SIZE]}
+        if idempotency_key:
+            request['ClientRequestToken'] = hashlib.md5(f"{idempotency_key}:{i}".encode()).hexdigest()
+        client.transact_write_items(**request)
+
+    refresh_derived_fields([action['Update']['Key']['profile_id'] for action in actions])
+    return len(actions)
+
+
+def refresh_derived_fields(profile_ids: List[str]) -> int:
+    """
+    Recompute step statuses / current step for the given coaches
+
+    Items that only hold counter deltas (the coach's first stream update
+    landed before any backfill) are rebuilt from the source tables instead.
+    """
+    table = get_table(get_progress_table_name())
+    items = batch_get_items(table, [{'profile_id': profile_id} for profile_id in profile_ids], consistent_read=True)
+    refreshed = 0
+
+    partial_ids = [item['profile_id'] for item in items if not is_materialized(item)]
+    if partial_ids:
+        logger.info(f"Materializing {len(partial_ids)} partial coach progress items")
+        refreshed += rebuild_coach_progress(partial_ids)['progress_items']
+
+    for item in items:
+        if not is_materialized(item):
+            continue
+        derived = _derived_fields(item)
+        if all(item.get(attribute) == value for attribute, value in derived.items()):
+            continue
+        try:
+            table.update_item(
+                Key={'profile_id': item['profile_id']},
+                UpdateExpression='SET ' + ', '.join(f'#{attribute} = :{attribute}' for attribute in derived),
+                ConditionExpression='#revision = :revision',
+                ExpressionAttributeNames={**{f'#{attribute}': attribute for attribute in derived}, '#revision': 'revision'},
+                ExpressionAttributeValues={**{f':{attribute}': value for attribute, value in derived.items()},
+                                           ':revision': item.get('revision', 0)}
+            )
+            refreshed += 1
+        except ClientError as e:
+            # A newer update landed meanwhile - its own refresh writes the derived fields
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+
+    return refreshed
+
+
+# =================================================================
+# READS
+# =================================================================
+
+def is_materialized(progress: Optional[Dict[str, Any]]) -> bool:
+    """Whether a progress item was built from the source tables (not just counter deltas)"""
+    return bool(progress) and all(field in progress for field in MATERIALIZED_FIELDS)
+
+
+def get_coach_progress(profile_id: str) -> Optional[Dict[str, Any]]:
+    """Fetch a coach's progress item (None if it does not exist yet)"""
+    response = get_table(get_progress_table_name()).get_item(Key={'profile_id': profile_id})
+    return response.get('Item')
+
+
+def get_materialized_progress(profile_id: str) -> Optional[Dict[str, Any]]:
+    """Coach's progress item, rebuilt from the source tables when missing or partial (None for unknown profiles)"""
+    progress = get_coach_progress(profile_id)
+    if not is_materialized(progress):
+        items = rebuild_coach_progress([profile_id])['items']
+        progress = items[0] if items else None
+    return progress
+
+
+def get_timeline_progress(profile_id: str, materialize: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    Timeline status for a coach from the progress projection
+
+    Args:
+        profile_id: Coach profile_id
+        materialize: Build the item from the source tables when it is missing
+                     or only holds counter deltas
+
+    Returns:
+        Dict with 'timeline_status', 'progress_summary' and 'progress' (the
+        raw item), or None if the coach has no materialized progress item
+    """
+    if not profile_id:
+        return None
+    progress = get_materialized_progress(profile_id) if materialize else get_coach_progress(profile_id)
+    if not is_materialized(progress):
+        return None
+
+    timeline_status, progress_summary = build_timeline(progress)
+    return {'timeline_status': timeline_status, 'progress_summary': progress_summary, 'progress': progress}
+
+
+# =================================================================
+# BACKFILL / REBUILD
+# =================================================================
+
+def _count(table_key: str, index_name: str, key_condition) -> int:
+    table = get_table(get_table_name(table_key))
+    return sum(page.get('Count', 0) for page in iter_query_pages(
+        table, IndexName=index_name, KeyConditionExpression=key_condition, Select='COUNT'
+    ))
+
+
+def compute_coach_progress(profile_id: str) -> Optional[Dict[str, Any]]:
+    """Recompute one coach's progress item from the source tables (GSI queries only; None if the profile does not exist)"""
+    profile = get_table(get_table_name('profiles')).get_item(Key={'profile_id': profile_id}).get('Item')
+    if profile is None:
+        return None
+
+    check = None
+    for page in iter_query_pages(get_table(get_table_name('background_checks')),
+                                 IndexName='coach-id-index',
+                                 KeyConditionExpression=Key('coach_id').eq(profile_id)):
+        for item in page.get('Items', []):
+            if check is None or item.get('created_at', '') > check.get('created_at', ''):
+                check = item
+
+    return _progress_item(profile_id, profile, check, {
+        'events_created': _count('events', 'coach-events-index', Key('coach_id').eq(profile_id)),
+        'invitations_sent': _count('parent_invitations', 'coach-id-index', Key('coach_id').eq(profile_id)),
+        'students_enrolled': _count('enrollments', 'coach-id-index',
+                                    Key('coach_id').eq(profile_id) & Key('enrollment_status').eq('enrolled'))
+    })
+
+
+def _progress_item(profile_id: str, profile: Optional[Dict[str, Any]], check: Optional[Dict[str, Any]],
+                   counters: Dict[str, int]) -> Dict[str, Any]:
+    item = {
+        'profile_id': profile_id,
+        'email': ((profile or {}).get('email') or '').lower(),
+        'onboarding': onboarding_step(profile),
+        'bootcamp_completion': bootcamp_step(profile),
+        'background_check': background_check_step(check),
+        'events_created': counters.get('events_created', 0),
+        'invitations_sent': counters.get('invitations_sent', 0),
+        'students_enrolled': counters.get('students_enrolled', 0),
+        'revision': 0,
+        'updated_at': datetime.now(timezone.utc).isoformat()
+    }
+    item.update(_derived_fields(item))
+    return item
+
+
+def _count_by_coach(items: Iterable[Dict[str, Any]], counts: Dict[str, int]) -> None:
+    for item in items:
+        coach_id = item.get('coach_id')
+        if coach_id:
+            counts[coach_id] = counts.get(coach_id, 0) + 1
+
+
+def rebuild_coach_progress(profile_ids: Optional[List[str]] = None, total_segments: int = 4) -> Dict[str, Any]:
+    """
+    Recompute and overwrite progress items (drift repair / backfill)
+
+    With profile_ids, each coach is recomputed from GSI queries (profiles
+    that do not exist are skipped, not written). Without,
+    every source table is read once with a parallel segmented scan and all
+    items are rewritten; items for profiles that no longer exist are deleted.
+    Stream updates that land while a full rebuild runs may be overwritten -
+    run again if exact counts matter.
+
+    Args:
+        profile_ids: Coaches to rebuild (all when omitted)
+        total_segments: Parallel scan segments per source table (full rebuild)
+
+    Returns:
+        Dict with rebuild summary ('success', 'failed' counts unwritten
+        items) and the rebuilt 'items'
+
+    Raises:
+        BatchOperationError: If a profile_ids rebuild could not store every item
+    """
+    table = get_table(get_progress_table_name())
+
+    if profile_ids:
+        items = [item for item in map(compute_coach_progress, profile_ids) if item is not None]
+        result = batch_write_items(table, items)
+        if not result['success']:
+            # Callers serve the returned items - never hand back progress that was not stored
+            raise BatchOperationError(f"Coach progress rebuild failed: {result['error']}", result)
+        logger.info(f"Rebuilt coach progress for {len(items)} coaches")
+        return {'success': True, 'progress_items': len(items), 'stale_removed': 0, 'failed': 0, 'items': items}
+
+    def scan(table_key: str, projection: List[str]):
+        return parallel_scan_items(get_table(get_table_name(table_key)), total_segments, projection)
+
+    profiles = {item['profile_id']: item for item in scan(
+        'profiles', ['profile_id', 'email', 'first_name', 'last_name', 'school_name', 'onboarding_completed',
+                     'onboarding_complete', 'onboarding_progress', 'bootcamp_progress'])}
+
+    checks: Dict[str, Dict[str, Any]] = {}
+    for item in scan('background_checks', ['coach_id', 'checkr_status', 'created_at', 'completed_at']):
+        coach_id = item.get('coach_id')
+        if coach_id and item.get('created_at', '') >= checks.get(coach_id, {}).get('created_at', ''):
+            checks[coach_id] = item
+
+    events: Dict[str, int] = {}
+    invitations: Dict[str, int] = {}
+    enrolled: Dict[str, int] = {}
+    _count_by_coach(scan('events', ['coach_id']), events)
+    _count_by_coach(scan('parent_invitations', ['coach_id']), invitations)
+    _count_by_coach((item for item in scan('enrollments', ['coach_id', 'enrollment_status'])
+                     if item.get('enrollment_status') == 'enrolled'), enrolled)
+
+    items = [
+        _progress_item(profile_id, profile, checks.get(profile_id), {
+            'events_created': events.get(profile_id, 0),
+            'invitations_sent': invitations.get(profile_id, 0),
+            'students_enrolled': enrolled.get(profile_id, 0)
+        })
+        for profile_id, profile in profiles.items()
+    ]
+
+    existing_ids = set()
+    for response in iter_scan_pages(table, projection=['profile_id']):
+        existing_ids.update(item['profile_id'] for item in response.get('Items', []))
+    stale_ids = existing_ids - set(profiles)
+
+    written = batch_write_items(table, items)
+    removed = batch_write_items(table, [{'profile_id': profile_id} for profile_id in stale_ids], operation='delete')
+    failed = written['failed'] + removed['failed']
+
+    if failed:
+        logger.error(f"❌ Coach progress rebuild incomplete: {written['failed']} writes and "
+                     f"{removed['failed']} stale deletes failed - run the rebuild again")
+    logger.info(f"Rebuilt {written['written']} coach progress items ({removed['written']} stale removed)")
+    return {
+        'success': failed == 0,
+        'progress_items': written['written'],
+        'stale_removed': removed['written'],
+        'failed': failed,
+        'items': items
+    }
@@ -57,6 +57,7 @@ class TSAConfig:
             'coach-onboarding-sessions': f'coach-onboarding-sessions-{self.stage}',
             'background-checks': f'background-checks-{self.stage}',
             'legal-requirements': f'legal-requirements-{self.stage}',
+            'coach-progress': f'coach-progress-{self.stage}',
             'eventbrite-config': f'eventbrite-config-{self.stage}',
             'event-attendees': f'event-attendees-{self.stage}',
             
@@ -117,6 +118,7 @@ class TSAConfig:
             'admin_audit_health': self.get_lambda_name('admin', 'audit-health'),
             'admin_coaches': self.get_lambda_name('admin', 'coaches'),
             'admin_audit': self.get_lambda_name('admin', 'audit'),
+            'admin_metrics_aggregator': self.get_lambda_name('admin', 'metrics-aggregator'),
             
             # Coach service
             'coach_onboard': self.get_lambda_name('coach', 'onboard'),
@@ -126,6 +128,9 @@ class TSAConfig:
             'coach_invitations': self.get_lambda_name('coach', 'invitations'),
             'coach_eventbrite_oauth': self.get_lambda_name('coach', 'eventbrite-oauth'),
             'coach_onboarding': self.get_lambda_name('coach', 'onboarding'),
+            'coach_progress_projector': self.get_lambda_name('coach', 'progress-projector'),
+            'coach_eventbrite_sync': self.get_lambda_name('coach', 'eventbrite-sync'),
+            'coach_principal_authorizer': self.get_lambda_name('coach', 'principal-authorizer'),
             
             # Parent service
             'parent_dashboard': self.get_lambda_name('parent', 'dashboard'),
@@ -3,10 +3,17 @@ Database Utilities - Centralized DynamoDB access for TSA services
 
 Provides consistent table naming, connection handling, and timestamp utilities
 """
-import boto3
 import os
+import time
+import queue
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Any
+from decimal import Decimal
+from typing import Optional, Any, Dict, List, Iterator, Tuple
+from botocore.exceptions import ClientError
+from .aws_clients import get_table
 
 
 def get_table_name(table_key: str) -> str:
@@ -45,12 +52,13 @@ def get_table_name(table_key: str) -> str:
     return table_name
 
 
-def get_dynamodb_table(table_name: str):
+def get_dynamodb_table(table_name: str, validate: bool = False):
     """
-    Get DynamoDB table resource with error handling
+    Get DynamoDB table resource from the container-scoped pool
     
     Args:
         table_name: Full DynamoDB table name
+        validate: Verify the table exists (DescribeTable, cached per container)
         
     Returns:
         DynamoDB Table resource
@@ -59,13 +67,7 @@ def get_dynamodb_table(table_name: str):
         Exception: If table access fails
     """
     try:
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(table_name)
-        
-        # Verify table exists by loading metadata
-        table.load()
-        
-        return table
+        return get_table(table_name, validate=validate)
         
     except Exception as e:
         print(f"❌ Error accessing DynamoDB table '{table_name}': {str(e)}")
@@ -93,195 +95,567 @@ def get_current_timestamp() -> str:
     return get_current_time()
 
 
-def batch_get_items(table, keys: list, consistent_read: bool = False) -> list:
+# =================================================================
+# BATCH I/O
+# =================================================================
+
+# DynamoDB request limits
+BATCH_GET_LIMIT = 100
+BATCH_WRITE_LIMIT = 25
+
+# Error codes worth retrying for a whole batch request
+RETRYABLE_BATCH_ERRORS = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+    'InternalServerError',
+    'ServiceUnavailable'
+}
+
+
+class BatchOperationError(Exception):
+    """Raised when a batch operation cannot complete (non-retryable error or retries exhausted)"""
+    
+    def __init__(self, message: str, result: Optional[Dict[str, Any]] = None):
+        super().__init__(message)
+        self.result = result or {}
+
+
+def _table_client(table):
     """
-    Batch get items from DynamoDB with error handling
+    Thread-safe low-level client behind a Table resource
+    
+    boto3 resources must not be shared across threads, but their client is a
+    regular (thread-safe) botocore client that still accepts and returns
+    native Python values and condition objects. Concurrent workers call it
+    with TableName instead of using Table / ServiceResource actions.
+    """
+    return table.meta.client
+
+
+def _backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """Full-jitter exponential backoff"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def _add_capacity(total: Dict[str, float], consumed: Optional[List[Dict[str, Any]]]) -> None:
+    for entry in consumed or []:
+        total[entry['TableName']] = total.get(entry['TableName'], 0.0) + float(entry.get('CapacityUnits', 0))
+
+
+def _canonical_value(value: Any) -> Any:
+    """
+    Comparable form of an attribute value
+
+    UnprocessedItems come back deserialized (numbers as Decimal, binary as
+    Binary), so numbers are normalized and sets sorted before comparing
+    them with the native values that were sent.
+    """
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float, Decimal)):
+        return ('N', str(Decimal(str(value)).normalize()))
+    if isinstance(value, (bytes, bytearray)):
+        return ('B', bytes(value))
+    if hasattr(value, 'value') and isinstance(getattr(value, 'value'), (bytes, bytearray)):
+        return ('B', bytes(value.value))
+    if isinstance(value, dict):
+        return ('M', tuple(sorted((str(k), _canonical_value(v)) for k, v in value.items())))
+    if isinstance(value, (set, frozenset)):
+        return ('S', tuple(sorted((_canonical_value(v) for v in value), key=repr)))
+    if isinstance(value, (list, tuple)):
+        return ('L', tuple(_canonical_value(v) for v in value))
+    return ('?', str(value))
+
+
+def _request_marker(request: Dict[str, Any]) -> Any:
+    """Hashable marker matching a write request to its UnprocessedItems entry"""
+    return _canonical_value(request)
+
+
+def _run_with_retries(request_items: Dict[str, Any], call, unprocessed_field: str,
+                      max_retries: int, base_delay: float, max_delay: float) -> Dict[str, Any]:
+    """
+    Send one batch request, re-sending unprocessed entries with jittered backoff
+    
+    Returns:
+        Dict with responses, leftover unprocessed entries, consumed capacity and retry count
+    """
+    responses: Dict[str, List[Dict[str, Any]]] = {}
+    capacity: Dict[str, float] = {}
+    retries = 0
+    pending = request_items
+    
+    for attempt in range(max_retries + 1):
+        try:
+            response = call(RequestItems=pending, ReturnConsumedCapacity='TOTAL')
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') not in RETRYABLE_BATCH_ERRORS or attempt == max_retries:
+                raise
+            retries += 1
+            time.sleep(_backoff_delay(attempt, base_delay, max_delay))
+            continue
+        
+        for table_name, items in response.get('Responses', {}).items():
+            responses.setdefault(table_name, []).extend(items)
+        _add_capacity(capacity, response.get('ConsumedCapacity'))
+        
+        pending = response.get(unprocessed_field) or {}
+        if not pending:
+            break
+        if attempt < max_retries:
+            retries += 1
+            time.sleep(_backoff_delay(attempt, base_delay, max_delay))
+    
+    return {'responses': responses, 'unprocessed': pending, 'consumed_capacity': capacity, 'retries': retries}
+
+
+def batch_get_items(table, keys: list, consistent_read: bool = False,
+                    projection: Optional[List[str]] = None, max_in_flight: int = 4,
+                    max_retries: int = 8, base_delay: float = 0.05, max_delay: float = 5.0,
+                    return_details: bool = False):
+    """
+    Batch get items from DynamoDB, retrying UnprocessedKeys
+    
+    Keys are de-duplicated (BatchGetItem rejects duplicates), split into
+    100-key chunks and fetched with up to max_in_flight chunks concurrently.
     
     Args:
         table: DynamoDB table resource
         keys: List of key dictionaries
         consistent_read: Whether to use consistent reads
+        projection: Optional attribute names to return (must include key attributes to match results)
+        max_in_flight: Concurrent chunk requests
+        max_retries: Retries per chunk for unprocessed keys / throttling
+        base_delay: Backoff base in seconds
+        max_delay: Backoff cap in seconds
+        return_details: Return a result dict instead of the item list
         
     Returns:
-        List of items found
+        List of items found, or with return_details a dict with items,
+        unprocessed_keys, consumed_capacity and retries
+        
+    Raises:
+        BatchOperationError: If keys are still unprocessed after retries or a request fails
     """
+    result = {'items': [], 'unprocessed_keys': [], 'consumed_capacity': {}, 'retries': 0}
+    if not keys:
+        return result if return_details else []
+    
+    unique_keys = []
+    seen = set()
+    for key in keys:
+        marker = tuple(sorted((name, str(value)) for name, value in key.items()))
+        if marker not in seen:
+            seen.add(marker)
+            unique_keys.append(key)
+    
+    table_name = table.table_name
+    request_template = {'ConsistentRead': consistent_read}
+    _apply_projection(request_template, projection)
+    client = _table_client(table)
+    
+    def fetch_chunk(chunk_keys: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return _run_with_retries(
+            {table_name: {**request_template, 'Keys': chunk_keys}},
+            client.batch_get_item, 'UnprocessedKeys', max_retries, base_delay, max_delay
+        )
+    
+    chunks = [unique_keys[i:i + BATCH_GET_LIMIT] for i in range(0, len(unique_keys), BATCH_GET_LIMIT)]
     try:
-        if not keys:
-            return []
-        
-        # DynamoDB batch_get_item has 100 item limit
-        items = []
-        for i in range(0, len(keys), 100):
-            batch_keys = keys[i:i+100]
-            
-            response = table.batch_get_item(
-                RequestItems={
-                    table.table_name: {
-                        'Keys': batch_keys,
-                        'ConsistentRead': consistent_read
-                    }
-                }
-            )
-            
-            items.extend(response.get('Responses', {}).get(table.table_name, []))
-        
-        return items
-        
-    except Exception as e:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(chunks)))) as executor:
+            for chunk_result in executor.map(fetch_chunk, chunks):
+                result['items'].extend(chunk_result['responses'].get(table_name, []))
+                result['unprocessed_keys'].extend(chunk_result['unprocessed'].get(table_name, {}).get('Keys', []))
+                for name, units in chunk_result['consumed_capacity'].items():
+                    result['consumed_capacity'][name] = result['consumed_capacity'].get(name, 0.0) + units
+                result['retries'] += chunk_result['retries']
+    except ClientError as e:
         print(f"❌ Error in batch get items: {str(e)}")
-        return []
+        raise BatchOperationError(f"Batch get failed: {str(e)}", result)
+    
+    if result['unprocessed_keys']:
+        print(f"⚠️ Batch get left {len(result['unprocessed_keys'])} keys unprocessed after retries")
+        if not return_details:
+            raise BatchOperationError(f"{len(result['unprocessed_keys'])} keys unprocessed after retries", result)
+    
+    return result if return_details else result['items']
 
 
-def batch_write_items(table, items: list, operation: str = 'put') -> dict:
+def batch_write_items(table, items: list, operation: str = 'put', max_in_flight: int = 4,
+                      max_retries: int = 8, base_delay: float = 0.05, max_delay: float = 5.0) -> dict:
     """
-    Batch write items to DynamoDB with error handling
+    Batch write items to DynamoDB, retrying UnprocessedItems
+    
+    Items are split into 25-item chunks, written with up to max_in_flight
+    chunks concurrently, and unprocessed items are retried with full-jitter
+    exponential backoff. A chunk must not contain the same key twice.
     
     Args:
         table: DynamoDB table resource
-        items: List of items to write
+        items: List of items to write (keys for 'delete')
         operation: 'put' or 'delete'
+        max_in_flight: Concurrent chunk requests
+        max_retries: Retries per chunk for unprocessed items / throttling
+        base_delay: Backoff base in seconds
+        max_delay: Backoff cap in seconds
         
     Returns:
-        Dict with success status and any unprocessed items
+        Dict with success status, per-item results, written/failed counts,
+        unprocessed items, consumed capacity and retries
     """
-    try:
-        if not items:
-            return {'success': True, 'unprocessed_items': []}
-        
-        unprocessed_items = []
-        
-        # DynamoDB batch_write_item has 25 item limit
-        for i in range(0, len(items), 25):
-            batch_items = items[i:i+25]
-            
-            # Format items for batch write
-            request_items = []
-            for item in batch_items:
-                if operation == 'put':
-                    request_items.append({'PutRequest': {'Item': item}})
-                elif operation == 'delete':
-                    request_items.append({'DeleteRequest': {'Key': item}})
-            
-            response = table.batch_write_item(
-                RequestItems={
-                    table.table_name: request_items
-                }
+    if operation not in ('put', 'delete'):
+        raise ValueError(f"Unsupported batch write operation: {operation}")
+    
+    result = {
+        'success': True,
+        'written': 0,
+        'failed': 0,
+        'results': [],
+        'unprocessed_items': [],
+        'consumed_capacity': {},
+        'retries': 0
+    }
+    if not items:
+        return result
+    
+    table_name = table.table_name
+    client = _table_client(table)
+    
+    def to_request(item: Dict[str, Any]) -> Dict[str, Any]:
+        if operation == 'put':
+            return {'PutRequest': {'Item': item}}
+        return {'DeleteRequest': {'Key': item}}
+    
+    def write_chunk(indexed_chunk: List[Tuple[int, Dict[str, Any]]]) -> Dict[str, Any]:
+        requests = [to_request(item) for _, item in indexed_chunk]
+        try:
+            chunk_result = _run_with_retries(
+                {table_name: requests}, client.batch_write_item,
+                'UnprocessedItems', max_retries, base_delay, max_delay
             )
+        except ClientError as e:
+            return {'error': str(e), 'indexes': [index for index, _ in indexed_chunk]}
+        
+        leftover = chunk_result['unprocessed'].get(table_name, [])
+        leftover_markers = {_request_marker(request) for request in leftover}
+        failed_indexes = [
+            index for (index, _), request in zip(indexed_chunk, requests)
+            if _request_marker(request) in leftover_markers
+        ]
+        return {**chunk_result, 'leftover': leftover, 'failed_indexes': failed_indexes,
+                'indexes': [index for index, _ in indexed_chunk]}
+    
+    indexed = list(enumerate(items))
+    chunks = [indexed[i:i + BATCH_WRITE_LIMIT] for i in range(0, len(indexed), BATCH_WRITE_LIMIT)]
+    statuses: Dict[int, Dict[str, Any]] = {}
+    
+    with ThreadPoolExecutor(max_workers=max(1, min(max_in_flight, len(chunks)))) as executor:
+        for chunk_result in executor.map(write_chunk, chunks):
+            if 'error' in chunk_result:
+                print(f"❌ Error in batch write items: {chunk_result['error']}")
+                for index in chunk_result['indexes']:
+                    statuses[index] = {'index': index, 'status': 'failed', 'error': chunk_result['error']}
+                continue
             
-            # Collect any unprocessed items
-            unprocessed = response.get('UnprocessedItems', {}).get(table.table_name, [])
-            unprocessed_items.extend(unprocessed)
+            failed = set(chunk_result['failed_indexes'])
+            for index in chunk_result['indexes']:
+                if index in failed:
+                    statuses[index] = {'index': index, 'status': 'failed', 'error': 'Unprocessed after retries'}
+                else:
+                    statuses[index] = {'index': index, 'status': 'written'}
+            result['unprocessed_items'].extend(chunk_result['leftover'])
+            for name, units in chunk_result['consumed_capacity'].items():
+                result['consumed_capacity'][name] = result['consumed_capacity'].get(name, 0.0) + units
+            result['retries'] += chunk_result['retries']
+    
+    result['results'] = [statuses[index] for index in range(len(items))]
+    result['written'] = sum(1 for status in result['results'] if status['status'] == 'written')
+    result['failed'] = len(items) - result['written']
+    result['success'] = result['failed'] == 0
+    if not result['success']:
+        result['error'] = f"{result['failed']} of {len(items)} items failed"
+    
+    return result
+
+
+# =================================================================
+# PAGINATED ITERATORS
+# =================================================================
+
+def _apply_projection(request_kwargs: Dict[str, Any], projection: Optional[List[str]]) -> Dict[str, Any]:
+    """Add a ProjectionExpression for attribute names (placeholders avoid reserved words)"""
+    if not projection:
+        return request_kwargs
+    names = dict(request_kwargs.get('ExpressionAttributeNames', {}))
+    placeholders = []
+    for i, attribute in enumerate(projection):
+        placeholder = f'#proj{i}'
+        names[placeholder] = attribute
+        placeholders.append(placeholder)
+    request_kwargs['ProjectionExpression'] = ', '.join(placeholders)
+    request_kwargs['ExpressionAttributeNames'] = names
+    return request_kwargs
+
+
+def _iter_pages(operation, start_key: Optional[Dict[str, Any]], max_pages: Optional[int],
+                request_kwargs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    page_count = 0
+    while True:
+        if start_key:
+            request_kwargs['ExclusiveStartKey'] = start_key
+        response = operation(**request_kwargs)
+        page_count += 1
+        start_key = response.get('LastEvaluatedKey')
+        yield response
+        if not start_key or (max_pages and page_count >= max_pages):
+            return
+
+
+def iter_query_pages(table, projection: Optional[List[str]] = None,
+                     start_key: Optional[Dict[str, Any]] = None,
+                     max_pages: Optional[int] = None, **query_kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Stream Query response pages one at a time
+    
+    Args:
+        table: DynamoDB table resource
+        projection: Optional attribute names to return
+        start_key: Resume from a previous page's LastEvaluatedKey
+        max_pages: Optional page cap (the last page's LastEvaluatedKey allows resuming)
+        **query_kwargs: Query parameters
         
+    Yields:
+        Raw Query responses (Items, LastEvaluatedKey, ScannedCount, ...)
+    """
+    request_kwargs = _apply_projection(dict(query_kwargs), projection)
+    request_kwargs['TableName'] = table.table_name
+    yield from _iter_pages(_table_client(table).query, start_key, max_pages, request_kwargs)
+
+
+def iter_scan_pages(table, segment: Optional[int] = None, total_segments: Optional[int] = None,
+                    projection: Optional[List[str]] = None,
+                    start_key: Optional[Dict[str, Any]] = None,
+                    max_pages: Optional[int] = None, **scan_kwargs) -> Iterator[Dict[str, Any]]:
+    """
+    Stream Scan response pages one at a time, optionally for a single segment
+    
+    Args:
+        table: DynamoDB table resource
+        segment: Segment number for a parallel scan
+        total_segments: Total segments for a parallel scan
+        projection: Optional attribute names to return
+        start_key: Resume from a previous page's LastEvaluatedKey
+        max_pages: Optional page cap (the last page's LastEvaluatedKey allows resuming)
+        **scan_kwargs: Scan parameters
+        
+    Yields:
+        Raw Scan responses (Items, LastEvaluatedKey, ScannedCount, ...)
+    """
+    request_kwargs = _apply_projection(dict(scan_kwargs), projection)
+    if total_segments:
+        request_kwargs['Segment'] = segment
+        request_kwargs['TotalSegments'] = total_segments
+    request_kwargs['TableName'] = table.table_name
+    # parallel_scan runs this on worker threads - go through the client, not the Table
+    yield from _iter_pages(_table_client(table).scan, start_key, max_pages, request_kwargs)
+
+
+class ScanCheckpoint:
+    """
+    Per-segment resume state for a parallel scan
+    
+    Each segment records the LastEvaluatedKey of the last page handed to the
+    consumer, or completion. Serialize with to_dict() between invocations and
+    pass from_dict() back into parallel_scan to resume.
+    """
+    
+    DONE = 'DONE'
+    
+    def __init__(self, total_segments: int, segments: Optional[Dict[int, Any]] = None):
+        self.total_segments = total_segments
+        self.segments: Dict[int, Any] = segments or {}
+    
+    def start_key(self, segment: int) -> Optional[Dict[str, Any]]:
+        key = self.segments.get(segment)
+        return None if key == self.DONE else key
+    
+    def is_segment_done(self, segment: int) -> bool:
+        return self.segments.get(segment) == self.DONE
+    
+    def advance(self, segment: int, last_evaluated_key: Optional[Dict[str, Any]]) -> None:
+        self.segments[segment] = last_evaluated_key or self.DONE
+    
+    @property
+    def is_complete(self) -> bool:
+        return all(self.is_segment_done(segment) for segment in range(self.total_segments))
+    
+    def to_dict(self) -> Dict[str, Any]:
         return {
-            'success': len(unprocessed_items) == 0,
-            'unprocessed_items': unprocessed_items
+            'total_segments': self.total_segments,
+            'segments': {str(segment): key for segment, key in self.segments.items()}
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ScanCheckpoint':
+        return cls(
+            data['total_segments'],
+            {int(segment): key for segment, key in data.get('segments', {}).items()}
+        )
+
+
+_SEGMENT_DONE = object()
+
+
+def parallel_scan(table, total_segments: int = 4, projection: Optional[List[str]] = None,
+                  checkpoint: Optional[ScanCheckpoint] = None, max_workers: Optional[int] = None,
+                  max_buffered_pages: Optional[int] = None,
+                  **scan_kwargs) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Parallel Segment/TotalSegments scan streamed as pages with bounded memory
+    
+    Segments are scanned on a thread pool. Workers hand pages to the consumer
+    through a bounded queue, so at most max_buffered_pages pages are held in
+    memory no matter how large the table is. The checkpoint is advanced only
+    after the consumer asks for the next page, so resuming from it never skips
+    a page that was not fully processed.
+    
+    Args:
+        table: DynamoDB table resource
+        total_segments: Number of scan segments
+        projection: Optional attribute names to return
+        checkpoint: Resume state (updated in place as pages are consumed)
+        max_workers: Thread count (defaults to total_segments)
+        max_buffered_pages: Queue bound (defaults to 2 x workers)
+        **scan_kwargs: Extra Scan parameters (FilterExpression, Limit, ...)
         
-    except Exception as e:
-        print(f"❌ Error in batch write items: {str(e)}")
-        return {'success': False, 'error': str(e)}
+    Yields:
+        (segment, items) per page
+    """
+    checkpoint = checkpoint or ScanCheckpoint(total_segments)
+    if checkpoint.total_segments != total_segments:
+        raise ValueError("Checkpoint was created with a different total_segments")
+    
+    pending_segments = [segment for segment in range(total_segments)
+                        if not checkpoint.is_segment_done(segment)]
+    if not pending_segments:
+        return
+    
+    workers = min(max_workers or total_segments, len(pending_segments))
+    pages: queue.Queue = queue.Queue(maxsize=max_buffered_pages or workers * 2)
+    stop = threading.Event()
+    
+    def put(message) -> bool:
+        while not stop.is_set():
+            try:
+                pages.put(message, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def scan_segment(segment: int) -> None:
+        try:
+            for response in iter_scan_pages(table, segment, total_segments, projection,
+                                            checkpoint.start_key(segment), **scan_kwargs):
+                if not put((segment, response.get('Items', []), response.get('LastEvaluatedKey'))):
+                    return
+        except Exception as e:
+            put((segment, e, None))
+            return
+        put((segment, _SEGMENT_DONE, None))
+    
+    executor = ThreadPoolExecutor(max_workers=workers)
+    for segment in pending_segments:
+        executor.submit(scan_segment, segment)
+    
+    remaining = len(pending_segments)
+    try:
+        while remaining:
+            segment, payload, last_evaluated_key = pages.get()
+            if payload is _SEGMENT_DONE:
+                remaining -= 1
+                continue
+            if isinstance(payload, Exception):
+                raise payload
+            yield segment, payload
+            checkpoint.advance(segment, last_evaluated_key)
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+
+
+def parallel_scan_items(table, total_segments: int = 4, projection: Optional[List[str]] = None,
+                        **kwargs) -> Iterator[Dict[str, Any]]:
+    """Flattened parallel_scan - yields individual items"""
+    for _, items in parallel_scan(table, total_segments, projection, **kwargs):
+        yield from items
 
 
-def query_with_pagination(table, **query_kwargs) -> dict:
+def query_with_pagination(table, max_pages: Optional[int] = None, **query_kwargs) -> dict:
     """
     Query DynamoDB with automatic pagination
     
     Args:
         table: DynamoDB table resource
+        max_pages: Optional page cap; LastEvaluatedKey is returned when it is hit
         **query_kwargs: Query parameters
         
     Returns:
         Dict with all items and pagination info
     """
     try:
-        all_items = []
-        last_evaluated_key = None
-        page_count = 0
-        
-        while True:
-            # Add pagination key if we have one
-            if last_evaluated_key:
-                query_kwargs['ExclusiveStartKey'] = last_evaluated_key
-            
-            response = table.query(**query_kwargs)
-            
-            # Add items from this page
-            items = response.get('Items', [])
-            all_items.extend(items)
-            page_count += 1
-            
-            # Check if there are more pages
-            last_evaluated_key = response.get('LastEvaluatedKey')
-            if not last_evaluated_key:
-                break
-            
-            # Safety check to prevent infinite loops
-            if page_count > 100:
-                print("⚠️ Query pagination exceeded 100 pages, stopping")
-                break
-        
-        return {
-            'Items': all_items,
-            'Count': len(all_items),
-            'PageCount': page_count,
-            'ScannedCount': response.get('ScannedCount', 0)
-        }
-        
+        return _collect_pages(iter_query_pages(table, max_pages=max_pages, **query_kwargs))
     except Exception as e:
         print(f"❌ Error in paginated query: {str(e)}")
         return {'Items': [], 'Count': 0, 'PageCount': 0, 'ScannedCount': 0}
 
 
-def scan_with_pagination(table, **scan_kwargs) -> dict:
+def scan_with_pagination(table, max_pages: Optional[int] = None, **scan_kwargs) -> dict:
     """
     Scan DynamoDB with automatic pagination
     
+    Prefer iter_scan_pages / parallel_scan for large tables - this helper
+    holds every item in memory.
+    
     Args:
         table: DynamoDB table resource
+        max_pages: Optional page cap; LastEvaluatedKey is returned when it is hit
         **scan_kwargs: Scan parameters
         
     Returns:
         Dict with all items and pagination info
     """
     try:
-        all_items = []
-        last_evaluated_key = None
-        page_count = 0
-        
-        while True:
-            # Add pagination key if we have one
-            if last_evaluated_key:
-                scan_kwargs['ExclusiveStartKey'] = last_evaluated_key
-            
-            response = table.scan(**scan_kwargs)
-            
-            # Add items from this page
-            items = response.get('Items', [])
-            all_items.extend(items)
-            page_count += 1
-            
-            # Check if there are more pages
-            last_evaluated_key = response.get('LastEvaluatedKey')
-            if not last_evaluated_key:
-                break
-            
-            # Safety check to prevent infinite loops
-            if page_count > 100:
-                print("⚠️ Scan pagination exceeded 100 pages, stopping")
-                break
-        
-        return {
-            'Items': all_items,
-            'Count': len(all_items),
-            'PageCount': page_count,
-            'ScannedCount': response.get('ScannedCount', 0)
-        }
-        
+        return _collect_pages(iter_scan_pages(table, max_pages=max_pages, **scan_kwargs))
     except Exception as e:
         print(f"❌ Error in paginated scan: {str(e)}")
         return {'Items': [], 'Count': 0, 'PageCount': 0, 'ScannedCount': 0}
 
 
+def _collect_pages(pages: Iterator[Dict[str, Any]]) -> dict:
+    all_items = []
+    page_count = 0
+    scanned_count = 0
+    last_evaluated_key = None
+    
+    for response in pages:
+        all_items.extend(response.get('Items', []))
+        page_count += 1
+        scanned_count += response.get('ScannedCount', 0)
+        last_evaluated_key = response.get('LastEvaluatedKey')
+    
+    result = {
+        'Items': all_items,
+        'Count': len(all_items),
+        'PageCount': page_count,
+        'ScannedCount': scanned_count
+    }
+    if last_evaluated_key:
+        result['LastEvaluatedKey'] = last_evaluated_key
+    return result
+
+
 def check_table_health(table_name: str) -> dict:
     """
     Check if a DynamoDB table is accessible and healthy
@@ -295,7 +669,8 @@ def check_table_health(table_name: str) -> dict:
     try:
         table = get_dynamodb_table(table_name)
         
-        # Get table metadata
+        # Get fresh table metadata
+        table.reload()
         table_status = table.table_status
         item_count = table.item_count
         
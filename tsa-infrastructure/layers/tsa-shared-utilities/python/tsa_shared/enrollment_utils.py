@@ -9,6 +9,8 @@ from datetime import datetime
 from typing import Dict, Any, List, Optional
 from .config import get_config
 from .response_utils import get_current_timestamp, create_response
+from .aws_clients import get_client, get_table
+from .secrets import get_secret
 
 logger = logging.getLogger(__name__)
 config = get_config()
@@ -251,7 +253,6 @@ def process_document_upload(file_data: bytes, enrollment_id: str, document_type:
         Upload result with S3 URL if successful
     """
     try:
-        import boto3
         import os
         
         # Validate inputs
@@ -270,7 +271,7 @@ def process_document_upload(file_data: bytes, enrollment_id: str, document_type:
         s3_key = f"enrollments/{enrollment_id}/{document_type}_{timestamp}.pdf"
         
         # Upload to S3
-        s3_client = boto3.client('s3')
+        s3_client = get_client('s3')
         s3_client.put_object(
             Bucket=bucket_name,
             Key=s3_key,
@@ -319,7 +320,6 @@ def validate_invitation_token(token: str) -> Dict[str, Any]:
         Validation result with token details if valid
     """
     try:
-        import boto3
         import os
         
         if not token:
@@ -332,8 +332,7 @@ def validate_invitation_token(token: str) -> Dict[str, Any]:
         stage = os.environ.get('STAGE', 'dev')
         table_name = config.get_table_name('invitations', stage)
         
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(table_name)
+        table = get_table(table_name)
         
         # Look up invitation by token
         response = table.scan(
@@ -457,7 +456,6 @@ def log_enrollment_event(enrollment_id: str, event_type: str, event_data: Dict[s
         context: Lambda context for request ID
     """
     try:
-        import boto3
         import os
         
         log_entry = {
@@ -476,8 +474,7 @@ def log_enrollment_event(enrollment_id: str, event_type: str, event_data: Dict[s
         stage = os.environ.get('STAGE', 'dev')
         table_name = config.get_table_name('enrollment-logs', stage)
         
-        dynamodb = boto3.resource('dynamodb')
-        table = dynamodb.Table(table_name)
+        table = get_table(table_name)
         
         table.put_item(Item=log_entry)
         
@@ -490,20 +487,16 @@ def log_enrollment_event(enrollment_id: str, event_type: str, event_data: Dict[s
 # DATABASE UTILITIES
 # =================================================================
 
-def get_database_secret() -> Dict[str, Any]:
-    """Get database credentials from AWS Secrets Manager"""
+def get_database_secret(force_refresh: bool = False) -> Dict[str, Any]:
+    """Get database credentials from AWS Secrets Manager (cached per container)"""
     try:
-        import boto3
         import os
         
         secret_arn = os.environ.get('DB_SECRET_ARN')
         if not secret_arn:
             raise ValueError("DB_SECRET_ARN environment variable not set")
         
-        secrets_client = boto3.client('secretsmanager')
-        response = secrets_client.get_secret_value(SecretId=secret_arn)
-        
-        return json.loads(response['SecretString'])
+        return get_secret(secret_arn, force_refresh=force_refresh)
         
     except Exception as e:
         logger.error(f"Error retrieving database secret: {str(e)}")
@@ -511,12 +504,9 @@ def get_database_secret() -> Dict[str, Any]:
 
 
 def get_dynamodb_table(table_name: str):
-    """Get DynamoDB table resource with error handling"""
+    """Get pooled DynamoDB table resource with error handling"""
     try:
-        import boto3
-        
-        dynamodb = boto3.resource('dynamodb')
-        return dynamodb.Table(table_name)
+        return get_table(table_name)
     except Exception as e:
         logger.error(f"Error getting DynamoDB table {table_name}: {str(e)}")
         raise 
\ No newline at end of file
@@ -0,0 +1,272 @@
+"""
+Cognito JWT Verification for TSA Platform
+Verifies RS256 signatures locally against the user pool's JWKS
+
+The JWKS is downloaded once per container and re-fetched (rate limited)
+when a token names an unknown key ID, which covers key rotation. Verified
+claims are memoized by token hash until the token expires, so repeated
+requests with the same token skip signature verification entirely.
+"""
+import hashlib
+import json
+import os
+import time
+import logging
+import threading
+import urllib.request
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+JWKS_FETCH_TIMEOUT_SECONDS = 3
+# Minimum time between JWKS downloads per issuer (bounds refetches for unknown kids)
+JWKS_MIN_REFRESH_SECONDS = int(os.environ.get('JWKS_MIN_REFRESH_SECONDS', '60'))
+# Backoff after a failed JWKS download (short, so a blip does not reject every token for a minute)
+JWKS_ERROR_RETRY_SECONDS = float(os.environ.get('JWKS_ERROR_RETRY_SECONDS', '1'))
+# Clock skew tolerated on exp / iat
+JWT_LEEWAY_SECONDS = 30
+ALLOWED_TOKEN_USES = ('id', 'access')
+
+
+def _configured_values(*names: str) -> List[str]:
+    values = []
+    for name in names:
+        for value in os.environ.get(name, '').split(','):
+            value = value.strip()
+            if value and value not in values:
+                values.append(value)
+    return values
+
+
+def get_trusted_issuers() -> List[str]:
+    """Issuer URLs for the configured Cognito user pools"""
+    issuers = []
+    for pool_id in _configured_values('USER_POOL_ID', 'AUTH_USER_POOL_ID', 'COGNITO_USER_POOL_IDS'):
+        region = pool_id.split('_', 1)[0]
+        issuers.append(f"https://cognito-idp.{region}.amazonaws.com/{pool_id}")
+    return issuers
+
+
+def get_trusted_client_ids() -> List[str]:
+    """App client IDs tokens must be issued to (no audience check when none are configured)"""
+    return _configured_values('CLIENT_ID', 'COGNITO_CLIENT_IDS')
+
+
+# =================================================================
+# JWKS CACHE
+# =================================================================
+
+class _JwksCache:
+    """Public signing keys per issuer, fetched lazily and refreshed on unknown kids"""
+
+    def __init__(self, min_refresh_seconds: int, error_retry_seconds: float):
+        self.min_refresh_seconds = min_refresh_seconds
+        self.error_retry_seconds = error_retry_seconds
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        # Earliest time (monotonic) the next download for an issuer may start
+        self._next_fetch_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.counters = {'fetches': 0, 'fetch_errors': 0, 'unknown_kids': 0}
+
+    def _fetch(self, issuer: str) -> None:
+        import jwt
+
+        self.counters['fetches'] += 1
+        with urllib.request.urlopen(f"{issuer}/.well-known/jwks.json", timeout=JWKS_FETCH_TIMEOUT_SECONDS) as response:
+            jwks = json.loads(response.read())
+
+        keys = {}
+        for jwk in jwks.get('keys', []):
+            if jwk.get('kid') and jwk.get('kty') == 'RSA':
+                keys[jwk['kid']] = jwt.PyJWK(jwk, algorithm='RS256').key
+        self._keys[issuer] = keys
+
+    def get_key(self, issuer: str, kid: str):
+        """Public key for (issuer, kid), or None if the issuer does not publish it"""
+        with self._lock:
+            key = self._keys.get(issuer, {}).get(kid)
+            if key is not None:
+                return key
+
+            if issuer in self._keys:
+                self.counters['unknown_kids'] += 1
+            if time.monotonic() < self._next_fetch_at.get(issuer, 0):
+                return None
+
+            try:
+                self._fetch(issuer)
+            except Exception as e:
+                self.counters['fetch_errors'] += 1
+                self._next_fetch_at[issuer] = time.monotonic() + self.error_retry_seconds
+                logger.error(f"❌ Error fetching JWKS for {issuer}: {str(e)}")
+                return None
+            self._next_fetch_at[issuer] = time.monotonic() + self.min_refresh_seconds
+            return self._keys.get(issuer, {}).get(kid)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys.clear()
+            self._next_fetch_at.clear()
+            for counter in self.counters:
+                self.counters[counter] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'issuers': len(self._keys)}
+
+
+# =================================================================
+# VERIFIED CLAIMS CACHE
+# =================================================================
+
+class _ClaimsCache:
+    """Thread-safe LRU of verified claims by token hash, each entry valid until the token's exp"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[float, Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'verified': 0, 'rejected': 0}
+
+    def get(self, token_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token_hash)
+            if entry is None or entry[0] <= time.time():
+                self._entries.pop(token_hash, None)
+                self.counters['misses'] += 1
+                return None
+            self._entries.move_to_end(token_hash)
+            self.counters['hits'] += 1
+            return entry[1]
+
+    def put(self, token_hash: str, expires_at: float, claims: Dict[str, Any]) -> None:
+        with self._lock:
+            self.counters['verified'] += 1
+            self._entries[token_hash] = (expires_at, claims)
+            self._entries.move_to_end(token_hash)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for counter in self.counters:
+                self.counters[counter] = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, 'entries': len(self._entries), 'max_entries': self.max_entries}
+
+
+# Module-level caches survive across warm Lambda invocations
+_jwks_cache = _JwksCache(min_refresh_seconds=JWKS_MIN_REFRESH_SECONDS, error_retry_seconds=JWKS_ERROR_RETRY_SECONDS)
+_claims_cache = _ClaimsCache(max_entries=int(os.environ.get('JWT_CLAIMS_CACHE_MAX_ENTRIES', '2048')))
+
+
+# =================================================================
+# VERIFICATION
+# =================================================================
+
+def _verify(token: str) -> Optional[Dict[str, Any]]:
+    import jwt
+
+    header = jwt.get_unverified_header(token)
+    if header.get('alg') != 'RS256' or not header.get('kid'):
+        logger.info("⚠️ JWT is not an RS256 token with a key ID")
+        return None
+
+    # The issuer only selects which JWKS to check against - it is verified below
+    issuer = jwt.decode(token, options={'verify_signature': False}).get('iss')
+    if issuer not in get_trusted_issuers():
+        logger.info(f"⚠️ JWT issuer is not trusted: {issuer}")
+        return None
+
+    key = _jwks_cache.get_key(issuer, header['kid'])
+    if key is None:
+        logger.info(f"⚠️ No signing key {header['kid']} for issuer {issuer}")
+        return None
+
+    claims = jwt.decode(
+        token,
+        key,
+        algorithms=['RS256'],
+        issuer=issuer,
+        leeway=JWT_LEEWAY_SECONDS,
+        options={'verify_aud': False, 'require': ['exp', 'iss']}
+    )
+
+    token_use = claims.get('token_use')
+    if token_use not in ALLOWED_TOKEN_USES:
+        logger.info(f"⚠️ Unsupported JWT token_use: {token_use}")
+        return None
+
+    # ID tokens carry the app client in aud, access tokens in client_id
+    client_ids = get_trusted_client_ids()
+    token_client = claims.get('aud') if token_use == 'id' else claims.get('client_id')
+    if client_ids and token_client not in client_ids:
+        logger.info(f"⚠️ JWT was issued to an untrusted client: {token_client}")
+        return None
+
+    return claims
+
+
+def verify_cognito_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify a Cognito ID or access token and return its claims
+
+    Args:
+        token: Encoded JWT (without the 'Bearer ' prefix)
+
+    Returns:
+        Verified claims (treat as read-only), or None if the token is invalid,
+        expired, or not issued by a configured user pool
+    """
+    if not token or token.count('.') != 2:
+        return None
+
+    token_hash = hashlib.sha256(token.encode()).hexdigest()
+    claims = _claims_cache.get(token_hash)
+    if claims is not None:
+        return claims
+
+    try:
+        claims = _verify(token)
+    except Exception as e:
+        # Expired, malformed or badly signed tokens all land here
+        logger.info(f"⚠️ JWT verification failed: {type(e).__name__}: {str(e)}")
+        claims = None
+
+    if claims is None:
+        _claims_cache.increment('rejected')
+        return None
+
+    _claims_cache.put(token_hash, float(claims['exp']), claims)
+    return claims
+
+
+def get_email_from_claims(claims: Dict[str, Any]) -> Optional[str]:
+    """Normalized user email from verified claims (access tokens only carry the username)"""
+    email = claims.get('email') or claims.get('username') or claims.get('cognito:username')
+    return email.lower().strip() if email else None
+
+
+def verify_token_email(token: str) -> Optional[str]:
+    """Email for a verified Cognito token, or None"""
+    claims = verify_cognito_token(token)
+    return get_email_from_claims(claims) if claims else None
+
+
+def get_jwt_verifier_stats() -> Dict[str, Any]:
+    """JWKS and verified-claims cache counters for this container"""
+    return {'claims': _claims_cache.stats(), 'jwks': _jwks_cache.stats()}
+
+
+def clear_jwt_verifier_cache() -> None:
+    """Drop cached JWKS and verified claims (e.g. in tests)"""
+    _claims_cache.clear()
+    _jwks_cache.clear()
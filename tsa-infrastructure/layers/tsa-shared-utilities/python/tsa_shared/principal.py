@@ -0,0 +1,105 @@
+"""
+Request Principal for TSA Platform
+Resolves the caller once in the API Gateway Lambda authorizer and hands it to handlers
+
+The authorizer verifies the bearer token, resolves email -> profile_id /
+user_type, and returns them as authorizer context. API Gateway caches that
+result per token, so downstream handlers read the principal from
+requestContext.authorizer instead of parsing the token and looking up the
+profile on every request.
+"""
+import logging
+from typing import Dict, Any, Optional
+from .jwt_verifier import verify_cognito_token, get_email_from_claims
+from .users import find_profile_by_email
+
+logger = logging.getLogger(__name__)
+
+PRINCIPAL_FIELDS = ('email', 'profile_id', 'role', 'user_type')
+
+
+def resolve_principal(token: str) -> Optional[Dict[str, str]]:
+    """
+    Verify a bearer token and resolve the caller's identity
+
+    Args:
+        token: Encoded Cognito JWT (without the 'Bearer ' prefix)
+
+    Returns:
+        Dict with email, profile_id, role and user_type ('' when unknown),
+        or None if the token is not valid
+    """
+    claims = verify_cognito_token(token)
+    if not claims:
+        return None
+
+    email = get_email_from_claims(claims)
+    if not email:
+        return None
+
+    role = claims.get('custom:user_role', '')
+    # Users still onboarding have no profile yet - they are authenticated all the same
+    try:
+        profile = find_profile_by_email(email) or {}
+    except Exception as e:
+        # Handlers fall back to their own lookup when profile_id is empty
+        logger.warning(f"⚠️ Could not resolve profile for {email}: {str(e)}")
+        profile = {}
+    return {
+        'email': email,
+        'profile_id': profile.get('profile_id', ''),
+        'role': role,
+        'user_type': profile.get('user_type') or role
+    }
+
+
+def build_authorizer_response(principal: Dict[str, str], method_arn: str) -> Dict[str, Any]:
+    """
+    Allow policy plus principal context for a TOKEN authorizer
+
+    The policy covers every method of the API stage, because API Gateway
+    reuses a cached result for any route called with the same token.
+    """
+    api_arn, stage = method_arn.split('/')[:2]
+    return {
+        'principalId': principal.get('profile_id') or principal['email'],
+        'policyDocument': {
+            'Version': '2012-10-17',
+            'Statement': [{
+                'Action': 'execute-api:Invoke',
+                'Effect': 'Allow',
+                'Resource': f"{api_arn}/{stage}/*/*"
+            }]
+        },
+        # Context values must be strings, numbers or booleans
+        'context': {field: principal.get(field) or '' for field in PRINCIPAL_FIELDS}
+    }
+
+
+def get_request_principal(event: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """
+    Principal resolved by the API Gateway authorizer for this request
+
+    Args:
+        event: API Gateway proxy event
+
+    Returns:
+        Dict with email, profile_id, role and user_type, or None when the
+        route has no principal authorizer
+    """
+    authorizer = (event.get('requestContext') or {}).get('authorizer') or {}
+    if not authorizer.get('email'):
+        return None
+    return {field: authorizer.get(field) or '' for field in PRINCIPAL_FIELDS}
+
+
+def get_request_email(event: Dict[str, Any]) -> Optional[str]:
+    """Authenticated email from the authorizer context, or None"""
+    principal = get_request_principal(event)
+    return principal['email'] if principal else None
+
+
+def get_request_profile_id(event: Dict[str, Any]) -> Optional[str]:
+    """Authenticated profile_id from the authorizer context, or None"""
+    principal = get_request_principal(event)
+    return (principal['profile_id'] or None) if principal else None
@@ -10,6 +10,8 @@ import logging
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from .config import get_config
+from .aws_clients import get_table
+from .security_patterns import BASIC_MATCHER
 
 logger = logging.getLogger(__name__)
 config = get_config()
@@ -121,6 +123,8 @@ def parse_event_body(event: Dict[str, Any]) -> Dict[str, Any]:
         if not validation['valid']:
             log_security_event("input_validation_failed", "anonymous", {
                 "error": validation['error'],
+                "pattern_type": validation.get('pattern_type'),
+                "field_path": validation.get('field_path'),
                 "data_keys": list(parsed.keys()) if isinstance(parsed, dict) else []
             }, event)
             return {}
@@ -200,55 +204,7 @@ def validate_email_format(email: str) -> bool:
 
 def validate_input_security(data: Dict[str, Any]) -> Dict[str, Any]:
     """Enhanced input validation with security checks"""
-    xss_patterns = [
-        r'<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>',
-        r'javascript:',
-        r'on\w+\s*=',
-        r'<iframe\b',
-        r'<object\b'
-    ]
-    
-    sql_patterns = [
-        r'\b(union|select|insert|delete|update|drop|exec|execute)\b',
-        r'[;\'"]\s*--',
-        r'\bor\s+\d+\s*=\s*\d+',
-        r'\band\s+\d+\s*=\s*\d+'
-    ]
-    
-    def check_string_value(value: str) -> bool:
-        if not isinstance(value, str):
-            return True
-            
-        value_lower = value.lower()
-        
-        for pattern in xss_patterns:
-            if re.search(pattern, value_lower, re.IGNORECASE):
-                return False
-                
-        for pattern in sql_patterns:
-            if re.search(pattern, value_lower, re.IGNORECASE):
-                return False
-                
-        return True
-    
-    def validate_recursive(obj):
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                if not validate_recursive(value):
-                    return False
-        elif isinstance(obj, list):
-            for item in obj:
-                if not validate_recursive(item):
-                    return False
-        elif isinstance(obj, str):
-            if not check_string_value(obj):
-                return False
-        return True
-    
-    if not validate_recursive(data):
-        return {'valid': False, 'error': 'Invalid input detected'}
-    
-    return {'valid': True}
+    return BASIC_MATCHER.validate(data)
 
 
 def sanitize_string(value: str, max_length: int = 255) -> str:
@@ -314,11 +270,8 @@ def log_security_event(event_type: str, user_id: str, details: Dict[str, Any],
 def log_admin_action(admin_user_id: str, action: str, details: Dict[str, Any]) -> None:
     """Log admin action to audit table for compliance and monitoring"""
     try:
-        import boto3
-        
-        dynamodb = boto3.resource('dynamodb')
         stage = os.environ.get('STAGE', 'dev')
-        audit_table = dynamodb.Table(config.get_table_name('audit-logs', stage))
+        audit_table = get_table(config.get_table_name('audit-logs', stage))
         
         log_entry = {
             'log_id': str(uuid.uuid4()),
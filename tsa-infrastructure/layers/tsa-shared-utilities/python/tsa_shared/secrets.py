@@ -0,0 +1,301 @@
+"""
+Secrets Provider - Container-cached Secrets Manager and Parameter Store access for TSA services
+
+JWT signing keys, the SendGrid API key and database credentials are read on
+hot paths (magic link generation, token verification, email sending). Values
+are cached in memory per warm container with a TTL, Parameter Store values for
+the current stage are prefetched in one batched call, and callers can force a
+refresh when a downstream service rejects a stale credential.
+"""
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Any, Optional, List
+from botocore.exceptions import ClientError
+
+from .aws_clients import get_client
+
+logger = logging.getLogger(__name__)
+
+# GetParameters accepts at most 10 names per call
+SSM_BATCH_SIZE = 10
+
+
+class SecretsProvider:
+    """Thread-safe TTL cache over Secrets Manager secrets and SSM parameters"""
+
+    def __init__(self, ttl_seconds: int = 900):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.RLock()
+        self._secrets: Dict[str, tuple] = {}
+        self._parameters: Dict[str, tuple] = {}
+        self._missing_parameters: Dict[str, float] = {}
+        self._prefetched_paths: set = set()
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {
+            'hits': 0,
+            'misses': 0,
+            'secret_fetches': 0,
+            'parameter_fetches': 0,
+            'batch_fetches': 0,
+            'prefetched_parameters': 0,
+            'refreshes': 0,
+            'errors': 0
+        }
+
+    @staticmethod
+    def stage_prefix(stage: Optional[str] = None) -> str:
+        """Parameter Store path holding all values for a stage"""
+        return f"/tsa/{stage or os.environ.get('STAGE', 'dev')}/"
+
+    def _fresh(self, entry: Optional[tuple]) -> bool:
+        return entry is not None and entry[1] > time.time()
+
+    # =================================================================
+    # SECRETS MANAGER
+    # =================================================================
+
+    def get_secret(self, secret_id: str, force_refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get a JSON secret from Secrets Manager
+
+        Args:
+            secret_id: Secret ARN or name
+            force_refresh: Bypass the cache (e.g. after an auth failure)
+
+        Returns:
+            Parsed SecretString
+        """
+        with self._lock:
+            entry = self._secrets.get(secret_id)
+            if not force_refresh and self._fresh(entry):
+                self._stats['hits'] += 1
+                return entry[0]
+            self._stats['refreshes' if force_refresh else 'misses'] += 1
+
+        try:
+            response = get_client('secretsmanager').get_secret_value(SecretId=secret_id)
+            value = json.loads(response['SecretString'])
+        except Exception:
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+
+        with self._lock:
+            self._secrets[secret_id] = (value, time.time() + self.ttl_seconds)
+            self._stats['secret_fetches'] += 1
+        return value
+
+    # =================================================================
+    # PARAMETER STORE
+    # =================================================================
+
+    def prefetch_parameters(self, path: Optional[str] = None) -> int:
+        """
+        Load every parameter under a path with one paginated GetParametersByPath call
+
+        Runs once per path per container. Missing IAM permissions are logged
+        and callers fall back to single GetParameter lookups.
+
+        Args:
+            path: Parameter path (defaults to /tsa/{stage}/)
+
+        Returns:
+            Number of parameters cached
+        """
+        path = path or self.stage_prefix()
+        with self._lock:
+            if path in self._prefetched_paths:
+                return 0
+            self._prefetched_paths.add(path)
+
+        loaded = {}
+        try:
+            paginator = get_client('ssm').get_paginator('get_parameters_by_path')
+            for page in paginator.paginate(Path=path.rstrip('/'), Recursive=True, WithDecryption=True):
+                for parameter in page.get('Parameters', []):
+                    loaded[parameter['Name']] = parameter['Value']
+        except Exception as e:
+            logger.warning(f"Parameter prefetch for {path} failed: {str(e)}")
+            with self._lock:
+                self._stats['errors'] += 1
+            return 0
+
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            for name, value in loaded.items():
+                self._parameters[name] = (value, expires_at)
+            self._stats['batch_fetches'] += 1
+            self._stats['prefetched_parameters'] += len(loaded)
+
+        logger.info(f"Prefetched {len(loaded)} parameters under {path}")
+        return len(loaded)
+
+    def get_parameters(self, names: List[str], force_refresh: bool = False) -> Dict[str, str]:
+        """
+        Get several SSM parameters, fetching uncached names with batched GetParameters
+
+        Args:
+            names: Parameter names
+            force_refresh: Bypass the cache
+
+        Returns:
+            Dict of name -> value for parameters that exist
+        """
+        results = {}
+        to_fetch = []
+        with self._lock:
+            for name in names:
+                entry = self._parameters.get(name)
+                if not force_refresh and self._fresh(entry):
+                    self._stats['hits'] += 1
+                    results[name] = entry[0]
+                else:
+                    self._stats['refreshes' if force_refresh else 'misses'] += 1
+                    to_fetch.append(name)
+
+        ssm = get_client('ssm')
+        for i in range(0, len(to_fetch), SSM_BATCH_SIZE):
+            batch = to_fetch[i:i + SSM_BATCH_SIZE]
+            try:
+                response = ssm.get_parameters(Names=batch, WithDecryption=True)
+            except Exception:
+                with self._lock:
+                    self._stats['errors'] += 1
+                raise
+
+            expires_at = time.time() + self.ttl_seconds
+            with self._lock:
+                self._stats['batch_fetches'] += 1
+                for parameter in response.get('Parameters', []):
+                    self._parameters[parameter['Name']] = (parameter['Value'], expires_at)
+                    self._missing_parameters.pop(parameter['Name'], None)
+                    results[parameter['Name']] = parameter['Value']
+                for name in response.get('InvalidParameters', []):
+                    self._missing_parameters[name] = expires_at
+
+        return results
+
+    def get_parameter(self, name: str, force_refresh: bool = False) -> Optional[str]:
+        """
+        Get a single (decrypted) SSM parameter
+
+        The first lookup under the stage prefix triggers a one-time prefetch
+        of the whole prefix. Missing parameters are negatively cached for the
+        TTL so fallback chains do not re-query SSM on every call.
+
+        Args:
+            name: Full parameter name
+            force_refresh: Bypass the cache
+
+        Returns:
+            Parameter value, or None if it does not exist
+        """
+        if not force_refresh:
+            prefix = self.stage_prefix()
+            if name.startswith(prefix):
+                self.prefetch_parameters(prefix)
+
+            with self._lock:
+                entry = self._parameters.get(name)
+                if self._fresh(entry):
+                    self._stats['hits'] += 1
+                    return entry[0]
+                if self._missing_parameters.get(name, 0) > time.time():
+                    self._stats['hits'] += 1
+                    return None
+                self._stats['misses'] += 1
+        else:
+            with self._lock:
+                self._stats['refreshes'] += 1
+
+        try:
+            response = get_client('ssm').get_parameter(Name=name, WithDecryption=True)
+            value = response['Parameter']['Value']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') == 'ParameterNotFound':
+                with self._lock:
+                    self._parameters.pop(name, None)
+                    self._missing_parameters[name] = time.time() + self.ttl_seconds
+                return None
+            with self._lock:
+                self._stats['errors'] += 1
+            raise
+
+        with self._lock:
+            self._parameters[name] = (value, time.time() + self.ttl_seconds)
+            self._missing_parameters.pop(name, None)
+            self._stats['parameter_fetches'] += 1
+        return value
+
+    # =================================================================
+    # CACHE MANAGEMENT
+    # =================================================================
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one cached secret/parameter, or everything when key is None"""
+        with self._lock:
+            if key is None:
+                self._secrets.clear()
+                self._parameters.clear()
+                self._missing_parameters.clear()
+                self._prefetched_paths.clear()
+            else:
+                self._secrets.pop(key, None)
+                self._parameters.pop(key, None)
+                self._missing_parameters.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache counters for this container"""
+        with self._lock:
+            return {
+                **self._stats,
+                'cached_secrets': len(self._secrets),
+                'cached_parameters': len(self._parameters),
+                'prefetched_paths': sorted(self._prefetched_paths),
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+# Module-level provider survives across warm Lambda invocations
+_provider = SecretsProvider(ttl_seconds=int(os.environ.get('SECRETS_CACHE_TTL_SECONDS', '900')))
+
+
+def get_secrets_provider() -> SecretsProvider:
+    """Get the container-scoped secrets provider"""
+    return _provider
+
+
+def get_secret(secret_id: str, force_refresh: bool = False) -> Dict[str, Any]:
+    """Get a cached JSON secret - convenience function"""
+    return _provider.get_secret(secret_id, force_refresh)
+
+
+def get_parameter(name: str, force_refresh: bool = False) -> Optional[str]:
+    """Get a cached SSM parameter - convenience function"""
+    return _provider.get_parameter(name, force_refresh)
+
+
+def get_stage_parameter(key: str, force_refresh: bool = False) -> Optional[str]:
+    """Get /tsa/{stage}/{key} from Parameter Store - convenience function"""
+    return _provider.get_parameter(f"{_provider.stage_prefix()}{key}", force_refresh)
+
+
+def prefetch_stage_parameters(stage: Optional[str] = None) -> int:
+    """Batch-load all /tsa/{stage}/ parameters - call at cold start"""
+    return _provider.prefetch_parameters(_provider.stage_prefix(stage))
+
+
+def invalidate_secrets(key: Optional[str] = None) -> None:
+    """Drop cached secrets/parameters - convenience function"""
+    _provider.invalidate(key)
+
+
+def get_secrets_stats() -> Dict[str, Any]:
+    """Get secrets cache counters - convenience function"""
+    return _provider.get_stats()
@@ -0,0 +1,178 @@
+"""
+Security Patterns - Precompiled attack-pattern matching for request validation
+
+Each pattern family (XSS, SQL injection, command injection) is combined into
+a single alternation compiled once at import. Patterns that can only match
+when a specific character is present (e.g. '<', '=', ';', '|') are gated
+behind a one-pass character-class check, so typical values such as names,
+emails and dates skip them entirely.
+"""
+import re
+from typing import Dict, Any, List, Optional, Tuple
+
+_VALID = {'valid': True}
+
+
+class PatternFamily:
+    """One family of attack patterns, compiled into gated and ungated alternations"""
+
+    def __init__(self, name: str, error: str, patterns: List[Tuple[str, str]]):
+        """
+        Args:
+            name: Family name reported as pattern_type (e.g. 'xss')
+            error: Error message reported on a match
+            patterns: (regex, trigger_chars) pairs; trigger_chars lists characters
+                      at least one of which must be present for the regex to match
+                      ('' when the regex can match without any special character)
+        """
+        self.name = name
+        self.error = error
+
+        gated = [regex for regex, triggers in patterns if triggers]
+        ungated = [regex for regex, triggers in patterns if not triggers]
+        triggers = sorted({char for _, chars in patterns for char in chars})
+
+        self.trigger = re.compile('[' + ''.join(re.escape(char) for char in triggers) + ']') if triggers else None
+        self.gated = self._combine(gated)
+        self.ungated = self._combine(ungated)
+
+    @staticmethod
+    def _combine(patterns: List[str]) -> Optional['re.Pattern']:
+        if not patterns:
+            return None
+        return re.compile('|'.join(f'(?:{pattern})' for pattern in patterns), re.IGNORECASE)
+
+    def matches(self, value: str) -> bool:
+        """Check whether any pattern in the family matches the value"""
+        if self.gated is not None and self.trigger.search(value) and self.gated.search(value):
+            return True
+        return self.ungated is not None and self.ungated.search(value) is not None
+
+
+class SecurityMatcher:
+    """Checks strings and nested request bodies against ordered pattern families"""
+
+    def __init__(self, families: List[PatternFamily]):
+        self.families = families
+
+    def match_family(self, value: str) -> Optional[PatternFamily]:
+        """
+        Get the first family matching a string
+
+        Args:
+            value: String to check
+
+        Returns:
+            Matching PatternFamily, or None if the value is clean
+        """
+        for family in self.families:
+            if family.matches(value):
+                return family
+        return None
+
+    def check_string(self, value: Any) -> Dict[str, Any]:
+        """
+        Check a single value (non-strings are always valid)
+
+        Returns:
+            Dict with 'valid', plus 'error' and 'pattern_type' on a match
+        """
+        if not isinstance(value, str) or not value:
+            return _VALID
+        family = self.match_family(value)
+        if family is None:
+            return _VALID
+        return {'valid': False, 'error': family.error, 'pattern_type': family.name}
+
+    def validate(self, data: Any) -> Dict[str, Any]:
+        """
+        Recursively check every string in a dict / list structure
+
+        Args:
+            data: Data to validate (can be dict, list, or string)
+
+        Returns:
+            Dict with validation result; on a match also 'pattern_type' and
+            'field_path' (e.g. 'students[0].name')
+        """
+        stack = [(data, '')]
+        while stack:
+            obj, path = stack.pop()
+            if isinstance(obj, str):
+                result = self.check_string(obj)
+                if not result['valid']:
+                    if path:
+                        result['field_path'] = path
+                    return result
+            elif isinstance(obj, dict):
+                # Reversed so fields are checked in document order
+                for key, value in reversed(list(obj.items())):
+                    if isinstance(value, (str, dict, list)):
+                        stack.append((value, f"{path}.{key}" if path else str(key)))
+            elif isinstance(obj, list):
+                for i in range(len(obj) - 1, -1, -1):
+                    if isinstance(obj[i], (str, dict, list)):
+                        stack.append((obj[i], f"{path}[{i}]"))
+        return _VALID
+
+
+# =================================================================
+# PATTERN FAMILIES
+# =================================================================
+
+XSS_FAMILY = PatternFamily('xss', 'Potentially malicious script content detected', [
+    (r'<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>', '<'),
+    (r'javascript:', ':'),
+    (r'vbscript:', ':'),
+    (r'on\w+\s*=', '='),
+    (r'<iframe\b', '<'),
+    (r'<object\b', '<'),
+    (r'<embed\b', '<'),
+    (r'<link\b', '<'),
+    (r'<meta\b', '<'),
+    (r'<style\b', '<')
+])
+
+SQL_FAMILY = PatternFamily('sql_injection', 'Potentially malicious SQL content detected', [
+    (r'\b(?:union|select|insert|delete|update|drop|exec|execute)\b.*\b(?:from|where|into)\b', ''),
+    (r'[;\'"]\s*--', ';\'"'),
+    (r'\bor\s+\d+\s*=\s*\d+', '='),
+    (r'\band\s+\d+\s*=\s*\d+', '='),
+    (r'\bunion\s+select', ''),
+    (r'1\s*=\s*1', '='),
+    (r'1\s*or\s*1', '')
+])
+
+COMMAND_FAMILY = PatternFamily('command_injection', 'Potentially malicious command content detected', [
+    (r'[;&|`]', ';&|`'),
+    (r'\$\(', '$'),
+    (r'`.*`', '`'),
+    (r'\|\s*\w+', '|'),
+    (r'&&\s*\w+', '&'),
+    (r';\s*\w+', ';')
+])
+
+# Lighter rule set used by response_utils.parse_event_body
+BASIC_XSS_FAMILY = PatternFamily('xss', 'Invalid input detected', [
+    (r'<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>', '<'),
+    (r'javascript:', ':'),
+    (r'on\w+\s*=', '='),
+    (r'<iframe\b', '<'),
+    (r'<object\b', '<')
+])
+
+BASIC_SQL_FAMILY = PatternFamily('sql_injection', 'Invalid input detected', [
+    (r'\b(?:union|select|insert|delete|update|drop|exec|execute)\b', ''),
+    (r'[;\'"]\s*--', ';\'"'),
+    (r'\bor\s+\d+\s*=\s*\d+', '='),
+    (r'\band\s+\d+\s*=\s*\d+', '=')
+])
+
+STRICT_MATCHER = SecurityMatcher([XSS_FAMILY, SQL_FAMILY, COMMAND_FAMILY])
+BASIC_MATCHER = SecurityMatcher([BASIC_XSS_FAMILY, BASIC_SQL_FAMILY])
+
+
+def match_security_pattern(value: str) -> Optional[str]:
+    """Name of the first strict pattern family matching a string, or None"""
+    family = STRICT_MATCHER.match_family(value)
+    return family.name if family else None
@@ -6,55 +6,211 @@ Features:
 - Magic link authentication emails
 - Notification emails  
 - Template-based emails
+- Asynchronous outbox (SQS, or in-memory for local testing) with batched delivery
 - Error handling and logging
 - Environment-aware configuration
 """
 
 import os
+import time
+import uuid
 import base64
+import hashlib
 from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, From, To, Subject, PlainTextContent, HtmlContent, Attachment, FileContent, FileName, FileType, Disposition, ContentId
+from sendgrid.helpers.mail import Mail, From, To, Subject, PlainTextContent, HtmlContent, Attachment, FileContent, FileName, FileType, Disposition, ContentId, Personalization, Substitution
 from typing import Optional, List, Dict, Any
 import json
 import logging
 
+from .aws_clients import get_client
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# SendGrid accepts at most 1000 personalizations per request
+MAX_PERSONALIZATIONS = 1000
+
+# SendGrid 4xx responses that are not about the recipients (auth, timeout, rate limit)
+RETRYABLE_CLIENT_ERRORS = (401, 403, 408, 429)
+
+# SQS SendMessageBatch limits: 10 entries and 256 KB per request
+SQS_BATCH_ENTRIES = 10
+SQS_BATCH_BYTES = 250 * 1024
+
+
+# =================================================================
+# EMAIL OUTBOX
+# =================================================================
+
+def build_email_job(to_email: str, subject: str, plain_content: str, html_content: str,
+                    to_name: Optional[str] = None,
+                    substitutions: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Build a queued email job
+    
+    Jobs with identical subject and content share a group_key, so the worker
+    can deliver them together as one multi-personalization send.
+    """
+    group_key = hashlib.sha256(
+        json.dumps([subject, plain_content, html_content]).encode('utf-8')
+    ).hexdigest()
+    return {
+        'job_id': str(uuid.uuid4()),
+        'group_key': group_key,
+        'to_email': to_email,
+        'to_name': to_name,
+        'subject': subject,
+        'plain_content': plain_content,
+        'html_content': html_content,
+        'substitutions': {tag: str(value) for tag, value in (substitutions or {}).items()},
+        'queued_at': time.time()
+    }
+
+
+def is_permanent_send_error(error: Exception) -> bool:
+    """True when SendGrid rejected the request itself (bad recipient/content), so a retry cannot succeed"""
+    if isinstance(error, ValueError):
+        return True
+    status_code = getattr(error, 'status_code', None)
+    return isinstance(status_code, int) and 400 <= status_code < 500 and status_code not in RETRYABLE_CLIENT_ERRORS
+
+
+class SQSEmailQueue:
+    """Email job queue backed by SQS (drained by the email worker Lambda)"""
+    
+    def __init__(self, queue_url: str):
+        self.queue_url = queue_url
+    
+    def put(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        """
+        Send jobs with SendMessageBatch (10 entries / 256 KB per call)
+        
+        Returns:
+            job_ids that could not be enqueued
+        """
+        sqs = get_client('sqs')
+        failed: List[str] = []
+        batch: List[Dict[str, str]] = []
+        batch_bytes = 0
+        
+        def flush():
+            if not batch:
+                return
+            try:
+                response = sqs.send_message_batch(QueueUrl=self.queue_url, Entries=list(batch))
+                failed.extend(entry['Id'] for entry in response.get('Failed', []))
+            except Exception as e:
+                logger.error(f"Failed to enqueue {len(batch)} email jobs: {str(e)}")
+                failed.extend(entry['Id'] for entry in batch)
+            batch.clear()
+        
+        for job in jobs:
+            body = json.dumps(job)
+            size = len(body.encode('utf-8'))
+            if batch and (len(batch) == SQS_BATCH_ENTRIES or batch_bytes + size > SQS_BATCH_BYTES):
+                flush()
+                batch_bytes = 0
+            # SQS batch entry ids only allow alphanumerics, hyphens and underscores
+            batch.append({'Id': job['job_id'], 'MessageBody': body})
+            batch_bytes += size
+        flush()
+        
+        return failed
+
+
+class InMemoryEmailQueue:
+    """Email job queue stand-in for local testing (drain with drain_email_outbox)"""
+    
+    def __init__(self):
+        self.jobs: List[Dict[str, Any]] = []
+    
+    def put(self, jobs: List[Dict[str, Any]]) -> List[str]:
+        self.jobs.extend(jobs)
+        return []
+    
+    def take(self, max_jobs: Optional[int] = None) -> List[Dict[str, Any]]:
+        count = len(self.jobs) if max_jobs is None else max_jobs
+        taken, self.jobs = self.jobs[:count], self.jobs[count:]
+        return taken
+
+
+class EmailOutbox:
+    """Enqueue email jobs instead of calling SendGrid inside the request"""
+    
+    def __init__(self, queue):
+        self.queue = queue
+    
+    def enqueue(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Enqueue email jobs
+        
+        Returns:
+            Dict with success status and queued / failed job ids
+        """
+        failed = set(self.queue.put(jobs)) if jobs else set()
+        queued = [job['job_id'] for job in jobs if job['job_id'] not in failed]
+        return {'success': not failed, 'queued': queued, 'failed': sorted(failed)}
+
+
+class _RateLimiter:
+    """Spaces SendGrid API calls to at most rate_per_second"""
+    
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self.next_at = 0.0
+    
+    def wait(self) -> None:
+        now = time.monotonic()
+        if now < self.next_at:
+            time.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+_outbox: Optional[EmailOutbox] = None
+
+
+def get_email_outbox() -> Optional[EmailOutbox]:
+    """
+    Get the container-scoped email outbox
+    
+    TSA_EMAIL_QUEUE_URL selects the SQS queue; EMAIL_OUTBOX_MODE=memory selects
+    the in-memory stand-in. Without either, emails are sent synchronously.
+    """
+    global _outbox
+    if _outbox is None:
+        queue_url = os.environ.get('TSA_EMAIL_QUEUE_URL')
+        if queue_url:
+            _outbox = EmailOutbox(SQSEmailQueue(queue_url))
+        elif os.environ.get('EMAIL_OUTBOX_MODE', '').lower() == 'memory':
+            _outbox = EmailOutbox(InMemoryEmailQueue())
+    return _outbox
+
 
 class SendGridService:
     """Centralized SendGrid service for all TSA email operations"""
     
-    def __init__(self):
-        """Initialize SendGrid service with environment configuration"""
+    def __init__(self, use_outbox: bool = True):
+        """
+        Initialize SendGrid service with environment configuration
+        
+        Args:
+            use_outbox: Enqueue emails on the outbox when one is configured
+                        (the email worker passes False to deliver directly)
+        """
         # Try to get API key from environment variable first (for backward compatibility)
         self.api_key = os.environ.get('SENDGRID_API_KEY')
         
-        # If not found, try to get from AWS Parameter Store, then Secrets Manager
+        # If not found, use the cached Parameter Store / Secrets Manager lookup
+        self._api_key_from_env = bool(self.api_key)
         if not self.api_key:
             try:
-                # Try Parameter Store first
-                import boto3
-                ssm = boto3.client('ssm')
-                stage = os.environ.get('STAGE', 'dev')
-                param_response = ssm.get_parameter(
-                    Name=f'/tsa/{stage}/sendgrid/api_key',
-                    WithDecryption=True
-                )
-                self.api_key = param_response['Parameter']['Value']
-                logger.info("Successfully retrieved SendGrid API key from Parameter Store")
+                from .auth_utils import get_sendgrid_api_key
+                self.api_key = get_sendgrid_api_key()
             except Exception as e:
-                logger.warning(f"Failed to get SendGrid API key from Parameter Store: {str(e)}")
-                
-                # Fallback to Secrets Manager
-                try:
-                    from .auth_utils import get_sendgrid_api_key
-                    self.api_key = get_sendgrid_api_key()
-                    logger.info("Successfully retrieved SendGrid API key from Secrets Manager")
-                except Exception as e2:
-                    logger.error(f"Failed to get SendGrid API key from Secrets Manager: {str(e2)}")
-                    raise ValueError("SENDGRID_API_KEY environment variable or Parameter Store value is required")
+                logger.error(f"Failed to get SendGrid API key: {str(e)}")
+                raise ValueError("SENDGRID_API_KEY environment variable or Parameter Store value is required")
         
         self.client = SendGridAPIClient(api_key=self.api_key)
         self.from_email = os.environ.get('SENDGRID_FROM_EMAIL', 'noreply@totalskillsacademy.com')
@@ -64,6 +220,35 @@ class SendGridService:
         self.stage = os.environ.get('STAGE', 'dev')
         self.frontend_url = self._get_frontend_url()
         
+        self.outbox = get_email_outbox() if use_outbox else None
+        self._rate_limiter = _RateLimiter(float(os.environ.get('SENDGRID_MAX_REQUESTS_PER_SECOND', '5')))
+        
+    def _send(self, message: Mail):
+        """
+        Send a message, refreshing the cached API key once if SendGrid rejects it
+        
+        Args:
+            message: SendGrid Mail object
+            
+        Returns:
+            SendGrid API response
+        """
+        try:
+            return self.client.send(message)
+        except Exception as e:
+            if getattr(e, 'status_code', None) not in (401, 403) or self._api_key_from_env:
+                raise
+            
+            from .auth_utils import get_sendgrid_api_key
+            refreshed_key = get_sendgrid_api_key(force_refresh=True)
+            if refreshed_key == self.api_key:
+                raise
+            
+            logger.warning("SendGrid rejected cached API key - retrying with refreshed key")
+            self.api_key = refreshed_key
+            self.client = SendGridAPIClient(api_key=self.api_key)
+            return self.client.send(message)
+    
     def _get_frontend_url(self) -> str:
         """Get environment-specific frontend URL"""
         stage = self.stage.lower()
@@ -283,7 +468,7 @@ Total Skills Academy Team
             message.template_id = template_id
             message.dynamic_template_data = template_data
             
-            response = self.client.send(message)
+            response = self._send(message)
             
             return {
                 'success': True,
@@ -334,7 +519,7 @@ Total Skills Academy Team
                 )
                 message.add_attachment(attachment)
             
-            response = self.client.send(message)
+            response = self._send(message)
             
             return {
                 'success': True,
@@ -350,6 +535,156 @@ Total Skills Academy Team
                 'message': 'Failed to send email with attachments'
             }
     
+    def send_personalized_batch(self, recipients: List[Dict[str, Any]], subject: str,
+                                plain_content: str, html_content: str) -> Dict[str, Any]:
+        """
+        Send one rendered template to many recipients using personalizations
+        
+        The content is rendered once with substitution tags (e.g. -invitee_name-)
+        and each recipient supplies its own values, so N recipients cost
+        ceil(N / 1000) API calls instead of N. With an outbox configured the
+        recipients are enqueued and the worker performs the batched sends.
+        
+        Args:
+            recipients: List of dicts with 'email', optional 'name' and
+                        optional 'substitutions' (tag -> value)
+            subject: Email subject (may contain substitution tags)
+            plain_content: Plain text content with substitution tags
+            html_content: HTML content with substitution tags
+            
+        Returns:
+            Dict with success status, sent/queued/failed/rejected email lists and
+            per-request results ('queued' only with an outbox, 'sent' only without)
+        """
+        if self.outbox:
+            jobs = [
+                build_email_job(recipient['email'], subject, plain_content, html_content,
+                                recipient.get('name'), recipient.get('substitutions'))
+                for recipient in recipients
+            ]
+            queued = set(self.outbox.enqueue(jobs)['queued'])
+            # Enqueued is not delivered - the worker sends (or rejects) them later
+            return {
+                'success': len(queued) == len(jobs),
+                'queued': [job['to_email'] for job in jobs if job['job_id'] in queued],
+                'sent': [],
+                'failed': [job['to_email'] for job in jobs if job['job_id'] not in queued],
+                'rejected': [],
+                'requests': []
+            }
+        
+        return self._deliver_personalized(recipients, subject, plain_content, html_content)
+    
+    def _deliver_personalized(self, recipients: List[Dict[str, Any]], subject: str,
+                              plain_content: str, html_content: str) -> Dict[str, Any]:
+        """
+        Send personalization batches of up to 1000 recipients directly to SendGrid
+        
+        'failed' lists every recipient that was not sent; 'rejected' is the
+        subset SendGrid refused permanently (e.g. an invalid address), which
+        retrying cannot fix.
+        """
+        result = {'success': True, 'sent': [], 'queued': [], 'failed': [], 'rejected': [], 'requests': []}
+        
+        for i in range(0, len(recipients), MAX_PERSONALIZATIONS):
+            self._send_personalization_batch(
+                recipients[i:i + MAX_PERSONALIZATIONS], subject, plain_content, html_content, result
+            )
+        
+        return result
+    
+    def _send_personalization_batch(self, batch: List[Dict[str, Any]], subject: str,
+                                    plain_content: str, html_content: str, result: Dict[str, Any]) -> None:
+        """Send one personalization request, bisecting it when SendGrid rejects a recipient"""
+        emails = [recipient['email'] for recipient in batch]
+        try:
+            message = Mail(
+                from_email=From(self.from_email, self.from_name),
+                subject=Subject(subject),
+                plain_text_content=PlainTextContent(plain_content),
+                html_content=HtmlContent(html_content)
+            )
+            for recipient in batch:
+                personalization = Personalization()
+                personalization.add_to(To(recipient['email'], recipient.get('name') or None))
+                for tag, value in (recipient.get('substitutions') or {}).items():
+                    personalization.add_substitution(Substitution(tag, str(value)))
+                message.add_personalization(personalization)
+            
+            self._rate_limiter.wait()
+            response = self._send(message)
+            result['sent'].extend(emails)
+            result['requests'].append({
+                'success': True,
+                'recipients': len(batch),
+                'message_id': response.headers.get('X-Message-Id'),
+                'status_code': response.status_code
+            })
+        except Exception as e:
+            if is_permanent_send_error(e) and len(batch) > 1:
+                # One bad recipient fails the whole request - split it so the others still go out
+                middle = len(batch) // 2
+                self._send_personalization_batch(batch[:middle], subject, plain_content, html_content, result)
+                self._send_personalization_batch(batch[middle:], subject, plain_content, html_content, result)
+                return
+            
+            result['success'] = False
+            result['failed'].extend(emails)
+            if is_permanent_send_error(e):
+                logger.warning(f"SendGrid rejected {emails[0]} permanently: {str(e)}")
+                result['rejected'].extend(emails)
+            else:
+                logger.error(f"Failed to send personalized batch of {len(batch)} emails: {str(e)}")
+            result['requests'].append({'success': False, 'recipients': len(batch), 'error': str(e)})
+    
+    def deliver_email_jobs(self, jobs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Deliver queued email jobs, grouping identical content into personalization sends
+        
+        Args:
+            jobs: Email jobs from build_email_job
+            
+        Returns:
+            Dict with delivered job_ids, failed job_ids worth retrying and
+            rejected job_ids SendGrid refused permanently
+        """
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for job in jobs:
+            groups.setdefault(job['group_key'], []).append(job)
+        
+        delivered: List[str] = []
+        failed: List[str] = []
+        rejected: List[str] = []
+        for group in groups.values():
+            first = group[0]
+            # One job per recipient address per send; repeats go in later sends
+            pending = list(group)
+            while pending:
+                seen, batch, rest = set(), [], []
+                for job in pending:
+                    (rest if job['to_email'] in seen else batch).append(job)
+                    seen.add(job['to_email'])
+                pending = rest
+                
+                result = self._deliver_personalized(
+                    [{'email': job['to_email'], 'name': job.get('to_name'),
+                      'substitutions': job.get('substitutions')} for job in batch],
+                    first['subject'], first['plain_content'], first['html_content']
+                )
+                failed_emails = set(result['failed'])
+                rejected_emails = set(result['rejected'])
+                for job in batch:
+                    if job['to_email'] in rejected_emails:
+                        rejected.append(job['job_id'])
+                    elif job['to_email'] in failed_emails:
+                        failed.append(job['job_id'])
+                    else:
+                        delivered.append(job['job_id'])
+        
+        logger.info(f"Delivered {len(delivered)} queued emails in {len(groups)} groups "
+                    f"({len(failed)} failed, {len(rejected)} rejected)")
+        return {'delivered': delivered, 'failed': failed, 'rejected': rejected}
+    
     def _send_email(self, to_email: str, subject: str, 
                    plain_content: str, html_content: str) -> Dict[str, Any]:
         """
@@ -362,8 +697,21 @@ Total Skills Academy Team
             html_content: HTML content
             
         Returns:
-            Dict with success status and message info
+            Dict with success status and message info ('queued' when sent via the outbox)
         """
+        if self.outbox:
+            job = build_email_job(to_email, subject, plain_content, html_content)
+            result = self.outbox.enqueue([job])
+            if not result['success']:
+                raise RuntimeError(f"Failed to enqueue email to {to_email}")
+            return {
+                'success': True,
+                'queued': True,
+                'message_id': job['job_id'],
+                'to_email': to_email,
+                'subject': subject
+            }
+        
         try:
             message = Mail(
                 from_email=From(self.from_email, self.from_name),
@@ -373,7 +721,8 @@ Total Skills Academy Team
                 html_content=HtmlContent(html_content)
             )
             
-            response = self.client.send(message)
+            self._rate_limiter.wait()
+            response = self._send(message)
             
             return {
                 'success': True,
@@ -388,6 +737,31 @@ Total Skills Academy Team
             raise
 
 
+# Module-level service reused across warm Lambda invocations
+_service: Optional[SendGridService] = None
+
+
+def get_sendgrid_service() -> SendGridService:
+    """Get the container-scoped SendGrid service (created on first use)"""
+    global _service
+    if _service is None:
+        _service = SendGridService()
+    return _service
+
+
+def drain_email_outbox(max_jobs: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Deliver jobs waiting in the in-memory outbox - local testing stand-in for the worker
+    
+    Returns:
+        Dict with delivered, failed and rejected job_ids
+    """
+    outbox = get_email_outbox()
+    if not outbox or not isinstance(outbox.queue, InMemoryEmailQueue):
+        raise ValueError("drain_email_outbox requires EMAIL_OUTBOX_MODE=memory")
+    return SendGridService(use_outbox=False).deliver_email_jobs(outbox.queue.take(max_jobs))
+
+
 # Convenience functions for backward compatibility
 def send_magic_link_email(email: str, magic_link: str, user_type: str = 'user') -> Dict[str, Any]:
     """Send magic link email - convenience function"""
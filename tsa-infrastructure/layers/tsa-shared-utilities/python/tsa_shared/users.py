@@ -1,10 +1,224 @@
 """
 User Identity Utilities - Centralized ID mapping for TSA services
 
-Solves the email ↔ profile_id mapping issues across all backend services
+Solves the email ↔ profile_id mapping issues across all backend services.
+Email lookups query the profiles `email-index` GSI and are cached per
+container (LRU + TTL) in both directions; a paginated scan is only used
+when the index does not exist on the table.
 """
-from typing import Dict, Any, Optional
-from .database import get_dynamodb_table, get_table_name
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+from boto3.dynamodb.conditions import Key, Attr
+from botocore.exceptions import ClientError
+from .database import get_dynamodb_table, get_table_name, iter_query_pages, iter_scan_pages
+
+PROFILES_EMAIL_INDEX = 'email-index'
+
+
+class _IdentityCache:
+    """Thread-safe LRU + TTL cache of email ↔ profile_id mappings for a warm container"""
+    
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._by_email: 'OrderedDict[str, Tuple[float, str, Optional[str]]]' = OrderedDict()
+        self._by_profile_id: 'OrderedDict[str, Tuple[float, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.counters = {'hits': 0, 'misses': 0, 'index_queries': 0, 'fallback_scans': 0}
+    
+    def _get(self, store: OrderedDict, key: str):
+        entry = store.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del store[key]
+            return None
+        store.move_to_end(key)
+        return entry
+    
+    def _put(self, store: OrderedDict, key: str, entry: tuple) -> None:
+        store[key] = entry
+        store.move_to_end(key)
+        while len(store) > self.max_entries:
+            store.popitem(last=False)
+    
+    def get_profile_id(self, email: str, user_type: Optional[str] = None) -> Optional[str]:
+        """Return cached profile_id for an email (optionally restricted to a user_type)"""
+        with self._lock:
+            entry = self._get(self._by_email, email)
+            if entry and (user_type is None or entry[2] == user_type):
+                self.counters['hits'] += 1
+                return entry[1]
+            self.counters['misses'] += 1
+            return None
+    
+    def get_email(self, profile_id: str) -> Optional[str]:
+        """Return cached email for a profile_id"""
+        with self._lock:
+            entry = self._get(self._by_profile_id, profile_id)
+            if entry:
+                self.counters['hits'] += 1
+                return entry[1]
+            self.counters['misses'] += 1
+            return None
+    
+    def store(self, email: Optional[str], profile_id: str, user_type: Optional[str] = None) -> None:
+        """Record a mapping in both directions"""
+        if not profile_id or not email:
+            return
+        email = email.lower().strip()
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            self._put(self._by_email, email, (expires_at, profile_id, user_type))
+            self._put(self._by_profile_id, profile_id, (expires_at, email))
+    
+    def invalidate(self, email: Optional[str] = None, profile_id: Optional[str] = None) -> None:
+        """Drop a mapping, e.g. after a profile email change"""
+        with self._lock:
+            if email:
+                entry = self._by_email.pop(email.lower().strip(), None)
+                if entry:
+                    self._by_profile_id.pop(entry[1], None)
+            if profile_id:
+                entry = self._by_profile_id.pop(profile_id, None)
+                if entry:
+                    self._by_email.pop(entry[1], None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._by_email.clear()
+            self._by_profile_id.clear()
+            for counter in self.counters:
+                self.counters[counter] = 0
+    
+    def increment(self, counter: str) -> None:
+        with self._lock:
+            self.counters[counter] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.counters,
+                'email_entries': len(self._by_email),
+                'profile_id_entries': len(self._by_profile_id),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds
+            }
+
+
+# Module-level cache survives across warm Lambda invocations
+_identity_cache = _IdentityCache(
+    max_entries=int(os.environ.get('IDENTITY_CACHE_MAX_ENTRIES', '2048')),
+    ttl_seconds=int(os.environ.get('IDENTITY_CACHE_TTL_SECONDS', '300'))
+)
+
+# Tables found to be missing the email GSI - avoids re-trying the index on every call
+_tables_without_email_index = set()
+
+
+def get_identity_cache_stats() -> Dict[str, Any]:
+    """
+    Get email ↔ profile_id cache counters for this container
+    
+    Returns:
+        Dict with hits, misses, index_queries, fallback_scans and cache sizes
+    """
+    return _identity_cache.stats()
+
+
+def clear_identity_cache() -> None:
+    """Clear cached email ↔ profile_id mappings and reset counters"""
+    _identity_cache.clear()
+
+
+def invalidate_identity(email: Optional[str] = None, profile_id: Optional[str] = None) -> None:
+    """
+    Invalidate a cached mapping (call after a profile's email changes)
+    
+    Args:
+        email: Email address to drop
+        profile_id: Profile identifier to drop
+    """
+    _identity_cache.invalidate(email=email, profile_id=profile_id)
+
+
+def _is_missing_index_error(error: ClientError) -> bool:
+    """Check whether a query failed because the GSI does not exist"""
+    error_info = error.response.get('Error', {})
+    return (
+        error_info.get('Code') == 'ValidationException'
+        and 'index' in error_info.get('Message', '').lower()
+    )
+
+
+def find_profile_by_email(email: str, profiles_table=None, user_type: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Find a profile by email using the email-index GSI
+    
+    Falls back to a fully paginated scan only when the table has no
+    email-index (a single `scan(Limit=1)` applies the limit before the
+    filter and misses matches on larger tables).
+    
+    Args:
+        email: Email address to lookup
+        profiles_table: DynamoDB table resource (optional)
+        user_type: Optional user type filter ("coach", "parent", "admin")
+        
+    Returns:
+        Profile dict or None if not found
+    """
+    email = email.lower().strip()
+    if not profiles_table:
+        profiles_table = get_dynamodb_table(get_table_name('profiles'))
+    
+    table_name = profiles_table.table_name
+    if table_name not in _tables_without_email_index:
+        query_kwargs = {
+            'IndexName': PROFILES_EMAIL_INDEX,
+            'KeyConditionExpression': Key('email').eq(email)
+        }
+        if user_type:
+            query_kwargs['FilterExpression'] = Attr('user_type').eq(user_type)
+        
+        try:
+            for response in iter_query_pages(profiles_table, **query_kwargs):
+                _identity_cache.increment('index_queries')
+                if response.get('Items'):
+                    profile = response['Items'][0]
+                    _identity_cache.store(email, profile['profile_id'], profile.get('user_type'))
+                    return profile
+            return None
+        except ClientError as e:
+            if not _is_missing_index_error(e):
+                raise
+            print(f"⚠️ {table_name} has no {PROFILES_EMAIL_INDEX}, falling back to scan")
+            _tables_without_email_index.add(table_name)
+    
+    filter_expression = Attr('email').eq(email)
+    if user_type:
+        filter_expression = filter_expression & Attr('user_type').eq(user_type)
+    
+    _identity_cache.increment('fallback_scans')
+    for response in iter_scan_pages(profiles_table, FilterExpression=filter_expression):
+        if response.get('Items'):
+            profile = response['Items'][0]
+            _identity_cache.store(email, profile['profile_id'], profile.get('user_type'))
+            return profile
+    return None
+
+
+def _resolve_email(email: str, profiles_table=None, user_type: Optional[str] = None) -> Optional[str]:
+    """Resolve an email to a profile_id, consulting the container cache first"""
+    email = email.lower().strip()
+    profile_id = _identity_cache.get_profile_id(email, user_type)
+    if profile_id:
+        return profile_id
+    
+    profile = find_profile_by_email(email, profiles_table, user_type)
+    return profile['profile_id'] if profile else None
 
 
 class UserIdentifier:
@@ -33,18 +247,10 @@ class UserIdentifier:
         
         # If it looks like an email, lookup the profile_id
         if '@' in coach_id:
-            if not profiles_table:
-                profiles_table = get_dynamodb_table(get_table_name('profiles'))
-                
             try:
-                response = profiles_table.scan(
-                    FilterExpression='email = :email',
-                    ExpressionAttributeValues={':email': coach_id.lower()},
-                    Limit=1
-                )
+                profile_id = _resolve_email(coach_id, profiles_table)
                 
-                if response['Items']:
-                    profile_id = response['Items'][0]['profile_id']
+                if profile_id:
                     print(f"🔗 Email mapping: {coach_id} -> {profile_id}")
                     return profile_id
                 else:
@@ -55,6 +261,10 @@ class UserIdentifier:
                     raise
                 raise ValueError(f"Error looking up profile for email {coach_id}: {str(e)}")
         
+        # Profile IDs seen recently were already validated against the table
+        if _identity_cache.get_email(coach_id):
+            return coach_id
+        
         # Assume it's already a profile_id - validate it exists
         if not profiles_table:
             profiles_table = get_dynamodb_table(get_table_name('profiles'))
@@ -64,6 +274,8 @@ class UserIdentifier:
             if 'Item' not in response:
                 raise ValueError(f"No profile found for profile_id: {coach_id}")
             
+            item = response['Item']
+            _identity_cache.store(item.get('email'), coach_id, item.get('user_type'))
             print(f"✅ Profile ID validated: {coach_id}")
             return coach_id
             
@@ -86,6 +298,10 @@ class UserIdentifier:
         """
         if not profile_id:
             return None
+        
+        email = _identity_cache.get_email(profile_id)
+        if email:
+            return email
             
         if not profiles_table:
             profiles_table = get_dynamodb_table(get_table_name('profiles'))
@@ -94,6 +310,7 @@ class UserIdentifier:
             response = profiles_table.get_item(Key={'profile_id': profile_id})
             if 'Item' in response:
                 email = response['Item'].get('email')
+                _identity_cache.store(email, profile_id, response['Item'].get('user_type'))
                 print(f"🔗 Profile ID mapping: {profile_id} -> {email}")
                 return email
             return None
@@ -147,21 +364,10 @@ class UserIdentifier:
         
         # Use same logic as coach but could be different table/logic in future
         if '@' in parent_id:
-            if not profiles_table:
-                profiles_table = get_dynamodb_table(get_table_name('profiles'))
-                
             try:
-                response = profiles_table.scan(
-                    FilterExpression='email = :email AND user_type = :user_type',
-                    ExpressionAttributeValues={
-                        ':email': parent_id.lower(),
-                        ':user_type': 'parent'
-                    },
-                    Limit=1
-                )
+                profile_id = _resolve_email(parent_id, profiles_table, user_type='parent')
                 
-                if response['Items']:
-                    profile_id = response['Items'][0]['profile_id']
+                if profile_id:
                     print(f"🔗 Parent email mapping: {parent_id} -> {profile_id}")
                     return profile_id
                 else:
@@ -195,21 +401,10 @@ class UserIdentifier:
         admin_id = str(admin_id).strip()
         
         if '@' in admin_id:
-            if not profiles_table:
-                profiles_table = get_dynamodb_table(get_table_name('profiles'))
-                
             try:
-                response = profiles_table.scan(
-                    FilterExpression='email = :email AND user_type = :user_type',
-                    ExpressionAttributeValues={
-                        ':email': admin_id.lower(),
-                        ':user_type': 'admin'
-                    },
-                    Limit=1
-                )
+                profile_id = _resolve_email(admin_id, profiles_table, user_type='admin')
                 
-                if response['Items']:
-                    profile_id = response['Items'][0]['profile_id']
+                if profile_id:
                     print(f"🔗 Admin email mapping: {admin_id} -> {profile_id}")
                     return profile_id
                 else:
@@ -269,24 +464,9 @@ def get_user_by_email(email: str, user_type: Optional[str] = None) -> Optional[D
         if not email or '@' not in email:
             return None
             
-        profiles_table = get_dynamodb_table(get_table_name('profiles'))
-        
-        # Build filter expression
-        filter_expression = 'email = :email'
-        expression_values = {':email': email.lower()}
+        profile = find_profile_by_email(email, user_type=user_type)
         
-        if user_type:
-            filter_expression += ' AND user_type = :user_type'
-            expression_values[':user_type'] = user_type
-        
-        response = profiles_table.scan(
-            FilterExpression=filter_expression,
-            ExpressionAttributeValues=expression_values,
-            Limit=1
-        )
-        
-        if response['Items']:
-            profile = response['Items'][0]
+        if profile:
             print(f"✅ User profile retrieved by email: {email} -> {profile.get('profile_id')}")
             return profile
         
@@ -6,6 +6,8 @@ Provides consistent validation patterns across all backend services
 import re
 from typing import Dict, Any, List, Union
 
+from .security_patterns import STRICT_MATCHER
+
 
 def validate_email(email: str) -> bool:
     """
@@ -152,102 +154,9 @@ def validate_input_security(data: Any) -> Dict[str, Any]:
         data: Data to validate (can be dict, list, or string)
         
     Returns:
-        Dict with validation result
+        Dict with validation result ('pattern_type' and 'field_path' on failure)
     """
-    
-    # XSS patterns to detect
-    xss_patterns = [
-        r'<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>',
-        r'javascript:',
-        r'vbscript:',
-        r'on\w+\s*=',
-        r'<iframe\b',
-        r'<object\b',
-        r'<embed\b',
-        r'<link\b',
-        r'<meta\b',
-        r'<style\b'
-    ]
-    
-    # SQL injection patterns to detect
-    sql_patterns = [
-        r'\b(union|select|insert|delete|update|drop|exec|execute)\b.*\b(from|where|into)\b',
-        r'[;\'"]\s*--',
-        r'\bor\s+\d+\s*=\s*\d+',
-        r'\band\s+\d+\s*=\s*\d+',
-        r'\bunion\s+select',
-        r'1\s*=\s*1',
-        r'1\s*or\s*1'
-    ]
-    
-    # Command injection patterns
-    command_patterns = [
-        r'[;&|`]',
-        r'\$\(',
-        r'`.*`',
-        r'\|\s*\w+',
-        r'&&\s*\w+',
-        r';\s*\w+'
-    ]
-    
-    def check_string_value(value: str) -> Dict[str, Any]:
-        """Check a single string value for security issues"""
-        if not isinstance(value, str):
-            return {'valid': True}
-        
-        value_lower = value.lower()
-        
-        # Check for XSS
-        for pattern in xss_patterns:
-            if re.search(pattern, value_lower, re.IGNORECASE):
-                return {
-                    'valid': False,
-                    'error': 'Potentially malicious script content detected',
-                    'pattern_type': 'xss'
-                }
-        
-        # Check for SQL injection
-        for pattern in sql_patterns:
-            if re.search(pattern, value_lower, re.IGNORECASE):
-                return {
-                    'valid': False,
-                    'error': 'Potentially malicious SQL content detected',
-                    'pattern_type': 'sql_injection'
-                }
-        
-        # Check for command injection
-        for pattern in command_patterns:
-            if re.search(pattern, value, re.IGNORECASE):
-                return {
-                    'valid': False,
-                    'error': 'Potentially malicious command content detected',
-                    'pattern_type': 'command_injection'
-                }
-        
-        return {'valid': True}
-    
-    def validate_recursive(obj, path=""):
-        """Recursively validate all string values"""
-        if isinstance(obj, dict):
-            for key, value in obj.items():
-                current_path = f"{path}.{key}" if path else key
-                result = validate_recursive(value, current_path)
-                if not result['valid']:
-                    result['field_path'] = current_path
-                    return result
-        elif isinstance(obj, list):
-            for i, item in enumerate(obj):
-                current_path = f"{path}[{i}]" if path else f"[{i}]"
-                result = validate_recursive(item, current_path)
-                if not result['valid']:
-                    result['field_path'] = current_path
-                    return result
-        elif isinstance(obj, str):
-            return check_string_value(obj)
-        
-        return {'valid': True}
-    
-    return validate_recursive(data)
+    return STRICT_MATCHER.validate(data)
 
 
 def validate_phone_number(phone: str, country_code: str = "US") -> bool:
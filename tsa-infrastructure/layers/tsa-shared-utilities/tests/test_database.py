@@ -0,0 +1,70 @@
+"""
+Tests for tsa_shared.database batch writes
+"""
+import os
+import sys
+from decimal import Decimal
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'python'))
+
+from tsa_shared import database  # noqa: E402
+
+
+def _to_wire(value):
+    """Numbers come back from DynamoDB as Decimal"""
+    if isinstance(value, dict):
+        return {key: _to_wire(inner) for key, inner in value.items()}
+    if isinstance(value, list):
+        return [_to_wire(inner) for inner in value]
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return Decimal(str(value))
+    return value
+
+
+class FakeClient:
+    """batch_write_item stub that never processes requests for the given ids"""
+
+    def __init__(self, unprocessed_ids):
+        self.unprocessed_ids = set(unprocessed_ids)
+
+    def batch_write_item(self, RequestItems, ReturnConsumedCapacity=None):
+        leftover = {}
+        for table_name, requests in RequestItems.items():
+            stuck = [
+                _to_wire(request) for request in requests
+                if request['PutRequest']['Item']['id'] in self.unprocessed_ids
+            ]
+            if stuck:
+                leftover[table_name] = stuck
+        return {'UnprocessedItems': leftover}
+
+
+def _table(unprocessed_ids):
+    return SimpleNamespace(table_name='items-test', meta=SimpleNamespace(client=FakeClient(unprocessed_ids)))
+
+
+def test_unprocessed_item_with_numeric_attributes_is_reported_failed():
+    items = [
+        {'id': 'a', 'points': 5, 'order_index': 1},
+        {'id': 'b', 'points': 2.5, 'order_index': 2},
+        {'id': 'c', 'points': 1, 'order_index': 3}
+    ]
+
+    result = database.batch_write_items(_table({'a', 'b'}), items, max_retries=1, base_delay=0)
+
+    assert result['success'] is False
+    assert result['written'] == 1
+    assert result['failed'] == 2
+    assert [status['status'] for status in result['results']] == ['failed', 'failed', 'written']
+    assert len(result['unprocessed_items']) == 2
+
+
+def test_all_items_processed():
+    items = [{'id': str(i), 'score': i} for i in range(30)]
+
+    result = database.batch_write_items(_table(set()), items, max_retries=0, base_delay=0)
+
+    assert result['success'] is True
+    assert result['written'] == 30
+    assert result['failed'] == 0
@@ -72,7 +72,10 @@ class DataSynchronizerStack(Stack):
                 "DB_SECRET_ARN": self.shared_resources.get("database_secret_arn", ""),
                 "DB_PORT": "5432",
                 "STAGE": self.stage,
-                "LOG_LEVEL": "INFO"
+                "LOG_LEVEL": "INFO",
+                # One batch transaction at a time per container
+                "DB_POOL_SIZE": "1",
+                "DB_MAX_OVERFLOW": "1"
             }
         )
 
@@ -110,8 +113,12 @@ class DataSynchronizerStack(Stack):
                 event_sources.DynamoEventSource(
                     table,
                     starting_position=lambda_.StartingPosition.LATEST,
-                    batch_size=10,
-                    retry_attempts=3
+                    batch_size=500,
+                    max_batching_window=Duration.seconds(2),
+                    retry_attempts=3,
+                    bisect_batch_on_error=True,
+                    # Handler returns batchItemFailures so only poison records are retried
+                    report_batch_item_failures=True
                 )
             )
         
@@ -19,6 +19,8 @@ from aws_cdk import (
     aws_logs as logs,
     aws_ssm as ssm,
     aws_secretsmanager as secretsmanager,
+    aws_sqs as sqs,
+    aws_lambda_event_sources as lambda_event_sources,
     BundlingOptions,
     RemovalPolicy,
 )
@@ -49,6 +51,7 @@ class PasswordlessAuthStack(Stack):
         # Create core authentication resources
         self._create_jwt_secret()
         self._create_sendgrid_secret()
+        self._create_email_outbox()
         self._create_lambda_functions()
         self._create_api_gateway()
         self._create_outputs()
@@ -111,6 +114,28 @@ class PasswordlessAuthStack(Stack):
             )
             print(f"✅ Created new SendGrid secret: {secret_name}")
     
+    def _create_email_outbox(self):
+        """Create the SQS email outbox and its dead-letter queue"""
+        
+        # Jobs that keep failing delivery land here for inspection / redrive
+        self.email_dlq = sqs.Queue(
+            self, "EmailOutboxDLQ",
+            queue_name=f"tsa-email-outbox-dlq-{self.stage}",
+            retention_period=Duration.days(14)
+        )
+        
+        # Visibility timeout must exceed the worker timeout (6x per AWS guidance)
+        self.email_queue = sqs.Queue(
+            self, "EmailOutboxQueue",
+            queue_name=f"tsa-email-outbox-{self.stage}",
+            visibility_timeout=Duration.minutes(6),
+            retention_period=Duration.days(4),
+            dead_letter_queue=sqs.DeadLetterQueue(
+                max_receive_count=5,
+                queue=self.email_dlq
+            )
+        )
+    
     def _create_lambda_functions(self):
         """Create Lambda functions for passwordless auth flow"""
         
@@ -138,6 +163,8 @@ class PasswordlessAuthStack(Stack):
                 "SENDGRID_API_KEY": self.sendgrid_secret.secret_arn,
                 "SENDGRID_FROM_EMAIL": "no-reply@strata.school",  # Correct domain
                 "SENDGRID_FROM_NAME": "Texas Sports Academy",
+                # Email outbox (magic links are delivered by the email worker)
+                "TSA_EMAIL_QUEUE_URL": self.email_queue.queue_url,
                 # Admin configuration
                 "ADMIN_EMAILS": "admin@sportsacademy.school,danny.mota@superbuilders.school,malekai.mischke@superbuilders.school",
             }
@@ -179,6 +206,50 @@ class PasswordlessAuthStack(Stack):
             **lambda_config
         )
         
+        # Email Outbox Worker Function - drains the queue and delivers via SendGrid
+        worker_config = {
+            **lambda_config,
+            "timeout": Duration.seconds(60),
+            "environment": {
+                **{
+                    key: value for key, value in lambda_config["environment"].items()
+                    if key not in ("TSA_EMAIL_QUEUE_URL", "SENDGRID_API_KEY")
+                },
+                # Resolved through the cached secrets provider (SSM first, then this secret)
+                "SENDGRID_SECRET_ARN": self.sendgrid_secret.secret_arn,
+                "SENDGRID_MAX_REQUESTS_PER_SECOND": "5"
+            }
+        }
+        self.email_worker_function = lambda_.Function(
+            self, "EmailWorkerHandler",
+            function_name=self.table_config.get_lambda_names()["auth_email_worker"],
+            code=lambda_.Code.from_asset(
+                "../tsa-auth-backend",
+                bundling=BundlingOptions(
+                    image=lambda_.Runtime.PYTHON_3_9.bundling_image,
+                    command=[
+                        "bash", "-c",
+                        "pip install -r requirements.txt -t /asset-output && cp -au . /asset-output"
+                    ],
+                )
+            ),
+            handler="email_worker_handler.lambda_handler",
+            **worker_config
+        )
+        
+        self.email_worker_function.add_event_source(
+            lambda_event_sources.SqsEventSource(
+                self.email_queue,
+                batch_size=100,
+                max_batching_window=Duration.seconds(5),
+                report_batch_item_failures=True,
+                # Caps concurrent SendGrid callers so the per-container rate limit holds overall.
+                # Limiting the poller (not reserved concurrency) means throttled invokes never
+                # burn receives toward the DLQ's max_receive_count
+                max_concurrency=2
+            )
+        )
+        
         # Grant permissions
         self._grant_lambda_permissions()
     
@@ -234,6 +305,10 @@ class PasswordlessAuthStack(Stack):
         # SendGrid secret permissions
         self.sendgrid_secret.grant_read(self.magic_link_function)
         self.sendgrid_secret.grant_read(self.verify_token_function)
+        self.sendgrid_secret.grant_read(self.email_worker_function)
+        
+        # Email outbox permissions
+        self.email_queue.grant_send_messages(self.magic_link_function)
         
         # SSM Parameter Store permissions for admin emails and SendGrid
         ssm_policy = iam.PolicyStatement(
@@ -250,6 +325,23 @@ class PasswordlessAuthStack(Stack):
         
         self.magic_link_function.add_to_role_policy(ssm_policy)
         self.verify_token_function.add_to_role_policy(ssm_policy)
+        self.email_worker_function.add_to_role_policy(ssm_policy)
+        
+        # Cold-start prefetch of all stage parameters (tsa_shared secrets provider)
+        ssm_prefetch_policy = iam.PolicyStatement(
+            effect=iam.Effect.ALLOW,
+            actions=[
+                "ssm:GetParametersByPath"
+            ],
+            resources=[
+                f"arn:aws:ssm:{self.region}:{self.account}:parameter/tsa/{self.stage}",
+                f"arn:aws:ssm:{self.region}:{self.account}:parameter/tsa/{self.stage}/*"
+            ]
+        )
+        
+        self.magic_link_function.add_to_role_policy(ssm_prefetch_policy)
+        self.verify_token_function.add_to_role_policy(ssm_prefetch_policy)
+        self.email_worker_function.add_to_role_policy(ssm_prefetch_policy)
     
     def _create_api_gateway(self):
         """Create API Gateway for auth endpoints"""
@@ -357,6 +449,12 @@ class PasswordlessAuthStack(Stack):
             value=self.api.url,
             export_name=f"PasswordlessAPIEndpoint-{self.stage}"
         )
+        
+        CfnOutput(
+            self, "EmailOutboxQueueUrl",
+            value=self.email_queue.queue_url,
+            description="TSA email outbox SQS queue URL"
+        )
     
     def get_shared_resources(self) -> Dict[str, Any]:
         """Get shared resources for other stacks"""
@@ -365,5 +463,6 @@ class PasswordlessAuthStack(Stack):
             "user_pool_client": self.user_pool_client,
             "api": self.api,
             "jwt_secret": self.jwt_secret,
-            "sendgrid_secret": self.sendgrid_secret
+            "sendgrid_secret": self.sendgrid_secret,
+            "email_queue": self.email_queue
         } 
\ No newline at end of file
@@ -14,6 +14,7 @@ from aws_cdk import (
     aws_logs as logs,
     aws_ec2 as ec2,
     aws_ssm as ssm,
+    aws_lambda_event_sources as event_sources,
 )
 from constructs import Construct
 from typing import Dict, Any
@@ -104,6 +105,18 @@ class AdminPortalService(Construct):
             point_in_time_recovery=True
         )
 
+        # Create admin dashboard metrics table (pre-aggregated counters fed by table streams)
+        self.metrics_table = dynamodb.Table(
+            self, "AdminMetricsTable",
+            table_name=f"admin-metrics-{self.stage}",
+            partition_key=dynamodb.Attribute(
+                name="metric_key",
+                type=dynamodb.AttributeType.STRING
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY
+        )
+
         # Add GSI for user action lookups
         self.audit_logs_table.add_global_secondary_index(
             index_name="user-id-index",
@@ -160,6 +173,7 @@ class AdminPortalService(Construct):
             "SENDGRID_SECRET_ARN": self.shared_resources.get("sendgrid_secret_arn", ""),
             "SENDGRID_FROM_EMAIL": "no-reply@strata.school",
             "SENDGRID_FROM_NAME": "Texas Sports Academy",
+            "TSA_EMAIL_QUEUE_URL": self.shared_resources.get("email_queue_url", ""),
             "LOG_LEVEL": "INFO",
             # Shared table environment variables from data infrastructure layer
             "TSA_USERS_TABLE": self.shared_table_names["users"],
@@ -168,8 +182,11 @@ class AdminPortalService(Construct):
             "TSA_ENROLLMENTS_TABLE": self.shared_table_names["enrollments"],
             "TSA_EVENTS_TABLE": self.shared_table_names["events"],
             "TSA_DOCUMENTS_TABLE": self.shared_table_names["documents"],
-            # Admin-specific table
+            # Admin-specific tables
             "TSA_AUDIT_LOGS_TABLE": self.audit_logs_table.table_name,
+            "TSA_ADMIN_METRICS_TABLE": self.metrics_table.table_name,
+            # Async rebuild target when the metrics table is still empty
+            "TSA_ADMIN_METRICS_AGGREGATOR_FUNCTION": self.table_config.get_lambda_names()["admin_metrics_aggregator"],
         }
         
         # ========================================
@@ -214,21 +231,59 @@ class AdminPortalService(Construct):
             **base_lambda_config
         )
         
+        # 4. Dashboard Metrics Aggregator (DynamoDB streams -> admin metrics table)
+        self.metrics_aggregator_function = lambda_.Function(
+            self, "MetricsAggregatorHandler",
+            function_name=self.table_config.get_lambda_names()["admin_metrics_aggregator"],
+            code=lambda_.Code.from_asset("../tsa-admin-backend/lambda_metrics_aggregator"),
+            handler="handler.lambda_handler",
+            environment=common_env,
+            **{**base_lambda_config, "timeout": Duration.minutes(5)}
+        )
+        
         # Grant permissions to functions
         functions = [
             self.invitations_function,
             self.audit_health_function,
-            self.coaches_function
+            self.coaches_function,
+            self.metrics_aggregator_function
         ]
         
         for function in functions:
             self._grant_common_permissions(function)
+            if function is not self.metrics_aggregator_function:
+                self.metrics_aggregator_function.grant_invoke(function)
+        
+        self._connect_metrics_streams()
+        
+    def _connect_metrics_streams(self):
+        """Feed coach-invitations and profiles stream changes into the metrics aggregator"""
+        source_tables = [
+            self.shared_resources.get("coach_invitations_table"),
+            self.shared_resources.get("profiles_table")
+        ]
+        
+        for table in source_tables:
+            if table is None:
+                logger.warning("Stream source table not provided - admin metrics will rely on rebuilds")
+                continue
+            self.metrics_aggregator_function.add_event_source(
+                event_sources.DynamoEventSource(
+                    table,
+                    starting_position=lambda_.StartingPosition.LATEST,
+                    batch_size=100,
+                    max_batching_window=Duration.seconds(5),
+                    retry_attempts=3,
+                    bisect_batch_on_error=True
+                )
+            )
         
     def _grant_common_permissions(self, function):
         """Grant common permissions to a Lambda function"""
         
         # Grant permissions to admin-specific tables (directly owned)
         self.audit_logs_table.grant_read_write_data(function)
+        self.metrics_table.grant_read_write_data(function)
         
         # Grant permissions to shared tables from centralized configuration
         shared_table_arns = []
@@ -278,6 +333,17 @@ class AdminPortalService(Construct):
                 )
             )
         
+        # Email outbox permissions (emails are enqueued and delivered by the auth email worker)
+        email_queue_arn = self.shared_resources.get("email_queue_arn")
+        if email_queue_arn:
+            function.add_to_role_policy(
+                iam.PolicyStatement(
+                    effect=iam.Effect.ALLOW,
+                    actions=["sqs:SendMessage"],
+                    resources=[email_queue_arn]
+                )
+            )
+        
         # Cognito permissions for user management
         if self.shared_resources.get("user_pool"):
             function.add_to_role_policy(
@@ -554,5 +620,6 @@ class AdminPortalService(Construct):
             "events": self.shared_table_names["events"],
             "documents": self.shared_table_names["documents"],
             # Admin-specific tables
-            "audit_logs": self.audit_logs_table.table_name
+            "audit_logs": self.audit_logs_table.table_name,
+            "admin_metrics": self.metrics_table.table_name
         } 
\ No newline at end of file
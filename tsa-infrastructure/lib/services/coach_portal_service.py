@@ -9,6 +9,7 @@ from aws_cdk import (
     Stack,
     RemovalPolicy,
     aws_lambda as lambda_,
+    aws_lambda_event_sources as event_sources,
     aws_apigateway as apigateway,
     aws_iam as iam,
     aws_dynamodb as dynamodb,
@@ -16,6 +17,9 @@ from aws_cdk import (
     aws_ec2 as ec2,
     aws_ssm as ssm,
     aws_secretsmanager as secrets,
+    aws_sqs as sqs,
+    aws_events as events,
+    aws_events_targets as targets,
 )
 from constructs import Construct
 from typing import Dict, Any
@@ -132,7 +136,8 @@ class CoachPortalService(Construct):
             ),
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             removal_policy=RemovalPolicy.RETAIN,
-            point_in_time_recovery=True
+            point_in_time_recovery=True,
+            stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES  # Feeds the coach progress projection
         )
         
         # Add GSI for coach lookups
@@ -161,6 +166,18 @@ class CoachPortalService(Construct):
             point_in_time_recovery=True
         )
         
+        # Coach progress projection (one item per coach, maintained from table streams)
+        self.coach_progress_table = dynamodb.Table(
+            self, "CoachProgressTable",
+            table_name=self.get_table_name("coach-progress"),
+            partition_key=dynamodb.Attribute(
+                name="profile_id",
+                type=dynamodb.AttributeType.STRING
+            ),
+            billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
+            removal_policy=RemovalPolicy.DESTROY  # Rebuildable from the source tables
+        )
+        
         # NOTE: eventbrite-config and event-attendees tables are now created in the Data Stack
         # as shared resources, not coach-specific tables
         
@@ -206,6 +223,7 @@ class CoachPortalService(Construct):
                 "ONBOARDING_SESSIONS_TABLE": self.onboarding_table.table_name,
                 "BACKGROUND_CHECKS_TABLE": self.background_checks_table.table_name,
                 "LEGAL_REQUIREMENTS_TABLE": self.legal_requirements_table.table_name,
+                "TSA_COACH_PROGRESS_TABLE": self.coach_progress_table.table_name,
                 
                 # Shared event management tables (from data stack)
                 "EVENTBRITE_CONFIG_TABLE": self.shared_table_names["eventbrite-config"],
@@ -231,6 +249,9 @@ class CoachPortalService(Construct):
                 "FRONTEND_URL": frontend_url,
                 "STAGE": self.stage,
                 
+                # Email outbox (delivered by the auth email worker)
+                "TSA_EMAIL_QUEUE_URL": self.shared_resources.get("email_queue_url", ""),
+                
                 # Other
                 "FROM_EMAIL": self.env_config.get("from_email", "no-reply@sportsacademy.school"),
                 "LOG_LEVEL": "INFO"
@@ -298,9 +319,43 @@ class CoachPortalService(Construct):
             **lambda_config
         )
         
+        # Coach progress projector (DynamoDB streams -> coach progress table)
+        self.progress_projector_function = lambda_.Function(
+            self, "ProgressProjectorHandler",
+            function_name=self.get_lambda_names()["coach_progress_projector"],
+            code=lambda_.Code.from_asset("../tsa-coach-backend/lambda_progress_projector"),
+            handler="handler.lambda_handler",
+            **{**lambda_config, "timeout": Duration.minutes(5)}
+        )
+        
+        # Principal authorizer - verifies the bearer token and resolves the coach once per token
+        self.authorizer_function = lambda_.Function(
+            self, "PrincipalAuthorizerHandler",
+            function_name=self.get_lambda_names()["coach_principal_authorizer"],
+            code=lambda_.Code.from_asset("../tsa-auth-backend"),
+            handler="authorizer_handler.lambda_handler",
+            **{**lambda_config, "timeout": Duration.seconds(10)}
+        )
+        profiles_table_name = self.get_table_name("profiles")
+        self.authorizer_function.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=["dynamodb:GetItem", "dynamodb:Query", "dynamodb:Scan"],
+                resources=[
+                    f"arn:aws:dynamodb:*:*:table/{profiles_table_name}",
+                    f"arn:aws:dynamodb:*:*:table/{profiles_table_name}/index/*"
+                ]
+            )
+        )
+        
+        # Scheduled Eventbrite attendee sync (planner + FIFO queue worker)
+        self._create_eventbrite_sync(lambda_config)
+        
         # Grant necessary permissions
         self._grant_table_permissions()
         self._grant_secrets_permissions()
+        self._grant_email_outbox_permissions()
+        self._connect_progress_streams()
         
         # Grant auth service permissions if available
         auth_user_pool_id = lambda_config["environment"].get("AUTH_USER_POOL_ID")
@@ -317,7 +372,9 @@ class CoachPortalService(Construct):
             self.events_function,
             self.background_function,
             self.eventbrite_oauth_function,
-            self.invitations_function
+            self.invitations_function,
+            self.progress_projector_function,
+            self.eventbrite_sync_function
         ]
         
         for function in functions:
@@ -325,10 +382,11 @@ class CoachPortalService(Construct):
             self.onboarding_table.grant_read_write_data(function)
             self.background_checks_table.grant_read_write_data(function)
             self.legal_requirements_table.grant_read_write_data(function)
+            self.coach_progress_table.grant_read_write_data(function)
             
             # Grant permissions to shared tables from centralized configuration
             shared_table_arns = []
-            for table_key in ["users", "profiles", "coach-invitations", "parent-invitations", "event-invitations", "enrollments", "events", "documents", "eventbrite-config", "event-attendees"]:
+            for table_key in ["users", "profiles", "coach-invitations", "parent-invitations", "event-invitations", "enrollments", "events", "documents", "eventbrite-config", "event-attendees", "sessions"]:
                 table_name = self.get_table_name(table_key)
                 shared_table_arns.extend([
                     f"arn:aws:dynamodb:*:*:table/{table_name}",
@@ -353,6 +411,110 @@ class CoachPortalService(Construct):
                 )
             )
     
+    def _create_eventbrite_sync(self, lambda_config: Dict[str, Any]):
+        """Create the scheduled Eventbrite sync: planner runs on a schedule, worker drains the FIFO queue"""
+        
+        # Jobs that keep failing land here for inspection / redrive
+        self.eventbrite_sync_dlq = sqs.Queue(
+            self, "EventbriteSyncDLQ",
+            queue_name=f"tsa-eventbrite-sync-dlq-{self.stage}.fifo",
+            fifo=True,
+            retention_period=Duration.days(14)
+        )
+        
+        # One message group per coach: at most one sync per coach token in flight.
+        # Visibility timeout must exceed the worker timeout (6x per AWS guidance)
+        self.eventbrite_sync_queue = sqs.Queue(
+            self, "EventbriteSyncQueue",
+            queue_name=f"tsa-eventbrite-sync-{self.stage}.fifo",
+            fifo=True,
+            visibility_timeout=Duration.minutes(30),
+            retention_period=Duration.days(1),
+            dead_letter_queue=sqs.DeadLetterQueue(
+                max_receive_count=5,
+                queue=self.eventbrite_sync_dlq
+            )
+        )
+        
+        self.eventbrite_sync_function = lambda_.Function(
+            self, "EventbriteSyncHandler",
+            function_name=self.get_lambda_names()["coach_eventbrite_sync"],
+            code=lambda_.Code.from_asset("../tsa-coach-backend/lambda_events"),
+            handler="sync_orchestrator.lambda_handler",
+            **{
+                **lambda_config,
+                "timeout": Duration.minutes(5),
+                "environment": {
+                    **lambda_config["environment"],
+                    "EVENTBRITE_SYNC_QUEUE_URL": self.eventbrite_sync_queue.queue_url
+                }
+            }
+        )
+        
+        self.eventbrite_sync_queue.grant_send_messages(self.eventbrite_sync_function)
+        self.eventbrite_sync_function.add_event_source(
+            event_sources.SqsEventSource(
+                self.eventbrite_sync_queue,
+                batch_size=10,
+                report_batch_item_failures=True,
+                # Caps concurrent workers across all coaches
+                max_concurrency=5
+            )
+        )
+        
+        # Plan due syncs every 15 minutes
+        events.Rule(
+            self, "EventbriteSyncSchedule",
+            rule_name=f"tsa-eventbrite-sync-{self.stage}",
+            schedule=events.Schedule.rate(Duration.minutes(15)),
+            targets=[targets.LambdaFunction(self.eventbrite_sync_function)]
+        )
+    
+    def _connect_progress_streams(self):
+        """Feed profile, background check, event, invitation and enrollment changes into the progress projector"""
+        # Profiles changes come from the table's Kinesis data stream; its DynamoDB
+        # stream already has the two readers AWS recommends per shard
+        profiles_change_stream = self.shared_resources.get("profiles_change_stream")
+        if profiles_change_stream is None:
+            logger.warning("Profiles change stream not provided - coach progress will rely on rebuilds")
+        else:
+            self.progress_projector_function.add_event_source(
+                event_sources.KinesisEventSource(
+                    profiles_change_stream,
+                    starting_position=lambda_.StartingPosition.LATEST,
+                    batch_size=100,
+                    max_batching_window=Duration.seconds(5),
+                    retry_attempts=3,
+                    bisect_batch_on_error=True,
+                    # Handler returns batchItemFailures so only the failed record onwards is retried
+                    report_batch_item_failures=True
+                )
+            )
+        
+        source_tables = [
+            self.background_checks_table,
+            self.shared_resources.get("events_table"),
+            self.shared_resources.get("parent_invitations_table"),
+            self.shared_resources.get("enrollments_table")
+        ]
+        
+        for table in source_tables:
+            if table is None:
+                logger.warning("Stream source table not provided - coach progress will rely on rebuilds")
+                continue
+            self.progress_projector_function.add_event_source(
+                event_sources.DynamoEventSource(
+                    table,
+                    starting_position=lambda_.StartingPosition.LATEST,
+                    batch_size=100,
+                    max_batching_window=Duration.seconds(5),
+                    retry_attempts=3,
+                    bisect_batch_on_error=True,
+                    # Handler returns batchItemFailures so only the failed record onwards is retried
+                    report_batch_item_failures=True
+                )
+            )
+    
     def _grant_secrets_permissions(self):
         """Grant AWS Secrets Manager permissions to Lambda functions"""
         
@@ -366,7 +528,8 @@ class CoachPortalService(Construct):
         # Functions that need Eventbrite credentials
         eventbrite_functions = [
             self.events_function,
-            self.eventbrite_oauth_function
+            self.eventbrite_oauth_function,
+            self.eventbrite_sync_function
         ]
         
         # Functions that need database credentials  
@@ -405,6 +568,20 @@ class CoachPortalService(Construct):
                 )
             )
         
+    def _grant_email_outbox_permissions(self):
+        """Allow invitation emails to be enqueued on the shared email outbox"""
+        email_queue_arn = self.shared_resources.get("email_queue_arn")
+        if not email_queue_arn:
+            return
+        
+        self.invitations_function.add_to_role_policy(
+            iam.PolicyStatement(
+                effect=iam.Effect.ALLOW,
+                actions=["sqs:SendMessage"],
+                resources=[email_queue_arn]
+            )
+        )
+        
     def _grant_auth_service_permissions(self, auth_user_pool_id):
         """Grant auth service permissions to Lambda functions"""
         
@@ -510,6 +687,33 @@ class CoachPortalService(Construct):
             )
         )
         
+        # Principal authorizer - result (email, profile_id, role, user_type) cached per token
+        self.principal_authorizer = apigateway.TokenAuthorizer(
+            self, "CoachPrincipalAuthorizer",
+            handler=self.authorizer_function,
+            identity_source=apigateway.IdentitySource.header("Authorization"),
+            results_cache_ttl=Duration.minutes(5)
+        )
+        
+        # Requests the authorizer rejects never reach a handler, so API Gateway's own
+        # 401/403 (and AUTHORIZER_FAILURE 500) need the CORS headers create_cors_response
+        # sends - otherwise the browser reports a CORS error and the frontend never sees the 401.
+        # The origin is echoed because gateway responses cannot check it against the allow-list;
+        # these responses carry no data.
+        for response_id, response_type in (("Default4xx", apigateway.ResponseType.DEFAULT_4XX),
+                                           ("Default5xx", apigateway.ResponseType.DEFAULT_5XX)):
+            self.api.add_gateway_response(
+                response_id,
+                type=response_type,
+                response_headers={
+                    "Access-Control-Allow-Origin": "method.request.header.Origin",
+                    "Access-Control-Allow-Methods": "'GET,POST,PUT,DELETE,OPTIONS,PATCH,HEAD'",
+                    "Access-Control-Allow-Headers": "'Content-Type,X-Amz-Date,Authorization,X-Api-Key,X-Amz-Security-Token,X-Requested-With,Accept,Accept-Language,Cache-Control'",
+                    "Access-Control-Allow-Credentials": "'true'",
+                    "Vary": "'Origin'"
+                }
+            )
+        
         # Health check endpoint at root
         health_integration = apigateway.LambdaIntegration(
             self.onboarding_function,
@@ -558,7 +762,8 @@ class CoachPortalService(Construct):
         events_resource = self.api.root.add_resource("events")
         events_integration = apigateway.LambdaIntegration(self.events_function)
         
-        events_resource.add_method("GET", events_integration)
+        # GET /events (incl. ?action=timeline_status) requires a bearer token
+        events_resource.add_method("GET", events_integration, authorizer=self.principal_authorizer)
         events_resource.add_method("POST", events_integration)
         events_resource.add_method("PUT", events_integration)
         events_resource.add_method("DELETE", events_integration)
@@ -588,7 +793,7 @@ class CoachPortalService(Construct):
         
         # OAuth authorization endpoint
         authorize_resource = oauth_resource.add_resource("authorize")
-        authorize_resource.add_method("GET", eventbrite_oauth_integration)
+        authorize_resource.add_method("GET", eventbrite_oauth_integration, authorizer=self.principal_authorizer)
         
         # OAuth callback endpoint
         callback_resource = oauth_resource.add_resource("callback")
@@ -596,11 +801,11 @@ class CoachPortalService(Construct):
         
         # OAuth status endpoint
         status_resource = oauth_resource.add_resource("status")
-        status_resource.add_method("GET", eventbrite_oauth_integration)
+        status_resource.add_method("GET", eventbrite_oauth_integration, authorizer=self.principal_authorizer)
         
         # OAuth disconnect endpoint
         disconnect_resource = oauth_resource.add_resource("disconnect")
-        disconnect_resource.add_method("POST", eventbrite_oauth_integration)
+        disconnect_resource.add_method("POST", eventbrite_oauth_integration, authorizer=self.principal_authorizer)
         
         # OAuth refresh endpoint
         refresh_resource = oauth_resource.add_resource("refresh")
@@ -61,6 +61,8 @@ class ParentPortalService(Construct):
         # Get shared resources
         vpc = self.shared_resources.get("vpc")
         lambda_security_group = self.shared_resources.get("lambda_security_group")
+        user_pool = self.shared_resources.get("user_pool")
+        user_pool_client = self.shared_resources.get("user_pool_client")
         
         # Get environment-specific URLs
         frontend_urls = self.env_config.get("frontend_urls", {})
@@ -85,6 +87,10 @@ class ParentPortalService(Construct):
                 "DB_SECRET_ARN": self.shared_resources.get("database_secret_arn", ""),
                 "DB_PORT": "5432",
                 
+                # Authentication (Cognito JWT verification)
+                "USER_POOL_ID": user_pool.user_pool_id if user_pool else "",
+                "CLIENT_ID": user_pool_client.user_pool_client_id if user_pool_client else "",
+                
                 # Frontend URL
                 "FRONTEND_URL": frontend_url,
                 "STAGE": self.stage,
@@ -8,6 +8,7 @@ from aws_cdk import aws_s3 as s3
 from aws_cdk import aws_kms as kms
 from aws_cdk import aws_ec2 as ec2
 from aws_cdk import aws_dynamodb as dynamodb
+from aws_cdk import aws_kinesis as kinesis
 from aws_cdk import aws_secretsmanager as secretsmanager
 from constructs import Construct
 from .table_names import get_resource_config
@@ -199,6 +200,16 @@ class DataStack(Stack):
             stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES
         )
         
+        # Profile changes for additional consumers (the profiles DynamoDB stream
+        # already has two readers: data synchronizer and admin metrics)
+        self.profiles_change_stream = kinesis.Stream(
+            self, "ProfilesChangeStream",
+            stream_name=f"profiles-changes-{self.stage}",
+            stream_mode=kinesis.StreamMode.ON_DEMAND,
+            encryption=kinesis.StreamEncryption.MANAGED,
+            retention_period=Duration.hours(24)
+        )
+        
         # Profiles table - Extended profile information
         self.profiles_table = dynamodb.Table(
             self, "ProfilesTable",
@@ -210,7 +221,17 @@ class DataStack(Stack):
             billing_mode=dynamodb.BillingMode.PAY_PER_REQUEST,
             removal_policy=RemovalPolicy.DESTROY,
             point_in_time_recovery=True,
-            stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES
+            stream=dynamodb.StreamViewType.NEW_AND_OLD_IMAGES,
+            kinesis_stream=self.profiles_change_stream
+        )
+
+        # Add GSI for email -> profile_id resolution (tsa_shared.users.UserIdentifier)
+        self.profiles_table.add_global_secondary_index(
+            index_name="email-index",
+            partition_key=dynamodb.Attribute(
+                name="email",
+                type=dynamodb.AttributeType.STRING
+            )
         )
         
         # Organizations table
@@ -285,6 +306,15 @@ class DataStack(Stack):
                 type=dynamodb.AttributeType.STRING
             )
         )
+
+        # Add GSI for per-coach invitation counts (timeline status)
+        self.parent_invitations_table.add_global_secondary_index(
+            index_name="coach-id-index",
+            partition_key=dynamodb.Attribute(
+                name="coach_id",
+                type=dynamodb.AttributeType.STRING
+            )
+        )
         
         # Event invitations table - Coach invites parents to specific events
         self.event_invitations_table = dynamodb.Table(
@@ -335,6 +365,19 @@ class DataStack(Stack):
                 type=dynamodb.AttributeType.STRING
             )
         )
+
+        # Add GSI for per-coach enrollment counts by status (timeline status)
+        self.enrollments_table.add_global_secondary_index(
+            index_name="coach-id-index",
+            partition_key=dynamodb.Attribute(
+                name="coach_id",
+                type=dynamodb.AttributeType.STRING
+            ),
+            sort_key=dynamodb.Attribute(
+                name="enrollment_status",
+                type=dynamodb.AttributeType.STRING
+            )
+        )
         
         # ========================================
         # EVENT AND ACTIVITY TABLES
@@ -363,6 +406,19 @@ class DataStack(Stack):
             )
         )
         
+        # Add GSI for published / upcoming event lookups (scheduled Eventbrite sync)
+        self.events_table.add_global_secondary_index(
+            index_name="status-start-date-index",
+            partition_key=dynamodb.Attribute(
+                name="status",
+                type=dynamodb.AttributeType.STRING
+            ),
+            sort_key=dynamodb.Attribute(
+                name="start_date",
+                type=dynamodb.AttributeType.STRING
+            )
+        )
+        
         # Event registrations table
         self.event_registrations_table = dynamodb.Table(
             self, "EventRegistrationsTable",
@@ -496,6 +552,16 @@ class DataStack(Stack):
             time_to_live_attribute="expires_at"
         )
         
+        # GSI for logging a user out of every session without a table scan
+        self.sessions_table.add_global_secondary_index(
+            index_name="user-email-index",
+            partition_key=dynamodb.Attribute(
+                name="user_email",
+                type=dynamodb.AttributeType.STRING
+            ),
+            projection_type=dynamodb.ProjectionType.KEYS_ONLY
+        )
+        
     @property
     def database_connection_string(self) -> str:
         """Get database connection string for Lambda environment"""
@@ -112,9 +112,14 @@ class TableNameConfig:
                 "AttributeDefinitions": [
                     {"AttributeName": "profile_id", "AttributeType": "S"},
                     {"AttributeName": "user_id", "AttributeType": "S"},
-                    {"AttributeName": "school_id", "AttributeType": "S"}
+                    {"AttributeName": "school_id", "AttributeType": "S"},
+                    {"AttributeName": "email", "AttributeType": "S"}
                 ],
                 "GlobalSecondaryIndexes": [
+                    {
+                        "IndexName": "email-index",
+                        "KeySchema": [{"AttributeName": "email", "KeyType": "HASH"}]
+                    },
                     {
                         "IndexName": "user-index",
                         "KeySchema": [{"AttributeName": "user_id", "KeyType": "HASH"}]
@@ -285,6 +290,7 @@ class TableNameConfig:
             # Auth service functions
             'auth_magic_link': f'tsa-magic-link-{self.stage}',
             'auth_verify_token': f'tsa-verify-token-{self.stage}',
+            'auth_email_worker': f'tsa-email-worker-{self.stage}',
             
             # Admin service functions
             'admin_coaches': f'tsa-admin-coaches-{self.stage}',
@@ -298,6 +304,9 @@ class TableNameConfig:
             'coach_profile': f'tsa-coach-profile-{self.stage}',
             'coach_background': f'tsa-coach-background-{self.stage}',
             'coach_eventbrite_oauth': f'tsa-coach-eventbrite-oauth-{self.stage}',
+            'coach_progress_projector': f'tsa-coach-progress-projector-{self.stage}',
+            'coach_eventbrite_sync': f'tsa-coach-eventbrite-sync-{self.stage}',
+            'coach_principal_authorizer': f'tsa-coach-principal-authorizer-{self.stage}',
             
             # Parent service functions
             'parent_enrollment': f'tsa-parent-enrollment-{self.stage}',
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+TSA Security Validation Benchmark
+Compares the precompiled security matcher against the previous per-pattern
+re.search loop on typical onboarding and enrollment payloads, and checks that
+both agree on every sample.
+
+Usage:
+    python scripts/benchmark-security-validation.py [--iterations 2000]
+"""
+import os
+import re
+import sys
+import time
+import argparse
+from typing import Dict, Any, Callable
+
+# Shared layer on the path (mirrors /opt/python in Lambda)
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'layers', 'tsa-shared-utilities', 'python'))
+
+from tsa_shared.validation import validate_input_security  # noqa: E402
+
+
+ONBOARDING_PAYLOAD = {
+    'email': 'jordan.rivera@example.com',
+    'first_name': 'Jordan',
+    'last_name': 'Rivera',
+    'phone': '(512) 555-0142',
+    'birth_date': '1988-04-12',
+    'gender': 'female',
+    'school_name': 'Texas Sports Academy - Austin North',
+    'school_type': 'high-school',
+    'grade_levels_served': ['9', '10', '11', '12'],
+    'address': {
+        'street': '4100 Lakeline Blvd, Suite 200',
+        'city': 'Austin',
+        'state': 'TX',
+        'zip': '78717'
+    },
+    'sport': 'basketball',
+    'football_type': None,
+    'experience': 'Head coach for 8 years, former collegiate player',
+    'certifications': ['CPR', 'First Aid', 'USA Basketball Gold License'],
+    'specialties': ['player development', 'conditioning'],
+    'bio': 'I love helping student athletes grow on and off the court. Looking forward to the season!',
+    'emergency_contact': {'name': 'Sam Rivera', 'phone': '512-555-0199', 'relationship': 'spouse'},
+    'has_physical_location': True,
+    'website': 'https://example.com/coach-jordan',
+    'wizard_step': 7,
+    'onboarding_complete': False
+}
+
+ENROLLMENT_PAYLOAD = {
+    'invitation_token': 'a3f9c2e1-7b4d-4e8a-9c1f-2d6b8e0f4a57',
+    'parent_email': 'morgan.lee@example.com',
+    'parent_first_name': 'Morgan',
+    'parent_last_name': 'Lee',
+    'students': [
+        {
+            'first_name': 'Avery',
+            'last_name': 'Lee',
+            'date_of_birth': '2011-09-03',
+            'grade_level': '8',
+            'sport_interests': ['soccer', 'track'],
+            'medical_notes': 'Mild asthma - carries inhaler',
+            'previous_school': "St. Mary's Academy"
+        },
+        {
+            'first_name': 'Riley',
+            'last_name': 'Lee',
+            'date_of_birth': '2014-01-22',
+            'grade_level': '5',
+            'sport_interests': ['swimming'],
+            'medical_notes': '',
+            'previous_school': 'Cedar Park Elementary'
+        }
+    ],
+    'consultation': {'preferred_date': '2025-08-14T15:30:00Z', 'notes': 'Afternoons work best'},
+    'agreements': {'terms': True, 'photo_release': True}
+}
+
+MALICIOUS_SAMPLES = [
+    "<script>alert('x')</script>",
+    'javascript:alert(1)',
+    '<img src=x onerror=alert(1)>',
+    "' OR 1=1 --",
+    'select password from users',
+    'name; rm -rf /',
+    'value | cat /etc/passwd',
+    '$(whoami)',
+    '1 or 1',
+    'a && b'
+]
+
+
+def legacy_validate_input_security(data: Any) -> Dict[str, Any]:
+    """Previous implementation: one re.search per pattern, per string"""
+    xss_patterns = [
+        r'<script\b[^<]*(?:(?!<\/script>)<[^<]*)*<\/script>', r'javascript:', r'vbscript:',
+        r'on\w+\s*=', r'<iframe\b', r'<object\b', r'<embed\b', r'<link\b', r'<meta\b', r'<style\b'
+    ]
+    sql_patterns = [
+        r'\b(union|select|insert|delete|update|drop|exec|execute)\b.*\b(from|where|into)\b',
+        r'[;\'"]\s*--', r'\bor\s+\d+\s*=\s*\d+', r'\band\s+\d+\s*=\s*\d+',
+        r'\bunion\s+select', r'1\s*=\s*1', r'1\s*or\s*1'
+    ]
+    command_patterns = [r'[;&|`]', r'\$\(', r'`.*`', r'\|\s*\w+', r'&&\s*\w+', r';\s*\w+']
+
+    def check_string_value(value: str) -> Dict[str, Any]:
+        value_lower = value.lower()
+        for pattern in xss_patterns:
+            if re.search(pattern, value_lower, re.IGNORECASE):
+                return {'valid': False, 'pattern_type': 'xss'}
+        for pattern in sql_patterns:
+            if re.search(pattern, value_lower, re.IGNORECASE):
+                return {'valid': False, 'pattern_type': 'sql_injection'}
+        for pattern in command_patterns:
+            if re.search(pattern, value, re.IGNORECASE):
+                return {'valid': False, 'pattern_type': 'command_injection'}
+        return {'valid': True}
+
+    def validate_recursive(obj):
+        if isinstance(obj, dict):
+            for value in obj.values():
+                result = validate_recursive(value)
+                if not result['valid']:
+                    return result
+        elif isinstance(obj, list):
+            for item in obj:
+                result = validate_recursive(item)
+                if not result['valid']:
+                    return result
+        elif isinstance(obj, str):
+            return check_string_value(obj)
+        return {'valid': True}
+
+    return validate_recursive(data)
+
+
+def time_calls(func: Callable[[Any], Dict[str, Any]], payload: Any, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(payload)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark validate_input_security')
+    parser.add_argument('--iterations', type=int, default=2000)
+    args = parser.parse_args()
+
+    # Both implementations must agree before timing means anything
+    samples = [ONBOARDING_PAYLOAD, ENROLLMENT_PAYLOAD] + MALICIOUS_SAMPLES
+    for sample in samples:
+        legacy = legacy_validate_input_security(sample)
+        current = validate_input_security(sample)
+        if legacy['valid'] != current['valid'] or legacy.get('pattern_type') != current.get('pattern_type'):
+            print(f"❌ Mismatch for {sample!r}: legacy={legacy} current={current}")
+            sys.exit(1)
+    print(f"✅ {len(samples)} samples agree")
+
+    for name, payload in (('onboarding', ONBOARDING_PAYLOAD), ('enrollment', ENROLLMENT_PAYLOAD)):
+        legacy_us = time_calls(legacy_validate_input_security, payload, args.iterations)
+        current_us = time_calls(validate_input_security, payload, args.iterations)
+        print(f"{name:>12}: legacy {legacy_us:8.1f} µs  precompiled {current_us:8.1f} µs  "
+              f"speedup {legacy_us / current_us:5.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,8 @@ Ensures EdFi and OneRoster compliance by syncing coach profiles from DynamoDB to
 Usage:
     python migrate-profiles-to-postgres.py --dry-run  # Preview changes
     python migrate-profiles-to-postgres.py --execute  # Apply changes
+    python migrate-profiles-to-postgres.py --execute --bulk [--chunk-size 5000] [--segments 4] [--restart]
+        # COPY-based loader with chunked commits; re-run to resume after an interruption
 """
 
 import boto3
@@ -14,6 +16,7 @@ import psycopg2.extras
 import json
 import uuid
 import argparse
+import os
 import sys
 from datetime import datetime, timezone
 from typing import Dict, List, Any, Optional
@@ -23,6 +26,16 @@ import logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Use the shared layer's segmented parallel scan when its dependencies are installed locally
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'layers', 'tsa-shared-utilities', 'python'))
+try:
+    from tsa_shared.database import parallel_scan_items
+except ImportError:
+    parallel_scan_items = None
+
+PROFILE_SCAN_SEGMENTS = 4
+DATABASE_SECRET_ARN = 'arn:aws:secretsmanager:us-east-2:164722634547:secret:tsa-coach/database-dev-S8EIlv'
+
 class ProfileMigrator:
     def __init__(self, dry_run: bool = True):
         self.dry_run = dry_run
@@ -46,7 +59,7 @@ class ProfileMigrator:
             # Try different possible secret names/ARNs
             possible_secrets = [
                 'tsa-coach/database-dev',
-                'arn:aws:secretsmanager:us-east-2:164722634547:secret:tsa-coach/database-dev-S8EIlv'
+                DATABASE_SECRET_ARN
             ]
             
             secret_data = None
@@ -83,15 +96,18 @@ class ProfileMigrator:
     def get_all_profiles(self) -> List[Dict[str, Any]]:
         """Fetch all profiles from DynamoDB"""
         try:
-            response = self.profiles_table.scan()
-            profiles = response.get('Items', [])
-            
-            # Handle pagination
-            while 'LastEvaluatedKey' in response:
-                response = self.profiles_table.scan(
-                    ExclusiveStartKey=response['LastEvaluatedKey']
-                )
-                profiles.extend(response.get('Items', []))
+            if parallel_scan_items:
+                profiles = list(parallel_scan_items(self.profiles_table, total_segments=PROFILE_SCAN_SEGMENTS))
+            else:
+                response = self.profiles_table.scan()
+                profiles = response.get('Items', [])
+                
+                # Handle pagination
+                while 'LastEvaluatedKey' in response:
+                    response = self.profiles_table.scan(
+                        ExclusiveStartKey=response['LastEvaluatedKey']
+                    )
+                    profiles.extend(response.get('Items', []))
             
             logger.info(f"📦 Found {len(profiles)} profiles in DynamoDB")
             return profiles
@@ -315,10 +331,43 @@ class ProfileMigrator:
         print("="*50)
 
 
+def run_bulk_migration(dry_run: bool, chunk_size: int, segments: int, restart: bool) -> bool:
+    """Run the shared COPY-based bulk loader (resumable via migration_checkpoints)"""
+    sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'lambda_migrations'))
+    os.environ.setdefault('DB_SECRET_ARN', DATABASE_SECRET_ARN)
+    
+    from shared_db_utils import migrate_profiles_bulk, run_async
+    
+    try:
+        result = run_async(migrate_profiles_bulk(
+            dry_run=dry_run, chunk_size=chunk_size, total_segments=segments, resume=not restart
+        ))
+    except Exception as e:
+        logger.error(f"❌ Bulk migration failed (re-run to resume from the last committed chunk): {e}")
+        return False
+    
+    stats = result['stats']
+    print("\n" + "="*50)
+    print("📊 BULK MIGRATION SUMMARY")
+    print("="*50)
+    print(f"Profiles processed: {stats['profiles_processed']}")
+    print(f"Users created/updated: {stats['users_created']}")
+    print(f"Organizations created: {stats['organizations_created']}")
+    print(f"Errors: {stats['errors']}")
+    print(f"Skipped: {stats['skipped']}")
+    print(f"Chunks committed: {result['chunks']} in {result.get('duration_seconds', 0)}s")
+    print("="*50)
+    return True
+
+
 def main():
     parser = argparse.ArgumentParser(description='Migrate DynamoDB profiles to PostgreSQL for compliance')
     parser.add_argument('--dry-run', action='store_true', help='Preview changes without executing')
     parser.add_argument('--execute', action='store_true', help='Execute the migration')
+    parser.add_argument('--bulk', action='store_true', help='Use the COPY-based bulk loader (resumable)')
+    parser.add_argument('--chunk-size', type=int, default=5000, help='Profiles per committed chunk (bulk mode)')
+    parser.add_argument('--segments', type=int, default=PROFILE_SCAN_SEGMENTS, help='Parallel scan segments (bulk mode)')
+    parser.add_argument('--restart', action='store_true', help='Ignore saved checkpoints and start over (bulk mode)')
     
     args = parser.parse_args()
     
@@ -330,6 +379,12 @@ def main():
         print("❌ Cannot specify both --dry-run and --execute")
         sys.exit(1)
     
+    if args.bulk:
+        print("🔄 TSA Coach Portal: DynamoDB → PostgreSQL bulk migration (COPY)")
+        success = run_bulk_migration(args.dry_run, args.chunk_size, args.segments, args.restart)
+        print("✅ Migration completed successfully!" if success else "❌ Migration failed!")
+        sys.exit(0 if success else 1)
+    
     migrator = ProfileMigrator(dry_run=args.dry_run)
     
     print("🔄 TSA Coach Portal: DynamoDB → PostgreSQL Migration")
@@ -14,6 +14,7 @@ from components.enrollments_component import EnrollmentsComponent
 from components.tasks_component import TasksComponent
 from components.activity_component import ActivityComponent
 from components.auth_component import AuthComponent
+from services.request_loader import request_scope, run_concurrently
 
 
 def lambda_handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
@@ -51,11 +52,21 @@ def get_dashboard_data(event: Dict[str, Any]) -> Dict[str, Any]:
         if not user_email:
             return create_api_response(401, {'error': 'Authentication required'})
         
-        # Get data from each component
-        profile_data = ProfileComponent.get_profile_summary(user_email)
-        enrollments_data = EnrollmentsComponent.get_enrollments_summary(user_email)  
-        tasks_data = TasksComponent.get_pending_tasks(user_email)
-        activity_data = ActivityComponent.get_recent_activity(user_email)
+        # Compose components concurrently; within the request scope the
+        # profile and enrollments queries each run once and are shared
+        with request_scope() as loader:
+            results = run_concurrently({
+                'profile': lambda: ProfileComponent.get_profile_summary(user_email),
+                'enrollments': lambda: EnrollmentsComponent.get_enrollments_summary(user_email),
+                'tasks': lambda: TasksComponent.get_pending_tasks(user_email),
+                'activity': lambda: ActivityComponent.get_recent_activity(user_email)
+            })
+        print(f"📊 Dashboard composed with {loader.loads} data loads")
+        
+        profile_data = results['profile']
+        enrollments_data = results['enrollments']
+        tasks_data = results['tasks']
+        activity_data = results['activity']
         
         # Compose dashboard response
         dashboard = {
@@ -3,9 +3,9 @@ Auth Service - Business Logic Layer
 Handles parent authentication operations with proper service integration
 """
 from typing import Dict, Any
-import boto3
 import json
 import os
+from tsa_shared import get_client
 
 
 class AuthService:
@@ -23,7 +23,7 @@ class AuthService:
             }
             
             # Call existing magic link lambda (proper service integration)
-            lambda_client = boto3.client('lambda')
+            lambda_client = get_client('lambda')
             magic_link_function = os.environ.get('MAGIC_LINK_FUNCTION_NAME', 'tsa-coach-magic-link-handler')
             
             response = lambda_client.invoke(
@@ -4,34 +4,36 @@ Handles parent enrollment operations with proper data access patterns
 """
 from typing import Dict, Any, List
 from tsa_shared import get_table, UserIdentifier
+from tsa_shared.database import get_table_name, iter_query_pages
 import os
-from tsa_shared.config import get_config
-
-
-
-config = get_config()
+from services.request_loader import load_once
 
 class EnrollmentService:
     """Service for parent enrollment business logic"""
     
     @staticmethod
     def get_parent_enrollments(parent_email: str) -> List[Dict[str, Any]]:
+        """Get all enrollments for parent (queried once per dashboard request)"""
+        return load_once(('enrollments', parent_email),
+                         lambda: EnrollmentService._query_parent_enrollments(parent_email))
+    
+    @staticmethod
+    def _query_parent_enrollments(parent_email: str) -> List[Dict[str, Any]]:
         """Get all enrollments for parent using proper GSI lookup"""
         try:
-            table = get_table(config.get_env_vars('SERVICE')['ENROLLMENTS_TABLE'], get_table_name('enrollments')))
+            table = get_table(os.environ.get('ENROLLMENTS_TABLE') or get_table_name('enrollments'))
             
             # Use GSI for efficient lookup instead of scanning
-            response = table.query(
+            enrollments = []
+            for page in iter_query_pages(
+                table,
                 IndexName='parent-email-index',  # Proper GSI, not scan
                 KeyConditionExpression='parent_email = :email',
                 ExpressionAttributeValues={':email': parent_email}
-            )
-            
-            enrollments = []
-            for item in response.get('Items', []):
-                # Calculate progress efficiently
-                enrollment_summary = EnrollmentService._format_enrollment_summary(item)
-                enrollments.append(enrollment_summary)
+            ):
+                for item in page.get('Items', []):
+                    # Calculate progress efficiently
+                    enrollments.append(EnrollmentService._format_enrollment_summary(item))
             
             # Sort by creation date (most recent first)
             enrollments.sort(key=lambda x: x.get('created_at', ''), reverse=True)
@@ -67,7 +69,7 @@ class EnrollmentService:
     def get_enrollment_by_id(enrollment_id: str) -> Dict[str, Any]:
         """Get specific enrollment by ID"""
         try:
-            table = get_table(config.get_env_vars('SERVICE')['ENROLLMENTS_TABLE'], get_table_name('enrollments')))
+            table = get_table(os.environ.get('ENROLLMENTS_TABLE') or get_table_name('enrollments'))
             
             response = table.get_item(Key={'enrollment_id': enrollment_id})
             return response.get('Item', {})
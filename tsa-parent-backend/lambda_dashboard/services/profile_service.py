@@ -6,12 +6,18 @@ from typing import Dict, Any, Optional
 from tsa_shared import get_table, UserIdentifier
 import os
 import time
+from services.request_loader import load_once
 
 class ProfileService:
     """Service for parent profile business logic"""
     
     @staticmethod
     def get_parent_profile(email: str) -> Optional[Dict[str, Any]]:
+        """Get parent profile (queried once per dashboard request)"""
+        return load_once(('profile', email), lambda: ProfileService._query_parent_profile(email))
+    
+    @staticmethod
+    def _query_parent_profile(email: str) -> Optional[Dict[str, Any]]:
         """Get parent profile using proper GSI lookup, not scan"""
         try:
             table = get_table(os.environ.get('PROFILES_TABLE', 'profiles'))
@@ -67,7 +73,8 @@ class ProfileService:
                     ReturnValues='ALL_NEW'
                 )
             
-            return ProfileService.get_parent_profile(email)
+            # Re-read past any request-scoped copy
+            return ProfileService._query_parent_profile(email)
             
         except Exception as e:
             print(f"Profile update error: {str(e)}")
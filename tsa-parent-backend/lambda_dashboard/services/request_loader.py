@@ -0,0 +1,90 @@
+"""
+Request Loader - Request-scoped memoization for dashboard data access
+Lets independent components share one underlying query per request and run concurrently
+"""
+import contextvars
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, Callable, Hashable, Iterator, Optional
+
+_current_loader: contextvars.ContextVar = contextvars.ContextVar('dashboard_request_loader', default=None)
+
+# Container-scoped pool for composing dashboard components
+_component_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='dashboard-component')
+
+
+class RequestLoader:
+    """Memoizes loads by key for one request; concurrent callers share the in-flight load"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._results: Dict[Hashable, Future] = {}
+        self.loads = 0
+
+    def load(self, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """
+        Get the result for key, calling fetch only the first time
+
+        Args:
+            key: Identifies the underlying query (e.g. ('enrollments', email))
+            fetch: Performs the query
+
+        Returns:
+            The shared result - callers must treat it as read-only
+        """
+        with self._lock:
+            result = self._results.get(key)
+            is_owner = result is None
+            if is_owner:
+                result = self._results[key] = Future()
+                self.loads += 1
+
+        if is_owner:
+            try:
+                result.set_result(fetch())
+            except Exception as e:
+                result.set_exception(e)
+        return result.result()
+
+
+@contextmanager
+def request_scope() -> Iterator[RequestLoader]:
+    """Open a request scope - loads inside it (including run_concurrently tasks) are memoized"""
+    loader = RequestLoader()
+    token = _current_loader.set(loader)
+    try:
+        yield loader
+    finally:
+        _current_loader.reset(token)
+
+
+def current_loader() -> Optional[RequestLoader]:
+    """The active request loader, or None outside a request scope"""
+    return _current_loader.get()
+
+
+def load_once(key: Hashable, fetch: Callable[[], Any]) -> Any:
+    """Memoized load within the current request scope (plain call outside one)"""
+    loader = _current_loader.get()
+    if loader is None:
+        return fetch()
+    return loader.load(key, fetch)
+
+
+def run_concurrently(tasks: Dict[str, Callable[[], Any]]) -> Dict[str, Any]:
+    """
+    Run independent tasks concurrently inside the caller's request scope
+
+    Args:
+        tasks: Dict of name -> zero-argument callable
+
+    Returns:
+        Dict of name -> result (exceptions propagate)
+    """
+    # Each task gets its own copy of the context, so they all see the same loader
+    futures = {
+        name: _component_executor.submit(contextvars.copy_context().run, task)
+        for name, task in tasks.items()
+    }
+    return {name: future.result() for name, future in futures.items()}
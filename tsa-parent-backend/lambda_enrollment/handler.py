@@ -247,16 +247,10 @@ def create_student_records_sync(enrollment_data: Dict[str, Any]) -> Dict[str, An
         }
     
     try:
-        import asyncio
+        from shared_db_utils.database import run_async
         
-        # Run the async function in a new event loop
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            result = loop.run_until_complete(create_edfi_student_from_enrollment(enrollment_data))
-            return result
-        finally:
-            loop.close()
+        # Run on the container's persistent loop so the pooled engine is reused
+        return run_async(create_edfi_student_from_enrollment(enrollment_data))
             
     except Exception as e:
         print(f"Error in sync wrapper for student creation: {str(e)}")
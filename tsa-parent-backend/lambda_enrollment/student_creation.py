@@ -50,40 +50,36 @@ async def create_edfi_student_from_enrollment(enrollment_data: Dict[str, Any]) -
                 'error': f"Student data validation failed: {validation['error']}"
             }
         
-        # Create database session
+        # Container-scoped manager - pooled connections are reused across warm invocations
         db_manager = await get_async_db_manager()
         
-        try:
-            async with db_manager.get_async_session() as session:
-                # 1. Create EdFi Student record
-                student = await create_edfi_student_record(session, student_info)
-                
-                # 2. Create Student-School Association
-                association = await create_student_school_association(session, student, student_info)
-                
-                # 3. Create TSA Student Extension with enrollment details
-                tsa_extension = await create_tsa_student_extension(session, student, enrollment_data)
-                
-                # 4. Create OneRoster User record for the student (if needed)
-                user_record = await create_oneroster_student_user(session, student, student_info)
-                
-                # Commit all changes
-                await session.commit()
-                
-                return {
-                    'success': True,
-                    'student_unique_id': student.student_unique_id,
-                    'student_usi': student.student_usi,
-                    'school_association_created': True,
-                    'tsa_extension_created': True,
-                    'user_record_created': user_record is not None,
-                    'enrollment_id': enrollment_data.get('enrollment_id'),
-                    'created_at': get_current_timestamp()
-                }
-                
-        finally:
-            await db_manager.close()
+        async with db_manager.get_async_session() as session:
+            # 1. Create EdFi Student record
+            student = await create_edfi_student_record(session, student_info)
+            
+            # 2. Create Student-School Association
+            association = await create_student_school_association(session, student, student_info)
+            
+            # 3. Create TSA Student Extension with enrollment details
+            tsa_extension = await create_tsa_student_extension(session, student, enrollment_data)
+            
+            # 4. Create OneRoster User record for the student (if needed)
+            user_record = await create_oneroster_student_user(session, student, student_info)
+            
+            # Commit all changes
+            await session.commit()
             
+            return {
+                'success': True,
+                'student_unique_id': student.student_unique_id,
+                'student_usi': student.student_usi,
+                'school_association_created': True,
+                'tsa_extension_created': True,
+                'user_record_created': user_record is not None,
+                'enrollment_id': enrollment_data.get('enrollment_id'),
+                'created_at': get_current_timestamp()
+            }
+        
     except Exception as e:
         print(f"Error creating EdFi student record: {str(e)}")
         return {
@@ -5,7 +5,6 @@ Self-contained version without external dependencies - Following .cursorrules La
 """
 import json
 import os
-import boto3
 import uuid
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
@@ -19,14 +18,10 @@ from tsa_shared import (
     get_current_timestamp,
     validate_required_fields,
     validate_email_format,
-    format_error_response
+    format_error_response,
+    get_dynamodb_table
 )
 
-def get_dynamodb_table(table_name):
-    import boto3
-    dynamodb = boto3.resource('dynamodb')
-    return dynamodb.Table(table_name)
-
 def log_api_event(event, context, message="API Request"):
     print(f"{message}: {event.get('httpMethod')} {event.get('path')}")
 
@@ -390,10 +385,10 @@ def send_bulk_parent_invitations(event: Dict[str, Any]) -> Dict[str, Any]:
 def send_parent_invitation_email(invitation: Dict[str, Any]) -> bool:
     """Send parent invitation email using SendGrid"""
     try:
-        from tsa_shared.sendgrid_service import SendGridService
+        from tsa_shared.sendgrid_service import get_sendgrid_service
         
-        # Create SendGrid service and send invitation email
-        sendgrid_service = SendGridService()
+        # Shared SendGrid service (enqueues on the email outbox when configured)
+        sendgrid_service = get_sendgrid_service()
         
         # Format invitation for email
         student_name = invitation.get('student_name', 'Student')